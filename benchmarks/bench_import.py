@@ -0,0 +1,69 @@
+"""Regresja czasu importu (``python -X importtime``) z budżetem per moduł.
+
+Uruchom:  python benchmarks/bench_import.py [--repeat 5] [--scale 1.0]
+
+Dla każdego modułu mierzymy medianę skumulowanego czasu importu w świeżym
+interpreterze i sprawdzamy, czy nie wciąga ciężkich zależności. Kod wyjścia 1,
+gdy budżet przekroczony albo pojawił się zakazany moduł – nadaje się do CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# moduł -> budżet [ms] (skumulowany czas importu, mierzony na wolnym runnerze CI)
+BUDGET_MS: dict[str, float] = {
+    "forest": 50,
+    "forest.backtest": 150,
+    "forest.utils.log": 150,
+    "forest.broker": 150,
+    "forest.live": 150,
+    "forest.data": 150,
+    "forest.dashboard.launcher": 150,
+}
+
+# te pakiety ładują się wyłącznie leniwie – przy pierwszym użyciu
+FORBIDDEN: tuple[str, ...] = ("pandas", "pandas_ta", "numba", "joblib", "tqdm", "structlog", "streamlit")
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Czas importu [ms] i lista zakazanych modułów załadowanych przy imporcie."""
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+    )
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in res.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            total_us = int(parts[1].strip())
+    loaded = [m for m in res.stdout.strip().split(",") if m]
+    return total_us / 1000, loaded
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=1.0, help="mnożnik budżetów (np. 0.5 na szybkiej maszynie)")
+    args = ap.parse_args()
+
+    failed = False
+    for module, budget in BUDGET_MS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        ms = statistics.median(r[0] for r in runs)
+        loaded = runs[-1][1]
+        limit = budget * args.scale
+        ok = ms <= limit and not loaded
+        failed |= not ok
+        extra = f"  heavy: {', '.join(loaded)}" if loaded else ""
+        print(f"{'OK ' if ok else 'FAIL'} {module:<28} {ms:8.1f} ms  (budget {limit:.0f} ms){extra}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Syntetyczne obciążenie ścieżki sygnał → zlecenie (``forest.live.pipeline``).
+
+Uruchom:  python benchmarks/bench_latency.py [--symbols 20] [--bars 5000] [--rate 0]
+          [--venue-latency 0.0] [--prom metrics/forest.prom] [--serve 9108]
+
+Generuje błądzenie losowe OHLC dla wielu symboli, podaje świece do
+``SignalPipeline`` (jeden ``LatencyMonitor`` na wszystkie) i drukuje p50/p99/p99.9
+per etap. ``--rate`` ogranicza tempo (świece / s łącznie, 0 = bez limitu),
+``--venue-latency`` zamienia ``PaperBroker`` na ``LatencyPaperBroker``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from forest.backtest.risk import RiskManager
+from forest.live import LatencyPaperBroker, PaperBroker
+from forest.live.pipeline import SignalPipeline
+from forest.utils.latency import LatencyMonitor
+
+
+def synthetic_bars(n_symbols: int, n_bars: int, seed: int = 0) -> np.ndarray:
+    """(n_bars, n_symbols, 3) – high, low, close."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n_bars, n_symbols)), axis=0))
+    spread = np.abs(rng.normal(0, 0.001, (n_bars, n_symbols))) * close
+    return np.stack([close + spread, close - spread, close], axis=-1)
+
+
+def run(n_symbols: int, n_bars: int, rate: float = 0.0, venue_latency: float = 0.0,
+        monitor: LatencyMonitor | None = None) -> LatencyMonitor:
+    monitor = monitor if monitor is not None else LatencyMonitor()
+    router = LatencyPaperBroker(1e9, latency=venue_latency) if venue_latency else PaperBroker(1e9)
+    router.connect()
+    pipes = [
+        SignalPipeline(router, RiskManager(capital=1e6), f"SYM{i}", fast=5, slow=20, monitor=monitor)
+        for i in range(n_symbols)
+    ]
+    bars = synthetic_bars(n_symbols, n_bars).tolist()
+    period = 1.0 / rate if rate else 0.0
+    t_next = time.perf_counter()
+    for row in bars:
+        for pipe, (hi, lo, cl) in zip(pipes, row):
+            if period:
+                t_next += period
+                wait = t_next - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            pipe.on_bar(hi, lo, cl)
+    return monitor
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=20)
+    ap.add_argument("--bars", type=int, default=5_000)
+    ap.add_argument("--rate", type=float, default=0.0, help="świece / s (0 = bez limitu)")
+    ap.add_argument("--venue-latency", type=float, default=0.0, help="round-trip venue [s]")
+    ap.add_argument("--prom", default=None, help="plik Prometheus (textfile collector)")
+    ap.add_argument("--serve", type=int, default=None, help="port endpointu /metrics (zostaje po teście)")
+    args = ap.parse_args()
+
+    monitor = LatencyMonitor()
+    server = monitor.serve(args.serve) if args.serve else None
+    t0 = time.perf_counter()
+    run(args.symbols, args.bars, args.rate, args.venue_latency, monitor)
+    n = args.symbols * args.bars
+    print(f"{n:,} bars in {time.perf_counter() - t0:.2f} s")
+    print(monitor.report())
+    if args.prom:
+        print(f"-> {monitor.write_prometheus(args.prom)}")
+    if server is not None:
+        print(f"metrics on http://127.0.0.1:{args.serve}/metrics – Ctrl+C kończy")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Mikrobenchmark narzutu pojedynczego wywołania loggera.
+
+Uruchom:  python benchmarks/bench_log.py [--n 200000]
+
+Każdy tryb jest mierzony w osobnym procesie (konfiguracja structlog jest globalna).
+Wynik: ns / wywołanie w wątku wywołującym – tyle, ile płaci ścieżka zleceń.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_MODES = {
+    "sync_console": dict(json=False),
+    "sync_json": dict(json=True),
+    "async_json": dict(json=True, async_mode=True, overflow="drop"),
+    "async_json_block": dict(json=True, async_mode=True, overflow="block"),
+    "disabled_level": dict(json=True, async_mode=True, level="WARNING"),
+}
+
+
+def _child(mode: str, n: int) -> None:
+    import time
+
+    from forest.utils.log import setup_logger, shutdown_logger
+
+    kwargs = dict(_MODES[mode])
+    level = kwargs.pop("level", "INFO")
+    if kwargs.get("async_mode"):
+        kwargs["file"] = os.path.join(tempfile.mkdtemp(), "bench.log")
+    else:
+        # synchroniczny tryb pisze na stdout – przekierowujemy do /dev/null
+        sys.stdout = open(os.devnull, "w")
+    lg = setup_logger(level, force=True, **kwargs)
+
+    for i in range(1_000):  # rozgrzewka + cache loggera
+        lg.info("warmup", i=i)
+    t0 = time.perf_counter_ns()
+    for i in range(n):
+        lg.info("order", symbol="EURUSD", qty=1.0, i=i)
+    elapsed = time.perf_counter_ns() - t0
+    stats = shutdown_logger()
+    sys.__stdout__.write(json.dumps({"mode": mode, "ns_per_call": elapsed / n, **stats}) + "\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.n)
+        return
+
+    for mode in _MODES:
+        res = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--n", str(args.n)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        row = json.loads(res.stdout.strip().splitlines()[-1])
+        print(f"{row['mode']:<18} {row['ns_per_call']:>10.0f} ns/call   dropped={row['dropped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Przepustowość symulatora giełdy (``forest.broker.matching``).
+
+Uruchom:  python benchmarks/bench_matching.py [--orders 500000] [--ticks 100000]
+
+Mierzy osobno: składanie zleceń limit (część przecina księgę), mieszankę
+limit/stop/market z nawiasami SL/TP oraz przetwarzanie ticków przy pełnej księdze.
+Wynik: zlecenia / s i ticki / s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from forest.broker.matching import MatchingEngine
+
+
+def bench_limits(n: int, seed: int = 0) -> float:
+    rng = random.Random(seed)
+    sides = ["BUY" if rng.random() < 0.5 else "SELL" for _ in range(n)]
+    prices = [round(100 + rng.gauss(0, 1), 2) for _ in range(n)]
+    qtys = [rng.randint(1, 10) for _ in range(n)]
+    eng = MatchingEngine()
+    eng.on_tick("SYN", 100.0)
+    t0 = time.perf_counter()
+    for s, p, q in zip(sides, prices, qtys):
+        eng.submit("SYN", s, q, "limit", price=p)
+    return n / (time.perf_counter() - t0)
+
+
+def bench_mixed(n: int, seed: int = 1) -> float:
+    rng = random.Random(seed)
+    eng = MatchingEngine()
+    px = 100.0
+    eng.on_tick("SYN", px)
+    t0 = time.perf_counter()
+    for i in range(n):
+        r = rng.random()
+        side = "BUY" if rng.random() < 0.5 else "SELL"
+        if r < 0.6:
+            eng.submit("SYN", side, 1, "limit", price=round(px + rng.gauss(0, 0.5), 2))
+        elif r < 0.8:
+            off = abs(rng.gauss(0, 0.5))
+            eng.submit("SYN", side, 1, "stop", stop=round(px + off if side == "BUY" else px - off, 2))
+        else:
+            eng.submit("SYN", side, 1, "market", sl=px * (0.99 if side == "BUY" else 1.01),
+                       tp=px * (1.01 if side == "BUY" else 0.99))
+        if i % 10 == 0:
+            px = round(px + rng.gauss(0, 0.05), 2)
+            eng.on_tick("SYN", px, volume=5)
+    return n / (time.perf_counter() - t0)
+
+
+def bench_ticks(n_ticks: int, resting: int = 100_000, seed: int = 2) -> float:
+    rng = random.Random(seed)
+    eng = MatchingEngine()
+    eng.on_tick("SYN", 100.0)
+    for _ in range(resting):
+        off = abs(rng.gauss(0, 2)) + 0.01
+        if rng.random() < 0.5:
+            eng.submit("SYN", "BUY", 1, "limit", price=round(100 - off, 2))
+        else:
+            eng.submit("SYN", "SELL", 1, "limit", price=round(100 + off, 2))
+    path = [100 + rng.gauss(0, 0.5) for _ in range(n_ticks)]
+    t0 = time.perf_counter()
+    for p in path:
+        eng.on_tick("SYN", p, volume=3)
+    return n_ticks / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--orders", type=int, default=500_000)
+    ap.add_argument("--ticks", type=int, default=100_000)
+    args = ap.parse_args()
+    print(f"{'limit orders':<24}{bench_limits(args.orders):>14,.0f} orders/s")
+    print(f"{'mixed + brackets':<24}{bench_mixed(args.orders):>14,.0f} orders/s")
+    print(f"{'ticks (full book)':<24}{bench_ticks(args.ticks):>14,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
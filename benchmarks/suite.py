@@ -0,0 +1,221 @@
+"""Powtarzalny benchmark: wskaźniki, silnik, grid, wczytywanie danych.
+
+Uruchom::
+
+    python benchmarks/suite.py                              # 10k świec, wszystkie przypadki
+    python benchmarks/suite.py --sizes 10k 1m --save base.json
+    python benchmarks/suite.py --sizes 10k 1m --compare base.json --threshold 0.15
+
+Dane są syntetyczne i deterministyczne (stałe ziarno), więc wyniki z różnych
+commitów są porównywalne na tej samej maszynie. ``--compare`` kończy się kodem 1,
+gdy mediana któregoś przypadku jest wolniejsza od bazowej o więcej niż ``threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+SIZES: dict[str, int] = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+GRID_JOBS: tuple[int, ...] = (1, 2, -1)
+
+
+def synthetic_ohlc(n: int, seed: int = 42) -> pd.DataFrame:
+    """Błądzenie losowe z lekkim trendem, świece 1m, indeks UTC."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0.0005, 0.05, n))
+    spread = rng.uniform(0.01, 0.1, n)
+    return pd.DataFrame(
+        {
+            "open": close - rng.normal(0, 0.02, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(1, 1_000, n),
+        },
+        index=pd.date_range("2020-01-01", periods=n, freq="min", tz="UTC"),
+    )
+
+
+# ---------------------------------------------------------------------------#
+#  Przypadki                                                                 #
+# ---------------------------------------------------------------------------#
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[pd.DataFrame, Path], Any]    # (dane, katalog tymczasowy) -> stan
+    run: Callable[[Any], Any]
+
+
+def _cases() -> list[Case]:
+    from forest.backtest.engine import run_backtest
+    from forest.backtest.grid import _hash_df, param_grid, run_grid
+    from forest.backtest.risk import RiskManager
+    from forest.backtest.tradebook import TradeBook
+    from forest.broker import PaperBroker, Side
+    from forest.core.indicators import atr, ema
+    from forest.data.csv_source import CSVConfig, load_history_csv
+
+    def make_risk() -> RiskManager:
+        return RiskManager(capital=10_000)
+
+    def csv_setup(df: pd.DataFrame, tmp: Path) -> CSVConfig:
+        path = tmp / f"bars_{len(df)}.csv"
+        if not path.exists():
+            df.rename_axis("time").reset_index().to_csv(path, index=False)
+        return CSVConfig(path=path, timeframe="1m", tz="UTC")
+
+    def tradebook_setup(df: pd.DataFrame, tmp: Path) -> TradeBook:
+        # jedna transakcja co 10 świec – typowa gęstość dla HFT-owego back-testu
+        tb = TradeBook()
+        step = df.iloc[::10]
+        for i, (ts, px) in enumerate(zip(step.index, step["close"].to_numpy())):
+            tb.append(ts, float(px), 1.0, 1 if i % 2 == 0 else -1)
+        return tb
+
+    def paper_setup(df: pd.DataFrame, tmp: Path) -> tuple:
+        # 500 symboli z otwartymi pozycjami, 200 ticków wyceny całego portfela
+        symbols = [f"S{i}" for i in range(500)]
+        closes = df["close"].to_numpy()[:200]
+        ticks = closes[:, None] * np.linspace(0.9, 1.1, len(symbols))[None, :]
+        br = PaperBroker(initial_balance=1_000_000)
+        br.update_prices(symbols, ticks[0])
+        for i, sym in enumerate(symbols):
+            br.market_order(sym, Side.BUY if i % 2 == 0 else Side.SELL, qty=1.0)
+        return br, symbols, ticks
+
+    def paper_run(state: tuple) -> float:
+        br, symbols, ticks = state
+        for row in ticks:
+            br.update_prices(symbols, row)
+            br.equity()
+        return br.equity()
+
+    grid = list(param_grid(fast=[5, 10], slow=[30, 60]))
+    cases = [
+        Case("ema", lambda df, tmp: df["close"].to_numpy(), lambda c: ema(c, 20)),
+        Case(
+            "atr",
+            lambda df, tmp: (df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy()),
+            lambda s: atr(*s, period=14),
+        ),
+        Case("run_backtest", lambda df, tmp: df, lambda df: run_backtest(df, make_risk(), 12, 26)),
+        Case("hash_df", lambda df, tmp: df, _hash_df),
+        Case("load_history_csv", csv_setup, load_history_csv),
+        Case("tradebook_equity_curve", tradebook_setup, lambda tb: tb.equity_curve()),
+        Case("paper_mtm_500sym", paper_setup, paper_run),
+    ]
+    for n_jobs in GRID_JOBS:
+        cases.append(
+            Case(
+                f"run_grid_jobs{n_jobs}",
+                lambda df, tmp: df,
+                lambda df, n_jobs=n_jobs: run_grid(df, grid, make_risk=make_risk, n_jobs=n_jobs, use_cache=False),
+            )
+        )
+    return cases
+
+
+# ---------------------------------------------------------------------------#
+#  Pomiar / zapis / porównanie                                               #
+# ---------------------------------------------------------------------------#
+def _time(fn: Callable[[Any], Any], state: Any, repeat: int) -> list[float]:
+    fn(state)  # rozgrzewka: leniwe importy, cache numba/pandas_ta
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(state)
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _meta() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def run_suite(sizes: list[str], repeat: int, only: list[str] | None = None) -> dict[str, Any]:
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="forest_bench_") as tmp_dir:
+        tmp = Path(tmp_dir)
+        for size in sizes:
+            df = synthetic_ohlc(SIZES[size])
+            for case in _cases():
+                if only and case.name not in only:
+                    continue
+                state = case.setup(df, tmp)
+                times = _time(case.run, state, repeat)
+                key = f"{case.name}[{size}]"
+                results[key] = {"median": statistics.median(times), "min": min(times), "repeat": repeat}
+                print(f"{key:<36} median {results[key]['median']:10.4f} s   min {results[key]['min']:10.4f} s")
+    return {"meta": _meta(), "results": results}
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> bool:
+    """Wypisz porównanie median; True, gdy nie ma regresji ponad ``threshold``."""
+    ok = True
+    base = baseline.get("results", {})
+    for key, row in current["results"].items():
+        if key not in base:
+            print(f"{key:<36} (brak w bazie)")
+            continue
+        ratio = row["median"] / base[key]["median"] if base[key]["median"] else float("inf")
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        ok &= status == "ok"
+        print(f"{key:<36} x{ratio:6.2f}  {status}")
+    return ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", nargs="+", default=["10k"], choices=list(SIZES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="+", help="nazwy przypadków (np. ema run_backtest)")
+    ap.add_argument("--save", type=Path, help="zapisz wyniki JSON (np. jako nową bazę)")
+    ap.add_argument("--compare", type=Path, help="plik JSON z bazą do porównania")
+    ap.add_argument("--threshold", type=float, default=0.15, help="dopuszczalne spowolnienie (0.15 = 15%%)")
+    args = ap.parse_args()
+
+    # ostrzeżenia numeryczne z rozgrzewkowych NaN nie są przedmiotem pomiaru (także w workerach joblib)
+    warnings.simplefilter("ignore", RuntimeWarning)
+    os.environ.setdefault("PYTHONWARNINGS", "ignore::RuntimeWarning")
+
+    current = run_suite(args.sizes, args.repeat, args.only)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(current, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        return 0 if compare(current, baseline, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,46 @@
 # src/forest/backtest/__init__.py
-from .engine import run_backtest
-from .risk import RiskManager
-from .trace import DecisionTrace
-from .tradebook import Trade, TradeBook
+"""Silnik back‑testu. Eksporty ładowane leniwie (PEP 562) – ``import forest.backtest``
+nie ciągnie pandas / pandas_ta, dopóki nie sięgniemy po konkretny obiekt."""
 
-__all__ = ["run_backtest", "RiskManager", "Trade", "TradeBook", "DecisionTrace"]
+from __future__ import annotations
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .engine import run_backtest
+    from .risk import RiskManager
+    from .trace import DecisionTrace, TraceRecorder, load_trace
+    from .tradebook import Trade, TradeBook
+
+_EXPORTS: dict[str, str] = {
+    "run_backtest": ".engine",
+    "RiskManager": ".risk",
+    "Trade": ".tradebook",
+    "TradeBook": ".tradebook",
+    "DecisionTrace": ".trace",
+    "TraceRecorder": ".trace",
+    "load_trace": ".trace",
+}
+
+__all__ = [
+    "run_backtest",
+    "RiskManager",
+    "Trade",
+    "TradeBook",
+    "DecisionTrace",
+    "TraceRecorder",
+    "load_trace",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value  # kolejne odwołania bez __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
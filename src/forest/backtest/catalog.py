@@ -0,0 +1,382 @@
+"""Katalog wyników gridów: partycjonowany Parquet + indeks przebiegów.
+
+Układ katalogu (partycje w stylu Hive)::
+
+    root/
+      _runs/<run_id>.parquet        # indeks przebiegów – jeden fragment na przebieg (run_id, symbol, tf …)
+      _common_metadata              # wspólny (zunifikowany) schemat wszystkich plików
+      _lock                         # blokada na czas scalania schematu
+      symbol=EURUSD/timeframe=1h/date=2025-01-31/run-<run_id>.parquet
+
+Zapytania idą przez ``pyarrow.dataset``: filtry po partycjach odcinają całe
+katalogi, filtry po kolumnach (``max_dd <= 0.2``, ``fast between 5..20``) są
+spychane do skanera i korzystają ze statystyk row‑groupów, a wczytywane są tylko
+potrzebne kolumny. ``top_k`` przegląda dane paczkami i trzyma w pamięci najwyżej
+``k`` najlepszych wierszy – całe archiwum nigdy nie ląduje w RAM.
+
+Kilka procesów (``forest run``, workery grida) może dopisywać równolegle: każdy
+przebieg dokłada własny fragment indeksu, a jedyny wspólny plik (schemat) jest
+scalany pod blokadą ``_lock``.
+
+CLI::
+
+    python -m forest.backtest.catalog results/catalog add grid.parquet --symbol EURUSD --timeframe 1h
+    python -m forest.backtest.catalog results/catalog runs
+    python -m forest.backtest.catalog results/catalog query -w "max_dd <= 0.2" -w "fast between 5..20"
+    python -m forest.backtest.catalog results/catalog top -k 10 --by rar -w "max_dd <= 0.2"
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import operator
+import os
+import re
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+import pandas as pd
+
+from forest.backtest.results import METRICS
+
+PARTITIONS: tuple[str, ...] = ("symbol", "timeframe", "date")
+RUN_ID = "run_id"
+
+Filter = tuple[str, str, Any]   # (kolumna, operator, wartość) – jak filtry DNF w pyarrow
+
+_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+__all__ = ["PARTITIONS", "ResultsCatalog", "parse_filter"]
+
+
+# ---------- filtry ----------
+def _literal(text: str) -> Any:
+    text = text.strip()
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text  # np. EURUSD bez cudzysłowów
+
+
+_FILTER_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>|=|\bnot in\b|\bin\b|\bbetween\b)\s*(.+?)\s*$")
+
+
+def parse_filter(text: str) -> Filter:
+    """``"max_dd <= 0.2"`` / ``"fast in 5,10"`` / ``"fast between 5..20"`` -> krotka filtra."""
+    m = _FILTER_RE.match(text)
+    if not m:
+        raise ValueError(f"Niepoprawny filtr: {text!r}")
+    col, op, raw = m.groups()
+    if op == "=":
+        op = "=="
+    if op in ("in", "not in"):
+        return col, op, [_literal(v) for v in raw.strip("[]()").split(",") if v.strip()]
+    if op == "between":
+        lo, hi = re.split(r"\.\.|,", raw, maxsplit=1)
+        return col, op, (_literal(lo), _literal(hi))
+    return col, op, _literal(raw)
+
+
+def _expression(where: Iterable[Filter]):
+    """Lista filtrów (łączonych przez AND) -> ``pyarrow.dataset.Expression``."""
+    import pyarrow.dataset as ds
+
+    expr = None
+    for col, op, value in where:
+        f = ds.field(col)
+        if op == "between":
+            lo, hi = value
+            e = (f >= lo) & (f <= hi)
+        elif op == "in":
+            e = f.isin(list(value))
+        elif op == "not in":
+            e = ~f.isin(list(value))
+        elif op in _OPS:
+            e = _OPS[op](f, value)
+        else:
+            raise ValueError(f"Nieznany operator filtra: {op!r}")
+        expr = e if expr is None else expr & e
+    return expr
+
+
+# ---------- katalog ----------
+class ResultsCatalog:
+    """Archiwum wyników gridów z zapytaniami bez wczytywania całości."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    @property
+    def _runs_dir(self) -> Path:
+        return self.root / "_runs"
+
+    @property
+    def _runs_path(self) -> Path:
+        # indeks sprzed fragmentów – wciąż czytany
+        return self.root / "_runs.parquet"
+
+    @property
+    def _schema_path(self) -> Path:
+        return self.root / "_common_metadata"
+
+    # ---------- zapis ----------
+    def add(
+        self,
+        df: pd.DataFrame,
+        *,
+        symbol: str,
+        timeframe: str,
+        date: Any = None,
+        run_id: str | None = None,
+        meta: dict[str, Any] | None = None,
+        row_group_size: int = 128_000,
+    ) -> str:
+        """Dopisz wyniki jednego grida (płaski schemat) jako nowy przebieg; zwraca ``run_id``."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from forest.backtest.results import flatten_results, param_columns
+
+        clash = {RUN_ID, *PARTITIONS} & set(df.columns)
+        if clash:
+            raise ValueError(f"Kolumny zarezerwowane dla katalogu: {sorted(clash)}")
+        df = flatten_results(df)
+        run_id = run_id or uuid.uuid4().hex[:12]
+        day = (pd.Timestamp(date) if date is not None else pd.Timestamp.now(tz="UTC")).strftime("%Y-%m-%d")
+
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        table = table.append_column(RUN_ID, pa.array([run_id] * len(df), pa.string()))
+        rel = Path(f"symbol={symbol}", f"timeframe={timeframe}", f"date={day}", f"run-{run_id}.parquet")
+        (self.root / rel).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.root / rel, row_group_size=row_group_size, compression="zstd")
+
+        self._merge_schema(table.schema)
+        row = {
+            RUN_ID: run_id,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "date": day,
+            "created": pd.Timestamp.now(tz="UTC"),
+            "rows": len(df),
+            "params": ",".join(param_columns(df)),
+            "path": rel.as_posix(),
+            "meta": json.dumps(meta or {}, default=str),
+        }
+        # własny fragment indeksu – bez read‑modify‑write wspólnego pliku
+        self._runs_dir.mkdir(exist_ok=True)
+        self._atomic_write(pd.DataFrame([row]), self._runs_dir / f"{run_id}.parquet")
+        return run_id
+
+    @contextmanager
+    def _lock(self, timeout: float = 30.0) -> Iterator[None]:
+        """Blokada międzyprocesowa (plik tworzony z ``O_EXCL``); starsza niż ``timeout`` s → porzucona."""
+        path = self.root / "_lock"
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - path.stat().st_mtime > timeout:
+                        path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            path.unlink(missing_ok=True)
+
+    def _merge_schema(self, schema) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with self._lock():
+            if self._schema_path.exists():
+                schema = pa.unify_schemas([pq.read_schema(self._schema_path), schema], promote_options="permissive")
+            tmp = self._schema_path.with_suffix(f".{os.getpid()}.tmp")
+            pq.write_metadata(schema, tmp)
+            os.replace(tmp, self._schema_path)
+
+    @staticmethod
+    def _atomic_write(df: pd.DataFrame, path: Path) -> None:
+        tmp = path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex[:6]}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    # ---------- indeks ----------
+    def runs(self, **where: Any) -> pd.DataFrame:
+        """Indeks przebiegów, opcjonalnie zawężony równościami (``symbol="EURUSD"`` …)."""
+        frames = [pd.read_parquet(p) for p in sorted(self._runs_dir.glob("*.parquet"))]
+        if self._runs_path.exists():
+            frames.insert(0, pd.read_parquet(self._runs_path))
+        if not frames:
+            return pd.DataFrame(columns=[RUN_ID, *PARTITIONS, "created", "rows", "params", "path", "meta"])
+        runs = pd.concat(frames, ignore_index=True).sort_values("created", kind="stable")
+        for col, value in where.items():
+            if value is not None:
+                runs = runs[runs[col] == value]
+        return runs.reset_index(drop=True)
+
+    # ---------- zapytania ----------
+    def dataset(self):
+        """``pyarrow.dataset.Dataset`` nad całym katalogiem (schemat z ``_common_metadata``)."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        if not self._schema_path.exists():
+            raise FileNotFoundError(f"Pusty katalog wyników: {self.root}")
+        part = pa.schema([(p, pa.string()) for p in PARTITIONS])
+        schema = pa.unify_schemas([pq.read_schema(self._schema_path), part])
+        return ds.dataset(
+            self.root, format="parquet", schema=schema, partitioning=ds.partitioning(part, flavor="hive")
+        )
+
+    def param_names(self) -> list[str]:
+        import pyarrow.parquet as pq
+
+        if not self._schema_path.exists():
+            return []
+        skip = {*METRICS, *PARTITIONS, RUN_ID}
+        return [n for n in pq.read_schema(self._schema_path).names if n not in skip]
+
+    def _filter(self, where: Sequence[Filter | str] | None, partitions: dict[str, Any]):
+        flt = [parse_filter(w) if isinstance(w, str) else tuple(w) for w in (where or ())]
+        for col, value in partitions.items():
+            if value is None:
+                continue
+            if col == "date" and isinstance(value, tuple):
+                flt.append((col, "between", tuple(pd.Timestamp(v).strftime("%Y-%m-%d") for v in value)))
+            elif col == "date":
+                flt.append((col, "==", pd.Timestamp(value).strftime("%Y-%m-%d")))
+            else:
+                flt.append((col, "in" if isinstance(value, (list, tuple, set)) else "==", value))
+        return _expression(flt)
+
+    def _frame(self, table) -> pd.DataFrame:
+        df = table.to_pandas()
+        df.attrs["params"] = [c for c in self.param_names() if c in df.columns]
+        return df
+
+    def query(
+        self,
+        where: Sequence[Filter | str] | None = None,
+        columns: Sequence[str] | None = None,
+        *,
+        symbol: Any = None,
+        timeframe: Any = None,
+        date: Any = None,
+        run_id: Any = None,
+    ) -> pd.DataFrame:
+        """Wiersze spełniające filtry – tylko wskazane kolumny (``None`` = wszystkie).
+
+        ``date`` może być pojedynczą datą albo krotką ``(od, do)`` (włącznie).
+        """
+        expr = self._filter(where, {"symbol": symbol, "timeframe": timeframe, "date": date, RUN_ID: run_id})
+        table = self.dataset().to_table(columns=list(columns) if columns else None, filter=expr)
+        return self._frame(table)
+
+    def top_k(
+        self,
+        k: int,
+        by: str = "rar",
+        *,
+        ascending: bool = False,
+        where: Sequence[Filter | str] | None = None,
+        columns: Sequence[str] | None = None,
+        batch_size: int = 256_000,
+        **partitions: Any,
+    ) -> pd.DataFrame:
+        """``k`` najlepszych wierszy wg ``by`` – skan paczkami, w pamięci najwyżej ``k`` + paczka."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        expr = self._filter(where, partitions)
+        not_nan = ds.field(by) == ds.field(by)  # NaN != NaN – odpada już w skanerze
+        expr = not_nan if expr is None else expr & not_nan
+        cols = None if columns is None else list(dict.fromkeys([*columns, by]))
+        order = "ascending" if ascending else "descending"
+
+        best = None
+        scanner = self.dataset().scanner(columns=cols, filter=expr, batch_size=batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows == 0:
+                continue
+            chunk = pa.Table.from_batches([batch])
+            best = chunk if best is None else pa.concat_tables([best, chunk])
+            if best.num_rows > k:
+                best = best.take(pc.select_k_unstable(best, k, sort_keys=[(by, order)]))
+        if best is None:
+            return self._frame(scanner.projected_schema.empty_table())
+        return self._frame(best.sort_by([(by, order)]))
+
+
+# ---------- CLI ----------
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m forest.backtest.catalog", description="Katalog wyników gridów")
+    ap.add_argument("root", type=Path)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_add = sub.add_parser("add", help="dopisz plik wyników (parquet/csv)")
+    p_add.add_argument("file", type=Path)
+    p_add.add_argument("--symbol", required=True)
+    p_add.add_argument("--timeframe", required=True)
+    p_add.add_argument("--date")
+
+    sub.add_parser("runs", help="lista przebiegów")
+
+    for name in ("query", "top"):
+        p = sub.add_parser(name)
+        p.add_argument("-w", "--where", action="append", default=[], help='np. "max_dd <= 0.2"')
+        p.add_argument("-c", "--columns", nargs="+")
+        p.add_argument("--symbol")
+        p.add_argument("--timeframe")
+        p.add_argument("-o", "--output", type=Path, help="zapisz wynik (.parquet/.csv)")
+        if name == "top":
+            p.add_argument("-k", type=int, default=10)
+            p.add_argument("--by", default="rar")
+            p.add_argument("--ascending", action="store_true")
+
+    args = ap.parse_args(argv)
+    cat = ResultsCatalog(args.root)
+    if args.cmd == "add":
+        from forest.backtest.results import read_results
+
+        print(cat.add(read_results(args.file), symbol=args.symbol, timeframe=args.timeframe, date=args.date))
+        return 0
+    if args.cmd == "runs":
+        out = cat.runs()
+    elif args.cmd == "query":
+        out = cat.query(args.where, args.columns, symbol=args.symbol, timeframe=args.timeframe)
+    else:
+        out = cat.top_k(
+            args.k, args.by, ascending=args.ascending, where=args.where, columns=args.columns,
+            symbol=args.symbol, timeframe=args.timeframe,
+        )
+
+    if args.output:
+        out.to_csv(args.output, index=False) if args.output.suffix == ".csv" else out.to_parquet(args.output)
+    else:
+        print(out.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
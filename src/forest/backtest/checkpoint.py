@@ -0,0 +1,91 @@
+"""Checkpoint silnika back‑testu – stan po ostatniej świecy, żeby dopisane świece liczyć bez historii.
+
+``run_backtest(..., checkpoint=path)`` na końcu zapisuje:
+
+* kolumny ``signal`` i ``atr`` całej historii,
+* stany wskaźników (ostatnia EMA / ATR – ``forest.strategies.indicator_states``),
+* otwartą pozycję, trailing SL i krzywą equity ``RiskManager``, ``TradeBook``
+
+– wszystko sprzed domknięcia pozycji na ostatniej świecy. Przy kolejnym wywołaniu
+z dłuższym ``df`` pętla rusza od pierwszej nowej świecy, a wynik jest identyczny
+z liczeniem od zera. Checkpoint jest pomijany (liczymy całość i zapisujemy nowy),
+gdy zmieniła się historia sprzed niego (odcisk OHLC), strategia / parametry /
+ustawienia ryzyka albo wersja formatu::
+
+    for day in nightly():
+        out = run_backtest(history(), RiskManager(capital=10_000), checkpoint="state/eurusd-1h.ckpt")
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from forest.backtest.risk import RiskManager
+from forest.backtest.tradebook import TradeBook
+from forest.utils import profiling
+
+__all__ = ["Checkpoint", "checkpoint_key", "history_fingerprint", "CHECKPOINT_VERSION"]
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_key(risk: RiskManager, source: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Konfiguracja, od której zależy stan: źródło sygnału (strategia / ``"signal"``), parametry, ryzyko."""
+    p = ",".join(f"{k}={v!r}" for k, v in sorted((params or {}).items()))
+    r = ",".join(repr(getattr(risk, f.name)) for f in fields(risk) if not f.name.startswith("_"))
+    return f"v{CHECKPOINT_VERSION}|{source}({p})|{r}"
+
+
+def history_fingerprint(df: pd.DataFrame) -> str:
+    """Odcisk OHLC(V) + indeksu – ten sam co klucz cech ``forest.ml``."""
+    from forest.ml.features import fingerprint
+
+    return fingerprint(df)
+
+
+@dataclass(slots=True)
+class Checkpoint:
+    n: int                              # liczba przetworzonych świec
+    fingerprint: str                    # odcisk OHLC df.iloc[:n]
+    key: str                            # checkpoint_key
+    signal: np.ndarray
+    atr: np.ndarray
+    states: Dict[str, tuple]
+    position: Optional[int]
+    entry_price: Optional[float]
+    entry_qty: Optional[float]
+    equity_curve: Optional[List[float]]
+    trail: Optional[float]
+    tradebook: TradeBook
+    version: int = CHECKPOINT_VERSION
+
+    def save(self, path: str | Path) -> None:
+        """Zapis atomowy (plik tymczasowy + ``os.replace``)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path, df: pd.DataFrame, key: str) -> Optional["Checkpoint"]:
+        """Checkpoint z ``path``, jeśli pasuje do ``df`` i ``key``; inaczej ``None``."""
+        try:
+            with open(path, "rb") as fh:
+                ck = pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+            return None
+        if not isinstance(ck, cls) or ck.version != CHECKPOINT_VERSION or ck.key != key or ck.n > len(df):
+            return None
+        if history_fingerprint(df.iloc[: ck.n]) != ck.fingerprint:
+            profiling.incr("backtest.checkpoint_stale")   # historia zmieniona wstecz
+            return None
+        return ck
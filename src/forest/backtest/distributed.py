@@ -0,0 +1,430 @@
+"""Grid rozproszony: koordynator dzieli siatkę na jednostki, workery na innych maszynach je pobierają.
+
+Kolejka to katalog na współdzielonym dysku (NFS/SMB; lokalnie – zwykły katalog),
+bez serwera i dodatkowych zależności::
+
+    <root>/
+        data/<odcisk>.parquet           # dane wysyłane raz na odcisk, wspólne dla zadań
+        <job>/
+            job.json                    # strategia, pola RiskManager, odcisk danych, liczba jednostek
+            todo/u00042.json            # jednostka: indeksy + parametry kombinacji, liczba prób
+            leased/u00042@host-123.json # pobrana (atomowy rename z todo/); mtime = heartbeat
+            results/u00042.parquet      # wynik jednostki (płaski schemat + ``_idx``)
+            failed/u00042.json          # po ``max_attempts`` nieudanych próbach
+
+Worker zajmuje jednostkę atomowym ``rename`` (wygrywa dokładnie jeden), w trakcie
+liczenia co ``lease / 3`` s odświeża mtime pliku dzierżawy, a wynik zapisuje przez
+plik tymczasowy + ``os.replace``. Jednostki z przeterminowaną dzierżawą (worker
+zniknął) wracają do ``todo/`` z licznikiem prób – robi to koordynator w ``wait`` i
+bezczynne workery. Dane worker kopiuje do lokalnego cache (``cache_dir``) raz na
+odcisk i trzyma w pamięci między jednostkami.
+
+Koordynator::
+
+    coord = GridCoordinator("/mnt/shared/forest-grid")
+    job = coord.submit(df, param_grid(fast=range(5, 50), slow=range(20, 200, 5)), strategy="ema_cross")
+    res = coord.wait(job)                 # wyniki w kolejności siatki (jak run_grid)
+
+Worker (na każdej maszynie, np. z crona lub systemd)::
+
+    python -m forest.backtest.distributed worker /mnt/shared/forest-grid --n-jobs -1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from forest.backtest.risk import RiskManager
+from forest.utils import profiling
+
+__all__ = ["GridCoordinator", "run_worker", "run_distributed", "main"]
+
+_DEFAULT_CACHE = Path.home() / ".cache" / "forest_grid_data"
+_FRAMES_IN_MEMORY = 4      # LRU ramek w pamięci workera – kolejne zadania mogą mieć inne dane
+
+
+# ---------- pliki ----------
+def _write_json(path: Path, obj: Any) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(obj, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _unit_name(path: Path) -> str:
+    """``u00042@host-1.json`` / ``u00042.json`` → ``u00042``."""
+    return path.stem.split("@", 1)[0]
+
+
+def _risk_fields(make_risk: Callable[[], RiskManager]) -> Dict[str, Any]:
+    rm = asdict(make_risk())
+    return {k: v for k, v in rm.items() if not k.startswith("_")}
+
+
+# ---------- koordynator ----------
+class GridCoordinator:
+    """Zlecanie gridów do katalogu-kolejki i zbieranie wyników."""
+
+    def __init__(self, root: str | Path, *, lease: float = 60.0, max_attempts: int = 3) -> None:
+        self.root = Path(root)
+        self.lease = float(lease)
+        self.max_attempts = int(max_attempts)
+
+    def _job(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def submit(
+        self,
+        df: pd.DataFrame,
+        grid: Iterable[dict],
+        make_risk: Callable[[], RiskManager] | None = None,
+        strategy: str | None = None,
+        unit_size: int = 64,
+        job_id: str | None = None,
+    ) -> str:
+        """Podziel siatkę na jednostki po ``unit_size`` kombinacji i wystaw je w ``todo/``."""
+        from forest.backtest.grid import _hash_df
+
+        grid_list = [dict(p) for p in grid]
+        if not grid_list:
+            raise ValueError("empty grid")
+        make_risk = make_risk or (lambda: RiskManager(capital=10_000))
+        fp = _hash_df(df)
+        data = self.root / "data" / f"{fp}.parquet"
+        if not data.exists():
+            data.parent.mkdir(parents=True, exist_ok=True)
+            tmp = data.with_name(f".{data.name}.{uuid.uuid4().hex[:8]}.tmp")
+            df.to_parquet(tmp)
+            os.replace(tmp, data)
+
+        job_id = job_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        d = self._job(job_id)
+        for sub in ("todo", "leased", "results", "failed"):
+            (d / sub).mkdir(parents=True, exist_ok=True)
+        units = [
+            [[i, grid_list[i]] for i in range(start, min(start + unit_size, len(grid_list)))]
+            for start in range(0, len(grid_list), unit_size)
+        ]
+        for k, items in enumerate(units):
+            _write_json(d / "todo" / f"u{k:05d}.json", {"items": items, "attempts": 0, "errors": []})
+        # job.json na końcu – worker bierze tylko kompletnie wystawione zadania
+        _write_json(
+            d / "job.json",
+            {
+                "data": fp,
+                "strategy": strategy,
+                "risk": _risk_fields(make_risk),
+                "units": len(units),
+                "combos": len(grid_list),
+                "lease": self.lease,
+                "max_attempts": self.max_attempts,
+            },
+        )
+        return job_id
+
+    def status(self, job_id: str) -> Dict[str, int]:
+        d = self._job(job_id)
+        meta = _read_json(d / "job.json") or {}
+        count = {sub: sum(1 for _ in (d / sub).glob("u*")) for sub in ("todo", "leased", "results", "failed")}
+        return {"units": meta.get("units", 0), **count}
+
+    def requeue_expired(self, job_id: str) -> int:
+        """Przeterminowane dzierżawy (worker zniknął) → ``todo/`` albo ``failed/``; zwraca ich liczbę."""
+        return _requeue_expired(self._job(job_id))
+
+    def results(self, job_id: str) -> pd.DataFrame:
+        """Dotychczasowe wyniki (także częściowe) w kolejności siatki, płaski schemat jak ``run_grid``."""
+        from forest.backtest.results import flatten_results
+
+        parts = [pd.read_parquet(p) for p in sorted((self._job(job_id) / "results").glob("u*.parquet"))]
+        if not parts:
+            return pd.DataFrame()
+        out = pd.concat(parts, ignore_index=True).sort_values("_idx", kind="stable")
+        out = out.drop(columns="_idx").reset_index(drop=True)
+        out.attrs = {}
+        return flatten_results(out)
+
+    def wait(
+        self,
+        job_id: str,
+        *,
+        poll: float = 0.5,
+        timeout: float | None = None,
+        on_progress: Callable[[Dict[str, int]], None] | None = None,
+    ) -> pd.DataFrame:
+        """Czekaj na wszystkie jednostki (pilnując dzierżaw); ``RuntimeError`` przy jednostkach ``failed/``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.requeue_expired(job_id)
+            st = self.status(job_id)
+            if on_progress is not None:
+                on_progress(st)
+            if st["failed"]:
+                errors = [
+                    (_read_json(p) or {}).get("errors", [])[-1:]
+                    for p in sorted((self._job(job_id) / "failed").glob("u*.json"))
+                ]
+                raise RuntimeError(f"{st['failed']} unit(s) of {job_id} failed: {errors}")
+            if st["results"] >= st["units"]:
+                return self.results(job_id)
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{job_id}: {st}")
+            time.sleep(poll)
+
+    def drop(self, job_id: str) -> None:
+        shutil.rmtree(self._job(job_id), ignore_errors=True)
+
+
+def _requeue_expired(d: Path) -> int:
+    meta = _read_json(d / "job.json")
+    if meta is None:
+        return 0
+    now, moved = time.time(), 0
+    for path in (d / "leased").glob("u*.json"):
+        try:
+            if now - path.stat().st_mtime < meta["lease"]:
+                continue
+            unit = _read_json(path)
+            if unit is None:
+                continue
+            unit["attempts"] += 1
+            unit["errors"].append(f"lease expired ({path.stem.partition('@')[2]})")
+            _retry(d, path, unit, meta["max_attempts"])
+            moved += 1
+        except FileNotFoundError:      # worker właśnie skończył albo ktoś inny przeniósł
+            continue
+    if moved:
+        profiling.incr("dist.requeued", moved)
+    return moved
+
+
+def _retry(d: Path, leased: Path, unit: dict, max_attempts: int) -> None:
+    name = _unit_name(leased)
+    target = d / ("failed" if unit["attempts"] >= max_attempts else "todo") / f"{name}.json"
+    if (d / "results" / f"{name}.parquet").exists():
+        leased.unlink(missing_ok=True)
+        return
+    _write_json(target, unit)
+    leased.unlink(missing_ok=True)
+
+
+# ---------- worker ----------
+class _Heartbeat(threading.Thread):
+    """Odświeża mtime pliku dzierżawy, dopóki jednostka się liczy."""
+
+    def __init__(self, path: Path, every: float) -> None:
+        super().__init__(daemon=True)
+        self.path = path
+        self.every = every
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(self.every):
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                return
+
+    def stop(self) -> None:
+        self._halt.set()
+
+
+class _Worker:
+    def __init__(self, root: Path, worker_id: str, n_jobs: int, cache_dir: Path, use_cache: bool) -> None:
+        self.root = root
+        self.worker_id = worker_id
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self._frames: OrderedDict[str, pd.DataFrame] = OrderedDict()
+
+    def frame(self, fp: str) -> pd.DataFrame:
+        """Dane po odcisku: pamięć (LRU) → lokalny cache → kopia ze współdzielonego katalogu (raz)."""
+        if fp in self._frames:
+            self._frames.move_to_end(fp)
+        else:
+            local = self.cache_dir / f"{fp}.parquet"
+            if not local.exists():
+                profiling.incr("dist.data_fetch")
+                local.parent.mkdir(parents=True, exist_ok=True)
+                tmp = local.with_name(f".{local.name}.{uuid.uuid4().hex[:8]}.tmp")
+                shutil.copyfile(self.root / "data" / f"{fp}.parquet", tmp)
+                os.replace(tmp, local)
+            self._frames[fp] = pd.read_parquet(local)
+            while len(self._frames) > _FRAMES_IN_MEMORY:
+                self._frames.popitem(last=False)
+        return self._frames[fp]
+
+    def claim(self) -> Optional[tuple[Path, Path, dict]]:
+        """Pierwsza wolna jednostka dowolnego zadania: (katalog zadania, plik dzierżawy, meta)."""
+        for job in sorted(p.parent for p in self.root.glob("*/job.json")):
+            meta = _read_json(job / "job.json")
+            if meta is None:
+                continue
+            for path in sorted((job / "todo").glob("u*.json")):
+                leased = job / "leased" / f"{path.stem}@{self.worker_id}.json"
+                try:
+                    os.rename(path, leased)
+                except FileNotFoundError:    # ktoś był szybszy
+                    continue
+                os.utime(leased)
+                return job, leased, meta
+        return None
+
+    def process(self, job: Path, leased: Path, meta: dict) -> bool:
+        from forest.backtest.grid import run_grid
+
+        unit = _read_json(leased)
+        if unit is None:
+            return False
+        name = _unit_name(leased)
+        beat = _Heartbeat(leased, max(meta["lease"] / 3, 0.05))
+        beat.start()
+        try:
+            idx = [i for i, _ in unit["items"]]
+            out = run_grid(
+                self.frame(meta["data"]),
+                [p for _, p in unit["items"]],
+                make_risk=partial(RiskManager, **meta["risk"]),
+                n_jobs=self.n_jobs,
+                use_cache=self.use_cache,
+                strategy=meta["strategy"],
+            )
+            out.insert(0, "_idx", idx)
+            target = job / "results" / f"{name}.parquet"
+            tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+            out.to_parquet(tmp, index=False)
+            os.replace(tmp, target)
+            leased.unlink(missing_ok=True)
+            return True
+        except Exception as exc:  # noqa: BLE001 – błąd jednostki wraca do kolejki z licznikiem prób
+            unit["attempts"] += 1
+            unit["errors"].append(f"{self.worker_id}: {type(exc).__name__}: {exc}")
+            _retry(job, leased, unit, meta["max_attempts"])
+            return False
+        finally:
+            beat.stop()
+
+
+def run_worker(
+    root: str | Path,
+    *,
+    worker_id: str | None = None,
+    n_jobs: int = 1,
+    cache_dir: str | Path = _DEFAULT_CACHE,
+    idle_exit: float | None = None,
+    max_units: int | None = None,
+    poll: float = 0.5,
+    use_cache: bool = True,
+) -> int:
+    """Pobieraj i licz jednostki ze wszystkich zadań w ``root``; zwraca liczbę policzonych.
+
+    ``idle_exit`` – zakończ po tylu sekundach bez pracy (``None`` = działaj bez końca).
+    """
+    root = Path(root)
+    w = _Worker(
+        root, worker_id or f"{socket.gethostname()}-{os.getpid()}", n_jobs, Path(cache_dir).expanduser(), use_cache
+    )
+    done, idle_since = 0, time.monotonic()
+    while max_units is None or done < max_units:
+        claimed = w.claim()
+        if claimed is None:
+            for job in root.glob("*/job.json"):
+                _requeue_expired(job.parent)
+            if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                break
+            time.sleep(poll)
+            continue
+        done += w.process(*claimed)
+        idle_since = time.monotonic()
+    return done
+
+
+def run_distributed(
+    df: pd.DataFrame,
+    grid: Iterable[dict],
+    root: str | Path,
+    make_risk: Callable[[], RiskManager] | None = None,
+    strategy: str | None = None,
+    *,
+    unit_size: int = 64,
+    local_workers: int = 0,
+    lease: float = 60.0,
+    max_attempts: int = 3,
+    timeout: float | None = None,
+) -> pd.DataFrame:
+    """``submit`` + ``wait``; ``local_workers`` – dodatkowo tylu workerów jako procesy na tej maszynie."""
+    coord = GridCoordinator(root, lease=lease, max_attempts=max_attempts)
+    job_id = coord.submit(df, grid, make_risk, strategy, unit_size)
+    cmd = [sys.executable, "-m", "forest.backtest.distributed", "worker", os.fspath(root), "--idle-exit", "2"]
+    procs = [subprocess.Popen(cmd, stdout=subprocess.DEVNULL) for _ in range(local_workers)]
+    try:
+        return coord.wait(job_id, timeout=timeout)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait()
+
+
+# ---------- CLI ----------
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m forest.backtest.distributed", description="Grid rozproszony")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_w = sub.add_parser("worker", help="licz jednostki z katalogu-kolejki")
+    p_w.add_argument("root", type=Path)
+    p_w.add_argument("--id", dest="worker_id")
+    p_w.add_argument("--n-jobs", type=int, default=1)
+    p_w.add_argument("--cache-dir", type=Path, default=_DEFAULT_CACHE)
+    p_w.add_argument("--idle-exit", type=float, help="zakończ po tylu sekundach bez pracy")
+    p_w.add_argument("--no-cache", action="store_true", help="bez cache gridu (joblib.Memory)")
+
+    p_s = sub.add_parser("status", help="postęp zadań")
+    p_s.add_argument("root", type=Path)
+    p_s.add_argument("job", nargs="*")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "worker":
+        n = run_worker(
+            args.root,
+            worker_id=args.worker_id,
+            n_jobs=args.n_jobs,
+            cache_dir=args.cache_dir,
+            idle_exit=args.idle_exit,
+            use_cache=not args.no_cache,
+        )
+        print(f"{n} unit(s) done", file=sys.stderr)
+        return 0
+
+    coord = GridCoordinator(args.root)
+    jobs: List[str] = args.job or sorted(p.parent.name for p in args.root.glob("*/job.json"))
+    for job in jobs:
+        print(job, json.dumps(coord.status(job)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
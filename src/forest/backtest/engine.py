@@ -1,53 +1,103 @@
 # src/forest/backtest/engine.py
 from __future__ import annotations
 
-from dataclasses import asdict, is_dataclass
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, Mapping
 
 import numpy as np
 import pandas as pd
 
+from forest.backtest.checkpoint import Checkpoint, checkpoint_key, history_fingerprint
 from forest.backtest.risk import RiskManager
-from forest.backtest.trace import DecisionTrace
-from forest.backtest.tradebook import Trade, TradeBook
-from forest.core.indicators import atr, ema
-from forest.utils.log import log
+from forest.backtest.trace import (
+    EVENT_CLOSE,
+    EVENT_OPEN,
+    EVENT_SKIP,
+    EVENT_TRAILING_SL,
+    TraceRecorder,
+)
+from forest.backtest.tradebook import TradeBook
+from forest.core.indicators import atr
+from forest.strategies import Strategy, get_strategy, indicator_states, resume_indicators, strategy_inputs
+from forest.utils import profiling
+from forest.utils.profiling import timer
 
 
 def ema_cross_strategy(
-    df: pd.DataFrame, fast: int = 12, slow: int = 26
+    df: pd.DataFrame, fast: int = 12, slow: int = 26, indicators: Mapping[str, np.ndarray] | None = None
 ) -> pd.Series:
     """
     Prosta strategia: sygnał z przecięcia EMA(fast) i EMA(slow).
-    Zwraca serię {-1, 0, 1}.
+    Zwraca serię {-1, 0, 1}. Gotowe EMA (``"ema_<okres>"``) bierze z ``indicators``.
     """
-    f = ema(df["close"].values, fast)
-    s = ema(df["close"].values, slow)
-    sig = np.sign(f - s).astype(np.int32)
-    # Na początkowych NaN z EMA zwracamy 0
-    sig = np.where(np.isnan(f) | np.isnan(s), 0, sig)
-    return pd.Series(sig, index=df.index, name="signal")
-
-
-def _trace_to_payload(trace: DecisionTrace) -> Dict[str, Any]:
-    """Zamień DecisionTrace na dict niezależnie od implementacji."""
-    if hasattr(trace, "model_dump"):
-        try:
-            return trace.model_dump()  # Pydantic v2
-        except Exception:
-            pass
-    if hasattr(trace, "dict"):
-        try:
-            return trace.dict()  # Pydantic v1
-        except Exception:
-            pass
-    if is_dataclass(trace):
-        try:
-            return asdict(trace)
-        except Exception:
-            pass
-    # Fallback
-    return getattr(trace, "__dict__", {"time": None, "symbol": None, "filters": {}, "final": None})
+    return strategy_signal(df, "ema_cross", {"fast": fast, "slow": slow}, indicators)
+
+
+def strategy_signal(
+    df: pd.DataFrame,
+    strategy: str | Strategy,
+    params: Mapping[str, Any] | None = None,
+    indicators: Mapping[str, np.ndarray] | None = None,
+) -> pd.Series:
+    """Sygnał dowolnej strategii z rejestru (``forest.strategies``) jako seria int32."""
+    strat = get_strategy(strategy)
+    p = strat.resolve(params)
+    data = strategy_inputs(df, strat.needs(p), indicators)
+    return pd.Series(strat.signal(data, p).astype(np.int32), index=df.index, name="signal")
+
+
+def _external_signal(out: pd.DataFrame, signal: pd.Series | np.ndarray) -> np.ndarray:
+    if isinstance(signal, pd.Series):
+        return signal.reindex(out.index).fillna(0).astype(np.int32).to_numpy()
+    if len(signal) != len(out):
+        raise ValueError(f"signal has {len(signal)} values for {len(out)} bars")
+    return np.asarray(signal, dtype=np.int32)
+
+
+def _resume_columns(
+    out: pd.DataFrame,
+    ck: Checkpoint,
+    strat: Strategy | None,
+    p: Mapping[str, Any],
+    signal: pd.Series | np.ndarray | None,
+    indicators: Mapping[str, np.ndarray] | None,
+) -> tuple[np.ndarray, np.ndarray, dict] | None:
+    """Ogon kolumn ``signal`` i ``atr`` (+ ogony wskaźników) po świecy ``ck.n``.
+
+    Wskaźniki wznawiane ze stanów checkpointu; czego nie da się wznowić, liczone jest
+    od początku i wtedy sprawdzamy, czy historia zgadza się z checkpointem – ``None``
+    oznacza, że nie (np. wskaźnik spoza ``_RESUMABLE`` liczony na zmienionej historii) i trzeba liczyć całość.
+    """
+    n = ck.n
+    tail = strategy_inputs(out.iloc[n:])
+    have = {k: np.asarray(v)[n:] for k, v in indicators.items()} if indicators else None
+    cols: Dict[str, np.ndarray] = {}
+
+    if strat is None:
+        sig = _external_signal(out, signal)
+        if not np.array_equal(sig[:n], ck.signal):
+            return None
+        sig_tail = sig[n:]
+    else:
+        keys = strat.needs(p)
+        resumed = resume_indicators(ck.states, tail, keys, have) if strat.pointwise else None
+        if resumed is not None:
+            sig_tail, cols = strat.signal(tail | resumed, p).astype(np.int32), resumed
+        else:
+            full = strat.signal(strategy_inputs(out, keys, indicators), p).astype(np.int32)
+            if not np.array_equal(full[:n], ck.signal):
+                return None
+            sig_tail = full[n:]
+
+    atr_cols = resume_indicators(ck.states, tail, ["atr_14"], have)
+    if atr_cols is not None:
+        atr_tail = atr_cols["atr_14"]
+    else:
+        full_atr = strategy_inputs(out, ["atr_14"], indicators)["atr_14"]
+        if not np.array_equal(full_atr[:n], ck.atr, equal_nan=True):
+            return None
+        atr_tail = full_atr[n:]
+    return sig_tail, atr_tail, cols | {"atr_14": atr_tail}
 
 
 def run_backtest(
@@ -55,69 +105,160 @@ def run_backtest(
     risk: RiskManager,
     fast: int = 12,
     slow: int = 26,
+    trace: TraceRecorder | None = None,
+    signal: pd.Series | np.ndarray | None = None,
+    indicators: Mapping[str, np.ndarray] | None = None,
+    strategy: str | Strategy | None = None,
+    params: Mapping[str, Any] | None = None,
+    checkpoint: str | Path | None = None,
 ) -> pd.DataFrame:
     """
     Uruchamia wektorowy back‑test na DF świec.
 
     Zwraca kopię wejściowego DF z kolumnami:
-    - signal: -1/0/1 z ema_cross_strategy
+    - signal: -1/0/1 z ema_cross_strategy, ze strategii ``strategy`` z rejestru
+      (z parametrami ``params``) albo podany ``signal`` (np. z ``forest.ml``;
+      Series wyrównywana do indeksu, brakujące świece = 0)
     - atr: ATR(14)
     - equity: kapitał konta (mark‑to‑market, po domknięciu pozycji na końcu)
+
+    ``indicators`` – policzone wcześniej wskaźniki (``"ema_<okres>"``, ``"atr_14"``),
+    np. memmapy z ``forest.ml.store.FeatureStore.indicators``; czego brak, liczy się tu.
+
+    ``checkpoint`` – plik stanu silnika (``forest.backtest.checkpoint``): jeśli pasuje
+    do początku ``df``, liczone są tylko nowe świece (wynik identyczny jak od zera,
+    ``out.attrs["resumed_from"]`` = liczba świec z checkpointu); na końcu zapisywany
+    jest stan po ostatniej świecy. Przy wznowieniu ``trace`` dostaje tylko nowe świece.
+
+    Decyzje (otwarcia, trailing SL, odrzucone sygnały) trafiają do ``trace``,
+    jeśli podano włączony ``TraceRecorder``; bez niego pętla nic nie loguje.
     """
     out = df.copy()
 
-    # 1) sygnał strategii
-    out["signal"] = ema_cross_strategy(out, fast=fast, slow=slow)
+    strat: Strategy | None = None
+    p: Dict[str, Any] = {}                      # parametry strategii (puste przy zewnętrznym ``signal``)
+    if signal is None:
+        strat = get_strategy(strategy if strategy is not None else "ema_cross")
+        p = strat.resolve(params if strategy is not None else {"fast": fast, "slow": slow})
+
+    ck: Checkpoint | None = None
+    key = checkpoint_key(risk, strat.name if strat is not None else "signal", p)
+    resumed = None
+    if checkpoint is not None:
+        ck = Checkpoint.load(checkpoint, out, key)
+        if ck is not None:
+            with timer("backtest.resume"):
+                resumed = _resume_columns(out, ck, strat, p, signal, indicators)
+            if resumed is None:
+                ck = None
+    start = ck.n if ck is not None else 0
+    cols: dict = {}
+
+    if ck is not None and resumed is not None:
+        sig_tail, atr_tail, cols = resumed
+        out["signal"] = np.concatenate([ck.signal, sig_tail]).astype(np.int32)
+        out["atr"] = np.concatenate([ck.atr, atr_tail])
+        profiling.incr("backtest.resumed_bars", start)
+        out.attrs["resumed_from"] = start
+    else:
+        # 1) sygnał strategii
+        with timer("backtest.signal"):
+            if strat is not None:
+                cols = strategy_inputs(out, strat.needs(p), indicators)
+                out["signal"] = strat.signal(cols, p).astype(np.int32)
+            else:
+                out["signal"] = _external_signal(out, signal)
+
+        # 2) ATR do position sizingu
+        with timer("backtest.atr"):
+            pre = indicators.get("atr_14") if indicators else None
+            out["atr"] = atr(out["high"].values, out["low"].values, out["close"].values, period=14) if pre is None else pre
+            cols["atr_14"] = out["atr"].to_numpy()
 
-    # 2) ATR do position sizingu
-    out["atr"] = atr(out["high"].values, out["low"].values, out["close"].values, period=14)
+    tb = ck.tradebook if ck is not None else TradeBook()
+    rec = trace if trace is not None and trace.enabled else None
+    if rec is not None:
+        times_ns = out.index.asi8 if isinstance(out.index, pd.DatetimeIndex) else np.arange(len(out), dtype=np.int64)
+        atr_ok = rec.mask(atr_ok=True)
+        trailing_hit = rec.mask(trailing_hit=True)
 
-    tb = TradeBook()
+    # pętla na surowych tablicach (iterrows budował Series na każdą świecę)
+    index = out.index
+    closes = out["close"].to_numpy(dtype=np.float64)
+    atrs = out["atr"].to_numpy(dtype=np.float64)
+    signals = out["signal"].to_numpy()
 
     position: int | None = None  # 1 LONG, -1 SHORT, None = flat
     entry_price: float | None = None
     entry_qty: float | None = None
+    if ck is not None:
+        position, entry_price, entry_qty = ck.position, ck.entry_price, ck.entry_qty
+        risk._equity_curve = list(ck.equity_curve) if ck.equity_curve is not None else None
+        risk._trail = ck.trail
 
-    for idx, row in out.iterrows():
-        sig = int(row.signal)
-
-        # ---------- trailing‑SL aktualizacja i ewentualne zamknięcie ----------
-        if position is not None:
-            risk.update_trailing_sl(float(row.close), float(row.atr))
-            if risk.hit_trailing_sl(float(row.close)):
-                pnl = (float(row.close) - float(entry_price)) * position * float(entry_qty)
-                cost = risk.position_cost(float(entry_qty), float(row.close))
-                risk.record_trade(pnl - cost)
-                tb.add(Trade(idx, float(row.close), float(entry_qty), "LONG" if position == 1 else "SHORT"))
-                log.warning("trailing_sl_hit", time=str(idx), price=float(row.close))
-                position = entry_price = entry_qty = None
-                # nie przerywamy — pozwalamy strategii dalej działać
-
-        # ---------- zmiana sygnału ⇒ zamknięcie starej + otwarcie nowej ----------
-        if sig != 0 and sig != position:
-            # zamknij starą pozycję (jeśli była)
+    with timer("backtest.loop"):
+        for i in range(start, len(out)):
+            sig = int(signals[i])
+            close = float(closes[i])
+            bar_atr = float(atrs[i])
+
+            # ---------- trailing‑SL aktualizacja i ewentualne zamknięcie ----------
             if position is not None:
-                pnl = (float(row.close) - float(entry_price)) * position * float(entry_qty)
-                cost = risk.position_cost(float(entry_qty), float(row.close))
-                risk.record_trade(pnl - cost)
-                tb.add(Trade(idx, float(row.close), float(entry_qty), "LONG" if position == 1 else "SHORT"))
-
-            # otwórz nową pozycję
-            qty = risk.position_size(float(row.atr))
-            if qty == 0:
-                continue
-
-            position = 1 if sig > 0 else -1
-            entry_price = float(row.close)
-            entry_qty = float(qty)
-
-            trace = DecisionTrace(
-                time=str(idx),
-                symbol="SYN",
-                filters={"atr_ok": bool(qty > 0), "trailing_hit": False},
-                final="BUY" if position == 1 else "SELL",
-            )
-            log.info("decision", **_trace_to_payload(trace))
+                risk.update_trailing_sl(close, bar_atr)
+                if risk.hit_trailing_sl(close):
+                    pnl = (close - float(entry_price)) * position * float(entry_qty)
+                    cost = risk.position_cost(float(entry_qty), close)
+                    risk.record_trade(pnl - cost)
+                    tb.append(index[i], close, float(entry_qty), position)
+                    if rec is not None:
+                        rec.record(times_ns[i], EVENT_TRAILING_SL, -position, trailing_hit, close, float(entry_qty), sig)
+                    position = entry_price = entry_qty = None
+                    # nie przerywamy — pozwalamy strategii dalej działać
+
+            # ---------- zmiana sygnału ⇒ zamknięcie starej + otwarcie nowej ----------
+            if sig != 0 and sig != position:
+                # zamknij starą pozycję (jeśli była)
+                if position is not None:
+                    pnl = (close - float(entry_price)) * position * float(entry_qty)
+                    cost = risk.position_cost(float(entry_qty), close)
+                    risk.record_trade(pnl - cost)
+                    tb.append(index[i], close, float(entry_qty), position)
+                    if rec is not None:
+                        rec.record(times_ns[i], EVENT_CLOSE, -position, 0, close, float(entry_qty), sig)
+
+                # otwórz nową pozycję
+                qty = risk.position_size(bar_atr)
+                if qty == 0:
+                    if rec is not None:
+                        rec.record(times_ns[i], EVENT_SKIP, 0, 0, close, 0.0, sig)
+                    continue
+
+                position = 1 if sig > 0 else -1
+                entry_price = close
+                entry_qty = float(qty)
+
+                if rec is not None:
+                    rec.record(times_ns[i], EVENT_OPEN, position, atr_ok if qty > 0 else 0, close, entry_qty, sig)
+
+    # ---------- stan przed domknięciem pozycji – punkt wznowienia ----------
+    if checkpoint is not None:
+        with timer("backtest.checkpoint"):
+            data = {"high": out["high"].to_numpy(), "low": out["low"].to_numpy(), "close": closes} | cols
+            states = indicator_states(data, cols) if len(out) > start or ck is None else ck.states
+            Checkpoint(
+                n=len(out),
+                fingerprint=history_fingerprint(out),
+                key=key,
+                signal=out["signal"].to_numpy(),
+                atr=atrs,
+                states=states,
+                position=position,
+                entry_price=entry_price,
+                entry_qty=entry_qty,
+                equity_curve=list(risk._equity_curve) if risk._equity_curve is not None else None,
+                trail=risk._trail,
+                tradebook=tb,
+            ).save(checkpoint)
 
     # ---------- domknij ewentualnie otwartą pozycję na końcu ----------
     if position is not None:
@@ -126,26 +267,27 @@ def run_backtest(
         pnl = (last_close - float(entry_price)) * position * float(entry_qty)
         cost = risk.position_cost(float(entry_qty), last_close)
         risk.record_trade(pnl - cost)
-        tb.add(Trade(last_idx, last_close, float(entry_qty), "LONG" if position == 1 else "SHORT"))
+        tb.append(last_idx, last_close, float(entry_qty), position)
         position = entry_price = entry_qty = None
 
     # ---------- zbuduj equity: dopasuj PnL z TradeBook do absolutnego equity z RiskManager ----------
-    final_equity = float(risk._equity_curve[-1]) if getattr(risk, "_equity_curve", None) else float(risk.capital)
-
-    eq_pnl = tb.equity_curve()  # zazwyczaj seria PnL (cumulative), indeks po momentach transakcji
-    if eq_pnl is not None and len(eq_pnl) > 0:
-        eq_pnl = eq_pnl.astype(float)
-        # Usuń ewentualne duplikaty indeksu, zostaw ostatnią wartość
-        if eq_pnl.index.has_duplicates:
-            eq_pnl = eq_pnl[~eq_pnl.index.duplicated(keep="last")]
-
-        # Skoryguj stałą tak, aby ostatnia wartość serii == final_equity
-        shift = final_equity - float(eq_pnl.iloc[-1])
-        eq_abs = (eq_pnl + shift).reindex(out.index).ffill()
-        out["equity"] = eq_abs.astype(float)
-    else:
-        # Brak transakcji — wpisz płaską linię kapitału
-        out["equity"] = pd.Series(final_equity, index=out.index, dtype=float)
+    with timer("backtest.equity"):
+        final_equity = float(risk._equity_curve[-1]) if getattr(risk, "_equity_curve", None) else float(risk.capital)
+
+        eq_pnl = tb.equity_curve()  # zazwyczaj seria PnL (cumulative), indeks po momentach transakcji
+        if eq_pnl is not None and len(eq_pnl) > 0:
+            eq_pnl = eq_pnl.astype(float)
+            # Usuń ewentualne duplikaty indeksu, zostaw ostatnią wartość
+            if eq_pnl.index.has_duplicates:
+                eq_pnl = eq_pnl[~eq_pnl.index.duplicated(keep="last")]
+
+            # Skoryguj stałą tak, aby ostatnia wartość serii == final_equity
+            shift = final_equity - float(eq_pnl.iloc[-1])
+            eq_abs = (eq_pnl + shift).reindex(out.index).ffill()
+            out["equity"] = eq_abs.astype(float)
+        else:
+            # Brak transakcji — wpisz płaską linię kapitału
+            out["equity"] = pd.Series(final_equity, index=out.index, dtype=float)
 
     return out
 
@@ -3,28 +3,53 @@ from __future__ import annotations
 
 import hashlib
 import itertools
-from dataclasses import asdict, dataclass
+import os
+from dataclasses import dataclass, fields, replace
+from functools import cache
 from math import sqrt
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Literal, Mapping, Tuple
 
-import joblib
+import numpy as np
 import pandas as pd
-from joblib import Parallel, delayed
-from tqdm.auto import tqdm
 
 from forest.backtest.engine import run_backtest
+from forest.backtest.results import results_frame
 from forest.backtest.risk import RiskManager
+from forest.strategies import Strategy, get_strategy, strategy_inputs
+from forest.utils import profiling
 
 # ---------------- persistent cache (for backtest runs) --------------------
+# joblib / tqdm importujemy leniwie – sam import modułu grid ich nie potrzebuje
 _CACHE_DIR = Path.home() / ".cache" / "forest_grid"
-_MEMORY = joblib.Memory(_CACHE_DIR, verbose=0)
+
+
+@cache
+def _memory():
+    import joblib
+
+    return joblib.Memory(_CACHE_DIR, verbose=0)
+
+
+# sygnały liczone macierzowo paczkami tylu kombinacji (pamięć: paczka × świece × 8 B)
+_SIGNAL_CHUNK = 256
+
+# pola RiskManager, które mogą być wymiarami siatki obok parametrów strategii
+# (nazwy zarezerwowane – strategia nie powinna mieć parametru o takiej nazwie)
+RISK_PARAMS: tuple[str, ...] = tuple(f.name for f in fields(RiskManager) if not f.name.startswith("_"))
+
+
+def split_params(params: Mapping[str, Any]) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """(parametry strategii, nadpisania ``RiskManager``) z jednej kombinacji siatki."""
+    strat = {k: v for k, v in params.items() if k not in RISK_PARAMS}
+    risk = {k: v for k, v in params.items() if k in RISK_PARAMS}
+    return strat, risk
 
 
 # ---------------- wynik pojedynczego przebiegu ----------------
 @dataclass(slots=True)
 class GridResult:
-    params: Dict[str, Any]
+    params: Dict[str, Any]  # w DataFrame rozwijane do płaskich kolumn (forest.backtest.results)
     equity_end: float
     max_dd: float
     cagr: float
@@ -42,6 +67,7 @@ def param_grid(**param_ranges) -> Iterable[dict]:
 
 
 # ---------------- funkcja pomocnicza: hash danych OHLC -------------------
+@profiling.timed("grid.hash_df")
 def _hash_df(df: pd.DataFrame) -> str:
     """Oblicza unikatowy hash dla danych (wartości + kolumny), używany do cache."""
     h = hashlib.md5(pd.util.hash_pandas_object(df, index=True).values.tobytes())
@@ -50,19 +76,28 @@ def _hash_df(df: pd.DataFrame) -> str:
 
 
 # ---------------- pojedynczy bieg symulacji (z cache) --------------------
-@_MEMORY.cache(ignore=["df", "make_risk"])
-def _single_run_cached(
+def _single_run(
     df_hash: str,
     params: Tuple[Tuple[str, Any], ...],
     df: pd.DataFrame,
     make_risk: Callable[[], RiskManager],
+    indicators: Mapping[str, np.ndarray] | None = None,
+    signal: np.ndarray | None = None,
 ) -> GridResult:
-    """Wykonuje pojedynczy backtest dla danych i zadanych parametrów, zwraca agregaty wyników."""
+    """Wykonuje pojedynczy backtest dla danych i zadanych parametrów, zwraca agregaty wyników.
+
+    ``signal`` – gotowy wiersz macierzy sygnałów strategii (wtedy ``fast``/``slow`` nie są używane).
+    Parametry z ``RISK_PARAMS`` nadpisują pola ``RiskManager`` z ``make_risk``.
+    """
+    profiling.incr("grid.cache_miss")  # ciało wykonuje się tylko, gdy cache nie trafił
     p = dict(params)
-    fast, slow = p["fast"], p["slow"]
+    strat_p, risk_p = split_params(p)
+    fast, slow = strat_p.get("fast", 12), strat_p.get("slow", 26)
 
     rm = make_risk()
-    res = run_backtest(df, rm, fast, slow)
+    if risk_p:
+        rm = replace(rm, **risk_p)
+    res = run_backtest(df, rm, fast, slow, indicators=indicators, signal=signal)
 
     equity = res["equity"]
     equity_end = float(equity.iloc[-1])
@@ -88,6 +123,37 @@ def _single_run_cached(
     return GridResult(p, equity_end, max_dd, cagr, rar, sharpe)
 
 
+@cache
+def _single_run_cached():
+    """``_single_run`` opakowany w joblib.Memory (tworzony przy pierwszym użyciu)."""
+    return _memory().cache(_single_run, ignore=["df", "make_risk", "indicators", "signal"])
+
+
+def _run_task(
+    df_hash: str,
+    params: Tuple[Tuple[str, Any], ...],
+    df: pd.DataFrame,
+    make_risk: Callable[[], RiskManager],
+    indicators: Mapping[str, np.ndarray] | None,
+    signal: np.ndarray | None,
+    use_cache: bool,
+) -> GridResult:
+    """``_single_run`` przez cache albo (``use_cache=False``) bezpośrednio."""
+    if use_cache:
+        return _single_run_cached()(df_hash, params, df, make_risk, indicators, signal)
+    return _single_run(df_hash, params, df, make_risk, indicators, signal)
+
+
+def _data_key(df: pd.DataFrame, make_risk: Callable[[], RiskManager], strategy: str | Strategy | None) -> str:
+    """Klucz danych do cache: hash OHLC + pola ``RiskManager`` (+ nazwa strategii, jeśli podana)."""
+    # parametry RiskManager w kluczu, aby uniknąć kolizji cache
+    rm = make_risk()
+    key = f"{_hash_df(df)}_" + "_".join(str(getattr(rm, name)) for name in RISK_PARAMS)
+    if strategy is not None:
+        key = f"{key}_{get_strategy(strategy).name}"
+    return key
+
+
 # ---------------- główna funkcja grid search -------------------------
 def run_grid(
     df: pd.DataFrame,
@@ -96,39 +162,121 @@ def run_grid(
     n_jobs: int = -1,
     export_path: str | Path | None = None,
     use_cache: bool = True,
+    profile: bool | None = None,
+    indicators: Mapping[str, np.ndarray] | None = None,
+    strategy: str | Strategy | None = None,
 ) -> pd.DataFrame:
     """
     Uruchamia serię backtestów dla wszystkich kombinacji parametrów podanych w grid.
-    Zwraca DataFrame z wynikami (metryki dla każdej kombinacji).
+    Zwraca DataFrame z wynikami: kolumna na parametr (``fast: int32`` …) + metryki,
+    nazwy parametrów w ``out.attrs["params"]``.
+
+    ``profile=True`` (albo globalnie włączone ``forest.utils.profiling``) zbiera
+    czasy etapów – także z procesów workerów – do ``out.attrs["profile"]``.
+    ``indicators`` (np. z ``FeatureStore.indicators``) trafia do każdego
+    ``run_backtest`` – memmapy idą do workerów bez kopiowania.
+
+    ``strategy`` – nazwa strategii z rejestru ``forest.strategies`` (domyślnie
+    ``ema_cross``); grid to jej parametry. Wskaźniki potrzebne całej siatce liczone
+    są raz, a sygnały – macierzowo, paczkami po ``_SIGNAL_CHUNK`` kombinacji.
+
+    Siatka może też zawierać wymiary ryzyka i kosztów (``RISK_PARAMS``:
+    ``risk_per_trade``, ``atr_multiple``, ``trail_k``, ``spread``, ``commission`` …),
+    nadpisujące pola ``RiskManager`` z ``make_risk``. Sygnał nie zależy od nich, więc
+    każdy zestaw parametrów strategii liczony jest raz i współdzielony przez wszystkie
+    warianty ryzyka; wyniki wracają w kolejności siatki.
     """
+    prof = profiling.is_enabled() if profile is None else bool(profile)
+    with profiling.profiling(prof, fresh=False):
+        return _run_grid(df, grid, make_risk, n_jobs, export_path, use_cache, prof, indicators, strategy)
+
+
+def _run_grid(
+    df: pd.DataFrame,
+    grid: Iterable[dict],
+    make_risk: Callable[[], RiskManager] | None,
+    n_jobs: int,
+    export_path: str | Path | None,
+    use_cache: bool,
+    prof: bool,
+    indicators: Mapping[str, np.ndarray] | None = None,
+    strategy: str | Strategy | None = None,
+) -> pd.DataFrame:
+    start = profiling.snapshot()
+    parent_pid = os.getpid()
     make_risk = make_risk or (lambda: RiskManager(capital=10_000))
 
-    # Oblicz hash danych + dołącz parametry RiskManager, aby uniknąć kolizji cache
-    df_hash = _hash_df(df)
-    test_rm = make_risk()
-    risk_key = f"{test_rm.capital}_{test_rm.risk_per_trade}_{test_rm.max_drawdown}"
-    df_hash = f"{df_hash}_{risk_key}"
+    df_hash = _data_key(df, make_risk, strategy)
+    strat = get_strategy(strategy or "ema_cross")
 
-    grid_list: List[dict] = list(grid)
+    # unikalne zestawy parametrów strategii → pozycje w siatce (warianty ryzyka dzielą sygnał)
+    grid_list: List[dict] = []
+    combos: Dict[tuple, dict] = {}
+    members: Dict[tuple, List[int]] = {}
+    for i, p in enumerate(grid):
+        strat_p, risk_p = split_params(p)
+        strat_p = strat.resolve(strat_p)
+        key = tuple(sorted(strat_p.items()))
+        combos.setdefault(key, strat_p)
+        members.setdefault(key, []).append(i)
+        grid_list.append(strat_p | risk_p)
+
+    # wspólne wskaźniki całej siatki (+ ATR silnika) – raz, nie w każdym przebiegu
+    with profiling.timer("grid.indicators"):
+        keys = {k for p in combos.values() for k in strat.needs(p)} | {"atr_14"}
+        data = strategy_inputs(df, sorted(keys), indicators)
+    shared = {"atr_14": data["atr_14"]}
+
+    def _tasks() -> Iterable[tuple[int, dict, np.ndarray]]:
+        uniq = list(combos)
+        for c in range(0, len(uniq), _SIGNAL_CHUNK):
+            chunk = uniq[c : c + _SIGNAL_CHUNK]
+            with profiling.timer("grid.signals"):
+                sigs = strat.signal_matrix(data, [combos[k] for k in chunk])
+            for key, sig in zip(chunk, sigs):
+                for i in members[key]:
+                    yield i, grid_list[i], sig
 
     # Funkcja pomocnicza do uruchamiania pojedynczej kombinacji
-    def _worker(params: dict) -> GridResult:
-        key = tuple(sorted(params.items()))
-        if use_cache:
-            return _single_run_cached(df_hash, key, df, make_risk)
-        # Jeśli cache wyłączony, wywołujemy funkcję bez pamięci podręcznej
-        return _single_run_cached.call(df_hash, key, df, make_risk)
+    def _run_one(params: dict, signal: np.ndarray) -> GridResult:
+        return _run_task(df_hash, tuple(sorted(params.items())), df, make_risk, shared, signal, use_cache)
+
+    def _worker(i: int, params: dict, signal: np.ndarray) -> tuple[int, GridResult, profiling.Snapshot | None]:
+        if os.getpid() == parent_pid:
+            with profiling.timer("grid.worker"):
+                return i, _run_one(params, signal), None
+        # osobny proces joblib: oddajemy deltę statystyk do scalenia u rodzica
+        profiling.enable(prof)
+        before = profiling.snapshot()
+        with profiling.timer("grid.worker"):
+            res = _run_one(params, signal)
+        return i, res, (profiling.delta(profiling.snapshot(), before) if prof else None)
+
+    from joblib import Parallel, delayed
+    from tqdm.auto import tqdm
 
     # Uruchom backtesty sekwencyjnie lub równolegle w zależności od n_jobs
-    iterator = tqdm(grid_list, desc="ParamGrid", leave=False)
-    results = (
-        [_worker(p) for p in iterator]
-        if n_jobs == 1
-        else Parallel(n_jobs=n_jobs)(delayed(_worker)(p) for p in iterator)
-    )
+    iterator = tqdm(_tasks(), total=len(grid_list), desc="ParamGrid", leave=False)
+    with profiling.timer("grid.dispatch"):
+        triples = (
+            [_worker(i, p, sig) for i, p, sig in iterator]
+            if n_jobs == 1
+            else Parallel(n_jobs=n_jobs)(delayed(_worker)(i, p, sig) for i, p, sig in iterator)
+        )
+    results: List[GridResult] = [None] * len(grid_list)  # type: ignore[list-item]
+    for i, res, snap in triples:
+        results[i] = res
+        if snap:
+            profiling.absorb(snap)
 
-    # Konwersja wyników do DataFrame
-    out = pd.DataFrame([asdict(r) for r in results])
+    # Konwersja wyników do DataFrame – płaskie, typowane kolumny parametrów
+    out = results_frame(results)
+    if prof:
+        stats = profiling.delta(profiling.snapshot(), start)
+        misses = stats["counters"].get("grid.cache_miss", (0, 0))[0]
+        stats["counters"]["grid.combos"] = (len(results), 0)
+        stats["counters"]["grid.cache_hit"] = (len(results) - misses, 0)
+        out.attrs["profile"] = stats
 
     # Zapis wyników do pliku (jeśli podano ścieżkę eksportu)
     if export_path:
@@ -143,3 +291,19 @@ def run_grid(
 
     return out
 
+
+# ---------------- profil pojedynczej kombinacji -------------------------
+def profile_combo(
+    df: pd.DataFrame,
+    params: Dict[str, Any],
+    make_risk: Callable[[], RiskManager] | None = None,
+    backend: Literal["cprofile", "pyinstrument"] = "cprofile",
+    output: str | Path | None = None,
+) -> str:
+    """Uruchamia jedną kombinację (bez cache) pod cProfile/pyinstrument i zwraca raport."""
+    make_risk = make_risk or (lambda: RiskManager(capital=10_000))
+    key = tuple(sorted(params.items()))
+    _, text = profiling.capture(
+        _single_run, "profile", key, df, make_risk, backend=backend, output=os.fspath(output) if output else None
+    )
+    return text
@@ -0,0 +1,427 @@
+"""Optymalizacja parametrów TPE (Tree‑structured Parzen Estimator) zamiast pełnej siatki.
+
+``param_grid`` rośnie wykładniczo z liczbą wymiarów; ``optimize`` proponuje kolejne
+zestawy adaptacyjnie. Po ``n_startup`` losowych próbach obserwacje dzielone są na
+„dobre” (górne ``gamma`` wg metryki) i resztę; dla każdego parametru osobno budowana
+jest gęstość Parzena l(x) (dobre) i g(x) (reszta), a spośród kandydatów losowanych
+z l(x) wybierany jest ten z największym l(x) / g(x).
+
+Propozycje są asynchroniczne: w locie jest ``batch_size`` zestawów (domyślnie liczba
+workerów ``n_jobs``), a gdy któryś się skończy, sampler dostaje wynik i od razu
+proponuje następny – workery nie czekają na najwolniejszy bieg paczki. Czekające
+zestawy liczą się do g(x) („constant liar”). Hash danych i wskaźniki liczone są raz
+na przebieg, wyniki trafiają do tego samego cache co ``run_grid`` (``joblib.Memory``),
+więc powtórzone zestawy są darmowe. Zestaw już oceniony w tym przebiegu nie jest
+proponowany ponownie. „Paczka” to kolejne ``batch_size`` wyników – po niej liczona
+jest zbieżność::
+
+    res = optimize(df, strategy="ema_cross", metric="rar", n_trials=300, patience=5)
+    res.best, res.best_value, res.converged   # ``exhausted`` – przestrzeń skończyła się przed budżetem
+    res.curve                 # najlepsza wartość po każdej paczce – do wykresu zbieżności
+
+Przestrzeń to ``Strategy.space`` (parametry z zakresem albo ``choices``); ``space``
+podmienia / dodaje wymiary, także ryzyka (``forest.backtest.grid.RISK_PARAMS``)::
+
+    optimize(df, space={"risk_per_trade": Param(0.01, 0.002, 0.05, log=True), "atr_multiple": Param(2.0, 1.0, 4.0)})
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from math import sqrt
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from forest.backtest.risk import RiskManager
+from forest.strategies import Param, Strategy, compute_indicators, get_strategy, strategy_inputs
+from forest.utils import profiling
+
+if TYPE_CHECKING:
+    from forest.backtest.grid import GridResult
+
+__all__ = ["optimize", "OptimizeResult", "TPESampler"]
+
+
+# ---------- estymator ----------
+@dataclass(frozen=True, slots=True)
+class _Range:
+    """Wymiar liczbowy ``Param`` z zawężonymi typami (``low``/``high`` nie są ``None``)."""
+
+    low: float
+    high: float
+    step: Optional[float]
+    log: bool
+    integer: bool
+
+
+class TPESampler:
+    """Niezależne (po parametrach) TPE na przestrzeni ``Param``; maksymalizuje ``value``."""
+
+    def __init__(
+        self,
+        space: Mapping[str, Param],
+        *,
+        gamma: float = 0.25,
+        n_startup: int = 16,
+        n_candidates: int = 32,
+        seed: int = 42,
+        valid: Callable[[Mapping[str, Any]], bool] | None = None,
+    ) -> None:
+        self.space: Dict[str, Param] = {}
+        self._dims: Dict[str, _Range | tuple] = {}         # zakres albo krotka ``choices``
+        for k, p in space.items():
+            if p.choices is not None:
+                self._dims[k] = tuple(p.choices)
+            elif p.low is not None and p.high is not None:
+                self._dims[k] = _Range(float(p.low), float(p.high), p.step, p.log, p.kind == "int")
+            else:
+                continue
+            self.space[k] = p
+        self.fixed = {k: p.default for k, p in space.items() if k not in self.space}
+        if not self.space:
+            raise ValueError("search space has no ranged or categorical parameters")
+        self.gamma = gamma
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.valid = valid or (lambda p: True)
+        self.rng = np.random.default_rng(seed)
+        self._x: List[Dict[str, Any]] = []
+        self._y: List[float] = []
+
+    # ---------- obserwacje ----------
+    def tell(self, params: Mapping[str, Any], value: float) -> None:
+        self._x.append({k: params[k] for k in self.space})
+        self._y.append(float(value) if np.isfinite(value) else -np.inf)
+
+    # ---------- kodowanie ----------
+    @staticmethod
+    def _to_unit(r: _Range, v: Any) -> float:
+        lo, hi = (float(np.log(r.low)), float(np.log(r.high))) if r.log else (r.low, r.high)
+        x = float(np.log(v)) if r.log else float(v)
+        return (x - lo) / (hi - lo) if hi > lo else 0.5
+
+    @staticmethod
+    def _from_unit(r: _Range, u: float) -> Any:
+        u = min(max(u, 0.0), 1.0)
+        if r.log:
+            v = float(np.exp(np.log(r.low) + u * (np.log(r.high) - np.log(r.low))))
+        else:
+            v = r.low + u * (r.high - r.low)
+        if r.step:
+            v = r.low + round((v - r.low) / r.step) * r.step
+            v = min(max(v, r.low), r.high)
+        if r.integer:
+            return int(round(v))
+        return float(round(v, 12))
+
+    def _random(self) -> Dict[str, Any]:
+        out = {}
+        for k, d in self._dims.items():
+            if isinstance(d, tuple):
+                out[k] = d[self.rng.integers(len(d))]
+            else:
+                out[k] = self._from_unit(d, self.rng.random())
+        return out
+
+    # ---------- gęstości Parzena ----------
+    def _numeric(self, r: _Range, good: List[Any], bad: List[Any], n: int) -> tuple[np.ndarray, np.ndarray]:
+        """(kandydaci w [0, 1], log l − log g) dla jednego parametru liczbowego."""
+        g_obs = np.array([self._to_unit(r, v) for v in good], dtype=np.float64)
+        b_obs = np.array([self._to_unit(r, v) for v in bad], dtype=np.float64)
+        g_sigma, b_sigma = _bandwidth(g_obs), _bandwidth(b_obs)
+        # losowanie z l(x): środek = dobra obserwacja albo (z wagą jednej obserwacji) płaski prior
+        pick = self.rng.integers(len(g_obs) + 1, size=n)
+        prior = pick == len(g_obs)
+        cand = np.empty(n)
+        cand[prior] = self.rng.random(prior.sum())
+        cand[~prior] = g_obs[pick[~prior]] + self.rng.normal(0.0, g_sigma, (~prior).sum())
+        cand = np.clip(cand, 0.0, 1.0)
+        return cand, _parzen_logpdf(cand, g_obs, g_sigma) - _parzen_logpdf(cand, b_obs, b_sigma)
+
+    def _categorical(self, choices: tuple, good: List[Any], bad: List[Any], n: int) -> tuple[np.ndarray, np.ndarray]:
+        lg = np.ones(len(choices))
+        lb = np.ones(len(choices))
+        for v in good:
+            lg[choices.index(v)] += 1
+        for v in bad:
+            lb[choices.index(v)] += 1
+        lg, lb = lg / lg.sum(), lb / lb.sum()
+        idx = self.rng.choice(len(choices), size=n, p=lg)
+        return idx, np.log(lg[idx]) - np.log(lb[idx])
+
+    def ask(
+        self, n: int = 1, exclude: Optional[set] = None, pending: Sequence[Mapping[str, Any]] = ()
+    ) -> List[Dict[str, Any]]:
+        """``n`` różnych propozycji (bez ``exclude`` – kluczy już ocenionych zestawów).
+
+        Działa „constant liar”: propozycje czekające na wynik (``pending`` i wcześniejsze
+        z tej samej paczki) liczą się do g(x), więc kolejne trafiają obok, a nie w to samo miejsce.
+        """
+        exclude = set(exclude or ())
+        out: List[Dict[str, Any]] = []
+        waiting = [{k: p[k] for k in self.space} for p in pending]
+        for _ in range(n):
+            prop = self._propose(exclude, waiting + out)
+            if prop is None:
+                break
+            exclude.add(_key(prop))
+            out.append(prop)
+        return out
+
+    def _propose(self, exclude: set, pending: Sequence[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+        startup = len(self._y) < self.n_startup
+        if not startup:
+            order = np.argsort(self._y, kind="stable")[::-1]
+            n_good = max(1, int(np.ceil(self.gamma * len(order))))
+            good = [self._x[i] for i in order[:n_good]]
+            bad = [self._x[i] for i in order[n_good:]] + list(pending)
+        for _ in range(20):                      # próby ominięcia powtórek / niepoprawnych
+            if startup:
+                cands = [self._random() for _ in range(self.n_candidates)]
+                scores = np.zeros(len(cands))
+            else:
+                cols, scores = {}, np.zeros(self.n_candidates)
+                for k, d in self._dims.items():
+                    gv, bv = [x[k] for x in good], [x[k] for x in bad]
+                    if isinstance(d, tuple):
+                        idx, s = self._categorical(d, gv, bv, self.n_candidates)
+                        cols[k] = [d[i] for i in idx]
+                    else:
+                        u, s = self._numeric(d, gv, bv, self.n_candidates)
+                        cols[k] = [self._from_unit(d, x) for x in u]
+                    scores += s
+                cands = [{k: cols[k][i] for k in self.space} for i in range(self.n_candidates)]
+            for i in np.argsort(-scores, kind="stable"):
+                prop = self.fixed | cands[i]
+                if _key(prop) not in exclude and self.valid(prop):
+                    return prop
+        # TPE skupia się wokół dobrych punktów – w małej przestrzeni resztę znajdzie losowanie
+        for _ in range(20 * self.n_candidates):
+            prop = self.fixed | self._random()
+            if _key(prop) not in exclude and self.valid(prop):
+                return prop
+        return None
+
+
+def _bandwidth(obs: np.ndarray) -> float:
+    """Szerokość jądra (reguła Scotta w skali [0, 1], z dolnym limitem)."""
+    if len(obs) < 2:
+        return 0.25
+    return max(float(obs.std()), 0.2) * len(obs) ** -0.2
+
+
+def _parzen_logpdf(x: np.ndarray, obs: np.ndarray, sigma: float) -> np.ndarray:
+    """log gęstości: mieszanka gaussów wokół ``obs`` + płaski prior na [0, 1]."""
+    dens = np.ones_like(x)
+    if len(obs):
+        z = (x[:, None] - obs[None, :]) / sigma
+        dens = dens + np.exp(-0.5 * z * z).sum(axis=1) / (sigma * sqrt(2 * np.pi))
+    return np.log(dens / (len(obs) + 1))
+
+
+def _key(params: Mapping[str, Any]) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+# ---------- pętla optymalizacji ----------
+@dataclass(slots=True)
+class OptimizeResult:
+    metric: str
+    trials: pd.DataFrame                       # schemat run_grid + kolumny ``trial``, ``batch``
+    best: Dict[str, Any]
+    best_value: float
+    curve: List[float] = field(default_factory=list)   # najlepsza wartość po każdej paczce
+    converged: bool = False                    # stop po ``patience`` paczkach bez poprawy
+    exhausted: bool = False                    # brak nowych (poprawnych) zestawów przed budżetem
+
+    def summary(self) -> str:
+        state = "plateau" if self.converged else "exhausted" if self.exhausted else "budget"
+        return f"{self.metric}={self.best_value:.4g} after {len(self.trials)} trials ({state}): {self.best}"
+
+
+def optimize(
+    df: pd.DataFrame,
+    strategy: str | Strategy | None = None,
+    space: Mapping[str, Param] | None = None,
+    make_risk: Callable[[], RiskManager] | None = None,
+    *,
+    metric: str = "rar",
+    n_trials: int = 200,
+    batch_size: int | None = None,
+    n_startup: int | None = None,
+    gamma: float = 0.25,
+    patience: int | None = None,
+    tol: float = 1e-4,
+    seed: int = 42,
+    n_jobs: int = -1,
+    use_cache: bool = True,
+    indicators: Mapping[str, np.ndarray] | None = None,
+    on_batch: Callable[[int, float, pd.DataFrame], None] | None = None,
+) -> OptimizeResult:
+    """TPE po przestrzeni strategii (+ ``space``); ``patience`` paczek bez poprawy o ``tol`` → stop.
+
+    ``metric`` – kolumna wyników ``run_grid`` (``rar``, ``sharpe``, ``equity_end``, ``cagr``
+    są maksymalizowane, ``max_dd`` – minimalizowane). ``on_batch(nr, najlepsza, paczka)``
+    wołane po każdej paczce. Gdy nie ma żadnej próby (``n_trials=0`` albo brak poprawnych
+    zestawów), ``trials`` jest pusty, ``best == {}``, a ``best_value`` to NaN.
+    """
+    import joblib
+
+    from forest.backtest.grid import RISK_PARAMS, _data_key, split_params
+    from forest.backtest.results import METRICS, results_frame
+
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r} (known: {', '.join(METRICS)})")
+    strat = get_strategy(strategy or "ema_cross")
+    full_space = dict(strat.space) | dict(space or {})
+    unknown = set(full_space) - set(strat.space) - set(RISK_PARAMS)
+    if unknown:
+        raise ValueError(f"{strat.name}: unknown parameters {sorted(unknown)}")
+    make_risk = make_risk or (lambda: RiskManager(capital=10_000))
+    n_workers = joblib.effective_n_jobs(n_jobs)
+    batch_size = batch_size or n_workers
+    sign = -1.0 if metric == "max_dd" else 1.0
+    sampler = TPESampler(
+        full_space,
+        gamma=gamma,
+        n_startup=n_startup if n_startup is not None else max(10, 2 * batch_size),
+        seed=seed,
+        valid=lambda p: strat.valid({k: v for k, v in p.items() if k in strat.space}),
+    )
+
+    # raz na przebieg: klucz cache danych i wskaźniki (nowe okresy dokładane, gdy propozycja ich wymaga)
+    prof = profiling.is_enabled()
+    with profiling.timer("optimize.prepare"):
+        df_hash = _data_key(df, make_risk, strategy)
+        data = strategy_inputs(df, ["atr_14"], indicators)
+    shared = {"atr_14": data["atr_14"]}
+    pool: Any = _InlineExecutor() if n_workers == 1 else _executor(n_workers)
+
+    def _submit(params: Dict[str, Any]) -> Future:
+        strat_p, risk_p = split_params(params)
+        strat_p = strat.resolve(strat_p)
+        missing = [k for k in strat.needs(strat_p) if k not in data]
+        if missing:
+            with profiling.timer("optimize.indicators"):
+                data.update(compute_indicators(data, missing, indicators))
+        with profiling.timer("optimize.signals"):
+            signal = strat.signal_matrix(data, [strat_p])[0]
+        key = tuple(sorted((strat_p | risk_p).items()))
+        return pool.submit(_trial, df_hash, key, df, make_risk, shared, signal, use_cache, prof, os.getpid())
+
+    parts: List[pd.DataFrame] = []
+    batch: List[tuple[int, GridResult]] = []
+    running: Dict[Future, tuple[int, Dict[str, Any]]] = {}
+    seen: set = set()
+    curve: List[float] = []
+    best_value, stale, converged, exhausted = -np.inf, 0, False, False
+
+    def _end_batch() -> None:
+        nonlocal best_value, stale, converged
+        res = results_frame([r for _, r in batch])
+        res.insert(0, "batch", len(curve))
+        res.insert(0, "trial", [t for t, _ in batch])
+        parts.append(res)
+        batch.clear()
+
+        values = sign * res[metric].to_numpy(dtype=np.float64)
+        batch_best = float(np.nanmax(values)) if np.isfinite(values).any() else -np.inf
+        improved = batch_best > best_value + tol * max(abs(best_value), 1.0) if np.isfinite(best_value) else True
+        best_value = max(best_value, batch_best)
+        curve.append(sign * best_value)
+        stale = 0 if improved else stale + 1
+        if on_batch is not None:
+            on_batch(len(curve) - 1, sign * best_value, res)
+        converged = patience is not None and stale >= patience
+
+    try:
+        while not converged:
+            # dopełnij kolejkę: nowe propozycje widzą wszystkie wyniki, które już wróciły
+            room = min(batch_size - len(running), n_trials - len(seen))
+            if room > 0 and not exhausted:
+                props = sampler.ask(room, exclude=seen, pending=[p for _, p in running.values()])
+                exhausted = len(props) < room           # przestrzeń wyczerpana – to nie zbieżność
+                for p in props:
+                    seen.add(_key(p))
+                    running[_submit(p)] = (len(seen) - 1, p)
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in sorted(finished, key=lambda f: running[f][0]):
+                trial, p = running.pop(fut)
+                res, snap = fut.result()
+                if snap:
+                    profiling.absorb(snap)
+                sampler.tell(p, sign * getattr(res, metric))
+                batch.append((trial, res))
+                if len(batch) == batch_size:
+                    _end_batch()
+                    if converged:
+                        break
+        if batch and not converged:
+            _end_batch()
+    finally:
+        for fut in running:                             # stop przed końcem – zbędne biegi odpadają
+            fut.cancel()
+
+    if not parts:
+        trials = results_frame([])
+        trials.insert(0, "batch", np.empty(0, dtype=np.int64))
+        trials.insert(0, "trial", np.empty(0, dtype=np.int64))
+        return OptimizeResult(metric, trials, {}, float("nan"), curve, converged, True)
+    trials = pd.concat(parts, ignore_index=True).sort_values("trial", kind="stable", ignore_index=True)
+    i = int(np.nan_to_num(sign * trials[metric].to_numpy(dtype=np.float64), nan=-np.inf).argmax())
+    best = {k: _scalar(trials[k].iloc[i]) for k in trials.columns if k in full_space}
+    return OptimizeResult(metric, trials, best, float(trials[metric].iloc[i]), curve, converged, exhausted)
+
+
+# ---------- wykonanie prób ----------
+class _InlineExecutor:
+    """``submit`` liczący od razu w tym procesie (``n_jobs=1``) – ta sama pętla co dla puli."""
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as exc:
+            fut.set_exception(exc)
+        return fut
+
+
+def _executor(n_workers: int) -> Any:
+    """Pula loky współdzielona z ``joblib.Parallel`` (duże tablice idą memmapą, lambdy – cloudpickle)."""
+    from joblib.executor import get_memmapping_executor
+
+    return get_memmapping_executor(n_workers)
+
+
+def _trial(
+    df_hash: str,
+    key: tuple,
+    df: pd.DataFrame,
+    make_risk: Callable[[], RiskManager],
+    shared: Mapping[str, np.ndarray],
+    signal: np.ndarray,
+    use_cache: bool,
+    prof: bool,
+    parent_pid: int,
+) -> tuple[GridResult, profiling.Snapshot | None]:
+    """Jeden backtest przez cache ``run_grid``; z procesu workera wraca też delta profilu."""
+    from forest.backtest.grid import _run_task
+
+    if os.getpid() == parent_pid:
+        with profiling.timer("optimize.trial"):
+            return _run_task(df_hash, key, df, make_risk, shared, signal, use_cache), None
+    profiling.enable(prof)
+    before = profiling.snapshot()
+    with profiling.timer("optimize.trial"):
+        res = _run_task(df_hash, key, df, make_risk, shared, signal, use_cache)
+    return res, (profiling.delta(profiling.snapshot(), before) if prof else None)
+
+
+def _scalar(v: Any) -> Any:
+    return v.item() if isinstance(v, np.generic) else v
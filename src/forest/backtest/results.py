@@ -0,0 +1,122 @@
+"""Schemat wyników grida: płaskie, typowane kolumny parametrów + metryki.
+
+Zamiast kolumny ``params`` ze słownikiem w każdym wierszu każdy parametr ma
+własną kolumnę o najwęższym sensownym typie (``int32``/``int64``, ``float64``,
+``bool``, tekst jako ``category``). Dzięki temu pivoty i filtry w heat‑mapie są
+wektorowe, a Parquet przechowuje zwykłe kolumny – przy odczycie można wczytać
+tylko potrzebne (projekcja kolumn). Nazwy kolumn parametrów są w
+``df.attrs["params"]``.
+
+Starsze pliki (z kolumną ``params``) ``flatten_results`` sprowadza do nowego schematu.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+from os import PathLike
+from typing import IO, TYPE_CHECKING, Any, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from forest.backtest.grid import GridResult
+
+METRICS: tuple[str, ...] = ("equity_end", "max_dd", "cagr", "rar", "sharpe")
+
+__all__ = ["METRICS", "results_frame", "param_columns", "flatten_results", "read_results"]
+
+
+def _param_column(values: Sequence[Any]) -> Any:
+    """Najwęższy typ dla wartości jednego parametru."""
+    arr = np.asarray(values)
+    if arr.dtype.kind == "b":
+        return arr
+    if arr.dtype.kind in "iu":
+        info = np.iinfo(np.int32)
+        fits = arr.size == 0 or (arr.min() >= info.min and arr.max() <= info.max)
+        return arr.astype(np.int32 if fits else np.int64)
+    if arr.dtype.kind == "f":
+        return arr.astype(np.float64)
+    # tekst / wartości mieszane / brakujące -> kategoria
+    return pd.Categorical(values)
+
+
+def _frame(params: Mapping[str, Sequence[Any]], metrics: Mapping[str, Any]) -> pd.DataFrame:
+    clash = set(params) & set(METRICS)
+    if clash:
+        raise ValueError(f"Nazwy parametrów kolidują z metrykami: {sorted(clash)}")
+    out = pd.DataFrame({**{k: _param_column(v) for k, v in params.items()}, **metrics})
+    out.attrs["params"] = list(params)
+    return out
+
+
+def results_frame(results: Sequence["GridResult"]) -> pd.DataFrame:
+    """Lista ``GridResult`` -> DataFrame w płaskim schemacie."""
+    names = list(dict.fromkeys(k for r in results for k in r.params))  # kolejność pierwszego wystąpienia
+    params = {k: [r.params.get(k) for r in results] for k in names}
+    metrics = {m: np.fromiter((getattr(r, m) for r in results), np.float64, len(results)) for m in METRICS}
+    return _frame(params, metrics)
+
+
+def param_columns(df: pd.DataFrame) -> list[str]:
+    """Kolumny parametrów: z ``attrs`` albo – np. po concat/odczycie CSV – wszystko poza metrykami."""
+    names = df.attrs.get("params")
+    if names and all(c in df.columns for c in names):
+        return list(names)
+    return [c for c in df.columns if c not in METRICS and c != "params"]
+
+
+def _as_dict(v: Any) -> dict:
+    if isinstance(v, str):  # CSV ze starym schematem: repr słownika
+        return ast.literal_eval(v)
+    return dict(v)
+
+
+def flatten_results(df: pd.DataFrame) -> pd.DataFrame:
+    """Sprowadź wyniki do płaskiego schematu (rozwija legacy kolumnę ``params``)."""
+    if "params" not in df.columns:
+        if "params" in df.attrs:  # już w schemacie (z results_frame / Parquet z metadanymi)
+            return df
+        names = param_columns(df)  # np. CSV – zawężamy typy kolumn parametrów
+        params = {c: df[c].to_numpy() for c in names}
+    else:
+        expanded = pd.DataFrame.from_records([_as_dict(v) for v in df["params"]])
+        params = {c: expanded[c].tolist() for c in expanded.columns}
+        names = ["params"]
+    rest = {c: df[c].to_numpy() for c in df.columns if c not in names}
+    return _frame(params, rest)
+
+
+def read_results(
+    source: str | PathLike | IO[bytes] | bytes,
+    metrics: Iterable[str] | None = None,
+    *,
+    fmt: str | None = None,
+) -> pd.DataFrame:
+    """Wczytaj wyniki grida (Parquet/CSV) – tylko parametry i wskazane metryki.
+
+    ``metrics=None`` wczytuje wszystkie. Format z rozszerzenia ścieżki albo ``fmt``
+    (``"parquet"``/``"csv"``) dla obiektów plikowych.
+    """
+    if fmt is None:
+        name = source if isinstance(source, (str, PathLike)) else getattr(source, "name", "")
+        fmt = "csv" if str(name).endswith(".csv") else "parquet"
+    wanted = None if metrics is None else set(metrics)
+
+    def keep(col: str) -> bool:
+        return col not in METRICS or wanted is None or col in wanted
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if fmt == "csv":
+        return flatten_results(pd.read_csv(source, usecols=keep))
+
+    import pyarrow.parquet as pq
+
+    names = pq.read_schema(source).names
+    if hasattr(source, "seek"):
+        source.seek(0)
+    cols = [c for c in names if keep(c) and not c.startswith("__index_level_")]
+    return flatten_results(pd.read_parquet(source, columns=cols))
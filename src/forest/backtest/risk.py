@@ -19,6 +19,11 @@ class RiskManager:
     capital: float
     risk_per_trade: float = 0.01         # 1 % equity
     max_drawdown: float = 0.20           # 20 % DD absolutny
+    atr_multiple: float = 2.0            # position sizing: ryzyko / (ATR * atr_multiple)
+    trail_k: float = 3.0                 # trailing SL = cena − k * ATR
+    spread: float = 0.0002               # 2 pipette przy cenie 1.0000
+    commission: float = 0.0005           # 5 pipette round‑turn
+    slippage: float = 0.0001             # dodatkowy poślizg
 
     _equity_curve: list[float] | None = None
     _trail: float | None = None          # trailing SL
@@ -26,19 +31,19 @@ class RiskManager:
     # ------------------------------------------------------------------ #
     #  Position sizing                                                   #
     # ------------------------------------------------------------------ #
-    def position_size(self, atr: float, atr_multiple: float = 2.0) -> float:
+    def position_size(self, atr: float, atr_multiple: float | None = None) -> float:
         """Lot size = (equity * risk%) / (ATR * atr_multiple)."""
         if atr <= 0:
             return 0.0
         dollar_risk = self.equity * self.risk_per_trade
-        return dollar_risk / (atr * atr_multiple)
+        return dollar_risk / (atr * (self.atr_multiple if atr_multiple is None else atr_multiple))
 
     # ------------------------------------------------------------------ #
     #  Trailing Stop (Chandelier)                                        #
     # ------------------------------------------------------------------ #
-    def update_trailing_sl(self, price: float, atr: float, k: float = 3.0) -> None:
-        """Podciąga trailing SL tylko w kierunku zysku."""
-        new_trail = price - k * atr
+    def update_trailing_sl(self, price: float, atr: float, k: float | None = None) -> None:
+        """Podciąga trailing SL (cena − k·ATR, domyślnie ``trail_k``) tylko w kierunku zysku."""
+        new_trail = price - (self.trail_k if k is None else k) * atr
         if self._trail is None or new_trail > self._trail:
             self._trail = new_trail
 
@@ -53,11 +58,16 @@ class RiskManager:
         self,
         qty: float,
         price: float,
-        spread: float = 0.0002,          # 2 pipette przy cenie 1.0000
-        commission: float = 0.0005,      # 5 pipette round‑turn
-        slippage: float = 0.0001,        # dodatkowy poślizg
+        spread: float | None = None,
+        commission: float | None = None,
+        slippage: float | None = None,
     ) -> float:
-        pct = spread + commission + slippage
+        """Koszt transakcji; pominięte składniki biorą wartości z pól ``RiskManager``."""
+        pct = (
+            (self.spread if spread is None else spread)
+            + (self.commission if commission is None else commission)
+            + (self.slippage if slippage is None else slippage)
+        )
         return qty * price * pct
 
     # ------------------------------------------------------------------ #
@@ -1,9 +1,22 @@
+"""Ślad decyzji („why / why not”) – rekord pojedynczej decyzji i binarny rejestrator.
+
+``TraceRecorder`` zapisuje decyzje do prealokowanej, strukturalnej tablicy NumPy
+(bez structlog / dictów na każdą transakcję) i zrzuca ją hurtowo do Parquet.
+Tryb pracy wybierany per run: ``off`` / ``sampled`` / ``full``.
+"""
+
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Literal
+from pathlib import Path
+from typing import Any, Dict, Literal, Sequence
+
+import numpy as np
+
+from forest.utils.profiling import timer
 
 Decision = Literal["BUY", "SELL", "WAIT"]
+TraceMode = Literal["off", "sampled", "full"]
 
 
 @dataclass(slots=True)
@@ -13,3 +26,226 @@ class DecisionTrace:
     filters: Dict[str, bool]      # np. {"atr_ok": True, "spread_ok": False}
     final: Decision
 
+
+# ---------- kodowanie binarne ----------
+EVENT_OPEN = 1          # otwarcie pozycji
+EVENT_CLOSE = 2         # zamknięcie na zmianie sygnału
+EVENT_TRAILING_SL = 3   # zamknięcie przez trailing SL
+EVENT_SKIP = 4          # sygnał był, ale filtry zablokowały wejście („why not”)
+
+EVENT_NAMES: dict[int, str] = {
+    EVENT_OPEN: "open",
+    EVENT_CLOSE: "close",
+    EVENT_TRAILING_SL: "trailing_sl",
+    EVENT_SKIP: "skip",
+}
+DECISION_CODES: dict[str, int] = {"BUY": 1, "SELL": -1, "WAIT": 0}
+DECISION_NAMES: dict[int, str] = {v: k for k, v in DECISION_CODES.items()}
+
+DEFAULT_FILTERS: tuple[str, ...] = ("atr_ok", "trailing_hit")
+
+TRACE_DTYPE = np.dtype(
+    [
+        ("time", "i8"),       # ns od epoki (UTC)
+        ("event", "i1"),
+        ("final", "i1"),      # 1 BUY, -1 SELL, 0 WAIT
+        ("filters", "u4"),    # bitmaska wg kolejności ``filters``
+        ("signal", "i1"),
+        ("price", "f8"),
+        ("qty", "f8"),
+    ]
+)
+
+
+class TraceRecorder:
+    """Rejestrator decyzji na prealokowanym buforze strukturalnym.
+
+    - ``mode="off"``     – ``record`` nic nie robi (silnik sprawdza ``enabled``),
+    - ``mode="sampled"`` – zapisuje co ``sample_every``-te zdarzenie,
+    - ``mode="full"``    – zapisuje wszystko.
+
+    Gdy podano ``path``, pełny bufor jest zrzucany jako kolejna grupa wierszy
+    Parquet; bez ``path`` bufor działa jak ring buffer (zostają najnowsze rekordy).
+    """
+
+    def __init__(
+        self,
+        mode: TraceMode = "full",
+        *,
+        capacity: int = 65_536,
+        sample_every: int = 10,
+        path: str | Path | None = None,
+        symbol: str = "SYN",
+        filters: Sequence[str] = DEFAULT_FILTERS,
+    ) -> None:
+        if mode not in ("off", "sampled", "full"):
+            raise ValueError(f"Nieznany tryb trace: {mode!r}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        if len(filters) > 32:
+            raise ValueError("Maksymalnie 32 filtry w bitmasce")
+
+        self.mode: TraceMode = mode
+        self.enabled = mode != "off"
+        self.sample_every = int(sample_every) if mode == "sampled" else 1
+        self.path = Path(path) if path is not None else None
+        self.symbol = symbol
+        self.filters: tuple[str, ...] = tuple(filters)
+
+        self._buf = np.zeros(max(int(capacity), 1) if self.enabled else 1, dtype=TRACE_DTYPE)
+        self._n = 0            # zapisane w buforze
+        self._seen = 0         # wszystkie zgłoszone zdarzenia (do próbkowania)
+        self._wrapped = False  # ring buffer przepełniony
+        self._writer: Any = None
+
+    # ---------- zapis ----------
+    def record(
+        self,
+        time_ns: int,
+        event: int,
+        final: int,
+        filters: int = 0,
+        price: float = float("nan"),
+        qty: float = float("nan"),
+        signal: int = 0,
+    ) -> None:
+        if not self.enabled:
+            return
+        seen = self._seen
+        self._seen = seen + 1
+        if seen % self.sample_every:
+            return
+
+        n = self._n
+        if n == self._buf.shape[0]:
+            if self.path is not None:
+                self.flush()
+                n = 0
+            else:
+                n = 0
+                self._wrapped = True
+        self._buf[n] = (time_ns, event, final, filters, signal, price, qty)
+        self._n = n + 1
+
+    def mask(self, **flags: bool) -> int:
+        """Zamień flagi filtrów (``atr_ok=True, ...``) na bitmaskę."""
+        out = 0
+        for bit, name in enumerate(self.filters):
+            if flags.get(name):
+                out |= 1 << bit
+        return out
+
+    def add(self, trace: DecisionTrace, event: int = EVENT_OPEN, price: float = float("nan"), qty: float = float("nan")) -> None:
+        """Zapisz klasyczny ``DecisionTrace`` (wolniejsza ścieżka, dla zgodności)."""
+        import pandas as pd
+
+        self.record(
+            pd.Timestamp(trace.time).value,
+            event,
+            DECISION_CODES[trace.final],
+            self.mask(**trace.filters),
+            price,
+            qty,
+        )
+
+    def __len__(self) -> int:
+        return self._buf.shape[0] if self._wrapped else self._n
+
+    def records(self) -> np.ndarray:
+        """Rekordy z bufora w kolejności chronologicznej (kopia tylko przy zawiniętym ringu)."""
+        if self._wrapped:
+            return np.concatenate([self._buf[self._n :], self._buf[: self._n]])
+        return self._buf[: self._n]
+
+    # ---------- Parquet ----------
+    def _table(self, rows: np.ndarray):
+        import pyarrow as pa
+
+        schema_meta = {b"symbol": self.symbol.encode(), b"filters": ",".join(self.filters).encode()}
+        cols = {name: pa.array(rows[name]) for name in TRACE_DTYPE.names or ()}
+        cols["time"] = pa.array(rows["time"], type=pa.timestamp("ns", tz="UTC"))
+        return pa.table(cols).replace_schema_metadata(schema_meta)
+
+    def flush(self) -> None:
+        """Dopisz zawartość bufora do pliku Parquet (jedna grupa wierszy) i wyczyść bufor."""
+        if self.path is None or not len(self):
+            return
+        import pyarrow.parquet as pq
+
+        with timer("trace.flush"):
+            table = self._table(self.records())
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        self._n = 0
+        self._wrapped = False
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def to_frame(self):
+        """Zdekodowane rekordy z pamięci jako DataFrame (jak ``load_trace``)."""
+        return _decode(self._table(self.records()))
+
+
+# ---------- odczyt / zapytania ----------
+def _decode(table):
+    """Tabela Arrow → DataFrame z czytelnymi kolumnami (event, final, filtry jako bool)."""
+    import pandas as pd
+
+    meta = table.schema.metadata or {}
+    filters = [f for f in meta.get(b"filters", b"").decode().split(",") if f]
+    df = table.to_pandas()
+    df["event"] = pd.Categorical(df["event"].map(EVENT_NAMES), categories=list(EVENT_NAMES.values()))
+    df["final"] = pd.Categorical(df["final"].map(DECISION_NAMES), categories=list(DECISION_CODES))
+    bits = df.pop("filters").to_numpy()
+    for bit, name in enumerate(filters):
+        df[name] = (bits >> bit) & 1 == 1
+    df["symbol"] = meta.get(b"symbol", b"").decode()
+    return df
+
+
+def load_trace(path: str | Path, *, start: Any = None, end: Any = None, event: str | None = None):
+    """Wczytaj plik trace; ``start``/``end``/``event`` są filtrowane przez pyarrow (pushdown)."""
+    import pandas as pd
+    import pyarrow.dataset as ds
+
+    def _utc(value: Any) -> pd.Timestamp:
+        ts = pd.Timestamp(value)
+        return ts.tz_localize("UTC") if ts.tz is None else ts
+
+    dataset = ds.dataset(Path(path), format="parquet")
+    expr = None
+    if start is not None:
+        expr = ds.field("time") >= _utc(start)
+    if end is not None:
+        cond = ds.field("time") <= _utc(end)
+        expr = cond if expr is None else expr & cond
+    if event is not None:
+        code = {v: k for k, v in EVENT_NAMES.items()}[event]
+        cond = ds.field("event") == code
+        expr = cond if expr is None else expr & cond
+
+    table = dataset.to_table(filter=expr)
+    return _decode(table.replace_schema_metadata(dataset.schema.metadata))
+
+
+def why(path: str | Path, time: Any):
+    """Ostatnia zapisana decyzja w chwili ``time`` lub przed nią (pusta ramka, gdy brak)."""
+    df = load_trace(path, end=time)
+    return df.tail(1)
+
+
+def why_not(path: str | Path, *, start: Any = None, end: Any = None):
+    """Sygnały odrzucone przez filtry w przedziale czasu, z flagami filtrów."""
+    return load_trace(path, start=start, end=end, event="skip")
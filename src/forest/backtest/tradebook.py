@@ -1,12 +1,23 @@
+"""TradeBook – kolumnowy rejestr transakcji.
+
+Transakcje trzymamy w rosnących tablicach NumPy (czas int64 [ns], cena/qty float64,
+strona int8), więc ``add`` kosztuje zamortyzowane O(1), a krzywa equity i max DD
+są aktualizowane przyrostowo przy każdym dopisaniu – bez przebudowy list.
+"""
+
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List, Literal
+from dataclasses import dataclass
+from typing import Iterator, Literal
 
+import numpy as np
 import pandas as pd
 
 Side = Literal["LONG", "SHORT"]
 
+_SIDE_CODE: dict[str, int] = {"LONG": 1, "SHORT": -1}
+_SIDE_NAME: dict[int, Side] = {1: "LONG", -1: "SHORT"}
+
 
 @dataclass(slots=True, frozen=True)
 class Trade:
@@ -18,29 +29,125 @@ class Trade:
     side: Side  # "LONG" → kupno,  "SHORT" → sprzedaż
 
 
-@dataclass
 class TradeBook:
-    """Prosty rejestr transakcji + metryki equity."""
+    """Kolumnowy rejestr transakcji + metryki equity (cache'owane przyrostowo)."""
 
-    _trades: List[Trade] = field(default_factory=list)
+    __slots__ = ("_time", "_price", "_qty", "_side", "_equity", "_n", "_tz", "_peak", "_max_dd")
+
+    def __init__(self, capacity: int = 64) -> None:
+        capacity = max(int(capacity), 1)
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._qty = np.empty(capacity, dtype=np.float64)
+        self._side = np.empty(capacity, dtype=np.int8)
+        self._equity = np.empty(capacity, dtype=np.float64)  # PnL narastająco
+        self._n = 0
+        self._tz = None
+        self._peak = -np.inf
+        self._max_dd = 0.0
 
     # ---------- API użytkowe ----------
     def add(self, trade: Trade) -> None:
-        self._trades.append(trade)
+        self.append(trade.time, trade.price, trade.qty, trade.side)
+
+    def append(self, time: pd.Timestamp | np.datetime64 | int, price: float, qty: float, side: Side | int) -> None:
+        """Szybka ścieżka bez alokacji ``Trade``; ``side`` jako "LONG"/"SHORT" albo 1/-1."""
+        n = self._n
+        if n == self._time.shape[0]:
+            self._grow(2 * n)
+
+        if isinstance(time, (int, np.integer)):
+            ns = int(time)
+        else:
+            ts = pd.Timestamp(time)
+            if n == 0:
+                self._tz = ts.tz
+            ns = ts.value
+        code = _SIDE_CODE[side] if isinstance(side, str) else int(side)
+
+        self._time[n] = ns
+        self._price[n] = price
+        self._qty[n] = qty
+        self._side[n] = code
+
+        eq = (self._equity[n - 1] if n else 0.0) + code * qty * price
+        self._equity[n] = eq
+        if eq > self._peak:
+            self._peak = eq
+        elif self._peak - eq > self._max_dd:
+            self._max_dd = self._peak - eq
+        self._n = n + 1
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("_time", "_price", "_qty", "_side", "_equity"):
+            old = getattr(self, name)
+            new = np.empty(max(capacity, 1), dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[Trade]:
+        idx = self._index()
+        for i in range(self._n):
+            yield Trade(idx[i], float(self._price[i]), float(self._qty[i]), _SIDE_NAME[int(self._side[i])])
+
+    # ---------- widoki kolumn (bez kopiowania) ----------
+    @property
+    def times(self) -> np.ndarray:
+        return self._time[: self._n]
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._price[: self._n]
+
+    @property
+    def qtys(self) -> np.ndarray:
+        return self._qty[: self._n]
+
+    @property
+    def sides(self) -> np.ndarray:
+        return self._side[: self._n]
+
+    def _index(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(self._time[: self._n].view("datetime64[ns]"))
+        return idx.tz_localize("UTC").tz_convert(self._tz) if self._tz is not None else idx
 
     # ---------- Analizy ----------
     def equity_curve(self) -> pd.Series:
         """Kapitał narastająco po każdej transakcji (brutto, bez kosztów)."""
-        pnl = []
-        for t in self._trades:
-            sign = 1 if t.side == "LONG" else -1
-            pnl.append(sign * t.qty * t.price)
-        return pd.Series(pnl, index=[t.time for t in self._trades]).cumsum()
+        return pd.Series(self._equity[: self._n], index=self._index(), copy=False)
 
     def max_drawdown(self) -> float:
         """Maksymalne obsunięcie kapitału (wartość dodatnia)."""
-        eq = self.equity_curve()
-        peak = eq.cummax()
-        drawdown = peak - eq
-        return drawdown.max() if not drawdown.empty else 0.0
+        return float(self._max_dd)
+
+    # ---------- eksport ----------
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame (time, price, qty, side, equity) na widokach tablic – bez kopii danych."""
+        return pd.DataFrame(
+            {
+                "price": self.prices,
+                "qty": self.qtys,
+                "side": self.sides,
+                "equity": self._equity[: self._n],
+            },
+            index=self._index().rename("time"),
+            copy=False,
+        )
+
+    def to_arrow(self):
+        """Tabela ``pyarrow.Table`` zbudowana bez kopiowania buforów NumPy."""
+        import pyarrow as pa
 
+        tz = str(self._tz) if self._tz is not None else None
+        return pa.table(
+            {
+                "time": pa.array(self.times, type=pa.timestamp("ns", tz=tz)),
+                "price": pa.array(self.prices),
+                "qty": pa.array(self.qtys),
+                "side": pa.array(self.sides),
+                "equity": pa.array(self._equity[: self._n]),
+            }
+        )
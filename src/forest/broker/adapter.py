@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Optional, Protocol
+from math import inf
+from typing import Dict, List, Optional, Protocol, Sequence
+
+from .matching import BUY, ROLE_ENTRY, Fill, MatchingEngine, OrderType
+from .positions import PositionStore
 
 
 class Side(str, Enum):
@@ -54,21 +58,52 @@ class PaperBroker(BrokerAdapter):
       potem otwieramy nową pozycję,
     - średnia cena wejścia uaktualnia się przy dokładaniu tej samej strony.
     - brak prowizji/slippage (można dodać później).
+    - pozycje i ostatnie ceny trzyma ``PositionStore`` (tablice NumPy) – ``equity`` jest O(1),
+      a ``update_prices`` wycenia paczkę symboli jedną operacją wektorową,
+    - ``sl``/``tp`` zakładają parę OCO w symulatorze (``forest.broker.matching``);
+      zlecenia limit/stop czekają w księdze – ``update_price`` je wypełnia, a wyniki
+      (także trafione SL/TP) odbiera ``executions()``; limit marketable wypełnia się
+      po ostatniej cenie jak rynek – nigdy o własne nogi SL/TP.
     """
 
     def __init__(self, initial_balance: float = 0.0) -> None:
         self._balance: float = float(initial_balance)
-        self._prices: Dict[str, float] = {}
-        self._pos: Dict[str, Position] = {}
+        self._store = PositionStore()
+        self._engine = MatchingEngine(cross=False)  # jeden rachunek – bez dopasowania z własnymi zleceniami
+        self._exits: Dict[str, tuple] = {}          # symbol -> (oid SL, oid TP) nawiasów pozycji
+        self._brackets: Dict[int, tuple] = {}       # oid zlecenia oczekującego -> (sl, tp) po fillu
+        self._executions: List[TradeResult] = []
 
     # ---------- price feed (papierowy) ----------
-    def update_price(self, symbol: str, price: float) -> None:
-        self._prices[symbol] = float(price)
+    def update_price(self, symbol: str, price: float, volume: float = inf) -> None:
+        self._store.update_price(symbol, float(price))
+        if symbol in self._engine.books:  # księga istnieje tylko, gdy są zlecenia oczekujące
+            self._on_fills(self._engine.on_tick(symbol, price, volume))
+
+    def update_prices(self, symbols: Sequence[str], prices: Sequence[float]) -> None:
+        """Ceny wielu (unikalnych) symboli naraz – wycena wektorowa, ticki tylko dla ksiąg ze zleceniami."""
+        self._store.update_prices(symbols, prices)
+        books = self._engine.books
+        if books:
+            for sym, px in zip(symbols, prices):
+                if sym in books:
+                    self._on_fills(self._engine.on_tick(sym, px))
 
     def price(self, symbol: str) -> float:
-        if symbol not in self._prices:
+        px = self._store.price(symbol)
+        if px != px:  # NaN – symbol bez ceny
             raise ValueError(f"No price for symbol: {symbol}")
-        return self._prices[symbol]
+        return px
+
+    # ---------- pozycje ----------
+    def _position(self, symbol: str) -> Optional[Position]:
+        qty, entry = self._store.get(symbol)
+        if qty == 0.0:
+            return None
+        return Position(symbol, Side.BUY if qty > 0 else Side.SELL, abs(qty), entry)
+
+    def _set(self, symbol: str, side: Side, qty: float, entry: float) -> None:
+        self._store.set(symbol, qty if side == Side.BUY else -qty, entry)
 
     # ---------- PnL helpers ----------
     @staticmethod
@@ -76,6 +111,77 @@ class PaperBroker(BrokerAdapter):
         sign = 1.0 if pos.side == Side.BUY else -1.0
         return (exit_price - pos.entry) * sign * pos.qty
 
+    # ---------- symulator zleceń ----------
+    def _book(self, symbol: str):
+        book = self._engine.book(symbol)
+        if book.last is None and symbol in self._store:
+            px = self._store.price(symbol)
+            book.last = px if px == px else None
+        return book
+
+    def _on_fills(self, fills: List[Fill]) -> None:
+        for f in fills:
+            side = Side.BUY if f.side == BUY else Side.SELL
+            if f.role == ROLE_ENTRY:
+                res = self._apply(f.symbol, side, f.qty, f.price)
+                if f.oid in self._brackets:
+                    sl, tp = self._brackets[f.oid]
+                    if self._engine.remaining(f.oid) <= 0:
+                        del self._brackets[f.oid]
+                    self._set_exits(f.symbol, sl, tp)
+            else:  # SL / TP – redukcja pozycji, nigdy odwrócenie
+                res = self._reduce(f.symbol, f.qty, f.price)
+            self._executions.append(res)
+
+    def _cancel_exits(self, symbol: str) -> None:
+        for oid in self._exits.pop(symbol, ()):
+            if oid is not None:
+                self._engine.cancel(oid)
+
+    def _set_exits(self, symbol: str, sl: Optional[float], tp: Optional[float]) -> None:
+        self._cancel_exits(symbol)
+        pos = self._position(symbol)
+        if pos is None or (sl is None and tp is None):
+            return
+        self._book(symbol)
+        oids, fills = self._engine.bracket(symbol, pos.side.value, pos.qty, sl, tp)
+        self._exits[symbol] = oids
+        self._on_fills(fills)
+
+    def _submit(
+        self, symbol: str, side: Side, qty: float, kind: OrderType,
+        price: Optional[float], stop: Optional[float], sl: Optional[float], tp: Optional[float],
+    ) -> int:
+        self._book(symbol)
+        oid, fills = self._engine.submit(symbol, side.value, qty, kind, price=price, stop=stop)
+        if sl is not None or tp is not None:
+            self._brackets[oid] = (sl, tp)  # nawias zakładamy po fillu – na całą pozycję
+        self._on_fills(fills)
+        return oid
+
+    def limit_order(
+        self, symbol: str, side: Side, qty: float, price: float,
+        sl: Optional[float] = None, tp: Optional[float] = None,
+    ) -> int:
+        """Zlecenie z limitem; zwraca id. Fille (częściowe) – przy kolejnych ``update_price``."""
+        return self._submit(symbol, side, qty, "limit", price, None, sl, tp)
+
+    def stop_order(
+        self, symbol: str, side: Side, qty: float, stop: float, limit: Optional[float] = None,
+        sl: Optional[float] = None, tp: Optional[float] = None,
+    ) -> int:
+        """Stop (po wyzwoleniu rynek) albo stop‑limit, gdy podano ``limit``; zwraca id."""
+        return self._submit(symbol, side, qty, "stop" if limit is None else "stop_limit", limit, stop, sl, tp)
+
+    def cancel_order(self, oid: int) -> bool:
+        self._brackets.pop(oid, None)
+        return self._engine.cancel(oid)
+
+    def executions(self) -> List[TradeResult]:
+        """Transakcje wykonane asynchronicznie (limit/stop/SL/TP) od ostatniego wywołania."""
+        out, self._executions = self._executions, []
+        return out
+
     # ---------- mandatory API ----------
     def market_order(
         self,
@@ -85,30 +191,49 @@ class PaperBroker(BrokerAdapter):
         sl: Optional[float] = None,
         tp: Optional[float] = None,
     ) -> TradeResult:
-        del sl, tp  # placeholders; mini-adapter na razie ich nie używa
+        res = self._apply(symbol, side, float(qty), self.price(symbol))
+        if sl is not None or tp is not None:
+            self._set_exits(symbol, sl, tp)  # nawias obejmuje całą (uśrednioną) pozycję
+        return res
 
-        px = self.price(symbol)
-        cur = self._pos.get(symbol)
+    def _apply(self, symbol: str, side: Side, qty: float, px: float) -> TradeResult:
+        cur = self._position(symbol)
 
         if cur is None:
-            self._pos[symbol] = Position(symbol=symbol, side=side, qty=float(qty), entry=px)
+            self._set(symbol, side, float(qty), px)
             return TradeResult(symbol, float(qty), side, px, realized_pnl=0.0)
 
         # ten sam kierunek => uśredniamy wejście
         if cur.side == side:
             new_qty = cur.qty + float(qty)
             new_entry = (cur.entry * cur.qty + px * float(qty)) / new_qty
-            self._pos[symbol] = Position(symbol=symbol, side=side, qty=new_qty, entry=new_entry)
+            self._set(symbol, side, new_qty, new_entry)
             return TradeResult(symbol, float(qty), side, px, realized_pnl=0.0)
 
         # przeciwny kierunek => zamknij starą, otwórz nową
         realized = self._pnl(cur, px)
         self._balance += realized
-        self._pos[symbol] = Position(symbol=symbol, side=side, qty=float(qty), entry=px)
+        self._cancel_exits(symbol)  # nawiasy dotyczyły zamkniętej pozycji
+        self._set(symbol, side, float(qty), px)
         return TradeResult(symbol, float(qty), side, px, realized_pnl=realized)
 
+    def _reduce(self, symbol: str, qty: float, px: float) -> TradeResult:
+        cur = self._position(symbol)
+        if cur is None:
+            return TradeResult(symbol, 0.0, Side.BUY, px, realized_pnl=0.0)
+        q = min(qty, cur.qty)
+        realized = self._pnl(Position(symbol, cur.side, q, cur.entry), px)
+        self._balance += realized
+        if cur.qty - q > 1e-12:
+            self._set(symbol, cur.side, cur.qty - q, cur.entry)
+        else:
+            self._store.set(symbol, 0.0, 0.0)
+            self._exits.pop(symbol, None)
+        closing = Side.SELL if cur.side == Side.BUY else Side.BUY
+        return TradeResult(symbol, q, closing, px, realized)
+
     def close_position(self, symbol: str) -> TradeResult:
-        cur = self._pos.get(symbol)
+        cur = self._position(symbol)
         if cur is None:
             # nic do zamknięcia
             return TradeResult(symbol, 0.0, Side.BUY, self.price(symbol), realized_pnl=0.0)
@@ -116,20 +241,24 @@ class PaperBroker(BrokerAdapter):
         px = self.price(symbol)
         realized = self._pnl(cur, px)
         self._balance += realized
-        del self._pos[symbol]
+        self._store.set(symbol, 0.0, 0.0)
+        self._cancel_exits(symbol)
         # side w wyniku przyjmijmy kierunek zamykanej pozycji
         return TradeResult(symbol, cur.qty, cur.side, px, realized)
 
     def positions(self) -> Dict[str, Position]:
-        return dict(self._pos)
+        """Migawka otwartych pozycji (obiekty ``Position`` budowane na żądanie)."""
+        out: Dict[str, Position] = {}
+        for sym in self._store.open_symbols():
+            pos = self._position(sym)
+            if pos is not None:
+                out[sym] = pos
+        return out
 
     def balance(self) -> float:
         return self._balance
 
     def equity(self) -> float:
-        unrealized = 0.0
-        for sym, pos in self._pos.items():
-            unrealized += self._pnl(pos, self.price(sym))
-        return self._balance + unrealized
+        return self._balance + float(self._store.unrealized())
 
 
@@ -0,0 +1,391 @@
+"""Lokalny symulator giełdy: księga zleceń z priorytetem cena‑czas.
+
+Obsługiwane typy: ``market``, ``limit``, ``stop``, ``stop_limit`` oraz nawiasy
+SL/TP (para OCO zakładana przy każdym fillu zlecenia‑rodzica). Dwa źródła
+płynności:
+
+- inne zlecenia w księdze – zlecenie przecinające spread zbiera je po kolei,
+  po cenie zlecenia leżącego w księdze (częściowe fille),
+- ticki rynku (``on_tick``) – wyzwalają stopy (fill po cenie ticka) i wypełniają
+  leżące limity po ich cenie limitu, do wolumenu ticka (częściowe fille).
+  Wyzwolony stop jest już zleceniem rynkowym: reszta niepokryta wolumenem ticka
+  dostaje fille po cenach kolejnych ticków (do ich wolumenu), bez ponownego wyzwolenia.
+
+Zlecenie rynkowe, którego nie pokryła księga, dostaje fill po ostatniej cenie
+(jak w papierowych brokerach); bez znanej ceny reszta jest anulowana.
+
+Nogi SL/TP to wyjścia własnej pozycji, nie płynność: leżą w osobnych kopcach,
+nowe zlecenia ich nie przecinają, a wypełniają je wyłącznie ticki rynku.
+``cross=False`` (księga jednego rachunku, np. ``PaperBroker``) wyłącza też
+dopasowanie zleceń między sobą – zlecenie marketable dostaje fill po ostatniej
+cenie, pozostałe czekają na ticki.
+
+Każda strona księgi to kopiec ``(klucz ceny, seq, zlecenie)`` – ``seq`` rośnie
+monotonicznie, więc remisy cenowe rozstrzyga czas. Anulowanie jest leniwe
+(``remaining = 0``), wpis znika z kopca przy najbliższym zetknięciu.
+"""
+
+from __future__ import annotations
+
+import itertools
+from heapq import heappop, heappush
+from math import inf
+from typing import Dict, List, Literal, NamedTuple, Optional
+
+OrderType = Literal["market", "limit", "stop", "stop_limit"]
+
+BUY, SELL = 1, -1
+ROLE_ENTRY, ROLE_SL, ROLE_TP = 0, 1, 2
+
+_SIDES = {"BUY": BUY, "SELL": SELL, BUY: BUY, SELL: SELL}
+
+__all__ = ["BUY", "SELL", "ROLE_ENTRY", "ROLE_SL", "ROLE_TP", "Fill", "OrderBook", "MatchingEngine"]
+
+
+class Fill(NamedTuple):
+    oid: int
+    symbol: str
+    side: int          # 1 BUY, -1 SELL
+    price: float
+    qty: float
+    role: int          # ROLE_ENTRY / ROLE_SL / ROLE_TP
+    parent: int        # oid zlecenia‑rodzica dla SL/TP, inaczej 0
+
+
+class _Order:
+    __slots__ = ("oid", "side", "kind", "price", "stop", "qty", "remaining", "sl", "tp", "role", "parent", "sibling", "children")
+
+    def __init__(self, oid: int, side: int, kind: str, price: float, stop: float, qty: float,
+                 sl: Optional[float], tp: Optional[float], role: int = ROLE_ENTRY, parent: int = 0) -> None:
+        self.oid = oid
+        self.side = side
+        self.kind = kind
+        self.price = price
+        self.stop = stop
+        self.qty = qty
+        self.remaining = qty
+        self.sl = sl
+        self.tp = tp
+        self.role = role
+        self.parent = parent
+        self.sibling: Optional[_Order] = None       # OCO
+        self.children: Optional[tuple] = None       # (sl, tp) – aktywna para nawiasów
+
+
+class OrderBook:
+    """Księga jednego instrumentu. Zwykle używana przez ``MatchingEngine``."""
+
+    def __init__(self, symbol: str, ids: "itertools.count[int]", cross: bool = True) -> None:
+        self.symbol = symbol
+        self.last: Optional[float] = None
+        self.cross = cross
+        self._ids = ids
+        self._seq = itertools.count()
+        self._bids: list = []        # (-cena, seq, order)
+        self._asks: list = []        # (cena, seq, order)
+        self._exit_bids: list = []   # nogi TP – jak wyżej, ale tylko dla ticków rynku
+        self._exit_asks: list = []
+        self._stop_buy: list = []    # (stop, seq, order)  – wyzwalany, gdy cena >= stop
+        self._stop_sell: list = []   # (-stop, seq, order) – wyzwalany, gdy cena <= stop
+        self._triggered: List[_Order] = []   # wyzwolone stopy (już rynek) czekające na wolumen
+        self.orders: Dict[int, _Order] = {}
+        self.fills: List[Fill] = []
+
+    # ---------- zapytania ----------
+    def best_bid(self) -> Optional[float]:
+        top = self._top(self._bids)
+        return -top[0] if top else None
+
+    def best_ask(self) -> Optional[float]:
+        top = self._top(self._asks)
+        return top[0] if top else None
+
+    def _top(self, heap: list):
+        while heap and heap[0][2].remaining <= 0:
+            heappop(heap)
+        return heap[0] if heap else None
+
+    def depth(self, side: int) -> float:
+        heap = self._bids if side == BUY else self._asks
+        return sum(o.remaining for _, _, o in heap if o.remaining > 0 and o.kind in ("limit", "stop_limit"))
+
+    # ---------- zlecenia ----------
+    def submit(
+        self,
+        side: int,
+        qty: float,
+        kind: str = "market",
+        price: Optional[float] = None,
+        stop: Optional[float] = None,
+        sl: Optional[float] = None,
+        tp: Optional[float] = None,
+        role: int = ROLE_ENTRY,
+        parent: int = 0,
+    ) -> _Order:
+        if qty <= 0:
+            raise ValueError("qty must be > 0")
+        if kind in ("limit", "stop_limit") and price is None:
+            raise ValueError(f"{kind} order requires price")
+        if kind in ("stop", "stop_limit") and stop is None:
+            raise ValueError(f"{kind} order requires stop")
+        o = _Order(next(self._ids), side, kind, float(price) if price is not None else 0.0,
+                   float(stop) if stop is not None else 0.0, float(qty), sl, tp, role, parent)
+        self.orders[o.oid] = o
+        if kind in ("stop", "stop_limit"):
+            last = self.last
+            if last is not None and (last >= o.stop if side == BUY else last <= o.stop):
+                self._activate(o, last, inf)
+            elif side == BUY:
+                heappush(self._stop_buy, (o.stop, next(self._seq), o))
+            else:
+                heappush(self._stop_sell, (-o.stop, next(self._seq), o))
+        else:
+            self._execute(o)
+        return o
+
+    def cancel(self, oid: int) -> bool:
+        o = self.orders.pop(oid, None)
+        if o is None or o.remaining <= 0:
+            return False
+        o.remaining = 0.0
+        return True
+
+    # ---------- dopasowanie ----------
+    def _fill(self, o: _Order, px: float, q: float) -> None:
+        o.remaining -= q
+        if o.remaining <= 1e-12:
+            o.remaining = 0.0
+            self.orders.pop(o.oid, None)
+        self.fills.append(Fill(o.oid, self.symbol, o.side, px, q, o.role, o.parent))
+        sib = o.sibling
+        if sib is not None and sib.remaining > 0:  # OCO: druga noga maleje o to samo
+            sib.remaining = max(sib.remaining - q, 0.0)
+            if sib.remaining <= 1e-12:
+                sib.remaining = 0.0
+                self.orders.pop(sib.oid, None)
+        if o.sl is not None or o.tp is not None:
+            self._bracket(o, q)
+
+    def _bracket(self, o: _Order, q: float) -> None:
+        kids = o.children
+        if kids is not None and any(k is not None and k.remaining > 0 for k in kids):
+            for k in kids:
+                if k is not None:
+                    k.qty += q
+                    k.remaining += q
+            return
+        o.children = self.oco(-o.side, q, o.sl, o.tp, parent=o.oid)
+
+    def oco(
+        self, side: int, qty: float, sl: Optional[float], tp: Optional[float], parent: int = 0
+    ) -> tuple[Optional[_Order], Optional[_Order]]:
+        """Para wyjść SL (stop) / TP (limit) po stronie ``side``, spięta OCO.
+
+        Obie nogi najpierw trafiają do księgi i są spinane – dopiero potem sprawdzamy,
+        czy rynek już je „przebił” (wtedy fill od razu, a druga noga maleje).
+        """
+        last, self.last = self.last, None
+        sl_o = self.submit(side, qty, "stop", stop=sl, role=ROLE_SL, parent=parent) if sl is not None else None
+        tp_o = self.submit(side, qty, "limit", price=tp, role=ROLE_TP, parent=parent) if tp is not None else None
+        self.last = last
+        if sl_o is not None and tp_o is not None:
+            sl_o.sibling, tp_o.sibling = tp_o, sl_o
+        if last is not None:
+            if sl_o is not None and (last >= sl_o.stop if side == BUY else last <= sl_o.stop):
+                self._activate(sl_o, last, inf)  # wpis w kopcu stopów zostaje martwy (remaining = 0)
+            if tp_o is not None and tp_o.remaining > 0 and (last <= tp_o.price if side == BUY else last >= tp_o.price):
+                self._fill(tp_o, last, tp_o.remaining)
+        return sl_o, tp_o
+
+    def _cross(self, o: _Order, limit: Optional[float]) -> None:
+        """Zbierz płynność z przeciwnej strony księgi (cena leżącego zlecenia)."""
+        buy = o.side == BUY
+        heap = self._asks if buy else self._bids
+        while o.remaining > 0 and heap:
+            key, _, r = heap[0]
+            if r.remaining <= 0:
+                heappop(heap)
+                continue
+            px = key if buy else -key
+            if limit is not None and (px > limit if buy else px < limit):
+                break
+            q = min(o.remaining, r.remaining)
+            self._fill(r, px, q)
+            self._fill(o, px, q)
+            # wypełnione zdejmujemy leniwie na początku pętli – fill mógł dołożyć zlecenia (nawiasy) do kopca
+
+    def _rest(self, o: _Order) -> None:
+        exit_leg = o.role != ROLE_ENTRY
+        if o.side == BUY:
+            heappush(self._exit_bids if exit_leg else self._bids, (-o.price, next(self._seq), o))
+        else:
+            heappush(self._exit_asks if exit_leg else self._asks, (o.price, next(self._seq), o))
+
+    def _execute(self, o: _Order) -> None:
+        crossing = self.cross and o.role == ROLE_ENTRY
+        if o.kind == "market":
+            if crossing:
+                self._cross(o, None)
+            if o.remaining > 0:
+                if self.last is None:
+                    self.cancel(o.oid)
+                else:
+                    self._fill(o, self.last, o.remaining)
+            return
+        if crossing:
+            self._cross(o, o.price)
+        if o.remaining <= 0:
+            return
+        last = self.last
+        if last is not None and (last <= o.price if o.side == BUY else last >= o.price):
+            self._fill(o, last, o.remaining)  # limit marketable względem rynku
+        else:
+            self._rest(o)
+
+    def _activate(self, o: _Order, px: float, volume: float) -> float:
+        """Wyzwolony stop: stop -> rynek po ``px``, stop_limit -> limit; oba do ``volume``."""
+        crossing = self.cross and o.role == ROLE_ENTRY
+        if o.kind == "stop_limit":
+            o.kind = "limit"
+            if crossing:
+                self._cross(o, o.price)
+            if o.remaining > 0 and volume > 0 and (px <= o.price if o.side == BUY else px >= o.price):
+                q = min(o.remaining, volume)
+                self._fill(o, px, q)
+                volume -= q
+            if o.remaining > 0:
+                self._rest(o)
+            return volume
+        o.kind = "market"
+        if crossing:
+            self._cross(o, None)
+        if o.remaining > 0 and volume > 0:
+            q = min(o.remaining, volume)
+            self._fill(o, px, q)
+            volume -= q
+        if o.remaining > 0:
+            self._triggered.append(o)
+        return volume
+
+    def _fill_triggered(self, px: float, volume: float) -> float:
+        """Reszty wyzwolonych stopów: rynek po ``px`` do ``volume``, w kolejności wyzwolenia."""
+        queue, self._triggered = self._triggered, []   # fill może wyzwolić nowe (nawiasy)
+        keep = []
+        for o in queue:
+            if o.remaining > 0 and volume > 0:
+                q = min(o.remaining, volume)
+                self._fill(o, px, q)
+                volume -= q
+            if o.remaining > 0:
+                keep.append(o)
+        self._triggered = keep + self._triggered
+        return volume
+
+    def on_tick(self, price: float, volume: float = inf) -> None:
+        """Nowa cena rynku: wyzwól stopy, wypełnij leżące limity (do ``volume``)."""
+        self.last = price = float(price)
+        volume = float(volume)
+        if self._triggered:
+            volume = self._fill_triggered(price, volume)
+        sb, ss = self._stop_buy, self._stop_sell
+        pending = []
+        while sb and sb[0][0] <= price:
+            pending.append(heappop(sb))
+        while ss and -ss[0][0] >= price:
+            pending.append(heappop(ss))
+        if pending:
+            pending.sort(key=lambda e: e[1])  # czas złożenia
+            for _, _, o in pending:
+                if o.remaining > 0:
+                    volume = self._activate(o, price, volume)
+
+        # leżące limity (i nogi TP), które rynek „przeszedł” – po cenie limitu, w kolejności cena‑czas
+        for heap in (self._bids, self._exit_bids):
+            while volume > 0 and heap:
+                key, _, o = heap[0]
+                if o.remaining <= 0:
+                    heappop(heap)
+                    continue
+                if -key < price:
+                    break
+                q = min(o.remaining, volume)
+                self._fill(o, -key, q)
+                volume -= q
+        for heap in (self._asks, self._exit_asks):
+            while volume > 0 and heap:
+                key, _, o = heap[0]
+                if o.remaining <= 0:
+                    heappop(heap)
+                    continue
+                if key > price:
+                    break
+                q = min(o.remaining, volume)
+                self._fill(o, key, q)
+                volume -= q
+
+
+class MatchingEngine:
+    """Zbiór ksiąg (po jednej na symbol) ze wspólną numeracją zleceń i dziennikiem filli."""
+
+    def __init__(self, cross: bool = True) -> None:
+        self._ids = itertools.count(1)
+        self.cross = cross
+        self.books: Dict[str, OrderBook] = {}
+
+    def book(self, symbol: str) -> OrderBook:
+        b = self.books.get(symbol)
+        if b is None:
+            b = self.books[symbol] = OrderBook(symbol, self._ids, self.cross)
+        return b
+
+    @staticmethod
+    def _drain(book: OrderBook) -> List[Fill]:
+        fills, book.fills = book.fills, []
+        return fills
+
+    def _find(self, oid: int) -> Optional[OrderBook]:
+        for book in self.books.values():  # symboli jest mało, zleceń dużo – bez indeksu oid -> księga
+            if oid in book.orders:
+                return book
+        return None
+
+    def submit(
+        self,
+        symbol: str,
+        side: str | int,
+        qty: float,
+        type: OrderType = "market",
+        price: Optional[float] = None,
+        stop: Optional[float] = None,
+        sl: Optional[float] = None,
+        tp: Optional[float] = None,
+    ) -> tuple[int, List[Fill]]:
+        """Złóż zlecenie; zwraca (oid, fille wywołane od razu – także innych zleceń)."""
+        book = self.book(symbol)
+        o = book.submit(_SIDES[getattr(side, "value", side)], qty, type, price, stop, sl, tp)
+        return o.oid, self._drain(book)
+
+    def bracket(
+        self, symbol: str, side: str | int, qty: float, sl: Optional[float] = None, tp: Optional[float] = None
+    ) -> tuple[tuple[Optional[int], Optional[int]], List[Fill]]:
+        """Sama para OCO SL/TP dla istniejącej pozycji ``side`` (zlecenia zamykające).
+
+        Zwraca ((oid SL, oid TP), fille) – noga już „przebita” przez rynek wypełnia się od razu.
+        """
+        book = self.book(symbol)
+        sl_o, tp_o = book.oco(-_SIDES[getattr(side, "value", side)], qty, sl, tp)
+        return ((sl_o.oid if sl_o else None), (tp_o.oid if tp_o else None)), self._drain(book)
+
+    def cancel(self, oid: int) -> bool:
+        book = self._find(oid)
+        return book.cancel(oid) if book is not None else False
+
+    def remaining(self, oid: int) -> float:
+        """Niewypełniona ilość zlecenia (0 dla wypełnionych / anulowanych / nieznanych)."""
+        book = self._find(oid)
+        return book.orders[oid].remaining if book is not None else 0.0
+
+    def on_tick(self, symbol: str, price: float, volume: float = inf) -> List[Fill]:
+        book = self.book(symbol)
+        book.on_tick(price, volume)
+        return self._drain(book)
@@ -0,0 +1,128 @@
+"""Tablicowy magazyn pozycji: mark‑to‑market wielu symboli bez pętli po słownikach.
+
+Każdy symbol dostaje stały slot; ilość (ze znakiem: + long, − short), cena wejścia,
+ostatnia cena i niezrealizowany PnL slotu siedzą w tablicach NumPy. Suma
+niezrealizowanego PnL jest utrzymywana przyrostowo – ``update_price`` i zmiana
+pozycji poprawiają ją o różnicę dla jednego slotu (O(1)), ``update_prices``
+robi to samo wektorowo dla paczki symboli.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, Sequence
+
+import numpy as np
+
+__all__ = ["PositionStore"]
+
+
+class PositionStore:
+    __slots__ = ("_slot", "_names", "_n", "qty", "entry", "last", "upnl", "_total")
+
+    def __init__(self, capacity: int = 64) -> None:
+        cap = max(int(capacity), 1)
+        self._slot: Dict[str, int] = {}
+        self._names: list[str] = []
+        self._n = 0
+        self.qty = np.zeros(cap)                # + long, − short, 0 = brak pozycji
+        self.entry = np.zeros(cap)
+        self.last = np.full(cap, np.nan)        # NaN = brak ceny
+        self.upnl = np.zeros(cap)
+        self._total = 0.0
+
+    # ---------- sloty ----------
+    def _grow(self) -> None:
+        cap = len(self.qty) * 2
+        for name, fill in (("qty", 0.0), ("entry", 0.0), ("last", np.nan), ("upnl", 0.0)):
+            old = getattr(self, name)
+            new = np.full(cap, fill)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def slot(self, symbol: str) -> int:
+        """Slot symbolu (tworzony przy pierwszym użyciu, nigdy nie zmienia się)."""
+        i = self._slot.get(symbol)
+        if i is None:
+            if self._n == len(self.qty):
+                self._grow()
+            i = self._slot[symbol] = self._n
+            self._names.append(symbol)
+            self._n += 1
+        return i
+
+    def slots(self, symbols: Iterable[str]) -> np.ndarray:
+        """Sloty dla listy symboli – do wielokrotnego użycia z ``update_slots``."""
+        return np.fromiter((self.slot(s) for s in symbols), dtype=np.intp)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._slot
+
+    # ---------- ceny ----------
+    def _mark(self, i: int) -> None:
+        q, px = self.qty[i], self.last[i]
+        new = q * (px - self.entry[i]) if q != 0.0 and px == px else 0.0  # px != px: brak ceny (NaN)
+        self._total += new - self.upnl[i]
+        self.upnl[i] = new
+
+    def update_price(self, symbol: str, price: float) -> None:
+        i = self.slot(symbol)
+        self.last[i] = price
+        if self.qty[i] != 0.0:
+            self._mark(i)
+
+    def update_slots(self, slots: np.ndarray, prices: np.ndarray | Sequence[float]) -> None:
+        """Ceny dla slotów (bez duplikatów) – jedna operacja wektorowa na paczkę."""
+        px = np.asarray(prices, dtype=np.float64)
+        self.last[slots] = px
+        q = self.qty[slots]
+        # jak w _mark: brak ceny (NaN) → 0, inaczej NaN na stałe zatruwa _total
+        new = np.where((q != 0.0) & ~np.isnan(px), q * (px - self.entry[slots]), 0.0)
+        self._total += float(new.sum() - self.upnl[slots].sum())
+        self.upnl[slots] = new
+
+    def update_prices(self, symbols: Sequence[str], prices: Sequence[float]) -> None:
+        """Ceny wielu (unikalnych) symboli naraz."""
+        self.update_slots(self.slots(symbols), prices)
+
+    def price(self, symbol: str) -> float:
+        i = self._slot.get(symbol)
+        return float(self.last[i]) if i is not None else float("nan")
+
+    # ---------- pozycje ----------
+    def get(self, symbol: str) -> tuple[float, float]:
+        """(ilość ze znakiem, cena wejścia); (0, 0) gdy brak pozycji."""
+        i = self._slot.get(symbol)
+        if i is None:
+            return 0.0, 0.0
+        return float(self.qty[i]), float(self.entry[i])
+
+    def set(self, symbol: str, qty: float, entry: float) -> None:
+        """Ustaw pozycję (``qty == 0`` zamyka) i popraw niezrealizowany PnL slotu."""
+        i = self.slot(symbol)
+        self.qty[i] = qty
+        self.entry[i] = entry if qty != 0.0 else 0.0
+        self._mark(i)
+
+    def open_symbols(self) -> Iterator[str]:
+        for i in np.flatnonzero(self.qty[: self._n]):
+            yield self._names[i]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.qty[: self._n]))
+
+    # ---------- agregaty ----------
+    def unrealized(self) -> float:
+        """Suma niezrealizowanego PnL (O(1)); pozycja bez ceny liczy się jako 0."""
+        return self._total
+
+    def unrealized_of(self, symbol: str) -> float:
+        i = self._slot.get(symbol)
+        return float(self.upnl[i]) if i is not None else 0.0
+
+    def recompute(self) -> float:
+        """Przelicz sumę od zera (kasuje dryf numeryczny przyrostowych poprawek)."""
+        n = self._n
+        q = self.qty[:n]
+        self.upnl[:n] = np.nan_to_num(np.where(q != 0.0, q * (self.last[:n] - self.entry[:n]), 0.0))
+        self._total = float(self.upnl[:n].sum())
+        return self._total
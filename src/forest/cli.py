@@ -0,0 +1,354 @@
+"""Bezgłowy punkt wejścia ``forest``: wsadowe backtesty i gridy z pliku konfiguracji.
+
+Konfiguracja (YAML/JSON, ``forest.config.BatchSettings``)::
+
+    data:
+      path: data/{symbol}_{timeframe}.csv      # albo data/{symbol}.csv – resampling do interwału
+    defaults:                                  # BacktestSettings (ryzyko, fast/slow dla backtestów)
+      risk: {capital: 10000, risk_per_trade: 0.01}
+    n_jobs: -1
+    output:
+      catalog: results/catalog                 # forest.backtest.catalog.ResultsCatalog
+      dir: results/runs                        # <dir>/<job>/<symbol>_<tf>.parquet
+      features: ~/.cache/forest_features       # wskaźniki z FeatureStore (opcjonalnie)
+    jobs:
+      - name: ema-sweep
+        symbols: [EURUSD, GBPUSD]
+        timeframes: [1h, 4h]
+        grid:
+          fast: {low: 5, high: 20, step: 5}
+          slow: [30, 40, 50]
+          risk_per_trade: [0.005, 0.01]        # wymiary ryzyka – sygnały liczone raz
+      - name: donchian
+        kind: backtest
+        strategy: donchian
+        symbols: [EURUSD]
+        params: {n: 55}
+
+``defaults.strategy.mode: ml`` – zadania ``backtest`` liczone są modelem
+``forest.ml.MLStrategy`` (``horizon``, ``threshold`` z ``defaults.strategy``): trening
+walk‑forward na serii i backtest na prognozach out‑of‑sample; gridy w tym trybie
+są błędem konfiguracji.
+
+Uruchomienie (np. z crona)::
+
+    forest validate nightly.yaml
+    forest run nightly.yaml --only ema-sweep --summary summary.csv
+    forest catalog results/catalog top -k 5
+    forest grid worker /mnt/shared/forest-grid      # worker gridu rozproszonego
+
+Wszystkie zadania działają w jednym procesie: świece wczytywane są raz na serię,
+wspólne są cache gridu (``joblib.Memory``), feature store i pula workerów loky
+(ten sam ``n_jobs`` → ten sam executor między kolejnymi ``run_grid``). Błąd
+jednej serii nie przerywa pozostałych (chyba że ``--fail-fast``), ale kod wyjścia
+to wtedy 1; niepoprawna konfiguracja → 2.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from forest.config import BatchSettings, JobSettings, RiskSettings
+
+__all__ = ["Task", "plan", "param_sets", "run_batch", "main"]
+
+EXIT_OK, EXIT_FAILED, EXIT_CONFIG = 0, 1, 2
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    job: JobSettings
+    symbol: str
+    timeframe: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.job.name}:{self.symbol}@{self.timeframe}"
+
+
+def plan(cfg: BatchSettings, only: Optional[Sequence[str]] = None) -> List[Task]:
+    """Zadania × symbole × interwały (w kolejności z pliku); ``only`` – wybrane nazwy zadań."""
+    names = {j.name for j in cfg.jobs}
+    unknown = set(only or ()) - names
+    if unknown:
+        raise ValueError(f"Nieznane zadania: {sorted(unknown)} (są: {sorted(names)})")
+    return [
+        Task(job, symbol, tf)
+        for job in cfg.jobs
+        if not only or job.name in only
+        for symbol in job.symbols
+        for tf in job.timeframes
+    ]
+
+
+def _values(spec: Any) -> list:
+    """Wartości parametru gridu: lista, ``{low, high, step}`` albo pojedyncza wartość."""
+    if isinstance(spec, dict):
+        from forest.strategies import Param
+
+        return Param(spec["low"], spec["low"], spec["high"], spec.get("step")).values()
+    return list(spec) if isinstance(spec, (list, tuple)) else [spec]
+
+
+def param_sets(job: JobSettings, cfg: BatchSettings) -> List[Dict[str, Any]]:
+    """Kombinacje parametrów zadania (backtest: jedna; ``fast``/``slow`` domyślnie z ``defaults.strategy``).
+
+    Klucze z ``RISK_PARAMS`` (``risk_per_trade``, ``atr_multiple`` …) to wymiary ryzyka –
+    siatka strategii mnożona jest przez ich wartości.
+    """
+    from forest.backtest.grid import RISK_PARAMS, param_grid, split_params
+    from forest.strategies import get_strategy
+
+    fixed, risk_fixed = split_params(job.params)
+    swept, risk_swept = split_params(job.grid)
+    settings = cfg.defaults.strategy
+    if settings.mode == "ml":
+        if job.kind != "backtest" or fixed or job.grid:
+            raise ValueError(f"{job.name}: strategy mode 'ml' runs backtest jobs without strategy params or grid")
+        return [{"horizon": settings.horizon, "threshold": settings.threshold} | risk_fixed]
+
+    strat = get_strategy(job.strategy)
+    unknown = (set(fixed) | set(swept)) - set(strat.space)
+    if unknown:
+        raise ValueError(f"{job.name}: {strat.name} has no parameters {sorted(unknown)} (risk: {list(RISK_PARAMS)})")
+    risk_grid = list(param_grid(**{k: _values(v) for k, v in risk_swept.items()})) if risk_swept else [{}]
+
+    if job.kind == "backtest":
+        if risk_swept:
+            raise ValueError(f"{job.name}: backtest jobs take fixed values – use kind: grid to sweep")
+        if strat.name == "ema_cross":
+            fixed = {"fast": cfg.defaults.strategy.fast, "slow": cfg.defaults.strategy.slow} | fixed
+        return [strat.resolve(fixed) | risk_fixed]
+
+    overrides = {k: [v] for k, v in fixed.items()} | {k: _values(v) for k, v in swept.items()}
+    combos = strat.grid(**overrides)
+    if not combos:
+        raise ValueError(f"{job.name}: grid has no valid combinations")
+    return [p | risk_fixed | r for p in combos for r in risk_grid]
+
+
+def _make_risk(settings: RiskSettings):
+    from forest.backtest.risk import RiskManager
+
+    # partial (nie lambda) – przechodzi przez pickle do workerów joblib
+    return partial(
+        RiskManager,
+        capital=settings.capital,
+        risk_per_trade=settings.risk_per_trade,
+        max_drawdown=settings.max_drawdown,
+        atr_multiple=settings.atr_multiple,
+        trail_k=settings.trail_k,
+        spread=settings.spread,
+        commission=2 * settings.fee_perc,     # fee_perc w jedną stronę, commission round‑turn
+        slippage=settings.slippage,
+    )
+
+
+class _Runner:
+    """Stan współdzielony między zadaniami jednego ``forest run``."""
+
+    def __init__(self, cfg: BatchSettings, n_jobs: int, use_cache: bool) -> None:
+        self.cfg = cfg
+        self.n_jobs = n_jobs
+        self.use_cache = use_cache
+        self._frames: Dict[tuple, Any] = {}
+        self._store = None
+        self._catalog = None
+        if cfg.output.features is not None:
+            from forest.ml.store import FeatureStore
+
+            self._store = FeatureStore(cfg.output.features.expanduser())
+        if cfg.output.catalog is not None:
+            from forest.backtest.catalog import ResultsCatalog
+
+            self._catalog = ResultsCatalog(cfg.output.catalog)
+
+    def frame(self, symbol: str, timeframe: str):
+        """Świece serii – wczytane raz na cały przebieg."""
+        csv = self.cfg.data.csv(symbol, timeframe)
+        key = (csv.path, timeframe)
+        if key not in self._frames:
+            from forest.data.csv_source import load_history_csv
+
+            self._frames[key] = load_history_csv(csv)
+        return self._frames[key]
+
+    def indicators(self, task: Task, df, combos: List[Dict[str, Any]]):
+        """EMA/ATR z feature store (``output.features``), reszta liczona w ``run_grid``."""
+        if self._store is None:
+            return None
+        from forest.strategies import get_strategy
+
+        strat = get_strategy(task.job.strategy)
+        keys = {k for p in combos for k in strat.needs(p)}
+        emas = sorted(int(k[4:]) for k in keys if k.startswith("ema_"))
+        atrs = sorted({14} | {int(k[4:]) for k in keys if k.startswith("atr_")})
+        return self._store.indicators(df, emas, atrs, dataset=f"{task.symbol}-{task.timeframe}")
+
+    def run(self, task: Task) -> Dict[str, Any]:
+        from forest.backtest.grid import run_grid
+
+        job = task.job
+        df = self.frame(task.symbol, task.timeframe)
+        combos = param_sets(job, self.cfg)
+        make_risk = _make_risk(job.risk or self.cfg.defaults.risk)
+        if self.cfg.defaults.strategy.mode == "ml":
+            out = self.ml_backtest(df, combos[0], make_risk)
+        else:
+            out = run_grid(
+                df,
+                combos,
+                make_risk=make_risk,
+                n_jobs=1 if len(combos) == 1 else self.n_jobs,
+                use_cache=self.use_cache,
+                indicators=self.indicators(task, df, combos),
+                strategy=job.strategy,
+            )
+        row: Dict[str, Any] = {"rows": len(out)}
+        if self._catalog is not None:
+            meta = {"job": job.name, "kind": job.kind, "strategy": job.strategy}
+            row["run_id"] = self._catalog.add(out, symbol=task.symbol, timeframe=task.timeframe, meta=meta)
+        if self.cfg.output.dir is not None:
+            path = self.cfg.output.dir / job.name / f"{task.symbol}_{task.timeframe}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            out.to_parquet(path, index=False)
+        if len(out):
+            best = out.loc[out["rar"].idxmax()]
+            row.update(best_rar=float(best["rar"]), best_equity=float(best["equity_end"]))
+        return row
+
+    def ml_backtest(self, df, params: Dict[str, Any], make_risk):
+        """``mode="ml"``: ``MLStrategy.fit`` (walk‑forward) i backtest na sygnale z ``oos_proba``."""
+        from forest.backtest.grid import _single_run
+        from forest.backtest.results import results_frame
+        from forest.ml import MLStrategy
+
+        model = MLStrategy.from_settings(self.cfg.defaults.strategy, seed=self.cfg.defaults.seed, store=self._store)
+        proba = model.fit(df).oos_proba
+        if proba is None:
+            raise RuntimeError("MLStrategy.fit() left no out-of-sample predictions")
+        signal = model.to_signal(proba)
+        res = _single_run("", tuple(sorted(params.items())), df, make_risk, None, signal)
+        return results_frame([res])
+
+
+def run_batch(
+    cfg: BatchSettings,
+    *,
+    only: Optional[Sequence[str]] = None,
+    n_jobs: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+    fail_fast: bool = False,
+):
+    """Wykonaj wszystkie zadania; zwraca podsumowanie (wiersz na serię, ``status`` ok/error)."""
+    import pandas as pd
+
+    runner = _Runner(
+        cfg,
+        cfg.n_jobs if n_jobs is None else n_jobs,
+        cfg.use_cache if use_cache is None else use_cache,
+    )
+    rows = []
+    for task in plan(cfg, only):
+        row: Dict[str, Any] = {"job": task.job.name, "symbol": task.symbol, "timeframe": task.timeframe}
+        t0 = time.perf_counter()
+        try:
+            row.update(runner.run(task), status="ok")
+        except Exception as exc:  # noqa: BLE001 – jedna zła seria nie przerywa nocnego przebiegu
+            traceback.print_exc(file=sys.stderr)
+            row.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        row["seconds"] = round(time.perf_counter() - t0, 3)
+        rows.append(row)
+        print(f"[{row['status']}] {task.label} ({row['seconds']:.2f}s)", file=sys.stderr)
+        if fail_fast and row["status"] != "ok":
+            break
+    return pd.DataFrame(rows)
+
+
+def _check(cfg: BatchSettings, only: Optional[Sequence[str]]) -> List[str]:
+    """Problemy konfiguracji wykrywalne bez liczenia (strategie, parametry, pliki danych)."""
+    problems = []
+    for job in cfg.jobs:
+        if only and job.name not in only:
+            continue
+        try:
+            param_sets(job, cfg)
+        except (KeyError, ValueError) as exc:
+            problems.append(str(exc).strip("'\""))
+        for symbol in job.symbols:
+            for tf in job.timeframes:
+                path = cfg.data.csv(symbol, tf).path
+                if not path.exists():
+                    problems.append(f"{job.name}: missing data file {path}")
+    return problems
+
+
+# ---------- CLI ----------
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="forest", description="FOREST 3.0 – backtesty i gridy bez dashboardu")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    for name in ("run", "validate"):
+        p = sub.add_parser(name, help="wykonaj zadania" if name == "run" else "sprawdź konfigurację")
+        p.add_argument("config", type=Path)
+        p.add_argument("--only", action="append", metavar="JOB", help="tylko wybrane zadania (można powtarzać)")
+        if name == "run":
+            p.add_argument("--n-jobs", type=int, help="nadpisz n_jobs z konfiguracji")
+            p.add_argument("--no-cache", action="store_true", help="bez cache gridu (joblib.Memory)")
+            p.add_argument("--fail-fast", action="store_true", help="przerwij po pierwszym błędzie")
+            p.add_argument("--dry-run", action="store_true", help="tylko wypisz plan")
+            p.add_argument("--summary", type=Path, help="zapisz podsumowanie (.csv/.json)")
+
+    p_cat = sub.add_parser("catalog", help="forest.backtest.catalog (root + komenda)")
+    p_cat.add_argument("args", nargs=argparse.REMAINDER)
+    p_dist = sub.add_parser("grid", help="forest.backtest.distributed (worker / status)")
+    p_dist.add_argument("args", nargs=argparse.REMAINDER)
+
+    args = ap.parse_args(argv)
+    if args.cmd == "catalog":
+        from forest.backtest.catalog import main as catalog_main
+
+        return catalog_main(args.args)
+    if args.cmd == "grid":
+        from forest.backtest.distributed import main as grid_main
+
+        return grid_main(args.args)
+
+    try:
+        cfg = BatchSettings.from_file(args.config)
+        tasks = plan(cfg, args.only)
+    except Exception as exc:  # noqa: BLE001 – pydantic / yaml / brak pliku → czytelny komunikat
+        print(f"forest: invalid config {args.config}: {exc}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    if args.cmd == "validate" or args.dry_run:
+        problems = _check(cfg, args.only)
+        for task in tasks:
+            print(task.label)
+        for msg in problems:
+            print(f"error: {msg}", file=sys.stderr)
+        return EXIT_CONFIG if problems else EXIT_OK
+
+    summary = run_batch(
+        cfg, only=args.only, n_jobs=args.n_jobs, use_cache=False if args.no_cache else None, fail_fast=args.fail_fast
+    )
+    print(summary.to_string(index=False))
+    if args.summary:
+        args.summary.parent.mkdir(parents=True, exist_ok=True)
+        if args.summary.suffix == ".json":
+            summary.to_json(args.summary, orient="records", indent=2)
+        else:
+            summary.to_csv(args.summary, index=False)
+    ok = len(summary) == len(tasks) and (summary["status"] == "ok").all()
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
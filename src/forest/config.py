@@ -18,19 +18,24 @@ from pydantic import BaseModel, Field, field_validator
 
 
 class RiskSettings(BaseModel):
-    capital: float = Field(10_000, ge=0, description="Kapitał początkowy")
-    risk_per_trade: float = Field(0.01, ge=0, le=1, description="Ułamek kapitału na trade")
-    max_drawdown: float = Field(0.2, ge=0, le=1, description="Maksymalny DD (np. 0.2 = 20%)")
-    fee_perc: float = Field(0.0002, ge=0, description="Prowizja % od notional (w jedną stronę)")
-    slippage: float = Field(0.0, ge=0, description="Dodatkowy poślizg ceny na wejście/wyjście")
-    atr_multiple: float = Field(1.5, ge=0, description="Mnożnik ATR dla wyznaczenia wielkości pozycji")
+    capital: float = Field(default=10_000, ge=0, description="Kapitał początkowy")
+    risk_per_trade: float = Field(default=0.01, ge=0, le=1, description="Ułamek kapitału na trade")
+    max_drawdown: float = Field(default=0.2, ge=0, le=1, description="Maksymalny DD (np. 0.2 = 20%)")
+    fee_perc: float = Field(default=0.0002, ge=0, description="Prowizja % od notional (w jedną stronę)")
+    slippage: float = Field(default=0.0, ge=0, description="Dodatkowy poślizg ceny na wejście/wyjście")
+    atr_multiple: float = Field(default=1.5, ge=0, description="Mnożnik ATR dla wyznaczenia wielkości pozycji")
+    trail_k: float = Field(default=3.0, ge=0, description="Trailing SL = cena − trail_k × ATR")
+    spread: float = Field(default=0.0002, ge=0, description="Spread jako ułamek ceny")
 
 
 class StrategySettings(BaseModel):
     mode: Literal["classic", "ml"] = "classic"
-    fast: int = Field(12, ge=1)
-    slow: int = Field(26, ge=1)
-    atr_period: int = Field(14, ge=1)
+    fast: int = Field(default=12, ge=1)
+    slow: int = Field(default=26, ge=1)
+    atr_period: int = Field(default=14, ge=1)
+    # mode="ml" (forest.ml.MLStrategy)
+    horizon: int = Field(default=1, ge=1, description="Horyzont etykiety ML (liczba świec)")
+    threshold: float = Field(default=0.55, ge=0.5, le=1, description="Próg P(wzrost) dla sygnału long / short")
 
 
 class BacktestSettings(BaseModel):
@@ -53,24 +58,101 @@ class BacktestSettings(BaseModel):
     @classmethod
     def from_file(cls, path: str | Path) -> "BacktestSettings":
         """Wczytaj konfigurację z pliku YAML/JSON."""
-        p = Path(path)
-        if not p.exists():
-            raise FileNotFoundError(p)
+        return cls.model_validate(_load_mapping(path))
 
-        if p.suffix.lower() in {".yml", ".yaml"}:
-            data = yaml.safe_load(p.read_text(encoding="utf-8"))
-        elif p.suffix.lower() == ".json":
-            import json
+    def to_dict(self) -> dict[str, Any]:
+        return self.model_dump()
 
-            data = json.loads(p.read_text(encoding="utf-8"))
-        else:
-            raise ValueError(f"Nieznane rozszerzenie pliku konfig: {p.suffix}")
 
-        if not isinstance(data, dict):
-            raise ValueError("Konfiguracja musi być słownikiem (mapą klucz→wartość).")
+# ---------- Zadania wsadowe (``forest run``) ----------
+class DataSettings(BaseModel):
+    """Źródło świec: szablon ścieżki CSV z polami ``{symbol}`` i ``{timeframe}``."""
+
+    path: str = Field(..., description="Np. 'data/{symbol}_{timeframe}.csv' albo 'data/{symbol}.csv' (resampling)")
+    tz: str | None = "UTC"
+    time_col: str = "time"
+    sep: str = ","
+
+    def csv(self, symbol: str, timeframe: str):
+        """``CSVConfig`` dla jednej serii."""
+        from forest.data.csv_source import CSVConfig
+
+        return CSVConfig(
+            path=Path(self.path.format(symbol=symbol, timeframe=timeframe)),
+            symbol=symbol,
+            timeframe=timeframe,
+            tz=self.tz,
+            time_col=self.time_col,
+            sep=self.sep,
+        )
+
+
+class JobSettings(BaseModel):
+    """Jedno zadanie: backtest albo grid strategii na wielu symbolach i interwałach."""
+
+    name: str
+    kind: Literal["backtest", "grid"] = "grid"
+    symbols: list[str] = Field(..., min_length=1)
+    timeframes: list[str] = Field(default_factory=lambda: ["1h"], min_length=1)
+    strategy: str = "ema_cross"
+    params: dict[str, Any] = Field(default_factory=dict, description="Stałe parametry strategii")
+    # grid: nazwa -> lista | {low, high, step} | skalar; pominięte parametry – pełny zakres ``space``;
+    # także wymiary ryzyka/kosztów (forest.backtest.grid.RISK_PARAMS, np. risk_per_trade, atr_multiple)
+    grid: dict[str, Any] = Field(default_factory=dict)
+    risk: RiskSettings | None = None   # nadpisuje ``defaults.risk``
+
+    @field_validator("timeframes")
+    @classmethod
+    def _normalize_timeframes(cls, v: list[str]) -> list[str]:
+        from forest.utils.timeframes import normalize_timeframe
 
-        return cls.model_validate(data)
+        return [normalize_timeframe(tf) for tf in v]
 
-    def to_dict(self) -> dict[str, Any]:
-        return self.model_dump()
 
+class OutputSettings(BaseModel):
+    catalog: Path | None = Field(default=None, description="Katalog wyników (forest.backtest.catalog)")
+    dir: Path | None = Field(default=None, description="Pliki <dir>/<job>/<symbol>_<tf>.parquet")
+    features: Path | None = Field(default=None, description="Feature store na wskaźniki współdzielone między zadaniami")
+
+
+class BatchSettings(BaseModel):
+    """Konfiguracja ``forest run``: dane + domyślne ustawienia + lista zadań + miejsce zapisu."""
+
+    data: DataSettings
+    defaults: BacktestSettings = BacktestSettings()
+    jobs: list[JobSettings] = Field(..., min_length=1)
+    output: OutputSettings = OutputSettings()
+    n_jobs: int = -1
+    use_cache: bool = True
+
+    @field_validator("jobs")
+    @classmethod
+    def _unique_names(cls, v: list[JobSettings]) -> list[JobSettings]:
+        names = [j.name for j in v]
+        dup = sorted({n for n in names if names.count(n) > 1})
+        if dup:
+            raise ValueError(f"Powtórzone nazwy zadań: {dup}")
+        return v
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "BatchSettings":
+        return cls.model_validate(_load_mapping(path))
+
+
+def _load_mapping(path: str | Path) -> dict[str, Any]:
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(p)
+
+    if p.suffix.lower() in {".yml", ".yaml"}:
+        data = yaml.safe_load(p.read_text(encoding="utf-8"))
+    elif p.suffix.lower() == ".json":
+        import json
+
+        data = json.loads(p.read_text(encoding="utf-8"))
+    else:
+        raise ValueError(f"Nieznane rozszerzenie pliku konfig: {p.suffix}")
+
+    if not isinstance(data, dict):
+        raise ValueError("Konfiguracja musi być słownikiem (mapą klucz→wartość).")
+    return data
@@ -1,33 +1,166 @@
 from __future__ import annotations
 
+from typing import Any
+
 import numpy as np
 
-# --- Hot‑fix dla pandas‑ta vs NumPy 2 ------------------------------
-if not hasattr(np, "NaN"):
-    np.NaN = np.nan
-# ------------------------------------------------------------------
+from forest.utils.profiling import timed
+
+__all__ = ["ema", "atr", "ema_resume", "atr_resume", "StreamingEMA", "StreamingATR"]
+
+
+# ---------- jedna definicja: seed SMA + rekurencja ``ewm(adjust=False)`` ----------
+# EMA i ATR (Wilder/RMA) liczymy sami – wersja wektorowa, wznowienie (resume) i
+# strumieniowa dzielą ten sam seed i ten sam krok, więc zgadzają się co do bitu i nie
+# zależą od wersji pandas_ta. Krok to dokładnie formuła pandas ``ewm(adjust=False)``
+# (z dzieleniem przez sumę wag), dzięki czemu pętlę wektorową robi C‑kod pandas.
+# Wygładzenie podajemy jako ``com`` – pandas liczy z niego ``alpha = 1 / (1 + com)``;
+# ``ewm(alpha=…)`` przelicza alpha → com → alpha i potrafi zgubić ostatni bit.
+def _ema_com(period: int) -> float:
+    return (period - 1) / 2.0       # span = period
+
+
+def _rma_com(period: int) -> float:
+    return period - 1.0             # alpha = 1 / period (Wilder)
+
+
+def _alpha(com: float) -> float:
+    return 1.0 / (1.0 + com)
+
+
+def _seed(values: Any) -> float:
+    """Pierwsza wartość wskaźnika: średnia z okna rozgrzewki (NaN pomijane)."""
+    return float(np.nanmean(np.asarray(values, dtype=np.float64)))
+
+
+def _ewm_step(value: float, x: float, alpha: float) -> float:
+    """Jeden krok rekurencji (NaN w danych pomijany, jak ``ignore_na=True``)."""
+    if x != x:
+        return value
+    if value != value:
+        return x
+    if value != x:
+        value = ((1.0 - alpha) * value + alpha * x) / ((1.0 - alpha) + alpha)
+    return value
+
+
+def _ewm(seed: float, x: np.ndarray, com: float) -> np.ndarray:
+    """``_ewm_step`` od ``seed`` po kolejnych ``x`` – pętla w C (pandas ``ewm``), te same bity."""
+    import pandas as pd
+
+    ser = pd.Series(np.r_[seed, np.asarray(x, dtype=np.float64)])
+    return ser.ewm(com=com, adjust=False, ignore_na=True).mean().to_numpy()[1:]
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, prev_close: float = float("nan")) -> np.ndarray:
+    """TR = max(high−low, |high−poprzedni close|, |low−poprzedni close|); pierwsza świeca bez poprzedniej: high−low."""
+    pc = np.r_[prev_close, close[:-1]]
+    return np.fmax(np.fmax(np.abs(high - low), np.abs(high - pc)), np.abs(pc - low))
 
-import pandas as pd
-import pandas_ta as pta
 
-__all__ = ["ema", "atr"]
+def _seeded(x: np.ndarray, period: int, com: float) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1] = seed = _seed(x[:period])
+        out[period:] = _ewm(seed, x[period:], com)
+    return out
 
 
+@timed("indicators.ema")
 def ema(prices: np.ndarray, period: int) -> np.ndarray:
-    """EMA – zwraca tablicę float64 tej samej długości co wejście."""
+    """EMA – zwraca tablicę float64 tej samej długości co wejście (start od SMA z ``period`` cen)."""
     if period <= 0:
         raise ValueError("period must be > 0")
-    ser = pd.Series(prices, dtype="float64")
-    return pta.ema(ser, length=period).to_numpy()
+    return _seeded(np.asarray(prices, dtype=np.float64), period, _ema_com(period))
 
 
+@timed("indicators.atr")
 def atr(
     high: np.ndarray | list[float],
     low: np.ndarray | list[float],
     close: np.ndarray | list[float],
     period: int = 14,
 ) -> np.ndarray:
-    ser = pd.Series(close, dtype="float64")  # indeks potrzebny, ale mało istotny
-    df = pd.DataFrame({"high": high, "low": low, "close": ser})
-    return pta.atr(df["high"], df["low"], df["close"], length=period).to_numpy()
+    """ATR (Wilder/RMA, ``alpha = 1/period``) – start od SMA z ``period`` pierwszych TR."""
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    return _seeded(_true_range(high, low, close), period, _rma_com(period))
+
+
+# ---------- dalszy ciąg po zapisanym stanie (resume backtestu) ----------
+# Jedynym stanem rekurencji jest ostatnia wartość (ATR: plus ostatni close), więc
+# dalszy ciąg daje te same bity co liczenie od pierwszej świecy.
+def ema_resume(last: float, prices: np.ndarray, period: int) -> np.ndarray:
+    """``ema`` dla świec po tej, w której EMA wynosiła ``last``."""
+    if not np.isfinite(last):
+        raise ValueError("EMA is still warming up – nothing to resume from")
+    return _ewm(last, prices, _ema_com(period))
+
+
+def atr_resume(
+    last: float,
+    prev_close: float,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 14,
+) -> np.ndarray:
+    """``atr`` dla świec po tej, w której ATR wynosił ``last`` (a close ``prev_close``)."""
+    if not np.isfinite(last):
+        raise ValueError("ATR is still warming up – nothing to resume from")
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    return _ewm(last, _true_range(high, low, close, prev_close), _rma_com(period))
+
+
+# ---------- wersje strumieniowe (live: jedna świeca = O(1)) ----------
+class StreamingEMA:
+    """EMA liczona świeca po świecy – te same bity co ``ema`` (wspólny seed i krok)."""
+
+    __slots__ = ("period", "alpha", "value", "_warm")
+
+    def __init__(self, period: int) -> None:
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        self.period = period
+        self.alpha = _alpha(_ema_com(period))
+        self.value = float("nan")
+        self._warm: list[float] | None = []
+
+    def update(self, price: float) -> float:
+        warm = self._warm
+        if warm is None:
+            self.value = _ewm_step(self.value, price, self.alpha)
+        else:
+            warm.append(price)
+            if len(warm) == self.period:
+                self.value, self._warm = _seed(warm), None
+        return self.value
+
+
+class StreamingATR:
+    """ATR (Wilder/RMA) świeca po świecy – te same bity co ``atr``."""
+
+    __slots__ = ("period", "alpha", "value", "_warm", "_prev_close")
+
+    def __init__(self, period: int = 14) -> None:
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        self.period = period
+        self.alpha = _alpha(_rma_com(period))
+        self.value = float("nan")
+        self._warm: list[float] | None = []
+        self._prev_close = float("nan")
 
+    def update(self, high: float, low: float, close: float) -> float:
+        pc = self._prev_close
+        tr = abs(high - low) if pc != pc else max(abs(high - low), abs(high - pc), abs(pc - low))
+        self._prev_close = close
+        warm = self._warm
+        if warm is None:
+            self.value = _ewm_step(self.value, tr, self.alpha)
+        else:
+            warm.append(tr)
+            if len(warm) == self.period:
+                self.value, self._warm = _seed(warm), None
+        return self.value
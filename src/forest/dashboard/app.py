@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import os
-import subprocess
-import sys
+import hashlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -12,13 +13,21 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from forest.backtest.catalog import ResultsCatalog
 from forest.backtest.engine import run_backtest
-from forest.backtest.grid import param_grid, run_grid
+from forest.backtest.grid import param_grid
+from forest.backtest.results import flatten_results, read_results
 from forest.backtest.risk import RiskManager
+from forest.dashboard.downsample import downsample
+from forest.dashboard.jobs import GridJob
+from forest.dashboard.launcher import main  # noqa: F401  (zgodność: forest.dashboard.app:main)
 from forest.utils.log import setup_logger
 
 setup_logger("ERROR")
 
+MAX_POINTS = 2_000  # limit punktów na serię wysyłanych do przeglądarki
+CATALOG_DIR = Path("results") / "catalog"
+
 # ---------- helpers --------------------------------------------------------
 def load_csv(file):  # small wrapper
     return (
@@ -27,16 +36,66 @@ def load_csv(file):  # small wrapper
         .loc[:, ["open", "high", "low", "close"]]
     )
 
+def fingerprint(data: bytes) -> str:
+    """Odcisk pliku – klucz cache niezależny od nazwy i obiektu UploadedFile."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Argumenty z "_" nie są hashowane przez st.cache_data – kluczem jest fingerprint.
+@st.cache_data(show_spinner=False, max_entries=8)
+def parse_csv_cached(fp: str, _data: bytes) -> pd.DataFrame:
+    return load_csv(io.BytesIO(_data))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_results_cached(fp: str, name: str, metric: str, _data: bytes) -> pd.DataFrame:
+    # projekcja: parametry + oglądana metryka (+ max_dd do filtra)
+    fmt = "csv" if name.endswith(".csv") else "parquet"
+    return read_results(_data, {metric, "max_dd"}, fmt=fmt)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def backtest_cached(fp: str, fast: int, slow: int, capital: float, _df: pd.DataFrame) -> pd.Series:
+    return run_backtest(_df, RiskManager(capital=capital), fast, slow)["equity"]
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def view_cached(
+    fp: str, fast: int, slow: int, start: datetime, end: datetime, method: str, _eq: pd.Series
+) -> tuple[pd.Series, pd.Series, int]:
+    """Equity i DD z okna [start, end] – najwyżej ``MAX_POINTS`` punktów każda (+ liczba punktów okna)."""
+    eq, dd = metrics(_eq)
+    lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+    tz = getattr(eq.index, "tz", None)
+    if tz is not None and lo.tz is None:  # slider może zwrócić czas bez strefy
+        lo, hi = lo.tz_localize(tz), hi.tz_localize(tz)
+    eq, dd = eq.loc[lo:hi], dd.loc[lo:hi]
+    return (
+        downsample(eq, MAX_POINTS, "minmax" if method == "minmax" else "lttb"),
+        # dla DD liczą się dołki – min/max zawsze je zachowa
+        downsample(dd, MAX_POINTS, "minmax"),
+        len(eq),
+    )
+
+@st.cache_resource
+def grid_executor() -> ThreadPoolExecutor:
+    # jeden wątek na gridy – każdy grid i tak zrównolegla się przez joblib
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="forest-grid")
+
+def uploaded(file) -> tuple[str, bytes]:
+    data = file.getvalue()
+    return fingerprint(data), data
+
+def _every(seconds: float):
+    """``st.fragment(run_every=…)`` gdy dostępny (Streamlit ≥ 1.37), inaczej zwykła funkcja."""
+    fragment = getattr(st, "fragment", None)
+    return fragment(run_every=seconds) if fragment else (lambda fn: fn)
+
 def metrics(eq: pd.Series):
     dd = (eq.cummax() - eq) / eq.cummax()
     return eq, dd
 
 def heatmap(df_grid: pd.DataFrame, metric: str, dd_lim: int):
-    params_df = df_grid["params"].apply(pd.Series)
-    df = pd.concat([params_df, df_grid[["equity_end", "max_dd", "rar", "sharpe"]]], axis=1)
+    df = flatten_results(df_grid)  # starsze pliki z kolumną ``params``
 
     if metric == "equity_end":
-        df = df[df["max_dd"] <= dd_lim / 100]
+        df = df.loc[df["max_dd"].to_numpy() <= dd_lim / 100, ["fast", "slow", metric]]
 
     if df.empty:
         st.warning("Brak danych do wyświetlenia.")
@@ -56,8 +115,9 @@ def heatmap(df_grid: pd.DataFrame, metric: str, dd_lim: int):
     }[metric]
     txt_fmt = ".2s" if metric in ("equity_end", "rar") else ".2f"
 
+    # przy dodatkowych wymiarach (np. risk_per_trade, atr_multiple) komórka = najlepszy wariant
     pivot = (
-        df.pivot(index="fast", columns="slow", values=value)
+        df.pivot_table(index="fast", columns="slow", values=value, aggfunc="min" if metric == "max_dd" else "max")
         .sort_index(ascending=False)
     )
     title = {
@@ -72,11 +132,63 @@ def heatmap(df_grid: pd.DataFrame, metric: str, dd_lim: int):
         use_container_width=True,
     )
 
+@_every(1.0)
+def grid_progress() -> None:
+    """Postęp grida w tle + heat‑mapa z wyników częściowych (odświeżane co 1 s)."""
+    job: GridJob = st.session_state["grid_job"]
+    st.progress(job.progress, text=f"{job.completed} / {job.total} combinations")
+    if job.running:
+        if st.button("■ Stop grid"):
+            job.cancel()
+        partial = job.snapshot()
+        if not partial.empty:
+            heatmap(partial, "equity_end", 20)
+        if not hasattr(st, "fragment"):  # starszy Streamlit: odpytywanie przez rerun
+            time.sleep(1.0)
+            st.rerun()
+        return
+
+    st.session_state.pop("grid_job")
+    if job.error() is not None:
+        st.error(f"Grid failed: {job.error()!r}")
+        return
+    res = job.result()
+    st.session_state["latest_grid"] = res
+    symbol, timeframe = st.session_state.get("grid_meta", ("UNKNOWN", "UNKNOWN"))
+    run_id = ResultsCatalog(CATALOG_DIR).add(res, symbol=symbol, timeframe=timeframe)
+    st.success(f"Finished ✓  – saved to {job.export_path} (catalog run {run_id})")
+    st.rerun()
+
+def catalog_tab(metric: str, dd_lim: int) -> None:
+    """Heat‑mapa wybranego przebiegu + top‑k z katalogu (filtry spychane do Parquet)."""
+    cat = ResultsCatalog(st.text_input("Katalog wyników", str(CATALOG_DIR)))
+    runs = cat.runs()
+    if runs.empty:
+        st.info("Katalog jest pusty – uruchom grid w zakładce Grid Runner.")
+        return
+    c1, c2 = st.columns(2)
+    with c1:
+        symbol = st.selectbox("Symbol", sorted(runs["symbol"].unique()))
+    with c2:
+        timeframe = st.selectbox("Timeframe", sorted(runs.loc[runs["symbol"] == symbol, "timeframe"].unique()))
+    runs = runs[(runs["symbol"] == symbol) & (runs["timeframe"] == timeframe)].sort_values("created", ascending=False)
+    run_id = st.selectbox("Run", runs["run_id"], format_func=lambda r: f"{r} ({runs.set_index('run_id').at[r, 'date']})")
+
+    where = [("max_dd", "<=", dd_lim / 100)] if metric == "equity_end" else []
+    cols = list(dict.fromkeys(["fast", "slow", metric, "max_dd"]))
+    heatmap(cat.query(where, cols, run_id=run_id), metric, dd_lim)
+
+    k = st.number_input("Top‑k (wszystkie przebiegi symbolu/TF)", 1, 1_000, 20)
+    st.dataframe(
+        cat.top_k(int(k), metric, ascending=metric == "max_dd", where=where, symbol=symbol, timeframe=timeframe),
+        use_container_width=True,
+    )
+
 # ---------- Streamlit UI ---------------------------------------------------
 def app() -> None:
     st.set_page_config(layout="wide")
-    tab_bt, tab_runner, tab_grid = st.tabs(
-        ["📈 Back‑test", "⚙️ Grid Runner", "🌡️ Grid Heat‑map"]
+    tab_bt, tab_runner, tab_grid, tab_cat = st.tabs(
+        ["📈 Back‑test", "⚙️ Grid Runner", "🌡️ Grid Heat‑map", "🗂️ Katalog"]
     )
 
     # 1. pojedynczy back‑test ----------------------------------------------
@@ -84,24 +196,36 @@ def app() -> None:
         st.header("📈 Back‑test pojedynczy")
         f = st.file_uploader("CSV OHLC", type="csv", key="bt")
         if f:
-            df = load_csv(f)
+            fp, data = uploaded(f)
+            df = parse_csv_cached(fp, data)
             fast = st.slider("EMA fast", 5, 50, 10)
             slow = st.slider("EMA slow", 20, 100, 30, 5)
             if slow <= fast:
                 st.error("slow musi być > fast")
-            elif st.button("Run back‑test"):
-                rm = RiskManager(capital=10_000)
-                res = run_backtest(df, rm, fast, slow)
-                eq, dd = metrics(res["equity"])
-                st.plotly_chart(px.line(eq, title="Equity"), use_container_width=True)
-                st.area_chart(dd, height=160, use_container_width=True)
+            else:
+                # wynik zostaje w sesji – zmiana zakresu (zoom) nie wymaga ponownego kliknięcia
+                if st.button("Run back‑test"):
+                    st.session_state["bt_run"] = (fp, fast, slow)
+                if st.session_state.get("bt_run") == (fp, fast, slow):
+                    eq_full = backtest_cached(fp, fast, slow, 10_000.0, df)
+                    t0, t1 = eq_full.index[0].to_pydatetime(), eq_full.index[-1].to_pydatetime()
+                    c1, c2 = st.columns([4, 1])
+                    with c1:
+                        start, end = st.slider("Zakres (zoom)", t0, t1, (t0, t1), key=f"bt_zoom_{fp}")
+                    with c2:
+                        method = st.radio("Downsampling", ["lttb", "minmax"], horizontal=True)
+                    eq, dd, n = view_cached(fp, fast, slow, start, end, method, eq_full)
+                    st.caption(f"{len(eq)} z {n} punktów")
+                    st.plotly_chart(px.line(eq, title="Equity"), use_container_width=True)
+                    st.area_chart(dd, height=160, use_container_width=True)
 
     # 2. Grid Runner --------------------------------------------------------
     with tab_runner:
         st.header("⚙️ Grid Runner")
         gfile = st.file_uploader("CSV OHLC", type="csv", key="runner")
         if gfile:
-            df_src = load_csv(gfile)
+            fp, data = uploaded(gfile)
+            df_src = parse_csv_cached(fp, data)
             c1, c2, c3 = st.columns(3)
             with c1:
                 f_min = st.number_input("fast min", 5, 200, 5)
@@ -114,29 +238,32 @@ def app() -> None:
             with c3:
                 n_jobs = st.number_input("CPU (-1=all)", -1, 32, -1)
                 cache_on = st.checkbox("Use cache", True)
+                symbol = st.text_input("Symbol", Path(gfile.name).stem)
+                timeframe = st.text_input("Timeframe", "1h")
 
             total = ((f_max - f_min) // f_step + 1) * ((s_max - s_min) // s_step + 1)
             st.write(f"**Total combinations: {total}**")
 
-            if st.button("▶ Run grid"):
-                with st.spinner("Running grid…"):
-                    grid = param_grid(
-                        fast=range(f_min, f_max + 1, f_step),
-                        slow=range(s_min, s_max + 1, s_step),
-                    )
-                    res = run_grid(
-                        df_src,
-                        grid,
-                        make_risk=lambda: RiskManager(capital=10_000),
-                        n_jobs=n_jobs,
-                        use_cache=cache_on,
-                    )
-                    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-                    out_path = Path("results") / f"grid_{ts}.parquet"
-                    out_path.parent.mkdir(exist_ok=True)
-                    res.to_parquet(out_path, index=False)
-                    st.success(f"Finished ✓  – saved to {out_path}")
-                    st.session_state["latest_grid"] = res
+            job: GridJob | None = st.session_state.get("grid_job")
+            if st.button("▶ Run grid", disabled=job is not None and job.running):
+                grid = param_grid(
+                    fast=range(f_min, f_max + 1, f_step),
+                    slow=range(s_min, s_max + 1, s_step),
+                )
+                ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                st.session_state["grid_job"] = GridJob(
+                    df_src,
+                    grid,
+                    make_risk=lambda: RiskManager(capital=10_000),
+                    n_jobs=n_jobs,
+                    use_cache=cache_on,
+                    export_path=Path("results") / f"grid_{ts}.parquet",
+                ).start(grid_executor())
+                st.session_state["grid_meta"] = (symbol, timeframe)
+                st.session_state.pop("latest_grid", None)
+
+            if "grid_job" in st.session_state:
+                grid_progress()
 
             if "latest_grid" in st.session_state:
                 st.subheader("Heat‑mapa Equity")
@@ -152,15 +279,24 @@ def app() -> None:
         st.header("🌡️ Wczytaj istniejące wyniki")
         file2 = st.file_uploader("grid_results (.parquet / .csv)", type=["parquet", "csv"])
         if file2:
-            gdf = pd.read_parquet(file2) if file2.name.endswith(".parquet") else pd.read_csv(file2)
+            fp, data = uploaded(file2)
             metric = st.radio("Metryka", ["equity_end", "max_dd", "rar", "sharpe"], horizontal=True)
+            gdf = read_results_cached(fp, file2.name, metric, data)
             dd_lim = st.slider("Max DD % filter", 0, 50, 20) if metric == "equity_end" else 100
             heatmap(gdf, metric, dd_lim)
 
-# ---------- CLI alias -------------------------------------------------------
-def main():
-    subprocess.run(["streamlit", "run", os.fspath(Path(__file__).resolve())] + sys.argv[1:], check=False)
+    # 4. Katalog wyników ----------------------------------------------------
+    with tab_cat:
+        st.header("🗂️ Katalog wyników")
+        metric = st.radio("Metryka", ["equity_end", "max_dd", "rar", "sharpe"], horizontal=True, key="cat_metric")
+        dd_lim = st.slider("Max DD % filter", 0, 50, 20, key="cat_dd") if metric == "equity_end" else 100
+        catalog_tab(metric, dd_lim)
 
+# ---------- CLI alias -------------------------------------------------------
 if __name__ == "__main__":
-    main()
+    # ``streamlit run`` też wykonuje skrypt jako __main__ – wtedy rysujemy UI
+    if st.runtime.exists():
+        app()
+    else:
+        main()
 
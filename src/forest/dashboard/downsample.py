@@ -0,0 +1,83 @@
+"""Downsampling serii czasowych po stronie serwera (equity / drawdown w dashboardzie).
+
+Do przeglądarki wysyłamy najwyżej kilka tysięcy punktów, zachowując kształt wykresu:
+
+- ``lttb``   – Largest-Triangle-Three-Buckets (wizualnie najwierniejszy),
+- ``minmax`` – min i max w każdym kubełku (gwarantuje widoczne ekstrema, np. dołki DD).
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+Method = Literal["lttb", "minmax"]
+
+__all__ = ["lttb_indices", "minmax_indices", "downsample"]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indeksy punktów wybranych przez LTTB (pierwszy i ostatni zawsze zostają)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n_out - 2 kubełków między pierwszym a ostatnim punktem
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # średnia następnego kubełka (dla ostatniego – ostatni punkt)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        # pole trójkąta (a, kandydat, średnia następnego) – bez stałego czynnika 1/2
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indeksy min i max w każdym z ``(n_out - 2) // 2`` kubełków (posortowane, bez duplikatów)."""
+    n = len(y)
+    buckets = max((n_out - 2) // 2, 1)  # + pierwszy i ostatni punkt
+    if n <= n_out:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    size = -(-n // buckets)  # ceil
+    pad = buckets * size - n
+    lo = np.pad(y, (0, pad), constant_values=np.inf).reshape(buckets, size)
+    hi = np.pad(y, (0, pad), constant_values=-np.inf).reshape(buckets, size)
+    start = np.arange(buckets) * size
+    idx = np.concatenate([start + lo.argmin(axis=1), start + hi.argmax(axis=1), [0, n - 1]])
+    return np.unique(np.clip(idx, 0, n - 1))
+
+
+def downsample(series: pd.Series, max_points: int = 2_000, method: Method = "lttb") -> pd.Series:
+    """Zwróć serię z co najwyżej ``max_points`` punktami (NaN pomijamy – i tak nie są rysowane)."""
+    s = series.dropna()
+    if len(s) <= max_points:
+        return s
+
+    if isinstance(s.index, pd.DatetimeIndex):
+        x = s.index.asi8.astype(np.float64)
+    else:
+        x = np.arange(len(s), dtype=np.float64)
+    y = s.to_numpy(dtype=np.float64)
+
+    if method == "lttb":
+        idx = lttb_indices(x, y, max_points)
+    elif method == "minmax":
+        idx = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Nieznana metoda downsamplingu: {method!r}")
+    return s.iloc[idx]
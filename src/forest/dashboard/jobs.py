@@ -0,0 +1,119 @@
+"""Grid w tle dla dashboardu: paczki kombinacji liczone w wątku, wyniki częściowe do podglądu.
+
+Streamlit wykonuje skrypt od nowa przy każdej interakcji, więc długi ``run_grid``
+nie może blokować wątku skryptu. ``GridJob`` dzieli siatkę na paczki, liczy je po
+kolei (każda paczka równolegle przez joblib) i udostępnia postęp oraz dotychczasowe
+wyniki – UI tylko je odpytuje.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Callable, Iterable, List
+
+import pandas as pd
+
+from forest.backtest.grid import run_grid
+from forest.backtest.risk import RiskManager
+
+
+class GridJob:
+    """Pojedynczy grid uruchomiony w executorze (wątek), z podglądem wyników częściowych."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        grid: Iterable[dict],
+        make_risk: Callable[[], RiskManager] | None = None,
+        n_jobs: int = -1,
+        use_cache: bool = True,
+        chunk_size: int | None = None,
+        export_path: str | Path | None = None,
+    ) -> None:
+        self._df = df
+        self._grid: List[dict] = list(grid)
+        self._make_risk = make_risk
+        self._n_jobs = n_jobs
+        self._use_cache = use_cache
+        self._export_path = Path(export_path) if export_path else None
+        if chunk_size is None:
+            import joblib
+
+            workers = joblib.cpu_count() if n_jobs < 0 else max(n_jobs, 1)
+            chunk_size = max(4 * workers, 8)
+        self._chunk = max(int(chunk_size), 1)
+
+        self._lock = threading.Lock()
+        self._parts: list[pd.DataFrame] = []
+        self._done = 0
+        self._cancel = threading.Event()
+        self._future: Future | None = None
+
+    # ---------- sterowanie ----------
+    def start(self, executor: Executor) -> "GridJob":
+        self._future = executor.submit(self._run)
+        return self
+
+    def cancel(self) -> None:
+        """Przerwij po bieżącej paczce (już policzone wyniki zostają)."""
+        self._cancel.set()
+
+    def _run(self) -> pd.DataFrame:
+        for i in range(0, len(self._grid), self._chunk):
+            if self._cancel.is_set():
+                break
+            chunk = self._grid[i : i + self._chunk]
+            part = run_grid(
+                self._df,
+                chunk,
+                make_risk=self._make_risk,
+                n_jobs=self._n_jobs,
+                use_cache=self._use_cache,
+            )
+            with self._lock:
+                self._parts.append(part)
+                self._done += len(chunk)
+        out = self.snapshot()
+        if self._export_path is not None and not out.empty:
+            self._export_path.parent.mkdir(parents=True, exist_ok=True)
+            out.to_parquet(self._export_path, index=False)
+        return out
+
+    # ---------- odpytywanie ----------
+    @property
+    def total(self) -> int:
+        return len(self._grid)
+
+    @property
+    def completed(self) -> int:
+        return self._done
+
+    @property
+    def progress(self) -> float:
+        return self._done / self.total if self.total else 1.0
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    @property
+    def export_path(self) -> Path | None:
+        return self._export_path
+
+    def error(self) -> BaseException | None:
+        if self._future is None or not self._future.done():
+            return None
+        return self._future.exception()
+
+    def snapshot(self) -> pd.DataFrame:
+        """Wyniki policzone do tej pory (kopia – bezpieczna do renderowania)."""
+        with self._lock:
+            parts = list(self._parts)
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    def result(self, timeout: float | None = None) -> pd.DataFrame:
+        if self._future is None:
+            raise RuntimeError("GridJob not started")
+        return self._future.result(timeout)
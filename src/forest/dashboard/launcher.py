@@ -0,0 +1,21 @@
+"""Lekki punkt wejścia ``forest-dashboard``.
+
+Osobny moduł, żeby samo uruchomienie komendy nie importowało streamlit / plotly /
+pandas w procesie-rodzicu – i tak startuje je dopiero ``streamlit run``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+def main():
+    app = Path(__file__).resolve().with_name("app.py")
+    subprocess.run(["streamlit", "run", os.fspath(app)] + sys.argv[1:], check=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,37 @@
 from __future__ import annotations
 
-from .csv_source import CSVConfig, iter_stream, load_history_csv
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["CSVConfig", "load_history_csv", "iter_stream"]
+if TYPE_CHECKING:
+    from .csv_source import CSVConfig, iter_stream, load_history_csv
+    from .ticks import BarAggregator, TickConfig, aggregate_ticks, iter_ticks
 
+_EXPORTS: dict[str, str] = {
+    "CSVConfig": ".csv_source",
+    "load_history_csv": ".csv_source",
+    "iter_stream": ".csv_source",
+    "TickConfig": ".ticks",
+    "BarAggregator": ".ticks",
+    "aggregate_ticks": ".ticks",
+    "iter_ticks": ".ticks",
+}
+
+__all__ = [
+    "CSVConfig",
+    "load_history_csv",
+    "iter_stream",
+    "TickConfig",
+    "BarAggregator",
+    "aggregate_ticks",
+    "iter_ticks",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # leniwy import: pandas/pydantic ładują się dopiero przy pierwszym użyciu
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
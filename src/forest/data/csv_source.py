@@ -64,11 +64,18 @@ def _maybe_resample(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
         raise ValueError("Index must be a DateTimeIndex to resample.")
 
     agg = {"open": "first", "high": "max", "low": "min", "close": "last"}
-    if "volume" in df.columns:
-        agg["volume"] = "sum"
-
-    out = df.resample(rule).agg(agg).dropna(how="any")
-    return out
+    # volume + kolumny świec z ticków (forest.data.ticks), jeżeli są
+    extra = {"volume": "sum", "ticks": "sum", "spread_mean": "mean", "spread_min": "min", "spread_max": "max"}
+    agg.update({k: v for k, v in extra.items() if k in df.columns})
+    weighted = "spread_mean" in agg and "ticks" in agg
+    if weighted:  # średnia z ticków: Σ(spread_mean · ticks) / Σ ticks, nie średnia ze świec
+        df = df.assign(spread_mean=df["spread_mean"] * df["ticks"])
+        agg["spread_mean"] = "sum"
+
+    out = df.resample(rule).agg(agg)
+    if weighted:
+        out["spread_mean"] = out["spread_mean"] / out["ticks"]
+    return out.dropna(how="any")
 
 
 def load_history_csv(cfg: CSVConfig) -> pd.DataFrame:
@@ -0,0 +1,305 @@
+"""Agregacja surowych ticków bid/ask do świec OHLCV – strumieniowo, w stałej pamięci.
+
+Plik ticków (CSV albo binarne rekordy ``TICK_DTYPE``) czytany jest paczkami po
+``TickConfig.chunksize``; każdy ``BarAggregator`` składa świece wektorowo
+(``reduceat`` po granicach świec) i trzyma między paczkami tylko jedną niedomkniętą
+świecę. Cena świecy to mid ``(bid + ask) / 2``; obok OHLCV zapisywane są ``ticks``
+i statystyki spreadu (``spread_mean``, ``spread_min``, ``spread_max``).
+
+Rodzaje świec (``spec``):
+
+* interwał z ``forest.utils.timeframes`` (``"1m"``, ``"1h"`` …) – świece od północy UTC
+  jak ``load_history_csv`` (resample), znacznik = początek świecy,
+* ``"500t"`` – co 500 ticków, ``"1e6v"`` / ``"250000v"`` – co tyle wolumenu
+  (bez kolumny wolumenu: wolumen tickowy); znacznik = czas pierwszego ticka.
+  Świeca wolumenowa k to ticki, przed którymi skumulowany wolumen leży w
+  ``[k·size, (k+1)·size)`` – progi stałe, więc wynik nie zależy od podziału na paczki,
+  a wolumen świecy to ``size`` ± jeden tick.
+
+Świece czasowe mogą trafiać od razu do plików czytanych przez ``load_history_csv``
+(szablon jak ``DataSettings.path`` z ``{symbol}`` i ``{timeframe}``); świece tickowe i
+wolumenowe wracają tylko jako ramki – ``load_history_csv`` przeliczyłby je po czasie::
+
+    src = TickConfig(path="ticks/EURUSD_2025.csv", symbol="EURUSD", time_unit="ms")
+    aggregate_ticks(src, ["1m", "1h"], out="data/{symbol}_{timeframe}.csv")
+    bars = aggregate_ticks(src, "1000t")
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Literal, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, field_validator
+
+from forest.utils import profiling
+from forest.utils.timeframes import normalize_timeframe, to_minutes
+
+__all__ = ["TickConfig", "TICK_DTYPE", "BarAggregator", "iter_ticks", "aggregate_ticks"]
+
+# rekord pliku binarnego: czas [ns UTC od epoki], bid, ask, wolumen
+TICK_DTYPE = np.dtype([("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("volume", "<f8")])
+
+BAR_COLUMNS: tuple[str, ...] = (
+    "open", "high", "low", "close", "volume", "ticks", "spread_mean", "spread_min", "spread_max",
+)
+
+_UNIT_NS: dict[str, int] = {"s": 10**9, "ms": 10**6, "us": 10**3, "ns": 1}
+
+
+class TickConfig(BaseModel):
+    """Konfiguracja odczytu pliku ticków."""
+
+    path: Path = Field(..., description="Plik ticków (CSV albo binarny TICK_DTYPE).")
+    symbol: str = Field("SYN", description="Symbol instrumentu (do szablonu ścieżki wyjściowej).")
+    format: Literal["csv", "binary"] = Field("csv", description="'csv' albo 'binary' (rekordy TICK_DTYPE).")
+    time_col: str = Field("time", description="Kolumna czasu (CSV).")
+    bid_col: str = Field("bid", description="Kolumna bid (CSV).")
+    ask_col: str = Field("ask", description="Kolumna ask (CSV).")
+    volume_col: str | None = Field(None, description="Kolumna wolumenu (CSV); brak → wolumen tickowy.")
+    sep: str = Field(",", description="Separator CSV.")
+    time_unit: str | None = Field(None, description="Czas jako liczba od epoki: 's'/'ms'/'us'/'ns'; None → tekst.")
+    time_format: str | None = Field(None, description="Format tekstowego czasu (przyspiesza parsowanie).")
+    tz: str | None = Field("UTC", description="Strefa czasu tekstowego bez offsetu.")
+    chunksize: int = Field(1_000_000, gt=0, description="Ticków na paczkę.")
+
+    @field_validator("time_unit")
+    @classmethod
+    def _validate_unit(cls, v: str | None) -> str | None:
+        if v is not None and v not in _UNIT_NS:
+            raise ValueError(f"time_unit must be one of {sorted(_UNIT_NS)}, got {v!r}")
+        return v
+
+
+# ---------- odczyt ----------
+Chunk = tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]
+
+
+def _parse_time(s: pd.Series, cfg: TickConfig) -> np.ndarray:
+    if cfg.time_unit is not None:
+        return s.to_numpy(dtype=np.int64) * _UNIT_NS[cfg.time_unit]
+    utc = cfg.tz is None or cfg.tz.upper() == "UTC"
+    ts = pd.to_datetime(s, format=cfg.time_format, utc=utc)
+    if not utc:
+        ts = ts.dt.tz_localize(cfg.tz).dt.tz_convert("UTC")
+    return pd.DatetimeIndex(ts).asi8
+
+
+def iter_ticks(cfg: TickConfig) -> Iterator[Chunk]:
+    """Paczki ``(czas_ns, bid, ask, wolumen | None)`` – pamięć ograniczona do jednej paczki."""
+    if cfg.format == "binary":
+        rec = np.memmap(cfg.path, dtype=TICK_DTYPE, mode="r")
+        for i in range(0, len(rec), cfg.chunksize):
+            part = rec[i : i + cfg.chunksize]
+            yield (
+                np.array(part["time"]), np.array(part["bid"]), np.array(part["ask"]), np.array(part["volume"]),
+            )
+        return
+    cols = [cfg.time_col, cfg.bid_col, cfg.ask_col] + ([cfg.volume_col] if cfg.volume_col else [])
+    reader = pd.read_csv(cfg.path, sep=cfg.sep, usecols=cols, chunksize=cfg.chunksize)
+    for part in reader:
+        yield (
+            _parse_time(part[cfg.time_col], cfg),
+            part[cfg.bid_col].to_numpy(dtype=np.float64),
+            part[cfg.ask_col].to_numpy(dtype=np.float64),
+            part[cfg.volume_col].to_numpy(dtype=np.float64) if cfg.volume_col else None,
+        )
+
+
+# ---------- agregator ----------
+_SPEC = re.compile(r"^(\d+(?:\.\d*)?(?:e\d+)?)([tv])$")
+
+
+class BarAggregator:
+    """Strumieniowe składanie świec jednego rodzaju (``spec``) z kolejnych paczek ticków."""
+
+    def __init__(self, spec: str) -> None:
+        m = _SPEC.match(spec.strip().lower())
+        if m is not None:
+            self.kind = "tick" if m.group(2) == "t" else "volume"
+            self.size: float = float(m.group(1))
+            if self.kind == "tick":
+                self.size = int(self.size)
+            self.spec = spec.strip().lower()
+        else:
+            self.kind = "time"
+            self.spec = normalize_timeframe(spec)
+            self.size = to_minutes(self.spec) * 60 * 10**9
+        if self.size <= 0:
+            raise ValueError(f"Bar size must be positive: {spec!r}")
+        self.late = 0                               # ticki spóźnione do już zamkniętej świecy (pominięte)
+        self._seen: float = 0                       # ticki / wolumen przed bieżącą paczką
+        self._carry: Dict[str, np.ndarray] | None = None
+
+    def _ids(self, t: np.ndarray, vol: np.ndarray) -> np.ndarray:
+        if self.kind == "time":
+            return t // int(self.size)
+        if self.kind == "tick":
+            ids = (self._seen + np.arange(len(t), dtype=np.int64)) // int(self.size)
+            self._seen += len(t)
+            return ids
+        before = self._seen + np.cumsum(vol) - vol
+        self._seen = float(before[-1] + vol[-1])
+        return np.floor(before / self.size).astype(np.int64)
+
+    def update(self, t: np.ndarray, bid: np.ndarray, ask: np.ndarray, volume: np.ndarray | None = None) -> pd.DataFrame:
+        """Dokłada paczkę ticków; zwraca świece domknięte w tej paczce."""
+        t = np.asarray(t, dtype=np.int64)
+        bid = np.asarray(bid, dtype=np.float64)
+        ask = np.asarray(ask, dtype=np.float64)
+        vol = np.ones(len(t)) if volume is None else np.asarray(volume, dtype=np.float64)
+        if len(t) > 1 and (t[1:] < t[:-1]).any():
+            order = np.argsort(t, kind="stable")
+            t, bid, ask, vol = t[order], bid[order], ask[order], vol[order]
+        if self.kind == "time" and self._carry is not None and len(t):
+            ok = t // int(self.size) >= self._carry["id"][0]
+            if not ok.all():
+                self.late += int((~ok).sum())
+                profiling.incr("ticks.late", int((~ok).sum()))
+                t, bid, ask, vol = t[ok], bid[ok], ask[ok], vol[ok]
+        if not len(t):
+            return _frame(None)
+
+        ids = self._ids(t, vol)
+        mid = (bid + ask) * 0.5
+        spr = ask - bid
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        ends = np.r_[starts[1:], len(t)]
+        g = {
+            "id": ids[starts],
+            "time": ids[starts] * int(self.size) if self.kind == "time" else t[starts],
+            "open": mid[starts],
+            "high": np.maximum.reduceat(mid, starts),
+            "low": np.minimum.reduceat(mid, starts),
+            "close": mid[ends - 1],
+            "volume": np.add.reduceat(vol, starts),
+            "ticks": (ends - starts).astype(np.int64),
+            "spread_sum": np.add.reduceat(spr, starts),
+            "spread_min": np.minimum.reduceat(spr, starts),
+            "spread_max": np.maximum.reduceat(spr, starts),
+        }
+        c = self._carry
+        if c is not None:
+            if c["id"][0] == g["id"][0]:                # paczka kontynuuje niedomkniętą świecę
+                for k in ("id", "time", "open"):
+                    g[k][0] = c[k][0]
+                g["high"][0] = max(g["high"][0], c["high"][0])
+                g["low"][0] = min(g["low"][0], c["low"][0])
+                g["spread_min"][0] = min(g["spread_min"][0], c["spread_min"][0])
+                g["spread_max"][0] = max(g["spread_max"][0], c["spread_max"][0])
+                for k in ("volume", "ticks", "spread_sum"):
+                    g[k][0] += c[k][0]
+            else:
+                g = {k: np.r_[c[k], g[k]] for k in g}
+        self._carry = {k: v[-1:].copy() for k, v in g.items()}
+        profiling.incr("ticks.processed", len(t))
+        return _frame({k: v[:-1] for k, v in g.items()})
+
+    def flush(self) -> pd.DataFrame:
+        """Ostatnia, niedomknięta świeca (koniec danych)."""
+        c, self._carry = self._carry, None
+        return _frame(c)
+
+
+def _frame(g: Mapping[str, np.ndarray] | None) -> pd.DataFrame:
+    if g is None:
+        g = {k: np.empty(0) for k in ("time", "spread_sum", "ticks", *BAR_COLUMNS)}
+    idx = pd.DatetimeIndex(np.asarray(g["time"], dtype=np.int64), tz="UTC", name="time")
+    ticks = np.asarray(g["ticks"], dtype=np.int64)
+    cols = {k: g[k] for k in ("open", "high", "low", "close", "volume")}
+    cols["ticks"] = ticks
+    cols["spread_mean"] = g["spread_sum"] / np.maximum(ticks, 1)
+    cols["spread_min"] = g["spread_min"]
+    cols["spread_max"] = g["spread_max"]
+    return pd.DataFrame(cols, index=idx)
+
+
+# ---------- zapis ----------
+def _last_time(path: Path, time_col: str, sep: str) -> pd.Timestamp | None:
+    """Czas ostatniej świecy w istniejącym CSV (czyta nagłówek i koniec pliku)."""
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    with path.open("rb") as fh:
+        header = fh.readline().decode().rstrip("\r\n").split(sep)
+        fh.seek(max(path.stat().st_size - 4096, 0))
+        last = [ln for ln in fh.read().decode().splitlines() if ln.strip()][-1].split(sep)
+    if last == header:
+        return None
+    return pd.Timestamp(last[header.index(time_col)]).tz_convert("UTC")
+
+
+class _Sink:
+    """Dopisuje świece jednego ``spec`` do CSV w formacie ``load_history_csv``."""
+
+    def __init__(self, path: Path, append: bool, time_col: str, sep: str) -> None:
+        self.path, self.time_col, self.sep = path, time_col, sep
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.after = _last_time(path, time_col, sep) if append else None
+        self.header = not (append and path.exists() and path.stat().st_size > 0)
+        if not append and path.exists():
+            path.unlink()
+
+    def write(self, bars: pd.DataFrame) -> None:
+        if self.after is not None:
+            bars = bars[bars.index > self.after]
+        if not len(bars):
+            return
+        bars.rename_axis(self.time_col).to_csv(self.path, mode="a", header=self.header, sep=self.sep)
+        self.header = False
+
+
+def aggregate_ticks(
+    source: TickConfig | Sequence[TickConfig],
+    specs: str | Sequence[str],
+    out: str | Path | None = None,
+    *,
+    append: bool = False,
+    time_col: str = "time",
+    sep: str = ",",
+) -> pd.DataFrame | Path | Dict[str, pd.DataFrame] | Dict[str, Path]:
+    """Świece ``specs`` z ticków ``source`` (kolejne pliki = ciąg dalszy) w jednym przebiegu.
+
+    ``out=None`` zwraca ramki; szablon ``out`` (``{symbol}``, ``{timeframe}``) zapisuje
+    CSV do ``load_history_csv`` paczka po paczce i zwraca ścieżki – tylko dla świec
+    czasowych (tickowe / wolumenowe → ``ValueError``). ``append=True``
+    dopisuje do istniejących plików tylko świece nowsze niż ostatnia zapisana.
+    Dla jednego ``spec`` (str) wynik jest pojedynczy, dla listy – słownik po ``spec``.
+    """
+    sources = [source] if isinstance(source, TickConfig) else list(source)
+    if not sources:
+        raise ValueError("aggregate_ticks: no tick sources")
+    spec_list = [specs] if isinstance(specs, str) else list(specs)
+    aggs = {s: BarAggregator(s) for s in spec_list}
+
+    sinks: Dict[str, _Sink] = {}
+    parts: Dict[str, list] = {s: [] for s in spec_list}
+    if out is not None:
+        untimed = [s for s, agg in aggs.items() if agg.kind != "time"]
+        if untimed:
+            raise ValueError(f"aggregate_ticks: out= takes time bars only – load_history_csv would resample {untimed}")
+        for s, agg in aggs.items():
+            path = Path(str(out).format(symbol=sources[0].symbol, timeframe=agg.spec))
+            sinks[s] = _Sink(path, append, time_col, sep)
+
+    def emit(s: str, bars: pd.DataFrame) -> None:
+        if s in sinks:
+            sinks[s].write(bars)
+        elif len(bars):
+            parts[s].append(bars)
+
+    for cfg in sources:
+        for chunk in iter_ticks(cfg):
+            with profiling.timer("ticks.aggregate"):
+                for s, agg in aggs.items():
+                    emit(s, agg.update(*chunk))
+    for s, agg in aggs.items():
+        emit(s, agg.flush())
+
+    if out is not None:
+        res: Dict = {s: sinks[s].path for s in spec_list}
+    else:
+        res = {s: pd.concat(parts[s]) if parts[s] else _frame(None) for s in spec_list}
+    return res[specs] if isinstance(specs, str) else res
@@ -1,4 +1,14 @@
-from .router import Order, OrderResult, OrderRouter, PaperBroker
-
-__all__ = ["Order", "OrderResult", "OrderRouter", "PaperBroker"]
+from .order_queue import BatchHandle, BatchResult, OrderQueue, send_batch
+from .router import LatencyPaperBroker, Order, OrderResult, OrderRouter, PaperBroker
 
+__all__ = [
+    "Order",
+    "OrderResult",
+    "OrderRouter",
+    "PaperBroker",
+    "LatencyPaperBroker",
+    "OrderQueue",
+    "BatchHandle",
+    "BatchResult",
+    "send_batch",
+]
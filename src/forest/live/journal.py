@@ -0,0 +1,534 @@
+"""Binarny dziennik zdarzeń ścieżki live + deterministyczny replay.
+
+Dziennik to plik z nagłówkiem i rekordami stałej długości (``JOURNAL_DTYPE``)
+zapisywanymi przez ``np.memmap`` – dopisanie rekordu to jedno przypisanie do
+tablicy, bez serializacji i bez syscalli (stronami zajmuje się system).
+Plik rośnie skokowo (podwajanie pojemności), licznik rekordów w nagłówku jest
+aktualizowany przy każdym zapisie, więc po awarii procesu dziennik da się
+odczytać do ostatniego rekordu. Symbole trafiają do pliku obok (``<plik>.sym``,
+jeden na linię) – w rekordzie jest tylko ich numer.
+
+Zapis: ``JournaledRouter`` / ``JournaledBroker`` owijają dowolny router / adapter
+i notują ceny, zlecenia (także oczekujące i anulowania) oraz ich wyniki – razem
+z fillami asynchronicznymi odebranymi przez ``fills()`` / ``executions()``. Odtworzenie: ``replay`` podaje zdarzenia
+z powrotem do routera lub adaptera (pełną prędkością albo w czasie rzeczywistym),
+porównuje wyniki z zapisanymi i raportuje percentyle czasu obsługi zdarzeń::
+
+    with TickJournal("incident.fjr", "w") as jr:
+        router = JournaledRouter(PaperBroker(10_000), jr)
+        ...                                    # normalna praca
+    report = replay("incident.fjr", PaperBroker(10_000), speed=None)
+    print(report.summary())
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional
+
+import numpy as np
+
+from .router import Order, OrderResult
+
+# ---------- format ----------
+MAGIC = b"FORESTJ1"
+
+KIND_PRICE = 1      # set_price / update_price
+KIND_ORDER = 2      # OrderRouter.market_order(Order)
+KIND_RESULT = 3     # OrderResult zwrócony przez router
+KIND_MARKET = 4     # BrokerAdapter.market_order(symbol, side, qty, sl, tp)
+KIND_CLOSE = 5      # BrokerAdapter.close_position(symbol)
+KIND_TRADE = 6      # TradeResult zwrócony przez adapter
+KIND_PENDING = 7    # BrokerAdapter.limit_order / stop_order (ref = zwrócone id)
+KIND_BRACKET = 8    # SL/TP zlecenia oczekującego – zawsze tuż po PENDING
+KIND_CANCEL = 9     # cancel / cancel_order (code = wynik, qty = nr rekordu ORDER)
+KIND_FILLS = 10     # fills() / executions() – qty = liczba wyników, które następują
+
+KIND_NAMES: dict[int, str] = {
+    KIND_PRICE: "price",
+    KIND_ORDER: "order",
+    KIND_RESULT: "result",
+    KIND_MARKET: "market",
+    KIND_CLOSE: "close",
+    KIND_TRADE: "trade",
+    KIND_PENDING: "pending",
+    KIND_BRACKET: "bracket",
+    KIND_CANCEL: "cancel",
+    KIND_FILLS: "fills",
+}
+
+_ORDER_TYPES: tuple[Literal["market", "limit", "stop", "stop_limit"], ...] = ("market", "limit", "stop", "stop_limit")
+_STATUSES = ("filled", "accepted", "rejected")
+
+JOURNAL_DTYPE = np.dtype(
+    [
+        ("ts", "i8"),        # time.time_ns() – czas ścienny zdarzenia
+        ("kind", "u1"),
+        ("side", "i1"),      # 1 BUY, -1 SELL, 0 n/d
+        ("code", "u1"),      # typ zlecenia (ORDER/PENDING) / status (RESULT) / wynik (CANCEL)
+        ("_pad", "u1"),
+        ("sym", "u4"),       # numer symbolu w tablicy ``.sym``
+        ("qty", "f8"),
+        ("price", "f8"),     # cena / limit / avg_price / SL
+        ("aux", "f8"),       # wolumen / stop / TP / realized PnL
+        ("ref", "S16"),      # client_id / id wyniku / id zlecenia (obcięte do 16 B)
+    ]
+)
+_HEADER = np.dtype([("magic", "S8"), ("itemsize", "u4"), ("_pad", "u4"), ("count", "i8")])
+_HEADER_SIZE = 64
+
+
+def _side(side: Any) -> int:
+    value = getattr(side, "value", side)
+    return 1 if value == "BUY" else -1 if value == "SELL" else 0
+
+
+def _nan(x: Optional[float]) -> float:
+    return float("nan") if x is None else float(x)
+
+
+def _opt(x: float) -> Optional[float]:
+    return None if x != x else float(x)
+
+
+# ---------- dziennik ----------
+class TickJournal:
+    """Dziennik append‑only na ``np.memmap`` (tryb ``"w"`` – nowy, ``"a"`` – dopisywanie)."""
+
+    def __init__(self, path: str | Path, mode: Literal["w", "a"] = "w", capacity: int = 1 << 16) -> None:
+        self.path = Path(path)
+        self._sym_path = self.path.with_name(self.path.name + ".sym")
+        self._symbols: Dict[str, int] = {}
+        if mode == "a" and self.path.exists():
+            header = np.fromfile(self.path, dtype=_HEADER, count=1)[0]
+            if header["magic"] != MAGIC or header["itemsize"] != JOURNAL_DTYPE.itemsize:
+                raise ValueError(f"Not a forest journal: {self.path}")
+            self._n = int(header["count"])
+            capacity = max((os.path.getsize(self.path) - _HEADER_SIZE) // JOURNAL_DTYPE.itemsize, 1)
+            if self._sym_path.exists():
+                names = self._sym_path.read_text(encoding="utf-8").splitlines()
+                self._symbols = {s: i for i, s in enumerate(names)}
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._n = 0
+            self._resize(max(int(capacity), 1), create=True)
+            self._sym_path.write_text("", encoding="utf-8")
+        self._map(capacity)
+        self._sym_fh = open(self._sym_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()      # router bywa wołany z wątków ``OrderQueue``
+
+    # ---------- plik ----------
+    def _resize(self, capacity: int, create: bool = False) -> None:
+        with open(self.path, "w+b" if create else "r+b") as fh:
+            fh.truncate(_HEADER_SIZE + capacity * JOURNAL_DTYPE.itemsize)
+            if create:
+                np.array([(MAGIC, JOURNAL_DTYPE.itemsize, 0, 0)], dtype=_HEADER).tofile(fh)
+
+    def _map(self, capacity: int) -> None:
+        self._cap = capacity
+        self._header = np.memmap(self.path, dtype=_HEADER, mode="r+", shape=(1,))
+        self._buf = np.memmap(self.path, dtype=JOURNAL_DTYPE, mode="r+", offset=_HEADER_SIZE, shape=(capacity,))
+
+    def _grow(self) -> None:
+        self.flush()
+        del self._buf, self._header
+        self._resize(self._cap * 2)
+        self._map(self._cap * 2)
+
+    def _sym(self, symbol: str) -> int:
+        i = self._symbols.get(symbol)
+        if i is None:
+            i = self._symbols[symbol] = len(self._symbols)
+            self._sym_fh.write(symbol + "\n")
+            self._sym_fh.flush()
+        return i
+
+    # ---------- zapis ----------
+    def append(
+        self, kind: int, symbol: str, *, side: int = 0, code: int = 0, qty: float = 0.0,
+        price: float = float("nan"), aux: float = float("nan"), ref: str | bytes = b"", ts: int | None = None,
+    ) -> int:
+        """Dopisz rekord; zwraca jego numer."""
+        if isinstance(ref, str):
+            ref = ref.encode()[:16]
+        with self._lock:
+            n = self._n
+            if n == self._cap:
+                self._grow()
+            self._buf[n] = (time.time_ns() if ts is None else ts, kind, side, code, 0, self._sym(symbol),
+                            qty, price, aux, ref)
+            self._n = n + 1
+            self._header["count"][0] = n + 1
+        return n
+
+    def price(self, symbol: str, price: float, volume: float = float("nan")) -> None:
+        self.append(KIND_PRICE, symbol, price=price, aux=volume)
+
+    def order(self, order: Order) -> int:
+        return self.append(
+            KIND_ORDER, order.symbol, side=_side(order.side), code=_ORDER_TYPES.index(order.type),
+            qty=order.qty, price=_nan(order.price), aux=_nan(order.stop), ref=order.client_id or b"",
+        )
+
+    def result(self, symbol: str, res: OrderResult) -> None:
+        self.append(
+            KIND_RESULT, symbol, code=_STATUSES.index(res.status), qty=res.filled_qty,
+            price=res.avg_price, ref=res.client_id or res.id,
+        )
+
+    def __len__(self) -> int:
+        return self._n
+
+    def flush(self) -> None:
+        self._buf.flush()
+        self._header.flush()
+
+    def close(self) -> None:
+        if self._sym_fh.closed:
+            return
+        self.flush()
+        self._sym_fh.close()
+
+    def __enter__(self) -> "TickJournal":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def read_journal(path: str | Path) -> tuple[np.ndarray, list[str]]:
+    """(rekordy – widok tylko do odczytu, lista symboli wg numeru)."""
+    path = Path(path)
+    header = np.fromfile(path, dtype=_HEADER, count=1)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError(f"Not a forest journal: {path}")
+    n = int(header["count"])
+    recs = np.memmap(path, dtype=JOURNAL_DTYPE, mode="r", offset=_HEADER_SIZE, shape=(n,)) if n else np.empty(0, JOURNAL_DTYPE)
+    sym_path = path.with_name(path.name + ".sym")
+    symbols = sym_path.read_text(encoding="utf-8").splitlines() if sym_path.exists() else []
+    return recs, symbols
+
+
+def journal_frame(path: str | Path):
+    """Dziennik jako DataFrame (do analizy incydentu)."""
+    import pandas as pd
+
+    recs, symbols = read_journal(path)
+    df = pd.DataFrame(
+        {
+            "time": pd.to_datetime(recs["ts"], utc=True),
+            "kind": pd.Categorical.from_codes(np.asarray(recs["kind"]) - 1, [KIND_NAMES[k] for k in sorted(KIND_NAMES)]),
+            "symbol": np.asarray(symbols, dtype=object)[recs["sym"]] if len(recs) else [],
+            "side": recs["side"],
+            "code": recs["code"],
+            "qty": recs["qty"],
+            "price": recs["price"],
+            "aux": recs["aux"],
+            "ref": [r.decode() for r in recs["ref"]],
+        }
+    )
+    return df
+
+
+# ---------- zapis ścieżki zleceń ----------
+class JournaledRouter:
+    """``OrderRouter`` notujący ceny, zlecenia i wyniki do dziennika."""
+
+    def __init__(self, router: Any, journal: TickJournal) -> None:
+        self.router = router
+        self.journal = journal
+        self._placed: Dict[str, int] = {}   # id wyniku → nr rekordu ORDER (id routera nie są powtarzalne)
+
+    def __getattr__(self, name: str) -> Any:  # connect / close / position_qty / equity …
+        return getattr(self.router, name)
+
+    def set_price(self, symbol: str, price: float, *args: Any, **kwargs: Any) -> None:
+        self.journal.price(symbol, price, kwargs.get("volume", args[0] if args else float("nan")))
+        self.router.set_price(symbol, price, *args, **kwargs)
+
+    def market_order(self, order: Order) -> OrderResult:
+        n = self.journal.order(order)
+        res = self.router.market_order(order)
+        self.journal.result(order.symbol, res)
+        self._placed[res.id] = n
+        return res
+
+    def market_orders(self, orders: List[Order]) -> List[OrderResult]:
+        orders = list(orders)
+        ns = [self.journal.order(o) for o in orders]
+        results = self.router.market_orders(orders)
+        for o, r, n in zip(orders, results, ns):
+            self.journal.result(o.symbol, r)
+            self._placed[r.id] = n
+        return results
+
+    def cancel(self, order_id: str) -> bool:
+        ok = self.router.cancel(order_id)
+        self.journal.append(KIND_CANCEL, "", code=int(ok), qty=self._placed.get(order_id, -1), ref=order_id)
+        return ok
+
+    def fills(self) -> List[OrderResult]:
+        out = self.router.fills()
+        if out:
+            self.journal.append(KIND_FILLS, "", qty=len(out))
+            for r in out:
+                self.journal.result("", r)
+        return out
+
+
+class JournaledBroker:
+    """``BrokerAdapter`` notujący ceny, zlecenia, anulowania, zamknięcia i transakcje."""
+
+    def __init__(self, broker: Any, journal: TickJournal) -> None:
+        self.broker = broker
+        self.journal = journal
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.broker, name)
+
+    def update_price(self, symbol: str, price: float, *args: Any, **kwargs: Any) -> None:
+        self.journal.price(symbol, price, kwargs.get("volume", args[0] if args else float("nan")))
+        self.broker.update_price(symbol, price, *args, **kwargs)
+
+    def update_prices(self, symbols: List[str], prices: List[float]) -> None:
+        for sym, px in zip(symbols, prices):
+            self.journal.price(sym, px)
+        self.broker.update_prices(symbols, prices)
+
+    def _trade(self, res: Any) -> None:
+        self.journal.append(KIND_TRADE, res.symbol, side=_side(res.side), qty=res.qty, price=res.price,
+                            aux=res.realized_pnl)
+
+    def market_order(self, symbol: str, side: Any, qty: float, sl: Optional[float] = None,
+                     tp: Optional[float] = None) -> Any:
+        self.journal.append(KIND_MARKET, symbol, side=_side(side), qty=qty, price=_nan(sl), aux=_nan(tp))
+        res = self.broker.market_order(symbol, side, qty, sl, tp)
+        self._trade(res)
+        return res
+
+    def _pending(self, symbol: str, side: Any, qty: float, kind: str, price: Optional[float],
+                 stop: Optional[float], sl: Optional[float], tp: Optional[float], oid: Any) -> None:
+        self.journal.append(KIND_PENDING, symbol, side=_side(side), code=_ORDER_TYPES.index(kind), qty=qty,
+                            price=_nan(price), aux=_nan(stop), ref=str(oid))
+        self.journal.append(KIND_BRACKET, symbol, price=_nan(sl), aux=_nan(tp))
+
+    def limit_order(self, symbol: str, side: Any, qty: float, price: float, sl: Optional[float] = None,
+                    tp: Optional[float] = None) -> Any:
+        oid = self.broker.limit_order(symbol, side, qty, price, sl, tp)
+        self._pending(symbol, side, qty, "limit", price, None, sl, tp, oid)
+        return oid
+
+    def stop_order(self, symbol: str, side: Any, qty: float, stop: float, limit: Optional[float] = None,
+                   sl: Optional[float] = None, tp: Optional[float] = None) -> Any:
+        oid = self.broker.stop_order(symbol, side, qty, stop, limit, sl, tp)
+        self._pending(symbol, side, qty, "stop" if limit is None else "stop_limit", limit, stop, sl, tp, oid)
+        return oid
+
+    def cancel_order(self, oid: Any) -> bool:
+        ok = self.broker.cancel_order(oid)
+        self.journal.append(KIND_CANCEL, "", code=int(ok), ref=str(oid))
+        return ok
+
+    def executions(self) -> List[Any]:
+        out = self.broker.executions()
+        if out:
+            self.journal.append(KIND_FILLS, "", qty=len(out))
+            for res in out:
+                self._trade(res)
+        return out
+
+    def close_position(self, symbol: str) -> Any:
+        self.journal.append(KIND_CLOSE, symbol)
+        res = self.broker.close_position(symbol)
+        self._trade(res)
+        return res
+
+
+# ---------- replay ----------
+@dataclass
+class ReplayReport:
+    events: Dict[str, int] = field(default_factory=dict)
+    latency_ns: Dict[str, np.ndarray] = field(default_factory=dict)   # czasy obsługi per rodzaj zdarzenia
+    mismatches: List[tuple[int, str, str]] = field(default_factory=list)  # (nr rekordu, zapisano, odtworzono)
+    elapsed: float = 0.0
+
+    def percentiles(self, q: tuple[float, ...] = (50, 90, 99, 99.9)) -> Dict[str, Dict[str, float]]:
+        """Percentyle czasu obsługi [µs] per rodzaj zdarzenia."""
+        out: Dict[str, Dict[str, float]] = {}
+        for kind, ns in self.latency_ns.items():
+            if len(ns):
+                vals = np.percentile(ns, q) / 1e3
+                out[kind] = {f"p{p:g}": float(v) for p, v in zip(q, vals)} | {"max": float(ns.max() / 1e3)}
+        return out
+
+    @property
+    def deterministic(self) -> bool:
+        return not self.mismatches
+
+    def summary(self) -> str:
+        lines = [f"{'event':<10}{'count':>10}{'p50 µs':>10}{'p99 µs':>10}{'p99.9 µs':>10}{'max µs':>10}"]
+        pct = self.percentiles()
+        for kind, n in self.events.items():
+            p = pct.get(kind, {})
+            lines.append(
+                f"{kind:<10}{n:>10}{p.get('p50', 0):>10.1f}{p.get('p99', 0):>10.1f}"
+                f"{p.get('p99.9', 0):>10.1f}{p.get('max', 0):>10.1f}"
+            )
+        lines.append(f"elapsed {self.elapsed:.3f} s, mismatches {len(self.mismatches)}")
+        return "\n".join(lines)
+
+
+def iter_events(path: str | Path) -> Iterator[tuple[int, np.void, str]]:
+    recs, symbols = read_journal(path)
+    for i in range(len(recs)):
+        rec = recs[i]
+        yield i, rec, symbols[rec["sym"]]
+
+
+def replay(path: str | Path, target: Any, *, speed: float | None = None, check: bool = True) -> ReplayReport:
+    """Odtwórz dziennik na ``target`` (``OrderRouter`` albo ``BrokerAdapter``).
+
+    ``speed=None`` – pełna prędkość; ``speed=1.0`` – czas rzeczywisty (``2.0`` dwa razy
+    szybciej …). ``check`` porównuje wyniki zleceń z zapisanymi w dzienniku. Zlecenia
+    oczekujące dostają w odtworzeniu własne id – anulowania są mapowane z zapisanych.
+    """
+    from forest.broker.adapter import Side
+
+    is_router = hasattr(target, "set_price")
+    recs, symbols = read_journal(path)
+    lat: Dict[str, List[int]] = {}
+    report = ReplayReport()
+    pending: deque[Any] = deque()          # wyniki odtworzonych zleceń czekające na porównanie
+    oids: Dict[Any, Any] = {}              # zapisane id zlecenia / nr rekordu ORDER → id w odtworzeniu
+    t_start = time.perf_counter()
+    wall0 = int(recs["ts"][0]) if len(recs) else 0
+    perf = time.perf_counter_ns
+
+    for i in range(len(recs)):
+        rec = recs[i]
+        kind = int(rec["kind"])
+        sym = symbols[rec["sym"]]
+        if speed:
+            due = (int(rec["ts"]) - wall0) / 1e9 / speed
+            wait = due - (time.perf_counter() - t_start)
+            if wait > 0:
+                time.sleep(wait)
+
+        t0 = perf()
+        if kind == KIND_PRICE:
+            vol = float(rec["aux"])
+            if is_router:
+                target.set_price(sym, float(rec["price"]), *(() if vol != vol else (vol,)))
+            else:
+                target.update_price(sym, float(rec["price"]), *(() if vol != vol else (vol,)))
+        elif kind == KIND_ORDER:
+            ref = rec["ref"].decode(errors="ignore") or None
+            order = Order(
+                symbol=sym, side="BUY" if rec["side"] > 0 else "SELL", qty=float(rec["qty"]),
+                price=_opt(rec["price"]), type=_ORDER_TYPES[rec["code"]], stop=_opt(rec["aux"]), client_id=ref,
+            )
+            res = target.market_order(order)
+            oids[i] = res.id
+            pending.append(res)
+        elif kind == KIND_MARKET:
+            side = Side.BUY if rec["side"] > 0 else Side.SELL
+            pending.append(target.market_order(sym, side, float(rec["qty"]), _opt(rec["price"]), _opt(rec["aux"])))
+        elif kind == KIND_CLOSE:
+            pending.append(target.close_position(sym))
+        elif kind == KIND_PENDING:
+            side = Side.BUY if rec["side"] > 0 else Side.SELL
+            sl = tp = None
+            if i + 1 < len(recs) and recs[i + 1]["kind"] == KIND_BRACKET:
+                sl, tp = _opt(recs[i + 1]["price"]), _opt(recs[i + 1]["aux"])
+            qty, price, stop = float(rec["qty"]), _opt(rec["price"]), _opt(rec["aux"])
+            if _ORDER_TYPES[rec["code"]] == "limit":
+                oid = target.limit_order(sym, side, qty, price, sl, tp)
+            else:
+                oid = target.stop_order(sym, side, qty, stop, price, sl, tp)
+            oids[rec["ref"].decode(errors="ignore")] = oid
+        elif kind == KIND_CANCEL:
+            ref = rec["ref"].decode(errors="ignore")
+            if is_router:
+                ok = target.cancel(oids.get(int(rec["qty"]), ref))
+            else:
+                ok = target.cancel_order(oids.get(ref, ref))
+            if check and bool(ok) != bool(rec["code"]):
+                report.mismatches.append((i, repr(bool(rec["code"])), repr(bool(ok))))
+        elif kind == KIND_FILLS:
+            got = target.fills() if is_router else target.executions()
+            if check and len(got) != int(rec["qty"]):
+                report.mismatches.append((i, f"{int(rec['qty'])} fills", f"{len(got)} fills"))
+            pending.extend(got)
+        elif kind == KIND_BRACKET:  # skonsumowany razem z PENDING
+            continue
+        else:  # RESULT / TRADE – zapisany wynik poprzedniego zlecenia: tylko porównanie
+            res = _take(pending, rec["ref"].decode(errors="ignore")) if kind == KIND_RESULT else (pending.popleft() if pending else None)
+            if check and res is not None:
+                _compare(i, kind, rec, res, report)
+            continue
+        dt = perf() - t0
+        name = KIND_NAMES[kind]
+        lat.setdefault(name, []).append(dt)
+        report.events[name] = report.events.get(name, 0) + 1
+
+    report.elapsed = time.perf_counter() - t_start
+    report.latency_ns = {k: np.asarray(v, dtype=np.int64) for k, v in lat.items()}
+    return report
+
+
+def _take(pending: deque[Any], ref: str) -> Any:
+    """Wynik o danym ``client_id``/``id`` (zlecenia z wątków mogą kończyć się w innej kolejności)."""
+    for j, res in enumerate(pending):
+        if (res.client_id or res.id)[:16] == ref:
+            del pending[j]
+            return res
+    return pending.popleft() if pending else None
+
+
+def _compare(i: int, kind: int, rec: np.void, res: Any, report: ReplayReport) -> None:
+    saved: tuple[Any, ...]
+    if kind == KIND_RESULT:
+        saved = (_STATUSES[rec["code"]], float(rec["qty"]), float(rec["price"]))
+        got = (res.status, float(res.filled_qty), float(res.avg_price))
+    else:
+        saved = (float(rec["qty"]), float(rec["price"]), float(rec["aux"]))
+        got = (float(res.qty), float(res.price), float(res.realized_pnl))
+    if not np.allclose(saved[-2:], got[-2:], equal_nan=True) or saved[:-2] != got[:-2]:
+        report.mismatches.append((i, repr(saved), repr(got)))
+
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None) -> int:
+    """``python -m forest.live.journal PLIK [--target router|adapter] [--cash] [--speed]``."""
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m forest.live.journal", description="Replay dziennika zdarzeń live")
+    ap.add_argument("path")
+    ap.add_argument("--target", choices=("router", "adapter"), default="router")
+    ap.add_argument("--cash", type=float, default=10_000.0)
+    ap.add_argument("--speed", type=float, default=None, help="1.0 = czas rzeczywisty; brak = pełna prędkość")
+    args = ap.parse_args(argv)
+
+    if args.target == "router":
+        from .router import PaperBroker
+
+        target: Any = PaperBroker(initial_cash=args.cash)
+        target.connect()
+    else:
+        from forest.broker.adapter import PaperBroker as AdapterBroker
+
+        target = AdapterBroker(initial_balance=args.cash)
+    report = replay(args.path, target, speed=args.speed)
+    print(report.summary())
+    for i, saved, got in report.mismatches[:20]:
+        print(f"#{i}: zapisano {saved}, odtworzono {got}")
+    return 0 if report.deterministic else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
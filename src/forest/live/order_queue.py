@@ -0,0 +1,130 @@
+"""Nieblokująca kolejka zleceń: równoległe wysyłanie z limitem, idempotentne ID klienta.
+
+``OrderQueue`` przyjmuje zlecenia i od razu zwraca ``Future`` – wysyłka do routera
+odbywa się w puli wątków z co najwyżej ``max_in_flight`` zleceniami w locie.
+Przy rebalansie portfela dziesiątki zleceń nakładają się w czasie zamiast czekać
+na siebie po kolei::
+
+    with OrderQueue(router, max_in_flight=8) as q:
+        batch = q.submit_batch(orders).result(timeout=5)
+    print(batch.filled, batch.rejected, batch.errors())
+
+Zlecenie z tym samym ``client_id`` wysłane ponownie (np. retry po timeoucie)
+nie trafia drugi raz do brokera – dostaje ten sam ``Future``.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .router import Order, OrderResult, OrderRouter
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Zagregowane wyniki paczki zleceń (kolejność jak w paczce)."""
+
+    results: tuple[OrderResult, ...]
+
+    @property
+    def filled(self) -> int:
+        return sum(r.status == "filled" for r in self.results)
+
+    @property
+    def rejected(self) -> int:
+        return sum(r.status == "rejected" for r in self.results)
+
+    @property
+    def ok(self) -> bool:
+        return self.rejected == 0
+
+    def errors(self) -> Dict[str, str]:
+        """client_id (albo id) -> powód odrzucenia."""
+        return {(r.client_id or r.id): (r.error or "") for r in self.results if r.status == "rejected"}
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+
+class BatchHandle:
+    """Uchwyt do paczki – czeka na wszystkie ``Future`` i składa ``BatchResult``."""
+
+    def __init__(self, futures: Sequence[Future]) -> None:
+        self.futures = list(futures)
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def result(self, timeout: Optional[float] = None) -> BatchResult:
+        _, pending = wait(self.futures, timeout=timeout)
+        if pending:
+            raise TimeoutError(f"{len(pending)} z {len(self.futures)} zleceń bez odpowiedzi")
+        return BatchResult(tuple(f.result() for f in self.futures))
+
+
+class OrderQueue:
+    """Wysyłka zleceń w tle przez ``router.market_order`` z ograniczoną współbieżnością."""
+
+    def __init__(self, router: OrderRouter, max_in_flight: int = 8, *, history: int = 100_000) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self._router = router
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="forest-orders")
+        self._lock = threading.Lock()
+        # client_id -> Future (ostatnie ``history`` wpisów; starsze zapominamy)
+        self._seen: "OrderedDict[str, Future]" = OrderedDict()
+        self._history = int(history)
+        self._closed = False
+
+    def _send(self, order: Order) -> OrderResult:
+        try:
+            return self._router.market_order(order)
+        except Exception as exc:  # błąd transportu nie może zgubić wyniku w paczce
+            return OrderResult(
+                id="error", status="rejected", filled_qty=0.0, avg_price=0.0,
+                error=f"{type(exc).__name__}: {exc}", client_id=order.client_id,
+            )
+
+    def submit(self, order: Order) -> Future:
+        """Zakolejkuj zlecenie; zwraca ``Future[OrderResult]`` (nie blokuje)."""
+        cid = order.client_id
+        if cid is None:
+            cid = uuid.uuid4().hex
+            order = replace(order, client_id=cid)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OrderQueue is closed")
+            fut = self._seen.get(cid)
+            if fut is not None:
+                return fut  # duplikat – to samo zlecenie już wysłane / w locie
+            fut = self._pool.submit(self._send, order)
+            self._seen[cid] = fut
+            if len(self._seen) > self._history:
+                self._seen.popitem(last=False)
+        return fut
+
+    def submit_batch(self, orders: Iterable[Order]) -> BatchHandle:
+        return BatchHandle([self.submit(o) for o in orders])
+
+    def close(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self) -> "OrderQueue":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def send_batch(router: OrderRouter, orders: Iterable[Order], max_in_flight: int = 8) -> BatchResult:
+    """Jednorazowo: wyślij paczkę równolegle i poczekaj na wszystkie wyniki."""
+    items: List[Order] = list(orders)
+    with OrderQueue(router, max_in_flight=max(1, min(max_in_flight, len(items)))) as q:
+        return q.submit_batch(items).result()
@@ -0,0 +1,95 @@
+"""Ścieżka live: nowa świeca → wskaźniki → decyzja → ryzyko → zlecenie.
+
+``SignalPipeline`` to strumieniowy odpowiednik ``run_backtest`` (przecięcie EMA,
+ATR‑sizing z ``RiskManager``) dla jednego symbolu, wpięty w dowolny
+``OrderRouter``. Każdy etap jest mierzony zegarem monotonicznym do histogramów
+``LatencyMonitor`` (``forest.utils.latency``):
+
+* ``indicators`` – aktualizacja EMA(fast), EMA(slow), ATR,
+* ``decision``   – sygnał strategii,
+* ``risk``       – ``RiskManager.position_size``,
+* ``router``     – wywołania ``market_order``,
+* ``bar``        – całość, od wejścia świecy do powrotu z routera.
+
+Router jest long‑only (jak ``PaperBroker``): sygnał −1 zamyka pozycję.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from typing import List, Optional
+
+from forest.backtest.risk import RiskManager
+from forest.core.indicators import StreamingATR, StreamingEMA
+from forest.utils.latency import LatencyMonitor
+
+from .router import Order, OrderResult, OrderRouter, Side
+
+STAGES = ("indicators", "decision", "risk", "router", "bar")
+
+
+class SignalPipeline:
+    def __init__(
+        self,
+        router: OrderRouter,
+        risk: RiskManager,
+        symbol: str,
+        fast: int = 12,
+        slow: int = 26,
+        atr_period: int = 14,
+        atr_multiple: float = 2.0,
+        monitor: Optional[LatencyMonitor] = None,
+    ) -> None:
+        self.router = router
+        self.risk = risk
+        self.symbol = symbol
+        self.atr_multiple = atr_multiple
+        self.monitor = monitor if monitor is not None else LatencyMonitor()
+        self._fast = StreamingEMA(fast)
+        self._slow = StreamingEMA(slow)
+        self._atr = StreamingATR(atr_period)
+        self._hist = {s: self.monitor.hist(s) for s in STAGES}
+        self._seq = itertools.count(1)
+        self.signal = 0
+
+    def on_bar(self, high: float, low: float, close: float) -> List[OrderResult]:
+        """Przetwórz zamkniętą świecę; zwraca wyniki wysłanych zleceń (zwykle pustą listę)."""
+        h = self._hist
+        clock = time.perf_counter_ns
+        t_bar = clock()
+
+        f = self._fast.update(close)
+        s = self._slow.update(close)
+        bar_atr = self._atr.update(high, low, close)
+        t = clock()
+        h["indicators"].record(t - t_bar)
+
+        sig = 1 if f > s else -1 if f < s else 0             # NaN na rozgrzewce → 0
+        changed = sig != 0 and sig != self.signal
+        if changed:
+            self.signal = sig
+        t1 = clock()
+        h["decision"].record(t1 - t)
+
+        self.router.set_price(self.symbol, close)
+        results: List[OrderResult] = []
+        if changed:
+            held = self.router.position_qty(self.symbol)
+            if held > 0:
+                results.append(self._send("SELL", held, h))
+            if sig > 0:
+                t = clock()
+                qty = self.risk.position_size(bar_atr, self.atr_multiple) if bar_atr == bar_atr else 0.0
+                h["risk"].record(clock() - t)
+                if qty > 0:
+                    results.append(self._send("BUY", qty, h))
+        h["bar"].record(clock() - t_bar)
+        return results
+
+    def _send(self, side: Side, qty: float, h: dict) -> OrderResult:
+        order = Order(symbol=self.symbol, side=side, qty=qty, client_id=f"{self.symbol}-{next(self._seq)}")
+        t = time.perf_counter_ns()
+        res = self.router.market_order(order)
+        h["router"].record(time.perf_counter_ns() - t)
+        return res
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import itertools
-from dataclasses import dataclass
-from typing import Dict, Literal, Optional, Protocol
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Literal, Optional, Protocol
+
+from forest.broker.matching import BUY, Fill, MatchingEngine
 
 Side = Literal["BUY", "SELL"]
 
@@ -12,19 +17,24 @@ class Order:
     symbol: str
     side: Side
     qty: float
-    # Dla PaperBroker dopuszczamy podanie ceny fill (np. z ostatniego ticka).
+    # market: opcjonalna cena fill dla PaperBroker (np. z ostatniego ticka); limit / stop_limit: cena limitu.
     price: Optional[float] = None
-    # Na razie tylko rynek, bez limit/stop.
-    type: Literal["market"] = "market"
+    type: Literal["market", "limit", "stop", "stop_limit"] = "market"
+    # Cena wyzwolenia dla stop / stop_limit.
+    stop: Optional[float] = None
+    # Identyfikator nadany przez klienta – ponowne wysłanie z tym samym ID nie dubluje zlecenia.
+    client_id: Optional[str] = None
 
 
 @dataclass(frozen=True)
 class OrderResult:
     id: str
-    status: Literal["filled", "rejected"]
+    # accepted = zlecenie czeka w księdze (filled_qty > 0 przy częściowym fillu)
+    status: Literal["filled", "accepted", "rejected"]
     filled_qty: float
     avg_price: float
     error: Optional[str] = None
+    client_id: Optional[str] = None
 
 
 class OrderRouter(Protocol):
@@ -34,6 +44,7 @@ class OrderRouter(Protocol):
     def close(self) -> None: ...
 
     def market_order(self, order: Order) -> OrderResult: ...
+    def market_orders(self, orders: Iterable[Order]) -> List[OrderResult]: ...
     def position_qty(self, symbol: str) -> float: ...
     def set_price(self, symbol: str, price: float) -> None: ...
     def equity(self) -> float: ...
@@ -45,7 +56,9 @@ class PaperBroker:
     - prowadzi 'cash' oraz słownik pozycji,
     - fill na cenie podanej w Order.price lub ostatniej znanej (set_price),
     - prowizja jako procent od wartości transakcji,
-    - tylko pozycje long (sprzedaż możliwa do wielkości pozycji).
+    - tylko pozycje long (sprzedaż możliwa do wielkości pozycji),
+    - limit / stop czekają w symulatorze księgi (``forest.broker.matching``);
+      ``set_price`` je wypełnia, wyniki odbiera ``fills()``.
     """
 
     _id_seq = itertools.count(1)
@@ -56,6 +69,11 @@ class PaperBroker:
         self._positions: Dict[str, float] = {}
         self._last_price: Dict[str, float] = {}
         self._connected: bool = False
+        # OrderQueue woła market_order z wielu wątków
+        self._lock = threading.RLock()
+        self._engine = MatchingEngine(cross=False)  # jeden rachunek – własne zlecenia się nie krzyżują
+        self._resting: Dict[int, tuple[str, Optional[str]]] = {}   # oid silnika -> (id, client_id)
+        self._fills: List[OrderResult] = []
 
     # --- interfejs ---
 
@@ -65,8 +83,25 @@ class PaperBroker:
     def close(self) -> None:
         self._connected = False
 
-    def set_price(self, symbol: str, price: float) -> None:
-        self._last_price[symbol] = float(price)
+    def set_price(self, symbol: str, price: float, volume: float = float("inf")) -> None:
+        with self._lock:
+            self._last_price[symbol] = float(price)
+            if symbol in self._engine.books:
+                self._on_fills(self._engine.on_tick(symbol, price, volume))
+
+    def fills(self) -> List[OrderResult]:
+        """Fille zleceń oczekujących (limit/stop) od ostatniego wywołania."""
+        with self._lock:
+            out, self._fills = self._fills, []
+        return out
+
+    def cancel(self, order_id: str) -> bool:
+        with self._lock:
+            for oid, (rid, _) in list(self._resting.items()):
+                if rid == order_id:
+                    del self._resting[oid]
+                    return self._engine.cancel(oid)
+        return False
 
     def position_qty(self, symbol: str) -> float:
         return float(self._positions.get(symbol, 0.0))
@@ -76,7 +111,20 @@ class PaperBroker:
                   for sym in self._positions)
         return self._cash + mtm
 
+    def market_orders(self, orders: Iterable[Order]) -> List[OrderResult]:
+        """Paczka zleceń w jednym wywołaniu (jedna blokada, wyniki w kolejności zleceń)."""
+        with self._lock:
+            return [self._execute(o) for o in orders]
+
     def market_order(self, order: Order) -> OrderResult:
+        with self._lock:
+            return self._execute(order)
+
+    def _execute(self, order: Order) -> OrderResult:
+        res = self._fill(order)
+        return res if order.client_id is None else replace(res, client_id=order.client_id)
+
+    def _fill(self, order: Order) -> OrderResult:
         if not self._connected:
             return OrderResult(
                 id="paper-0",
@@ -87,7 +135,7 @@ class PaperBroker:
             )
 
         price = order.price if order.price is not None else self._last_price.get(order.symbol)
-        if price is None:
+        if price is None and order.type in ("market", "limit", "stop_limit"):
             return OrderResult(
                 id="paper-0",
                 status="rejected",
@@ -106,29 +154,19 @@ class PaperBroker:
                 error="invalid_qty",
             )
 
-        cost = qty * price
-        fee = cost * self._fee
+        if order.side == "SELL" and qty > self.position_qty(order.symbol) + 1e-12:
+            return OrderResult(
+                id="paper-0",
+                status="rejected",
+                filled_qty=0.0,
+                avg_price=0.0,
+                error="insufficient_position",
+            )
 
-        if order.side == "BUY":
-            # kupno zmniejsza cash, zwiększa pozycję
-            self._cash -= (cost + fee)
-            self._positions[order.symbol] = self.position_qty(order.symbol) + qty
-        else:  # SELL
-            current = self.position_qty(order.symbol)
-            if qty > current + 1e-12:
-                return OrderResult(
-                    id="paper-0",
-                    status="rejected",
-                    filled_qty=0.0,
-                    avg_price=0.0,
-                    error="insufficient_position",
-                )
-            self._cash += (cost - fee)
-            self._positions[order.symbol] = current - qty
-            if abs(self._positions[order.symbol]) < 1e-12:
-                # czyścimy 'zerową' pozycję
-                self._positions.pop(order.symbol, None)
+        if order.type != "market" or price is None:     # market bez ceny odrzucony wyżej
+            return self._place(order, qty)
 
+        self._apply(order.symbol, order.side, qty, price)
         oid = f"paper-{next(self._id_seq)}"
         return OrderResult(
             id=oid,
@@ -137,3 +175,92 @@ class PaperBroker:
             avg_price=price,
         )
 
+
+
+    def _apply(self, symbol: str, side: Side, qty: float, price: float) -> None:
+        cost = qty * price
+        fee = cost * self._fee
+        if side == "BUY":
+            # kupno zmniejsza cash, zwiększa pozycję
+            self._cash -= (cost + fee)
+            self._positions[symbol] = self.position_qty(symbol) + qty
+        else:  # SELL
+            self._cash += (cost - fee)
+            self._positions[symbol] = self.position_qty(symbol) - qty
+            if abs(self._positions[symbol]) < 1e-12:
+                # czyścimy 'zerową' pozycję
+                self._positions.pop(symbol, None)
+
+    def _place(self, order: Order, qty: float) -> OrderResult:
+        if order.type in ("stop", "stop_limit") and order.stop is None:
+            return OrderResult(id="paper-0", status="rejected", filled_qty=0.0, avg_price=0.0, error="no_stop")
+        book = self._engine.book(order.symbol)
+        if book.last is None:
+            book.last = self._last_price.get(order.symbol)
+        limit = order.price if order.type in ("limit", "stop_limit") else None
+        rid = f"paper-{next(self._id_seq)}"
+        oid, fills = self._engine.submit(order.symbol, order.side, qty, order.type, price=limit, stop=order.stop)
+        self._resting[oid] = (rid, order.client_id)
+        own = [f for f in fills if f.oid == oid]
+        self._on_fills([f for f in fills if f.oid != oid])
+        filled = sum(f.qty for f in own)
+        for f in own:
+            self._apply(f.symbol, "BUY" if f.side == BUY else "SELL", f.qty, f.price)
+        if self._engine.remaining(oid) <= 0:
+            self._resting.pop(oid, None)
+        avg = sum(f.qty * f.price for f in own) / filled if filled else 0.0
+        done = self._engine.remaining(oid) <= 0 and filled > 0
+        return OrderResult(id=rid, status="filled" if done else "accepted", filled_qty=filled, avg_price=avg)
+
+    def _on_fills(self, fills: List[Fill]) -> None:
+        for f in fills:
+            rid, client_id = self._resting.get(f.oid, ("paper-0", None))
+            side: Side = "BUY" if f.side == BUY else "SELL"
+            qty = f.qty if side == "BUY" else min(f.qty, self.position_qty(f.symbol))
+            if qty > 0:
+                self._apply(f.symbol, side, qty, f.price)
+            if qty < f.qty:  # pozycja sprzedana w międzyczasie – reszta zlecenia przepada
+                self._engine.cancel(f.oid)
+            done = self._engine.remaining(f.oid) <= 0
+            if done:
+                self._resting.pop(f.oid, None)
+            self._fills.append(
+                OrderResult(id=rid, status="filled" if done else "accepted", filled_qty=qty,
+                            avg_price=f.price, client_id=client_id)
+            )
+
+
+class LatencyPaperBroker(PaperBroker):
+    """PaperBroker z symulowanym czasem odpowiedzi venue (round‑trip).
+
+    Każde zlecenie czeka ``latency`` s (+ losowy ``jitter`` z rozkładu jednostajnego)
+    *przed* fill – blokada brokera nie jest wtedy trzymana, więc równoległe
+    zlecenia (``OrderQueue``) nakładają się w czasie jak na prawdziwym venue.
+    Paczka ``market_orders`` to jeden round‑trip.
+    """
+
+    def __init__(
+        self,
+        initial_cash: float = 0.0,
+        fee_perc: float = 0.0,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(initial_cash, fee_perc)
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self._rng = random.Random(seed)
+
+    def _round_trip(self) -> None:
+        delay = self.latency + (self._rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def market_order(self, order: Order) -> OrderResult:
+        self._round_trip()
+        return super().market_order(order)
+
+    def market_orders(self, orders: Iterable[Order]) -> List[OrderResult]:
+        self._round_trip()
+        return super().market_orders(orders)
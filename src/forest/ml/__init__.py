@@ -0,0 +1,52 @@
+"""Tryb ``mode="ml"``: cechy z OHLC + LightGBM. Eksporty ładowane leniwie (PEP 562) –
+lightgbm importuje się dopiero przy treningu / predykcji."""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .features import FeatureSpec, LiveFeatures, build_features, feature_matrix, fingerprint
+    from .model import LivePredictor, MLStrategy, make_labels, time_series_splits
+    from .store import FeatureStore, FeatureView
+
+_EXPORTS: dict[str, str] = {
+    "FeatureSpec": ".features",
+    "LiveFeatures": ".features",
+    "build_features": ".features",
+    "feature_matrix": ".features",
+    "fingerprint": ".features",
+    "MLStrategy": ".model",
+    "LivePredictor": ".model",
+    "make_labels": ".model",
+    "time_series_splits": ".model",
+    "FeatureStore": ".store",
+    "FeatureView": ".store",
+}
+
+__all__ = [
+    "FeatureSpec",
+    "LiveFeatures",
+    "build_features",
+    "feature_matrix",
+    "fingerprint",
+    "MLStrategy",
+    "LivePredictor",
+    "make_labels",
+    "time_series_splits",
+    "FeatureStore",
+    "FeatureView",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,258 @@
+"""Macierz cech z OHLC dla trybu ``mode="ml"``.
+
+Cechy (kolejność kolumn = ``FeatureSpec.names()``), wszystkie znane na zamknięciu
+świecy ``t`` – bez zaglądania w przyszłość:
+
+* ``ret_k``         – log‑zwrot sprzed ``k − 1`` świec (``ret_1`` = ostatni),
+* ``ema_p``         – ``close / EMA(p) − 1``,
+* ``atr_p``         – ``ATR(p) / close``,
+* ``rmean_w``, ``rstd_w`` – średnia i odchylenie log‑zwrotów z okna ``w``,
+* ``z_w``           – z‑score ceny względem SMA / odchylenia z okna ``w``.
+
+``build_features`` liczy całą historię wektorowo; ``feature_matrix`` dodatkowo
+trzyma ostatnie macierze w pamięci pod kluczem (odcisk danych, spec), więc
+kolejne treningi na tych samych danych nie przeliczają cech. ``LiveFeatures``
+daje ten sam wiersz świeca po świecy w O(1) – do inferencji live.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from math import log, sqrt
+
+import numpy as np
+import pandas as pd
+
+from forest.core.indicators import StreamingATR, StreamingEMA, atr, ema
+from forest.utils import profiling
+
+__all__ = [
+    "FeatureSpec",
+    "fingerprint",
+    "build_features",
+    "feature_matrix",
+    "compute_columns",
+    "context_for",
+    "LiveFeatures",
+]
+
+# Wersja definicji cech – podbijana przy każdej zmianie sposobu liczenia
+# (unieważnia zapisane kolumny w ``forest.ml.store``).
+FEATURES_VERSION = 2   # 2: EMA/ATR z forest.core.indicators (ATR bez epsilonu pandas_ta)
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureSpec:
+    lags: tuple[int, ...] = (1, 2, 3, 5, 10)
+    ema_periods: tuple[int, ...] = (5, 10, 20, 50)
+    atr_periods: tuple[int, ...] = (14,)
+    windows: tuple[int, ...] = (10, 20, 50)
+
+    def names(self) -> list[str]:
+        return (
+            [f"ret_{k}" for k in self.lags]
+            + [f"ema_{p}" for p in self.ema_periods]
+            + [f"atr_{p}" for p in self.atr_periods]
+            + [f"{kind}_{w}" for w in self.windows for kind in ("rmean", "rstd", "z")]
+        )
+
+    @property
+    def warmup(self) -> int:
+        """Liczba pierwszych świec, w których któraś cecha jest jeszcze NaN."""
+        periods = (*self.ema_periods, *self.atr_periods)
+        return max((*self.lags, *(p - 1 for p in periods), *self.windows, 0))
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """Odcisk danych OHLC (wartości + indeks) – klucz cache cech."""
+    cols = [c for c in ("open", "high", "low", "close", "volume") if c in df.columns]
+    h = hashlib.md5(pd.util.hash_pandas_object(df[cols], index=True).values.tobytes())
+    h.update(",".join(cols).encode())
+    return h.hexdigest()
+
+
+@profiling.timed("ml.features")
+def build_features(df: pd.DataFrame, spec: FeatureSpec = FeatureSpec()) -> np.ndarray:
+    """Macierz (n_świec, n_cech) float64; wiersze rozgrzewki zawierają NaN."""
+    close = df["close"].to_numpy(dtype=np.float64)
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    n = len(close)
+    out = np.empty((n, len(spec.names())), dtype=np.float64)
+    col = 0
+
+    ret = np.full(n, np.nan)
+    ret[1:] = np.diff(np.log(close))
+    for k in spec.lags:
+        out[: k - 1, col] = np.nan
+        out[k - 1 :, col] = ret[: n - k + 1]
+        col += 1
+    for p in spec.ema_periods:
+        out[:, col] = close / ema(close, p) - 1.0
+        col += 1
+    for p in spec.atr_periods:
+        out[:, col] = atr(high, low, close, p) / close
+        col += 1
+    r = pd.Series(ret)
+    c = pd.Series(close)
+    for w in spec.windows:
+        out[:, col] = r.rolling(w).mean().to_numpy()
+        out[:, col + 1] = r.rolling(w).std().to_numpy()
+        sd = c.rolling(w).std().to_numpy()
+        z = np.divide(close - c.rolling(w).mean().to_numpy(), sd, out=np.zeros(n), where=sd > 0)
+        z[np.isnan(sd)] = np.nan
+        z[:w] = np.nan                              # to samo okno co rmean/rstd (w zwrotów = w + 1 cen)
+        out[:, col + 2] = z
+        col += 3
+    return out
+
+
+# ---------- pojedyncze kolumny (feature store) ----------
+# cechy z ``FeatureSpec`` + surowe wskaźniki dla silnika: ``ind.ema_<p>``, ``ind.atr_<p>``
+_NAME = re.compile(r"^(ind\.ema|ind\.atr|ret|ema|atr|rmean|rstd|z)_(\d+)$")
+
+
+def _parse(name: str) -> tuple[str, int]:
+    m = _NAME.match(name)
+    if m is None or int(m.group(2)) <= 0:
+        raise ValueError(f"Unknown feature column: {name!r}")
+    return m.group(1), int(m.group(2))
+
+
+def context_for(names: list[str]) -> int:
+    """Ile świec historii trzeba doliczyć przed nowymi, żeby ogon wyszedł jak przy pełnym przeliczeniu.
+
+    Okna i opóźnienia są skończone; EMA / ATR (Wilder) mają pamięć nieskończoną, więc
+    bierzemy 30 okresów – wpływ innego startu spada wtedy poniżej 1e‑13 względnie.
+    """
+    ctx = 1
+    for name in names:
+        kind, p = _parse(name)
+        ctx = max(ctx, 30 * p if kind in ("ema", "atr", "ind.ema", "ind.atr") else p + 1)
+    return ctx
+
+
+def compute_columns(df: pd.DataFrame, names: list[str]) -> dict[str, np.ndarray]:
+    """Tylko wskazane kolumny (minimalny ``FeatureSpec`` + surowe wskaźniki)."""
+    parsed = {name: _parse(name) for name in names}
+    out: dict[str, np.ndarray] = {}
+    close = df["close"].to_numpy(dtype=np.float64)
+    for name, (kind, p) in parsed.items():
+        if kind == "ind.ema":
+            out[name] = ema(close, p)
+        elif kind == "ind.atr":
+            out[name] = atr(df["high"].to_numpy(dtype=np.float64), df["low"].to_numpy(dtype=np.float64), close, p)
+    def periods(*kinds: str) -> tuple[int, ...]:
+        return tuple(sorted({p for kind, p in parsed.values() if kind in kinds}))
+
+    spec = FeatureSpec(periods("ret"), periods("ema"), periods("atr"), periods("rmean", "rstd", "z"))
+    if spec.names():
+        X = build_features(df, spec)
+        for i, name in enumerate(spec.names()):
+            if name in parsed:
+                out[name] = np.ascontiguousarray(X[:, i])
+    return out
+
+
+# ---------- cache w pamięci ----------
+_CACHE: OrderedDict[tuple[str, FeatureSpec], np.ndarray] = OrderedDict()
+_CACHE_SIZE = 8
+
+
+def feature_matrix(df: pd.DataFrame, spec: FeatureSpec = FeatureSpec(), *, cache: bool = True) -> np.ndarray:
+    """``build_features`` z cache LRU po (odcisk danych, spec). Wynik tylko do odczytu."""
+    if not cache:
+        return build_features(df, spec)
+    key = (fingerprint(df), spec)
+    X = _CACHE.get(key)
+    if X is None:
+        profiling.incr("ml.features_miss")
+        X = build_features(df, spec)
+        X.flags.writeable = False
+        _CACHE[key] = X
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    else:
+        _CACHE.move_to_end(key)
+    return X
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+# ---------- cechy strumieniowo (live) ----------
+class _Window:
+    """Suma i suma kwadratów z ostatnich ``w`` wartości (odchylenie z ddof=1 jak w pandas)."""
+
+    __slots__ = ("w", "buf", "s", "ss")
+
+    def __init__(self, w: int) -> None:
+        self.w = w
+        self.buf: deque[float] = deque()
+        self.s = 0.0
+        self.ss = 0.0
+
+    def push(self, x: float) -> None:
+        self.buf.append(x)
+        self.s += x
+        self.ss += x * x
+        if len(self.buf) > self.w:
+            old = self.buf.popleft()
+            self.s -= old
+            self.ss -= old * old
+
+    def stats(self) -> tuple[float, float]:
+        if len(self.buf) < self.w:
+            return float("nan"), float("nan")
+        w = self.w
+        mean = self.s / w
+        var = (self.ss - w * mean * mean) / (w - 1) if w > 1 else float("nan")
+        return mean, sqrt(var) if var > 0 else 0.0
+
+
+class LiveFeatures:
+    """Wiersz cech dla kolejnych świec w O(1) – ten sam co w ``build_features``."""
+
+    def __init__(self, spec: FeatureSpec = FeatureSpec()) -> None:
+        self.spec = spec
+        self._emas = [StreamingEMA(p) for p in spec.ema_periods]
+        self._atrs = [StreamingATR(p) for p in spec.atr_periods]
+        depth = max(spec.lags, default=1)
+        self._rets: deque[float] = deque([float("nan")] * depth, maxlen=depth)
+        self._rwin = [_Window(w) for w in spec.windows]
+        self._cwin = [_Window(w) for w in spec.windows]
+        self._prev: float | None = None
+        self._row = np.empty(len(spec.names()), dtype=np.float64)
+
+    def update(self, high: float, low: float, close: float) -> np.ndarray:
+        """Dodaj zamkniętą świecę; zwraca wiersz cech (bufor współdzielony – skopiuj, jeśli trzymasz)."""
+        row = self._row
+        ret = log(close / self._prev) if self._prev is not None else float("nan")
+        self._prev = close
+        self._rets.appendleft(ret)
+        col = 0
+        for k in self.spec.lags:
+            row[col] = self._rets[k - 1]
+            col += 1
+        for e in self._emas:
+            row[col] = close / e.update(close) - 1.0
+            col += 1
+        for a in self._atrs:
+            row[col] = a.update(high, low, close) / close
+            col += 1
+        for rw, cw in zip(self._rwin, self._cwin):
+            if ret == ret:
+                rw.push(ret)
+            cw.push(close)
+            row[col], row[col + 1] = rw.stats()
+            mean, sd = cw.stats()
+            if len(rw.buf) < rw.w:
+                row[col + 2] = float("nan")
+            else:
+                row[col + 2] = (close - mean) / sd if sd > 0 else 0.0
+            col += 3
+        return row
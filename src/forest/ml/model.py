@@ -0,0 +1,188 @@
+"""LightGBM na cechach z ``forest.ml.features``.
+
+Etykieta: czy log‑zwrot za ``horizon`` świec jest dodatni. ``fit`` robi walk‑forward
+(rozszerzające się okno, przerwa ``gap = horizon`` między treningiem a testem,
+żeby etykiety treningu nie sięgały w test), zapisuje wyniki foldów i
+prawdopodobieństwa out‑of‑sample, po czym trenuje model końcowy na całej historii.
+
+Backtest bez zaglądania w przyszłość::
+
+    strat = MLStrategy().fit(df)
+    out = run_backtest(df, risk, signal=strat.to_signal(strat.oos_proba))
+
+Live – pojedyncza świeca, cechy liczone przyrostowo::
+
+    live = strat.live()
+    sig = live.update(high, low, close)        # -1 / 0 / 1
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from forest.utils import profiling
+
+from .features import FeatureSpec, LiveFeatures, feature_matrix
+
+__all__ = ["MLStrategy", "LivePredictor", "time_series_splits", "make_labels"]
+
+
+@cache
+def _lgb() -> Any:
+    import lightgbm
+
+    return lightgbm
+
+
+def time_series_splits(
+    n: int, n_splits: int = 5, *, gap: int = 0, min_train: Optional[int] = None
+) -> Iterator[tuple[slice, slice]]:
+    """(train, test) z rozszerzającym się oknem: train = [0, a), test = [a + gap, b)."""
+    if n_splits < 1:
+        raise ValueError("n_splits must be >= 1")
+    min_train = min_train if min_train is not None else n // (n_splits + 1)
+    step = (n - min_train) // n_splits
+    if min_train <= 0 or step <= gap:
+        raise ValueError(f"Za mało danych ({n}) na {n_splits} foldów")
+    for i in range(n_splits):
+        a = min_train + i * step
+        b = n if i == n_splits - 1 else a + step
+        yield slice(0, a), slice(a + gap, b)
+
+
+def make_labels(close: np.ndarray, horizon: int = 1) -> np.ndarray:
+    """1.0 gdy ``close[t + horizon] > close[t]``, 0.0 gdy nie; NaN dla ostatnich ``horizon`` świec."""
+    close = np.asarray(close, dtype=np.float64)
+    y = np.full(len(close), np.nan)
+    y[:-horizon] = (close[horizon:] > close[:-horizon]).astype(np.float64)
+    return y
+
+
+def _auc(y: np.ndarray, p: np.ndarray) -> float:
+    pos = y == 1
+    n_pos, n_neg = int(pos.sum()), int((~pos).sum())
+    if not n_pos or not n_neg:
+        return float("nan")
+    ranks = pd.Series(p).rank().to_numpy()
+    return float((ranks[pos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+@dataclass
+class MLStrategy:
+    spec: FeatureSpec = FeatureSpec()
+    horizon: int = 1
+    threshold: float = 0.55            # p > threshold → long, p < 1 − threshold → short
+    num_boost_round: int = 200
+    params: Dict[str, Any] = field(default_factory=dict)   # nadpisuje domyślne parametry LightGBM
+    seed: int = 42
+    store: Any = None                  # FeatureStore – cechy z dysku zamiast cache w pamięci
+
+    booster: Any = None
+    cv_scores: List[Dict[str, float]] = field(default_factory=list)
+    oos_proba: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_settings(cls, settings: Any, **kwargs: Any) -> "MLStrategy":
+        """Z ``StrategySettings`` (``mode="ml"``); ``kwargs`` – pozostałe pola (np. ``store``, ``seed``)."""
+        return cls(horizon=settings.horizon, threshold=settings.threshold, **kwargs)
+
+    # ---------- trening ----------
+    def _params(self) -> Dict[str, Any]:
+        return {
+            "objective": "binary",
+            "learning_rate": 0.05,
+            "num_leaves": 15,
+            "min_data_in_leaf": 50,
+            "feature_fraction": 0.8,
+            "bagging_fraction": 0.8,
+            "bagging_freq": 1,
+            "lambda_l2": 1.0,
+            "seed": self.seed,
+            "deterministic": True,
+            "verbose": -1,
+        } | self.params
+
+    def _features(self, df: pd.DataFrame) -> np.ndarray:
+        return self.store.features(df, self.spec) if self.store is not None else feature_matrix(df, self.spec)
+
+    def _train(self, X: np.ndarray, y: np.ndarray) -> Any:
+        lgb = _lgb()
+        ds = lgb.Dataset(X, label=y, feature_name=self.spec.names(), free_raw_data=True)
+        return lgb.train(self._params(), ds, num_boost_round=self.num_boost_round)
+
+    @profiling.timed("ml.fit")
+    def fit(self, df: pd.DataFrame, n_splits: int = 5) -> "MLStrategy":
+        X = self._features(df)
+        y = make_labels(df["close"].to_numpy(), self.horizon)
+        start, stop = self.spec.warmup, len(df) - self.horizon
+        Xl, yl = X[start:stop], y[start:stop]
+
+        self.cv_scores = []
+        self.oos_proba = np.full(len(df), np.nan)
+        for train, test in time_series_splits(len(yl), n_splits, gap=self.horizon):
+            model = self._train(Xl[train], yl[train])
+            p = model.predict(Xl[test])
+            self.oos_proba[start + test.start : start + test.stop] = p
+            yt = yl[test]
+            self.cv_scores.append(
+                {"train": train.stop, "test": len(yt), "accuracy": float(((p > 0.5) == yt).mean()), "auc": _auc(yt, p)}
+            )
+        self.oos_proba[stop:] = model.predict(X[stop:])   # ogon bez etykiet – ostatni model foldu
+        self.booster = self._train(Xl, yl)
+        return self
+
+    # ---------- predykcja ----------
+    @profiling.timed("ml.predict")
+    def predict_proba(self, df: pd.DataFrame, batch_size: int = 100_000) -> np.ndarray:
+        """P(wzrost) dla całej historii, paczkami; NaN na rozgrzewce cech."""
+        if self.booster is None:
+            raise RuntimeError("MLStrategy.fit() must be called first")
+        X = self._features(df)
+        out = np.full(len(X), np.nan)
+        for i in range(self.spec.warmup, len(X), batch_size):
+            out[i : i + batch_size] = self.booster.predict(X[i : i + batch_size])
+        return out
+
+    def to_signal(self, proba: np.ndarray) -> np.ndarray:
+        """Prawdopodobieństwa → sygnał int8 {-1, 0, 1} (NaN → 0)."""
+        proba = np.asarray(proba, dtype=np.float64)
+        sig = np.zeros(len(proba), dtype=np.int8)
+        sig[proba > self.threshold] = 1
+        sig[proba < 1.0 - self.threshold] = -1
+        return sig
+
+    def signals(self, df: pd.DataFrame) -> pd.Series:
+        """Sygnał modelu końcowego (in‑sample dla danych treningowych – do backtestu użyj ``oos_proba``)."""
+        return pd.Series(self.to_signal(self.predict_proba(df)), index=df.index, name="signal")
+
+    def live(self) -> "LivePredictor":
+        if self.booster is None:
+            raise RuntimeError("MLStrategy.fit() must be called first")
+        return LivePredictor(self)
+
+
+class LivePredictor:
+    """Inferencja świeca po świecy: cechy przyrostowo (O(1)) + jeden wiersz do LightGBM."""
+
+    def __init__(self, strategy: MLStrategy) -> None:
+        self.strategy = strategy
+        self.features = LiveFeatures(strategy.spec)
+        self._warmup = strategy.spec.warmup
+        self._seen = 0
+        self._x = np.empty((1, len(strategy.spec.names())), dtype=np.float64)
+        self.proba = float("nan")
+
+    def update(self, high: float, low: float, close: float) -> int:
+        row = self.features.update(high, low, close)
+        self._seen += 1
+        if self._seen <= self._warmup:
+            return 0
+        self._x[0] = row
+        self.proba = p = float(self.strategy.booster.predict(self._x, num_threads=1)[0])
+        thr = self.strategy.threshold
+        return 1 if p > thr else -1 if p < 1.0 - thr else 0
@@ -0,0 +1,164 @@
+"""Lokalny feature store: kolumny cech / wskaźników zapisane jako ``.npy`` i czytane przez memmap.
+
+Układ katalogu::
+
+    <root>/<dataset>/v<wersja>/
+        meta.json            # liczba świec, odcisk danych, lista kolumn
+        ret_1.npy  ema_20.npy  ind.atr_14.npy  …
+
+``dataset`` to nazwa serii (np. ``"EURUSD-1h"``) albo – gdy jej nie podano – odcisk
+danych. Przy kolejnym ``get``:
+
+* te same dane → kolumny z dysku, bez liczenia;
+* brakujące kolumny → liczone i dopisywane tylko one;
+* dane dłuższe o nowe świece (początek zgadza się z odciskiem) → dla istniejących
+  kolumn liczony jest tylko ogon (z kontekstem ``context_for``), reszta kopiowana;
+* dane zmienione w środku albo inna wersja → wpis budowany od nowa.
+
+Kolumny są zwracane jako ``np.memmap`` tylko do odczytu – wycinki nie kopiują
+danych, a joblib przekazuje memmapy do workerów gridu przez ścieżkę pliku::
+
+    store = FeatureStore()
+    ind = store.indicators(df, emas=range(5, 60, 5))
+    run_grid(df, grid, indicators=ind)
+    strat = MLStrategy(store=store).fit(df)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from forest.utils import profiling
+
+from .features import FEATURES_VERSION, FeatureSpec, compute_columns, context_for, fingerprint
+
+__all__ = ["FeatureStore", "FeatureView"]
+
+_DEFAULT_ROOT = Path.home() / ".cache" / "forest_features"
+
+
+class FeatureView(Mapping[str, np.ndarray]):
+    """Kolumny jednego wpisu (nazwa -> memmap tylko do odczytu)."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], n: int) -> None:
+        self._cols = columns
+        self.n = n
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._cols[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cols)
+
+    def __len__(self) -> int:
+        return len(self._cols)
+
+    def matrix(self, names: Optional[Iterable[str]] = None, rows: slice = slice(None)) -> np.ndarray:
+        """Macierz (świece, kolumny) w podanej kolejności – jedyne miejsce, które kopiuje."""
+        names = list(self._cols) if names is None else list(names)
+        out = np.empty((len(range(*rows.indices(self.n))), len(names)), dtype=np.float64)
+        for j, name in enumerate(names):
+            out[:, j] = self._cols[name][rows]
+        return out
+
+
+class FeatureStore:
+    def __init__(self, root: str | Path = _DEFAULT_ROOT, version: int = FEATURES_VERSION) -> None:
+        self.root = Path(root)
+        self.version = version
+
+    # ---------- wpis ----------
+    def _dir(self, dataset: str) -> Path:
+        return self.root / dataset / f"v{self.version}"
+
+    @staticmethod
+    def _read_meta(d: Path) -> Optional[dict]:
+        try:
+            return json.loads((d / "meta.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_meta(d: Path, meta: dict) -> None:
+        tmp = d / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, d / "meta.json")
+
+    @staticmethod
+    def _write_column(d: Path, name: str, head: Optional[np.ndarray], tail: np.ndarray) -> None:
+        n_head = 0 if head is None else len(head)
+        tmp = d / f"{name}.npy.tmp"
+        arr = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(n_head + len(tail),))
+        if n_head:
+            arr[:n_head] = head
+        arr[n_head:] = tail
+        arr.flush()
+        del arr
+        os.replace(tmp, d / f"{name}.npy")
+
+    @profiling.timed("store.get")
+    def get(self, df: pd.DataFrame, names: Iterable[str], *, dataset: Optional[str] = None) -> FeatureView:
+        """Kolumny ``names`` dla ``df`` – z dysku, z dopisanym ogonem albo policzone."""
+        names = list(dict.fromkeys(names))
+        fp = fingerprint(df)
+        d = self._dir(dataset or fp)
+        n = len(df)
+        meta = self._read_meta(d)
+
+        if meta is not None and meta["n"] <= n and (
+            meta["fingerprint"] == fp if meta["n"] == n else fingerprint(df.iloc[: meta["n"]]) == meta["fingerprint"]
+        ):
+            have = [c for c in meta["columns"] if (d / f"{c}.npy").exists()]
+        else:                                   # nowe dane albo zmienione wstecz
+            if meta is not None:
+                shutil.rmtree(d, ignore_errors=True)
+            meta, have = {"n": 0, "fingerprint": None, "columns": []}, []
+        d.mkdir(parents=True, exist_ok=True)
+
+        n_old = meta["n"]
+        if n_old and n_old < n and have:        # dopisane świece: tylko ogon istniejących kolumn
+            profiling.incr("store.append_rows", n - n_old)
+            start = max(0, n_old - context_for(have))
+            fresh = compute_columns(df.iloc[start:], have)
+            for name in have:
+                head = np.load(d / f"{name}.npy", mmap_mode="r")
+                self._write_column(d, name, head, fresh[name][n_old - start :])
+        elif n_old != n:
+            have = []
+
+        missing = [c for c in names if c not in have]
+        if missing:
+            profiling.incr("store.computed_columns", len(missing))
+            for name, values in compute_columns(df, missing).items():
+                self._write_column(d, name, None, values)
+        self._write_meta(d, {"n": n, "fingerprint": fp, "version": self.version, "columns": have + missing})
+
+        cols = {name: np.load(d / f"{name}.npy", mmap_mode="r") for name in names}
+        return FeatureView(cols, n)
+
+    # ---------- wygodne widoki ----------
+    def features(self, df: pd.DataFrame, spec: FeatureSpec = FeatureSpec(), *, dataset: Optional[str] = None) -> np.ndarray:
+        """Macierz cech w kolejności ``spec.names()`` (jak ``build_features``)."""
+        names = spec.names()
+        return self.get(df, names, dataset=dataset).matrix(names)
+
+    def indicators(
+        self, df: pd.DataFrame, emas: Iterable[int] = (), atrs: Iterable[int] = (14,), *, dataset: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """Surowe wskaźniki dla ``run_backtest`` / ``run_grid``: ``{"ema_12": memmap, "atr_14": memmap}``."""
+        names = [f"ind.ema_{p}" for p in emas] + [f"ind.atr_{p}" for p in atrs]
+        view = self.get(df, names, dataset=dataset)
+        return {name.removeprefix("ind."): view[name] for name in names}
+
+    def datasets(self) -> list[str]:
+        return sorted(p.parent.name for p in self.root.glob(f"*/v{self.version}") if (p / "meta.json").exists())
+
+    def drop(self, dataset: str) -> None:
+        shutil.rmtree(self.root / dataset, ignore_errors=True)
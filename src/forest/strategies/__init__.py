@@ -0,0 +1,35 @@
+"""Rejestr strategii wektorowych (``forest.strategies``).
+
+Wbudowane: ``ema_cross``, ``donchian``; kolejne dochodzą z entry pointów grupy
+``forest.strategies`` albo przez ``register``.
+"""
+
+from __future__ import annotations
+
+from .base import (
+    ENTRY_POINT_GROUP,
+    Param,
+    Strategy,
+    available,
+    compute_indicators,
+    get_strategy,
+    indicator_states,
+    register,
+    register_indicator,
+    resume_indicators,
+    strategy_inputs,
+)
+
+__all__ = [
+    "Param",
+    "Strategy",
+    "register",
+    "register_indicator",
+    "get_strategy",
+    "available",
+    "compute_indicators",
+    "strategy_inputs",
+    "indicator_states",
+    "resume_indicators",
+    "ENTRY_POINT_GROUP",
+]
@@ -0,0 +1,320 @@
+"""Kontrakt strategii + rejestr (wbudowane i z entry pointów ``forest.strategies``).
+
+Strategia jest wektorowa: dostaje słownik tablic (``open/high/low/close/volume``
+i zadeklarowane wskaźniki, np. ``"ema_12"``) i zwraca sygnał ``int8`` {-1, 0, 1}
+tej samej długości. Deklaruje przestrzeń parametrów (``space``) i – dla danych
+parametrów – potrzebne wskaźniki (``needs``). Dzięki temu silnik może policzyć
+wspólne wskaźniki raz dla całego gridu i wyznaczać macierz sygnałów
+(``signal_matrix``) paczkami parametrów.
+
+Plugin w innym pakiecie::
+
+    # pyproject.toml
+    [project.entry-points."forest.strategies"]
+    my_strategy = "my_pkg.strategies:MyStrategy"
+
+    class MyStrategy(Strategy):
+        name = "my_strategy"
+        space = {"n": Param(20, 5, 100, 5)}
+
+        def needs(self, params):
+            return [f"sma_{params['n']}"]
+
+        def signal(self, data, params):
+            return np.sign(data["close"] - data[f"sma_{params['n']}"]).astype(np.int8)
+"""
+
+from __future__ import annotations
+
+import itertools
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+__all__ = [
+    "Param",
+    "Strategy",
+    "register",
+    "register_indicator",
+    "get_strategy",
+    "available",
+    "compute_indicators",
+    "strategy_inputs",
+    "indicator_states",
+    "resume_indicators",
+    "ENTRY_POINT_GROUP",
+]
+
+ENTRY_POINT_GROUP = "forest.strategies"
+
+
+# ---------- przestrzeń parametrów ----------
+@dataclass(frozen=True, slots=True)
+class Param:
+    """Parametr strategii: domyślna wartość + zakres [low, high] z krokiem albo lista ``choices``."""
+
+    default: Any
+    low: Optional[float] = None
+    high: Optional[float] = None
+    step: Optional[float] = None
+    choices: Optional[tuple] = None
+    log: bool = False                   # wskazówka dla optymalizatorów: skala logarytmiczna
+
+    @property
+    def kind(self) -> str:
+        if self.choices is not None:
+            return "choice"
+        return "int" if isinstance(self.default, (int, np.integer)) and not isinstance(self.default, bool) else "float"
+
+    def values(self) -> list:
+        """Wartości do pełnej siatki (``choices`` albo ``low..high`` co ``step``)."""
+        if self.choices is not None:
+            return list(self.choices)
+        if self.low is None or self.high is None:
+            return [self.default]
+        if self.kind == "int":
+            return list(range(int(self.low), int(self.high) + 1, int(self.step or 1)))
+        step = self.step or (self.high - self.low) / 10
+        return [float(v) for v in np.arange(self.low, self.high + step / 2, step)]
+
+    def contains(self, value: Any) -> bool:
+        if self.choices is not None:
+            return value in self.choices
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+
+# ---------- kontrakt ----------
+class Strategy(ABC):
+    """Baza strategii wektorowej; podklasy ustawiają ``name``, ``space``, ``needs`` i ``signal``."""
+
+    name: ClassVar[str] = ""
+    space: ClassVar[Dict[str, Param]] = {}
+    # sygnał w świecy t zależy tylko od wiersza t danych (i wskaźników) – resume
+    # backtestu może wtedy liczyć sam ogon; inaczej sygnał liczony jest od początku
+    pointwise: ClassVar[bool] = False
+
+    def resolve(self, params: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """Domyślne wartości + podane; nieznany parametr → ``ValueError``."""
+        params = dict(params or {})
+        unknown = set(params) - set(self.space)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown parameters {sorted(unknown)}")
+        return {k: params.get(k, p.default) for k, p in self.space.items()}
+
+    def valid(self, params: Mapping[str, Any]) -> bool:
+        """Czy kombinacja ma sens (np. ``fast < slow``) – grid pomija niepoprawne."""
+        return True
+
+    def needs(self, params: Mapping[str, Any]) -> List[str]:
+        """Klucze wskaźników (``"ema_12"``, ``"atr_14"`` …) potrzebne dla ``params``."""
+        return []
+
+    @abstractmethod
+    def signal(self, data: Mapping[str, np.ndarray], params: Mapping[str, Any]) -> np.ndarray:
+        """Sygnał ``int8`` {-1, 0, 1} tej samej długości co ``data["close"]``."""
+
+    def signal_matrix(self, data: Mapping[str, np.ndarray], param_sets: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Sygnały dla wielu zestawów parametrów: (len(param_sets), n) int8. Podklasy mogą wektoryzować."""
+        n = len(data["close"])
+        out = np.empty((len(param_sets), n), dtype=np.int8)
+        for i, p in enumerate(param_sets):
+            out[i] = self.signal(data, p)
+        return out
+
+    def grid(self, **overrides: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Pełna siatka z ``space`` (``overrides`` podmienia wartości wybranych parametrów)."""
+        keys = sorted(self.space)
+        values = [list(overrides[k]) if k in overrides else self.space[k].values() for k in keys]
+        combos = (dict(zip(keys, combo)) for combo in itertools.product(*values))
+        return [p for p in combos if self.valid(p)]
+
+    def __repr__(self) -> str:
+        return f"<Strategy {self.name}>"
+
+
+# ---------- wskaźniki ----------
+def _ema(data: Mapping[str, np.ndarray], p: int) -> np.ndarray:
+    from forest.core.indicators import ema
+
+    return ema(data["close"], p)
+
+
+def _atr(data: Mapping[str, np.ndarray], p: int) -> np.ndarray:
+    from forest.core.indicators import atr
+
+    return atr(data["high"], data["low"], data["close"], p)
+
+
+def _sma(data: Mapping[str, np.ndarray], p: int) -> np.ndarray:
+    out = np.full(len(data["close"]), np.nan)
+    c = np.cumsum(np.r_[0.0, data["close"]])
+    out[p - 1 :] = (c[p:] - c[:-p]) / p
+    return out
+
+
+def _shifted_extreme(x: np.ndarray, p: int, fn: Callable) -> np.ndarray:
+    """Ekstremum z poprzednich ``p`` świec (bez bieżącej)."""
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    out = np.full(len(x), np.nan)
+    if len(x) > p:
+        out[p:] = fn(sliding_window_view(x[:-1], p), axis=1)
+    return out
+
+
+_INDICATORS: Dict[str, Callable[[Mapping[str, np.ndarray], int], np.ndarray]] = {
+    "ema": _ema,
+    "atr": _atr,
+    "sma": _sma,
+    "hhv": lambda d, p: _shifted_extreme(d["high"], p, np.max),    # najwyższe high z p poprzednich
+    "llv": lambda d, p: _shifted_extreme(d["low"], p, np.min),
+}
+
+
+def register_indicator(kind: str, fn: Callable[[Mapping[str, np.ndarray], int], np.ndarray]) -> None:
+    """Dodaj rodzaj wskaźnika ``"<kind>_<okres>"`` – ``fn(dane, okres) -> tablica``."""
+    _INDICATORS[kind] = fn
+
+
+def compute_indicators(
+    data: Mapping[str, np.ndarray], keys: Iterable[str], have: Optional[Mapping[str, np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """Policz każdy klucz raz; gotowe (``have``, np. z feature store) tylko przepisz."""
+    have = have or {}
+    out: Dict[str, np.ndarray] = {}
+    for key in dict.fromkeys(keys):
+        if key in have:
+            out[key] = np.asarray(have[key])
+            continue
+        kind, _, period = key.rpartition("_")
+        if kind not in _INDICATORS or not period.isdigit():
+            raise ValueError(f"Unknown indicator {key!r} (known kinds: {sorted(_INDICATORS)})")
+        out[key] = _INDICATORS[kind](data, int(period))
+    return out
+
+
+def strategy_inputs(df: Any, keys: Iterable[str] = (), have: Optional[Mapping[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """Tablice OHLCV z DataFrame + wskaźniki ``keys`` – wejście ``Strategy.signal``."""
+    data = {c: df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume") if c in df}
+    data.update(compute_indicators(data, keys, have))
+    return data
+
+
+# ---------- wznowienie (forest.backtest.checkpoint) ----------
+def _ema_state(data: Mapping[str, np.ndarray], last: float) -> tuple:
+    return (last,)
+
+
+def _atr_state(data: Mapping[str, np.ndarray], last: float) -> tuple:
+    return (last, float(data["close"][-1]))
+
+
+def _ema_resume(state: tuple, tail: Mapping[str, np.ndarray], p: int) -> Optional[np.ndarray]:
+    from forest.core.indicators import ema_resume
+
+    return ema_resume(state[0], tail["close"], p)
+
+
+def _atr_resume(state: tuple, tail: Mapping[str, np.ndarray], p: int) -> Optional[np.ndarray]:
+    from forest.core.indicators import atr_resume
+
+    return atr_resume(state[0], state[1], tail["high"], tail["low"], tail["close"], p)
+
+
+# rodzaj -> (stan po ostatniej świecy, dalszy ciąg dla nowych świec)
+_RESUMABLE: Dict[str, tuple[Callable, Callable]] = {
+    "ema": (_ema_state, _ema_resume),
+    "atr": (_atr_state, _atr_resume),
+}
+
+
+def indicator_states(data: Mapping[str, np.ndarray], keys: Iterable[str]) -> Dict[str, tuple]:
+    """Stany wskaźników ``keys`` po ostatniej świecy (tylko te, które da się wznowić).
+
+    ``data`` – OHLC całej historii i wartości wskaźników (wystarczy ich ogon).
+    """
+    out: Dict[str, tuple] = {}
+    for key in dict.fromkeys(keys):
+        kind = key.rpartition("_")[0]
+        values = data.get(key)
+        if kind in _RESUMABLE and values is not None and len(values) and np.isfinite(values[-1]):
+            out[key] = _RESUMABLE[kind][0](data, float(values[-1]))
+    return out
+
+
+def resume_indicators(
+    states: Mapping[str, tuple],
+    tail: Mapping[str, np.ndarray],
+    keys: Iterable[str],
+    have: Optional[Mapping[str, np.ndarray]] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """Wskaźniki ``keys`` tylko dla nowych świec ``tail`` (ze ``states``; gotowe ogony z ``have``).
+
+    ``None``, gdy któregoś nie da się policzyć tak samo jak od pierwszej świecy.
+    """
+    have = have or {}
+    out: Dict[str, np.ndarray] = {}
+    for key in dict.fromkeys(keys):
+        if key in have:
+            out[key] = np.asarray(have[key])
+            continue
+        kind, _, period = key.rpartition("_")
+        if key not in states or kind not in _RESUMABLE:
+            return None
+        values = _RESUMABLE[kind][1](states[key], tail, int(period))
+        if values is None:
+            return None
+        out[key] = values
+    return out
+
+
+# ---------- rejestr ----------
+_REGISTRY: Dict[str, Strategy] = {}
+
+
+def register(strategy: type[Strategy] | Strategy) -> Any:
+    """Zarejestruj strategię (klasa albo instancja); działa też jako dekorator klasy."""
+    inst = strategy() if isinstance(strategy, type) else strategy
+    if not inst.name:
+        raise ValueError(f"{strategy!r} has no name")
+    _REGISTRY[inst.name] = inst
+    return strategy
+
+
+@cache
+def _load() -> None:
+    """Wbudowane strategie + pluginy z entry pointów (raz na proces; błędne są pomijane)."""
+    from importlib.metadata import entry_points
+
+    from . import builtin  # noqa: F401  (rejestruje się przy imporcie)
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            obj = ep.load()
+            inst = obj() if isinstance(obj, type) else obj
+            if not inst.name:
+                inst.name = ep.name
+        except Exception as exc:  # zepsuty plugin nie może zablokować rejestru
+            from forest.utils.log import get_logger
+
+            get_logger("forest").warning("strategy_plugin_failed", entry_point=ep.name, error=repr(exc))
+            continue
+        _REGISTRY.setdefault(inst.name, inst)
+
+
+def get_strategy(strategy: str | Strategy) -> Strategy:
+    if isinstance(strategy, Strategy):
+        return strategy
+    _load()
+    try:
+        return _REGISTRY[strategy]
+    except KeyError:
+        raise KeyError(f"Unknown strategy {strategy!r}; available: {available()}") from None
+
+
+def available() -> List[str]:
+    _load()
+    return sorted(_REGISTRY)
@@ -0,0 +1,61 @@
+"""Strategie wbudowane (rejestrowane przy pierwszym użyciu rejestru)."""
+
+from __future__ import annotations
+
+from typing import Any, List, Mapping, Sequence
+
+import numpy as np
+
+from .base import Param, Strategy, register
+
+
+def _sign(x: np.ndarray) -> np.ndarray:
+    """Znak jako int8; NaN (rozgrzewka wskaźników) → 0."""
+    return np.nan_to_num(np.sign(x), nan=0.0).astype(np.int8)
+
+
+@register
+class EmaCross(Strategy):
+    """Przecięcie EMA(fast) i EMA(slow): +1 gdy szybka nad wolną, −1 pod."""
+
+    name = "ema_cross"
+    space = {"fast": Param(12, 2, 50, 1), "slow": Param(26, 5, 200, 5)}
+    pointwise = True
+
+    def valid(self, params: Mapping[str, Any]) -> bool:
+        return params["fast"] < params["slow"]
+
+    def needs(self, params: Mapping[str, Any]) -> List[str]:
+        return [f"ema_{params['fast']}", f"ema_{params['slow']}"]
+
+    def signal(self, data: Mapping[str, np.ndarray], params: Mapping[str, Any]) -> np.ndarray:
+        return _sign(data[f"ema_{params['fast']}"] - data[f"ema_{params['slow']}"])
+
+    def signal_matrix(self, data: Mapping[str, np.ndarray], param_sets: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        # każda EMA raz w macierzy (okresy × świece), różnice jednym odejmowaniem z fancy indexingiem
+        periods = sorted({p[k] for p in param_sets for k in ("fast", "slow")})
+        row = {p: i for i, p in enumerate(periods)}
+        emas = np.stack([data[f"ema_{p}"] for p in periods]) if periods else np.empty((0, len(data["close"])))
+        fi = [row[p["fast"]] for p in param_sets]
+        si = [row[p["slow"]] for p in param_sets]
+        return _sign(emas[fi] - emas[si])
+
+
+@register
+class Donchian(Strategy):
+    """Wybicie kanału Donchiana: close powyżej max(high) z ``n`` poprzednich świec → +1, poniżej min(low) → −1."""
+
+    name = "donchian"
+    space = {"n": Param(20, 5, 100, 5)}
+    pointwise = True
+
+    def needs(self, params: Mapping[str, Any]) -> List[str]:
+        return [f"hhv_{params['n']}", f"llv_{params['n']}"]
+
+    def signal(self, data: Mapping[str, np.ndarray], params: Mapping[str, Any]) -> np.ndarray:
+        close, n = data["close"], params["n"]
+        sig = np.zeros(len(close), dtype=np.int8)
+        with np.errstate(invalid="ignore"):
+            sig[close > data[f"hhv_{n}"]] = 1
+            sig[close < data[f"llv_{n}"]] = -1
+        return sig
@@ -1,6 +1,19 @@
 """Pakiet narzędzi pomocniczych (logger, timing, config…)."""
 
-from .log import setup_logger
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .log import setup_logger
 
 __all__: list[str] = ["setup_logger"]
 
+
+def __getattr__(name: str) -> Any:
+    # leniwy import – structlog ładuje się dopiero przy konfiguracji loggera
+    if name == "setup_logger":
+        from .log import setup_logger
+
+        return setup_logger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,228 @@
+"""Histogramy opóźnień (HDR‑style) i eksport w formacie Prometheus.
+
+``LatencyHistogram`` trzyma liczniki w kubełkach log‑liniowych: wartości < 256 ns
+dokładnie, wyżej 128 kubełków na każdą potęgę dwójki (błąd względny < 0,8 %),
+zakres do 2⁶³ ns w stałych 7296 licznikach. Zapis to kilka operacji na intach –
+bez alokacji i bez sortowania – więc można mierzyć każde zdarzenie, a percentyle
+(p50/p99/p99.9) liczą się z liczników na żądanie.
+
+``LatencyMonitor`` to zestaw histogramów per etap z pomiarem zegarem monotonicznym
+(``time.perf_counter_ns``)::
+
+    mon = LatencyMonitor()
+    with mon.stage("router"):
+        router.market_order(order)
+    print(mon.report())
+    mon.write_prometheus("metrics/forest.prom")     # textfile collector
+    mon.serve(9108)                                 # albo endpoint /metrics
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+__all__ = ["LatencyHistogram", "LatencyMonitor", "QUANTILES"]
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+_SUB_BITS = 7
+_SUB = 1 << _SUB_BITS                  # kubełki na potęgę dwójki
+_LINEAR = 2 * _SUB                     # poniżej: wartość = indeks
+_MAX = (1 << 63) - 1                   # większe wartości liczone jako _MAX (int64)
+_SIZE = (63 - _SUB_BITS + 1) * _SUB
+
+
+def _index(v: int) -> int:
+    if v < _LINEAR:
+        return v if v > 0 else 0
+    v = min(v, _MAX)
+    shift = v.bit_length() - _SUB_BITS - 1
+    return (shift << _SUB_BITS) + (v >> shift)
+
+
+def _upper(idx: np.ndarray) -> np.ndarray:
+    """Największa wartość mieszcząca się w kubełku (jak ``highestEquivalentValue`` w HdrHistogram)."""
+    idx = np.asarray(idx, dtype=np.int64)
+    shift = np.maximum((idx >> _SUB_BITS) - 1, 0)
+    mant = idx - (shift << _SUB_BITS)
+    return np.where(idx < _LINEAR, idx, (mant << shift) + ((1 << shift) - 1))
+
+
+class LatencyHistogram:
+    """Histogram czasów w ns; ``record`` O(1), percentyle z liczników."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+    counts: List[int]
+    count: int
+    total: int
+    min: int
+    max: int
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def record(self, ns: int) -> None:
+        self.counts[_index(ns)] += 1
+        if self.count == 0 or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+
+    def record_many(self, values: Iterable[int]) -> None:
+        for v in values:
+            self.record(int(v))
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if not other.count:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self) -> None:
+        self.counts = [0] * _SIZE
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, qs: Iterable[float] = QUANTILES) -> Dict[float, int]:
+        """Kwantyle (0–1) w ns: górna granica kubełka, przycięta do maksimum."""
+        qs = tuple(qs)
+        if not self.count:
+            return {q: 0 for q in qs}
+        cum = np.cumsum(self.counts)
+        ranks = np.maximum(np.ceil(np.asarray(qs, dtype=np.float64) * self.count), 1)
+        vals = np.minimum(_upper(np.searchsorted(cum, ranks)), self.max)
+        return {q: int(v) for q, v in zip(qs, vals)}
+
+    def percentile(self, q: float) -> int:
+        return self.percentiles((q,))[q]
+
+
+class _Span:
+    __slots__ = ("_hist", "_t0")
+
+    def __init__(self, hist: LatencyHistogram) -> None:
+        self._hist = hist
+
+    def __enter__(self) -> "_Span":
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._hist.record(time.perf_counter_ns() - self._t0)
+
+
+class LatencyMonitor:
+    """Histogramy per etap + eksport (tabela, Prometheus text format, endpoint HTTP)."""
+
+    def __init__(self, name: str = "forest_latency") -> None:
+        self.name = name
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self._spans: Dict[str, _Span] = {}
+        self._lock = threading.Lock()       # eksport z wątku serwera vs. zapis w pętli
+
+    def hist(self, stage: str) -> LatencyHistogram:
+        h = self.stages.get(stage)
+        if h is None:
+            h = self.stages[stage] = LatencyHistogram()
+        return h
+
+    def stage(self, stage: str) -> _Span:
+        """Context manager mierzący etap (obiekt współdzielony – bez alokacji na pomiar)."""
+        span = self._spans.get(stage)
+        if span is None:
+            span = self._spans[stage] = _Span(self.hist(stage))
+        return span
+
+    def record(self, stage: str, ns: int) -> None:
+        self.hist(stage).record(ns)
+
+    def reset(self) -> None:
+        for h in self.stages.values():
+            h.reset()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.stages)
+
+    # ---------- eksport ----------
+    def snapshot(self, qs: Iterable[float] = QUANTILES) -> Dict[str, Dict[str, float]]:
+        """Etap -> count / mean / max / pXX (ns)."""
+        qs = tuple(qs)
+        with self._lock:
+            out: Dict[str, Dict[str, float]] = {}
+            for stage, h in self.stages.items():
+                row: Dict[str, float] = {"count": h.count, "mean": h.mean, "max": h.max}
+                row |= {f"p{q * 100:g}": v for q, v in h.percentiles(qs).items()}
+                out[stage] = row
+        return out
+
+    def report(self) -> str:
+        lines = [f"{'stage':<16}{'count':>10}{'p50 µs':>10}{'p99 µs':>10}{'p99.9 µs':>10}{'max µs':>10}"]
+        for stage, r in self.snapshot((0.5, 0.99, 0.999)).items():
+            lines.append(
+                f"{stage:<16}{int(r['count']):>10}{r['p50'] / 1e3:>10.1f}{r['p99'] / 1e3:>10.1f}"
+                f"{r['p99.9'] / 1e3:>10.1f}{r['max'] / 1e3:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self) -> str:
+        """Metryki jako ``summary`` w formacie tekstowym Prometheusa (sekundy)."""
+        m = f"{self.name}_seconds"
+        lines = [f"# HELP {m} Latency of forest live stages.", f"# TYPE {m} summary"]
+        with self._lock:
+            for stage, h in self.stages.items():
+                for q, v in h.percentiles().items():
+                    lines.append(f'{m}{{stage="{stage}",quantile="{q:g}"}} {v / 1e9:.9f}')
+                lines.append(f'{m}_sum{{stage="{stage}"}} {h.total / 1e9:.9f}')
+                lines.append(f'{m}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path) -> Path:
+        """Zapis atomowy (tmp + rename) – node_exporter nie zobaczy połowy pliku."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1"):
+        """Endpoint ``/metrics`` w wątku w tle; zwraca serwer (``shutdown()`` kończy)."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        monitor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = monitor.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                return None
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="forest-metrics", daemon=True).start()
+        return server
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import sys
-from typing import Any, Optional
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, Any, Callable, Literal, MutableMapping, Optional
 
-import structlog
+# ``log`` / ``logger`` są dostępne leniwie przez __getattr__ (poza __all__)
+__all__ = ["setup_logger", "get_logger", "is_enabled", "shutdown_logger"]
 
-__all__ = ["setup_logger", "get_logger", "log", "logger"]
+Overflow = Literal["drop", "block"]
 
 _CONFIGURED = False
+_LEVEL = logging.INFO
+_JSON = False
+_WRITER: "_AsyncWriter | None" = None
 
 
 def _to_level(level: str | int) -> int:
@@ -20,55 +29,307 @@ def _to_level(level: str | int) -> int:
         return logging.INFO
 
 
-def setup_logger(level: str | int = "INFO", json: bool = False):
+# ---------------------------------------------------------------------------#
+#  Tryb asynchroniczny: kolejka + wątek piszący                              #
+# ---------------------------------------------------------------------------#
+def _json_renderer() -> Callable[[dict], str]:
+    """Najszybszy dostępny serializer JSON (orjson, jeśli zainstalowany)."""
+    try:
+        import orjson
+
+        def render(event_dict: dict) -> str:
+            return orjson.dumps(event_dict, default=str).decode()
+
+    except ImportError:  # pragma: no cover - zależy od środowiska
+        import json
+
+        def render(event_dict: dict) -> str:
+            return json.dumps(event_dict, default=str, separators=(",", ":"))
+
+    return render
+
+
+def _console_renderer() -> Callable[[dict], str]:
+    import structlog
+
+    console = structlog.dev.ConsoleRenderer(colors=False)
+    return lambda event_dict: console(None, "", event_dict)
+
+
+class _AsyncWriter(threading.Thread):
+    """Wątek opróżniający ograniczony bufor i zapisujący zdarzenia paczkami.
+
+    Wątek wywołujący robi tylko ``deque.append`` (bez budzenia innych wątków) –
+    renderowanie i I/O odbywają się tutaj, co ``flush_interval`` s albo po zebraniu
+    ``batch_size`` zdarzeń. Przy ``overflow="drop"`` nadmiarowe zdarzenia są liczone
+    w ``dropped`` i odrzucane, przy ``"block"`` producent czeka na miejsce (backpressure).
+    Po ``stop`` zdarzenia (np. z loggerów zbuforowanych przez structlog) są zapisywane
+    od razu w wątku wywołującym – nic nie ginie i kolejka już nie rośnie.
+    """
+
+    def __init__(
+        self,
+        stream: IO[str],
+        render: Callable[[dict], str],
+        *,
+        maxsize: int = 10_000,
+        overflow: Overflow = "drop",
+        batch_size: int = 256,
+        flush_interval: float = 0.2,
+        owns_stream: bool = False,
+    ) -> None:
+        super().__init__(name="forest-log-writer", daemon=True)
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Nieznana polityka przepełnienia: {overflow!r}")
+        self._buf: deque[dict] = deque()
+        self._maxsize = max(int(maxsize), 1)
+        self._stream = stream
+        self._render = render
+        self._block = overflow == "block"
+        self._batch_size = max(int(batch_size), 1)
+        self._flush_interval = flush_interval
+        self._owns_stream = owns_stream
+        self._wake = threading.Event()
+        self._stopping = False
+        self._stopped = False
+        self.dropped = 0
+        self.written = 0
+
+    def submit(self, event_dict: dict) -> None:
+        if self._stopped:
+            self._write_now(event_dict)
+            return
+        buf = self._buf
+        if len(buf) >= self._maxsize:
+            if not self._block:
+                self.dropped += 1
+                return
+            while len(buf) >= self._maxsize and self.is_alive():
+                self._wake.set()
+                time.sleep(0.0005)
+        buf.append(event_dict)
+        if len(buf) == self._batch_size:
+            self._wake.set()
+
+    def _write_now(self, event_dict: dict) -> None:
+        stream = sys.stdout if self._stream.closed else self._stream
+        try:
+            line = self._render(event_dict)
+        except Exception as exc:  # pragma: no cover
+            line = f"log_render_error: {exc!r}"
+        stream.write(line + "\n")
+        stream.flush()
+        self.written += 1
+
+    def _drain(self) -> None:
+        buf = self._buf
+        while buf:
+            lines = []
+            for _ in range(min(len(buf), self._batch_size)):
+                item = buf.popleft()
+                try:
+                    lines.append(self._render(item))
+                except Exception as exc:  # pragma: no cover - nie zabijamy wątku logów
+                    lines.append(f"log_render_error: {exc!r}")
+            self._stream.write("\n".join(lines) + "\n")
+            self.written += len(lines)
+        self._stream.flush()
+
+    def run(self) -> None:
+        while True:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            self._drain()
+            if stopping:
+                break
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Dopisz zaległe zdarzenia i zakończ wątek."""
+        if self.is_alive():
+            self._stopping = True
+            self._wake.set()
+            self.join(timeout)
+        self._stopped = True
+        self._drain()              # to, co zdążyło wpaść po ostatnim przebiegu wątku
+        if self._owns_stream:
+            self._stream.close()
+
+
+class _QueueLogger:
+    """Logger structlog, który przekazuje gotowy event dict do wątku piszącego."""
+
+    __slots__ = ("_writer",)
+
+    def __init__(self, writer: _AsyncWriter) -> None:
+        self._writer = writer
+
+    def msg(self, event_dict: dict) -> None:
+        self._writer.submit(event_dict)
+
+    log = debug = info = warn = warning = error = err = critical = exception = fatal = failure = msg
+
+
+def _enqueue(_logger: Any, _name: str, event_dict: MutableMapping[str, Any]) -> tuple[Any, ...]:
+    # ostatni procesor: zwracamy (args, kwargs) → _QueueLogger.<metoda>(event_dict)
+    return (event_dict,), {}
+
+
+# ---------------------------------------------------------------------------#
+#  Konfiguracja                                                              #
+# ---------------------------------------------------------------------------#
+def setup_logger(
+    level: str | int = "INFO",
+    json: bool = False,
+    *,
+    async_mode: bool = False,
+    file: str | Path | None = None,
+    queue_size: int = 10_000,
+    overflow: Overflow = "drop",
+    batch_size: int = 256,
+    force: bool = False,
+):
     """
     Idempotentna konfiguracja structlog + stdlib logging.
-    Zwraca BoundLogger; można wywoływać wielokrotnie bez skutków ubocznych.
+    Zwraca BoundLogger; można wywoływać wielokrotnie bez skutków ubocznych
+    (``force=True`` wymusza ponowną konfigurację).
+
+    ``async_mode=True`` przełącza na nieblokujący potok: wywołanie loggera tylko
+    wkłada event dict do ograniczonego bufora (``queue_size``), a osobny wątek
+    renderuje (JSON lub konsola) i zapisuje paczkami po ``batch_size`` do ``file``
+    lub stdout. ``overflow`` decyduje, czy przy pełnej kolejce gubimy zdarzenia
+    (``"drop"``), czy spowalniamy producenta (``"block"``).
     """
-    global _CONFIGURED
-    if not _CONFIGURED:
-        # stdlib logging -> minimalne ustawienia na stdout
-        logging.basicConfig(
-            level=_to_level(level),
-            format="%(message)s",
-            stream=sys.stdout,
-        )
+    import structlog
 
-        processors: list[Any] = [
-            structlog.processors.TimeStamper(fmt="iso", utc=True),
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-        ]
-        if json:
-            processors.append(structlog.processors.JSONRenderer())
+    global _CONFIGURED, _LEVEL, _JSON, _WRITER
+    if _CONFIGURED and not force:
+        return structlog.get_logger("forest")
+
+    _stop_writer()
+    _LEVEL = _to_level(level)
+    _JSON = json
+
+    if async_mode:
+        if file is not None:
+            stream: IO[str] = open(file, "a", encoding="utf-8", buffering=1 << 16)
         else:
-            # Czytelny renderer do dev/testów
-            processors.append(structlog.dev.ConsoleRenderer())
+            stream = sys.stdout
+        _WRITER = _AsyncWriter(
+            stream,
+            _json_renderer() if json else _console_renderer(),
+            maxsize=queue_size,
+            overflow=overflow,
+            batch_size=batch_size,
+            owns_stream=file is not None,
+        )
+        _WRITER.start()
 
         structlog.configure(
-            processors=processors,
-            wrapper_class=structlog.make_filtering_bound_logger(_to_level(level)),
-            logger_factory=structlog.stdlib.LoggerFactory(),
+            processors=[
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt=None, utc=True),  # float epoch – bez formatowania
+                structlog.processors.format_exc_info,
+                _enqueue,
+            ],
+            wrapper_class=structlog.make_filtering_bound_logger(_LEVEL),
+            logger_factory=lambda *_args: _QueueLogger(_WRITER),
             cache_logger_on_first_use=True,
         )
-        _CONFIGURED = True
+    else:
+        _configure_sync(json, force)
+    _CONFIGURED = True
 
     return structlog.get_logger("forest")
 
 
+def _configure_sync(json: bool, force: bool) -> None:
+    import structlog
+
+    # stdlib logging -> minimalne ustawienia na stdout
+    logging.basicConfig(
+        level=_LEVEL,
+        format="%(message)s",
+        stream=sys.stdout,
+        force=force,
+    )
+
+    processors: list[Any] = [
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+        structlog.processors.add_log_level,
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+    ]
+    if json:
+        processors.append(structlog.processors.JSONRenderer())
+    else:
+        # Czytelny renderer do dev/testów
+        processors.append(structlog.dev.ConsoleRenderer())
+
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(_LEVEL),
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+
+def is_enabled(level: str | int) -> bool:
+    """Czy dany poziom jest aktywny? Pozwala pominąć budowę kosztownego payloadu.
+
+    Wyłączone poziomy i tak są no-opami (``make_filtering_bound_logger``), ale
+    argumenty wywołania powstają przed sprawdzeniem – w gorących pętlach warto::
+
+        if is_enabled("DEBUG"):
+            log.debug("bar", **expensive_payload())
+    """
+    return _to_level(level) >= _LEVEL
+
+
+def _stop_writer(timeout: float | None = 5.0) -> dict[str, int]:
+    global _WRITER
+    stats = {"written": 0, "dropped": 0}
+    if _WRITER is not None:
+        _WRITER.stop(timeout)
+        stats = {"written": _WRITER.written, "dropped": _WRITER.dropped}
+        _WRITER = None
+    return stats
+
+
+def shutdown_logger(timeout: float | None = 5.0) -> dict[str, int]:
+    """Zatrzymaj wątek piszący (jeśli działa) i zwróć statystyki: zapisane / odrzucone.
+
+    Po zatrzymaniu structlog wraca do trybu synchronicznego (ten sam poziom i format),
+    więc ``get_logger`` działa dalej – także po ``atexit``.
+    """
+    global _CONFIGURED
+    if _WRITER is None:
+        return _stop_writer(timeout)
+    stats = _stop_writer(timeout)
+    _configure_sync(_JSON, force=False)
+    _CONFIGURED = False
+    return stats
+
+
+atexit.register(shutdown_logger)
+
+
 def get_logger(name: Optional[str] = None):
     """
     Pobiera BoundLogger. Gwarantuje, że konfiguracja istnieje.
     """
+    import structlog
+
     if not _CONFIGURED:
         setup_logger()
     return structlog.get_logger(name) if name else structlog.get_logger()
 
 
-# Domyślny logger eksportowany dla wygody importów:
-#   from forest.utils.log import log
-log = setup_logger()
-# Alias zgodny z niektórymi stylami:
-logger = log
-
+def __getattr__(name: str) -> Any:
+    # Domyślny logger eksportowany dla wygody importów:
+    #   from forest.utils.log import log
+    # Konfiguracja nie dzieje się już przy imporcie modułu – dopiero przy pierwszym
+    # sięgnięciu po ``log``/``logger`` (albo jawnie przez ``setup_logger``).
+    if name in ("log", "logger"):  # ``logger`` – alias zgodny z niektórymi stylami
+        return get_logger("forest")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
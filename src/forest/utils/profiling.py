@@ -0,0 +1,241 @@
+"""Lekka instrumentacja gorących ścieżek: timery i liczniki per etap.
+
+Domyślnie wyłączona – ``timer`` zwraca wtedy współdzielony no-op, a ``timed``
+kosztuje jedno sprawdzenie flagi. Po ``enable()`` (lub w bloku ``profiling()``)
+zbieramy (liczba wywołań, łączny czas w ns) dla każdego etapu::
+
+    from forest.utils import profiling
+
+    with profiling.profiling():
+        res = run_grid(df, grid)
+    print(profiling.report(res.attrs["profile"]))
+
+Statystyki są per proces; ``run_grid`` zbiera delty z workerów joblib i scala je
+(``merge``) w wyniku. ``capture`` uruchamia pojedyncze wywołanie pod cProfile
+albo pyinstrument.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Literal, TypeVar
+
+__all__ = [
+    "enable",
+    "disable",
+    "is_enabled",
+    "reset",
+    "timer",
+    "timed",
+    "incr",
+    "snapshot",
+    "delta",
+    "merge",
+    "absorb",
+    "report",
+    "profiling",
+    "capture",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+Snapshot = dict[str, dict[str, tuple[int, int]]]
+
+_ENABLED = False
+_STAGES: dict[str, list[int]] = {}    # etap -> [liczba, łączny czas ns]
+_COUNTERS: dict[str, int] = {}
+
+
+# ---------- przełączniki ----------
+def enable(on: bool = True) -> None:
+    global _ENABLED
+    _ENABLED = bool(on)
+
+
+def disable() -> None:
+    enable(False)
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    _STAGES.clear()
+    _COUNTERS.clear()
+
+
+# ---------- pomiar ----------
+class _Timer:
+    __slots__ = ("_stage", "_t0")
+
+    def __init__(self, stage: str) -> None:
+        self._stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        _add(self._stage, time.perf_counter_ns() - self._t0)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopTimer()
+
+
+def _add(stage: str, ns: int, count: int = 1) -> None:
+    slot = _STAGES.get(stage)
+    if slot is None:
+        _STAGES[stage] = [count, ns]
+    else:
+        slot[0] += count
+        slot[1] += ns
+
+
+def timer(stage: str) -> _Timer | _NoopTimer:
+    """Context manager mierzący etap (no-op, gdy instrumentacja wyłączona)."""
+    return _Timer(stage) if _ENABLED else _NOOP
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Dekorator: mierzy każde wywołanie funkcji jako ``stage``."""
+
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add(stage, time.perf_counter_ns() - t0)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+def incr(name: str, n: int = 1) -> None:
+    if _ENABLED:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+# ---------- agregacja ----------
+def snapshot() -> Snapshot:
+    """Kopia bieżących statystyk procesu (picklowalna – wraca z workerów)."""
+    return {
+        "stages": {k: (v[0], v[1]) for k, v in _STAGES.items()},
+        "counters": {k: (v, 0) for k, v in _COUNTERS.items()},
+    }
+
+
+def delta(after: Snapshot, before: Snapshot) -> Snapshot:
+    """Różnica dwóch snapshotów (to, co przybyło między nimi)."""
+    out: Snapshot = {"stages": {}, "counters": {}}
+    for part in ("stages", "counters"):
+        prev = before.get(part, {})
+        for k, (n, ns) in after.get(part, {}).items():
+            pn, pns = prev.get(k, (0, 0))
+            if n != pn or ns != pns:
+                out[part][k] = (n - pn, ns - pns)
+    return out
+
+
+def merge(snapshots: Iterable[Snapshot]) -> Snapshot:
+    """Zsumuj snapshoty (np. z wielu procesów workerów)."""
+    out: Snapshot = {"stages": {}, "counters": {}}
+    for snap in snapshots:
+        for part in ("stages", "counters"):
+            acc = out[part]
+            for k, (n, ns) in snap.get(part, {}).items():
+                pn, pns = acc.get(k, (0, 0))
+                acc[k] = (pn + n, pns + ns)
+    return out
+
+
+def absorb(snap: Snapshot) -> None:
+    """Dolicz snapshot (np. delta z innego procesu) do statystyk bieżącego procesu."""
+    for k, (n, ns) in snap.get("stages", {}).items():
+        _add(k, ns, n)
+    for k, (n, _) in snap.get("counters", {}).items():
+        _COUNTERS[k] = _COUNTERS.get(k, 0) + n
+
+
+def report(snap: Snapshot | None = None) -> str:
+    """Czytelna tabelka: etap, liczba wywołań, łączny i średni czas."""
+    snap = snapshot() if snap is None else snap
+    lines = [f"{'stage':<28}{'calls':>10}{'total [s]':>12}{'mean [ms]':>12}"]
+    for k, (n, ns) in sorted(snap.get("stages", {}).items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{k:<28}{n:>10}{ns / 1e9:>12.4f}{ns / 1e6 / max(n, 1):>12.3f}")
+    for k, (n, _) in sorted(snap.get("counters", {}).items()):
+        lines.append(f"{k:<28}{n:>10}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiling(on: bool = True, *, fresh: bool = True) -> Iterator[None]:
+    """Włącz instrumentację na czas bloku (domyślnie od czystych statystyk)."""
+    prev = _ENABLED
+    if fresh:
+        reset()
+    enable(on)
+    try:
+        yield
+    finally:
+        enable(prev)
+
+
+# ---------- pełne profilowanie pojedynczego wywołania ----------
+def capture(
+    fn: Callable[..., Any],
+    *args: Any,
+    backend: Literal["cprofile", "pyinstrument"] = "cprofile",
+    output: str | None = None,
+    limit: int = 30,
+    **kwargs: Any,
+) -> tuple[Any, str]:
+    """Uruchom ``fn(*args, **kwargs)`` pod profilerem; zwraca (wynik, raport tekstowy).
+
+    ``output`` – opcjonalna ścieżka: ``.prof`` (pstats, cProfile) albo ``.html``
+    (pyinstrument).
+    """
+    if backend == "pyinstrument":
+        from pyinstrument import Profiler
+
+        prof = Profiler()
+        prof.start()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            prof.stop()
+        if output:
+            with open(output, "w", encoding="utf-8") as fh:
+                fh.write(prof.output_html())
+        return result, prof.output_text()
+
+    if backend != "cprofile":
+        raise ValueError(f"Nieznany backend profilera: {backend!r}")
+
+    import cProfile
+    import io
+    import pstats
+
+    prof = cProfile.Profile()
+    result = prof.runcall(fn, *args, **kwargs)
+    if output:
+        prof.dump_stats(output)
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(limit)
+    return result, buf.getvalue()
@@ -1,10 +1,38 @@
+"""Kontrola jakości danych OHLC przed backtestem.
+
+``validate_ohlc`` przechodzi ramkę raz, wektorowo (numpy na kolumnach i ``asi8``
+indeksu), i zwraca ``ValidationReport``:
+
+* błędy – NaN/inf, ceny ≤ 0, niespójne OHLC (``high < max(open, close)``,
+  ``low > min(open, close)``), duplikaty i cofnięcia czasu, szpilki (izolowany
+  skok ceny albo knot daleko poza odporną skalą log‑zwrotów),
+* luki – serie brakujących świec z podziałem na ``weekend``, ``session`` (< 1 dnia,
+  np. przerwa rolloveru) i ``gap``.
+
+Raport jest cache'owany po odcisku danych (w pamięci, opcjonalnie ``cache_dir``),
+więc ten sam zbiór sprawdzany jest raz. ``repair_ohlc`` naprawia to, co wskazał
+raport, i nie kopiuje ramki, gdy nie ma czego naprawiać::
+
+    rep = validate_ohlc(df, timeframe="1h")
+    if not rep.ok:
+        print(rep.summary())
+        df = repair_ohlc(df, rep)
+"""
+
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Sequence
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Sequence
 
+import numpy as np
 import pandas as pd
 
+from forest.utils import profiling
+from forest.utils.timeframes import to_minutes
+
 
 @dataclass(frozen=True)
 class FrameCheckResult:
@@ -14,11 +42,257 @@ class FrameCheckResult:
 
 REQUIRED_OHLC: tuple[str, ...] = ("open", "high", "low", "close")
 
+# kategorie błędów w kolejności raportu; luki są osobno (weekend nie jest błędem)
+ISSUES: tuple[str, ...] = ("nan", "nonpositive", "ohlc", "duplicate", "unsorted", "spike")
+
+_DAY_NS = 86_400 * 10**9
+
+
+# ---------- raport ----------
+@dataclass(frozen=True, eq=False)
+class ValidationReport:
+    n: int
+    step: int                                   # krok świecy [ns] (podany albo mediana)
+    rows: Dict[str, np.ndarray]                 # kategoria → pozycje (iloc) wadliwych świec
+    gaps: pd.DataFrame                          # start, end, missing, kind
+    fingerprint: str | None = None
+    params: tuple = ()                          # (krok, spike_sigma) – klucz cache
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {k: int(len(self.rows[k])) for k in ISSUES}
+
+    @property
+    def ok(self) -> bool:
+        """Brak błędów (luki weekendowe i sesyjne są dopuszczalne)."""
+        return not any(self.counts.values())
+
+    @property
+    def missing_bars(self) -> int:
+        """Brakujące świece poza weekendami."""
+        g = self.gaps
+        return int(g.loc[g["kind"] != "weekend", "missing"].sum())
+
+    def to_check(self) -> FrameCheckResult:
+        return FrameCheckResult(self.ok, None if self.ok else self.summary())
+
+    def summary(self) -> str:
+        errs = ", ".join(f"{k}={v}" for k, v in self.counts.items() if v) or "no errors"
+        kinds = self.gaps["kind"].value_counts().to_dict()
+        gaps = ", ".join(f"{k}={kinds[k]}" for k in ("gap", "session", "weekend") if k in kinds) or "none"
+        return f"{self.n} bars: {errs}; gaps: {gaps} ({self.missing_bars} missing bars outside weekends)"
+
+
+# ---------- walidacja ----------
+def _robust_scale(x: np.ndarray) -> float:
+    """Odchylenie z MAD (odporne na same szpilki)."""
+    x = x[np.isfinite(x)]
+    if not len(x):
+        return 0.0
+    med = np.median(x)
+    return 1.4826 * float(np.median(np.abs(x - med)))
+
+
+def _gap_table(ts: np.ndarray, d: np.ndarray, step: int, tz) -> pd.DataFrame:
+    at = np.flatnonzero(d > step) if step > 0 else np.empty(0, dtype=np.int64)
+    start, end = ts[at], ts[at + 1]
+    missing = (end - start) // step - 1
+    dur = end - start
+    # weekend: luka zaczyna się w pt/sob, kończy w nd/pn i trwa najwyżej 3 dni
+    wd_start = (start // _DAY_NS + 3) % 7                      # 1970‑01‑01 to czwartek → pn = 0
+    wd_end = (end // _DAY_NS + 3) % 7
+    weekend = np.isin(wd_start, (4, 5)) & np.isin(wd_end, (6, 0)) & (dur <= 3 * _DAY_NS)
+    kind = np.where(weekend, "weekend", np.where(dur < _DAY_NS, "session", "gap"))
+    return pd.DataFrame(
+        {
+            "start": pd.DatetimeIndex(start, tz="UTC").tz_convert(tz),
+            "end": pd.DatetimeIndex(end, tz="UTC").tz_convert(tz),
+            "missing": missing.astype(np.int64),
+            "kind": kind,
+        }
+    )
+
+
+@profiling.timed("validate.scan")
+def _scan(df: pd.DataFrame, step: int | None, spike_sigma: float) -> ValidationReport:
+    o, h, lo, c = (df[k].to_numpy(dtype=np.float64) for k in REQUIRED_OHLC)
+    n = len(c)
+    rows: Dict[str, np.ndarray] = {}
+
+    finite = np.isfinite(o) & np.isfinite(h) & np.isfinite(lo) & np.isfinite(c)
+    rows["nan"] = np.flatnonzero(~finite)
+    with np.errstate(invalid="ignore"):
+        rows["nonpositive"] = np.flatnonzero(finite & ((o <= 0) | (h <= 0) | (lo <= 0) | (c <= 0)))
+        top, bot = np.maximum(o, c), np.minimum(o, c)
+        rows["ohlc"] = np.flatnonzero(finite & ((h < top) | (lo > bot) | (h < lo)))
+
+    idx = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(df.index)
+    ts = idx.asi8
+    d = np.diff(ts)
+    rows["duplicate"] = np.flatnonzero(d == 0) + 1
+    rows["unsorted"] = np.flatnonzero(d < 0) + 1
+    if step is None:
+        pos = d[d > 0]
+        step = int(np.median(pos)) if len(pos) else 0
+    gaps = _gap_table(ts, d, step, idx.tz)
+
+    # szpilki: log‑zwrot > k·σ z natychmiastowym powrotem albo knot > k·σ poza korpus
+    good = finite & (lo > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lc = np.where(good, np.log(np.where(good, c, 1.0)), np.nan)
+        r = np.diff(lc)
+        sigma = _robust_scale(r)
+        spike = np.zeros(n, dtype=bool)
+        if sigma > 0 and n > 2:
+            lim = spike_sigma * sigma
+            jump, back = r[:-1], r[1:]
+            spike[1:-1] = (np.abs(jump) > lim) & (np.abs(back) > lim / 2) & (np.sign(jump) != np.sign(back))
+            wick = np.maximum(np.log(h / top), np.log(bot / lo))
+            spike |= good & (wick > lim)
+    rows["spike"] = np.flatnonzero(spike)
+    return ValidationReport(n=n, step=int(step), rows=rows, gaps=gaps, params=(step, float(spike_sigma)))
+
+
+_CACHE: OrderedDict[tuple, ValidationReport] = OrderedDict()
+_CACHE_SIZE = 32
+
+
+def validate_ohlc(
+    df: pd.DataFrame,
+    *,
+    timeframe: str | None = None,
+    spike_sigma: float = 10.0,
+    cache: bool = True,
+    cache_dir: str | Path | None = None,
+) -> ValidationReport:
+    """Raport jakości OHLC; ``timeframe=None`` → krok z mediany odstępów indeksu.
+
+    ``cache=True`` – raport zapamiętany pod (odcisk danych, parametry); ``cache_dir``
+    dodatkowo zapisuje go na dysku (``<odcisk>.pkl``) – między procesami.
+    """
+    if any(col not in df.columns for col in REQUIRED_OHLC):
+        missing = [c for c in REQUIRED_OHLC if c not in df.columns]
+        raise ValueError(f"Missing required columns: {missing}")
+    step = to_minutes(timeframe) * 60 * 10**9 if timeframe else None
+    params = (step, float(spike_sigma))
+    if not cache:
+        return _scan(df, step, spike_sigma)
+
+    from forest.ml.features import fingerprint
+
+    fp = fingerprint(df)
+    key = (fp, params)
+    rep = _CACHE.get(key)
+    if rep is not None:
+        _CACHE.move_to_end(key)
+        profiling.incr("validate.cache_hit")
+        return rep
+    path = Path(cache_dir).expanduser() / f"{fp}.pkl" if cache_dir is not None else None
+    if path is not None and path.exists():
+        with path.open("rb") as fh:
+            stored = pickle.load(fh)
+        rep = stored.get(params) if isinstance(stored, dict) else None
+    if rep is None:
+        rep = _scan(df, step, spike_sigma)
+        rep = replace(rep, fingerprint=fp, params=params)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stored = {}
+            if path.exists():
+                with path.open("rb") as fh:
+                    stored = pickle.load(fh)
+            stored[params] = rep
+            tmp = path.with_suffix(".tmp")
+            with tmp.open("wb") as fh:
+                pickle.dump(stored, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+    else:
+        profiling.incr("validate.cache_hit")
+    _CACHE[key] = rep
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return rep
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+# ---------- naprawa ----------
+def repair_ohlc(
+    df: pd.DataFrame,
+    report: ValidationReport | None = None,
+    *,
+    spikes: str | None = "drop",
+    fill_gaps: bool = False,
+    max_fill: int = 12,
+) -> pd.DataFrame:
+    """Naprawia ramkę wg raportu; bez błędów (i bez ``fill_gaps``) zwraca ``df`` bez kopii.
+
+    * kolejność / duplikaty – sortowanie, zostaje ostatnia świeca z danym czasem,
+    * NaN i ceny ≤ 0 – świeca usuwana,
+    * niespójne OHLC – ``high``/``low`` rozszerzane do ``max``/``min`` z open/close,
+    * szpilki – ``"drop"`` usuwa świecę, ``"clip"`` przycina knot do korpusu,
+      ``None`` zostawia,
+    * ``fill_gaps`` – luki ``gap``/``session`` do ``max_fill`` świec wypełniane płaskimi
+      świecami po ostatnim zamknięciu (``volume`` = 0).
+    """
+    rep = report if report is not None else validate_ohlc(df)
+    cnt = rep.counts
+    want_fill = fill_gaps and bool(((rep.gaps["kind"] != "weekend") & (rep.gaps["missing"] <= max_fill)).any())
+    if not any(cnt[k] for k in ISSUES if k != "spike" or spikes) and not want_fill:
+        return df
+
+    out = df
+    if cnt["unsorted"] or cnt["duplicate"]:
+        out = out.sort_index(kind="stable")
+        out = out[~out.index.duplicated(keep="last")]
+        rep = _scan(out, rep.step or None, rep.params[1])
+    out = out.copy()
+    o, h, lo, c = (out[k].to_numpy(dtype=np.float64) for k in REQUIRED_OHLC)
+
+    drop = np.zeros(len(out), dtype=bool)
+    drop[rep.rows["nan"]] = True
+    drop[rep.rows["nonpositive"]] = True
+    if cnt["ohlc"]:
+        i = rep.rows["ohlc"]
+        out.iloc[i, out.columns.get_loc("high")] = np.maximum.reduce([h[i], o[i], c[i]])
+        out.iloc[i, out.columns.get_loc("low")] = np.minimum.reduce([lo[i], o[i], c[i]])
+    if spikes == "drop":
+        drop[rep.rows["spike"]] = True
+    elif spikes == "clip":
+        i = rep.rows["spike"]
+        out.iloc[i, out.columns.get_loc("high")] = np.maximum(o[i], c[i])
+        out.iloc[i, out.columns.get_loc("low")] = np.minimum(o[i], c[i])
+    elif spikes is not None:
+        raise ValueError(f"spikes must be 'drop', 'clip' or None, got {spikes!r}")
+    if drop.any():
+        out = out[~drop]
+
+    if fill_gaps:
+        g = rep.gaps[(rep.gaps["kind"] != "weekend") & (rep.gaps["missing"] <= max_fill)]
+        if len(g):
+            k = g["missing"].to_numpy()
+            base = np.repeat(pd.DatetimeIndex(g["start"]).asi8, k)
+            offs = np.concatenate([np.arange(1, m + 1) for m in k]) * rep.step
+            idx = pd.DatetimeIndex(base + offs, tz="UTC").tz_convert(out.index.tz)
+            fill = pd.DataFrame(index=idx, columns=out.columns, dtype=np.float64)
+            if "volume" in fill.columns:
+                fill["volume"] = 0.0
+            out = pd.concat([out, fill]).sort_index(kind="stable")
+            prev = out["close"].ffill()
+            for col in REQUIRED_OHLC:
+                out[col] = out[col].fillna(prev)
+    profiling.incr("validate.repaired")
+    return out
+
 
 def ensure_backtest_ready(
     df: pd.DataFrame,
     *,
     required: Sequence[str] = REQUIRED_OHLC,
+    check: bool = False,
+    repair: bool = False,
 ) -> pd.DataFrame:
     """
     Upewnia się, że ramka do backtestu:
@@ -26,8 +300,9 @@ def ensure_backtest_ready(
     - ma DatetimeIndex,
     - indeks jest posortowany rosnąco i bez duplikatów.
 
-    Funkcja działa defensywnie: nie zmienia wartości danych,
-    jedynie porządkuje indeks/czyszczy duplikaty i zwraca kopię.
+    Kopia powstaje tylko wtedy, gdy coś trzeba zmienić – czysta ramka wraca bez kopii.
+    ``check=True`` dodatkowo uruchamia ``validate_ohlc`` i rzuca ``ValueError`` przy
+    błędach danych; ``repair=True`` zamiast tego naprawia je ``repair_ohlc``.
     """
     if not isinstance(df, pd.DataFrame):
         raise TypeError("ensure_backtest_ready: expected pandas.DataFrame")
@@ -36,22 +311,27 @@ def ensure_backtest_ready(
         missing = [c for c in required if c not in df.columns]
         raise ValueError(f"Missing required columns: {missing}")
 
-    out = df.copy()
+    out = df
 
     # DatetimeIndex (jeżeli nie ma, spróbuj sparsować)
     if not isinstance(out.index, pd.DatetimeIndex):
         try:
-            out.index = pd.to_datetime(out.index)
+            out = out.set_axis(pd.to_datetime(out.index), axis=0)
         except Exception as exc:  # pragma: no cover
             raise ValueError("Cannot convert index to DatetimeIndex") from exc
 
     # sortuj rosnąco
     if not out.index.is_monotonic_increasing:
-        out = out.sort_index()
+        out = out.sort_index(kind="stable")
 
     # usuń duplikaty (zostaw ostatnią świecę dla powtarzającego się znacznika czasu)
     if out.index.has_duplicates:
         out = out[~out.index.duplicated(keep="last")]
 
+    if check or repair:
+        rep = validate_ohlc(out)
+        if repair:
+            out = repair_ohlc(out, rep)
+        elif not rep.ok:
+            raise ValueError(f"Data quality check failed: {rep.summary()}")
     return out
-
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest.catalog import ResultsCatalog, main, parse_filter
+from forest.backtest.grid import GridResult
+from forest.backtest.results import results_frame
+
+
+def _grid(seed: int, fast=range(5, 15), slow=range(30, 50, 5)) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return results_frame([GridResult({"fast": f, "slow": s}, *rng.random(5)) for f in fast for s in slow])
+
+
+@pytest.fixture
+def catalog(tmp_path) -> ResultsCatalog:
+    cat = ResultsCatalog(tmp_path / "catalog")
+    cat.add(_grid(0), symbol="EURUSD", timeframe="1h", date="2025-01-01")
+    cat.add(_grid(1), symbol="GBPUSD", timeframe="1h", date="2025-01-02")
+    cat.add(_grid(2), symbol="EURUSD", timeframe="15m", date="2025-01-03")
+    return cat
+
+
+def test_runs_index_and_layout(catalog):
+    runs = catalog.runs()
+    assert len(runs) == 3 and set(runs["symbol"]) == {"EURUSD", "GBPUSD"}
+    assert (catalog.root / runs.at[0, "path"]).exists()
+    assert "symbol=EURUSD/timeframe=1h/date=2025-01-01" in runs.at[0, "path"]
+    assert len(catalog.runs(symbol="EURUSD")) == 2
+
+
+def test_concurrent_adds_keep_every_run(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cat = ResultsCatalog(tmp_path / "catalog")
+
+    def add(i: int) -> str:
+        df = _grid(i, fast=range(5, 8), slow=[30])
+        if i % 2:
+            df["atr_multiple"] = 2.0                          # wymiar tylko w części przebiegów
+        return cat.add(df, symbol=f"S{i % 3}", timeframe="1h", date="2025-01-01")
+
+    with ThreadPoolExecutor(8) as pool:
+        ids = list(pool.map(add, range(16)))
+    assert sorted(cat.runs()["run_id"]) == sorted(ids)
+    assert "atr_multiple" in cat.param_names() and len(cat.query(columns=["fast"])) == 48
+    assert not (cat.root / "_lock").exists()
+
+
+def test_query_pushdown_and_projection(catalog):
+    df = catalog.query(["max_dd <= 0.3", ("fast", "between", (5, 9))], ["fast", "slow", "max_dd"], symbol="EURUSD")
+    expected = pd.concat([_grid(0), _grid(2)])
+    expected = expected[(expected["max_dd"] <= 0.3) & expected["fast"].between(5, 9)]
+    assert list(df.columns) == ["fast", "slow", "max_dd"]
+    assert len(df) == len(expected) and df["fast"].dtype == "int32"
+    assert catalog.query(date=("2025-01-02", "2025-01-03"), columns=["symbol"])["symbol"].nunique() == 2
+
+
+def test_top_k_matches_full_sort(catalog):
+    top = catalog.top_k(5, "rar", where=["max_dd <= 0.5"], columns=["fast", "slow"], batch_size=7)
+    full = pd.concat([_grid(0), _grid(1), _grid(2)])
+    full = full[full["max_dd"] <= 0.5].nlargest(5, "rar")
+    assert top["rar"].tolist() == full["rar"].tolist()
+
+
+def test_parse_filter():
+    assert parse_filter("max_dd <= 0.2") == ("max_dd", "<=", 0.2)
+    assert parse_filter("fast in 5, 10") == ("fast", "in", [5, 10])
+    assert parse_filter("fast between 5..20") == ("fast", "between", (5, 20))
+    with pytest.raises(ValueError):
+        parse_filter("max_dd ~ 1")
+
+
+def test_cli_top(catalog, tmp_path, capsys):
+    out = tmp_path / "top.csv"
+    assert main([str(catalog.root), "top", "-k", "3", "--by", "sharpe", "--symbol", "GBPUSD", "-o", str(out)]) == 0
+    assert len(pd.read_csv(out)) == 3
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest.engine import run_backtest
+from forest.backtest.risk import RiskManager
+from forest.core.indicators import atr, atr_resume, ema, ema_resume
+
+
+def _prices(n: int = 3000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame(
+        {"open": close, "high": close + rng.random(n) * 0.5, "low": close - rng.random(n) * 0.5, "close": close},
+        index=pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC"),
+    )
+
+
+def test_indicator_resume_is_bit_exact():
+    df = _prices(1000)
+    h, lo, c = (df[k].to_numpy() for k in ("high", "low", "close"))
+    head_ema, head_atr = ema(c[:700], 12), atr(h[:700], lo[:700], c[:700], 14)
+    assert np.array_equal(ema_resume(head_ema[-1], c[700:], 12), ema(c, 12)[700:])
+    assert np.array_equal(atr_resume(head_atr[-1], c[699], h[700:], lo[700:], c[700:], 14), atr(h, lo, c, 14)[700:])
+    h[800] = lo[800] = c[800]                                  # świeca bez zakresu nie zmienia historii
+    assert np.array_equal(atr_resume(head_atr[-1], c[699], h[700:], lo[700:], c[700:], 14), atr(h, lo, c, 14)[700:])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"fast": 8, "slow": 30}, {"strategy": "donchian", "params": {"n": 40}}, {"signal": "random"}],
+)
+def test_resume_matches_full_run(tmp_path, kwargs):
+    df = _prices()
+    if kwargs.get("signal") == "random":
+        kwargs = {"signal": np.random.default_rng(1).choice([-1, 0, 1], len(df))}
+    ck = tmp_path / "state.ckpt"
+    head_kwargs = {**kwargs, "signal": kwargs["signal"][:2500]} if "signal" in kwargs else kwargs
+
+    run_backtest(df.iloc[:2500], RiskManager(capital=10_000), checkpoint=ck, **head_kwargs)
+    resumed = run_backtest(df, RiskManager(capital=10_000), checkpoint=ck, **kwargs)
+    full = run_backtest(df, RiskManager(capital=10_000), **kwargs)
+
+    assert resumed.attrs["resumed_from"] == 2500
+    pd.testing.assert_frame_equal(resumed, full, check_exact=True)
+    # kolejna noc – wznowienie od checkpointu zapisanego przy wznowieniu
+    assert run_backtest(df, RiskManager(capital=10_000), checkpoint=ck, **kwargs).attrs["resumed_from"] == len(df)
+
+
+def test_checkpoint_invalidated(tmp_path):
+    df = _prices()
+    ck = tmp_path / "state.ckpt"
+    run_backtest(df.iloc[:2000], RiskManager(capital=10_000), checkpoint=ck)
+
+    # inna konfiguracja ryzyka → liczone od zera
+    out = run_backtest(df, RiskManager(capital=20_000), checkpoint=ck)
+    assert "resumed_from" not in out.attrs
+
+    # zmieniona historia sprzed checkpointu
+    run_backtest(df.iloc[:2000], RiskManager(capital=10_000), checkpoint=ck)
+    edited = df.copy()
+    edited.iloc[100, edited.columns.get_loc("close")] += 1.0
+    out = run_backtest(edited, RiskManager(capital=10_000), checkpoint=ck)
+    assert "resumed_from" not in out.attrs
+    pd.testing.assert_frame_equal(out, run_backtest(edited, RiskManager(capital=10_000)), check_exact=True)
+
+    # świeca high == low w nowych danych nie zmienia historii ATR → wznowienie, wynik jak pełny bieg
+    run_backtest(df.iloc[:2000], RiskManager(capital=10_000), checkpoint=ck)
+    flat = df.copy()
+    flat.iloc[2500, [flat.columns.get_loc("high"), flat.columns.get_loc("low")]] = flat["close"].iloc[2500]
+    out = run_backtest(flat, RiskManager(capital=10_000), checkpoint=ck)
+    assert out.attrs["resumed_from"] == 2000
+    pd.testing.assert_frame_equal(out, run_backtest(flat, RiskManager(capital=10_000)), check_exact=True)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest.catalog import ResultsCatalog
+from forest.cli import main, param_sets, plan
+from forest.config import BatchSettings
+
+
+def _write_csv(path, n: int = 300, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    pd.DataFrame(
+        {
+            "time": pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"),
+            "open": close,
+            "high": close + 0.3,
+            "low": close - 0.3,
+            "close": close,
+        }
+    ).to_csv(path, index=False)
+
+
+@pytest.fixture
+def config(tmp_path):
+    for i, sym in enumerate(("EURUSD", "GBPUSD")):
+        _write_csv(tmp_path / f"{sym}.csv", seed=i)
+    cfg = {
+        "data": {"path": str(tmp_path / "{symbol}.csv")},
+        "defaults": {"risk": {"capital": 5000}, "strategy": {"fast": 8, "slow": 21}},
+        "n_jobs": 1,
+        "use_cache": False,
+        "output": {"catalog": str(tmp_path / "catalog"), "dir": str(tmp_path / "runs")},
+        "jobs": [
+            {
+                "name": "sweep",
+                "symbols": ["EURUSD", "GBPUSD"],
+                "timeframes": ["1h", "4h"],
+                "grid": {"fast": {"low": 5, "high": 15, "step": 5}, "slow": [30, 40], "risk_per_trade": [0.01, 0.02]},
+            },
+            {"name": "single", "kind": "backtest", "symbols": ["EURUSD"]},
+        ],
+    }
+    path = tmp_path / "batch.json"
+    path.write_text(json.dumps(cfg), encoding="utf-8")
+    return path
+
+
+def test_plan_and_param_sets(config):
+    cfg = BatchSettings.from_file(config)
+    assert [t.label for t in plan(cfg)][:2] == ["sweep:EURUSD@1h", "sweep:EURUSD@4h"]
+    assert len(plan(cfg, ["single"])) == 1
+    assert len(param_sets(cfg.jobs[0], cfg)) == 12
+    assert param_sets(cfg.jobs[1], cfg) == [{"fast": 8, "slow": 21}]
+    with pytest.raises(ValueError, match="Nieznane zadania"):
+        plan(cfg, ["nope"])
+
+
+def test_run_writes_catalog_and_files(config, tmp_path, capsys):
+    summary = tmp_path / "summary.csv"
+    assert main(["run", str(config), "--summary", str(summary)]) == 0
+    runs = ResultsCatalog(tmp_path / "catalog").runs()
+    assert len(runs) == 5 and set(runs["timeframe"]) == {"1h", "4h"}
+    assert len(pd.read_parquet(tmp_path / "runs" / "sweep" / "GBPUSD_4h.parquet")) == 12
+    assert (pd.read_csv(summary)["status"] == "ok").all()
+
+
+def test_failures_exit_nonzero(config, tmp_path):
+    raw = json.loads(config.read_text())
+    raw["jobs"][0]["symbols"].append("MISSING")
+    config.write_text(json.dumps(raw))
+    assert main(["validate", str(config)]) == 2
+    assert main(["run", str(config), "--only", "sweep", "--n-jobs", "1"]) == 1
+    # pozostałe serie policzone mimo błędu
+    assert len(ResultsCatalog(tmp_path / "catalog").runs()) == 4
+
+    raw["jobs"][1]["params"] = {"bogus": 1}
+    config.write_text(json.dumps(raw))
+    assert main(["validate", str(config), "--only", "single"]) == 2
+    assert main(["run", str(tmp_path / "absent.yaml")]) == 2
+
+
+def test_ml_mode_runs_backtest_jobs(config, tmp_path):
+    raw = json.loads(config.read_text())
+    raw["defaults"]["strategy"] = {"mode": "ml", "threshold": 0.6}
+    raw["jobs"][1]["params"] = {"risk_per_trade": 0.02}
+    config.write_text(json.dumps(raw))
+    cfg = BatchSettings.from_file(config)
+    with pytest.raises(ValueError, match="mode 'ml'"):
+        param_sets(cfg.jobs[0], cfg)
+    assert param_sets(cfg.jobs[1], cfg) == [{"horizon": 1, "threshold": 0.6, "risk_per_trade": 0.02}]
+
+    assert main(["run", str(config), "--only", "single"]) == 0
+    (run,) = ResultsCatalog(tmp_path / "catalog").runs().itertuples()
+    out = pd.read_parquet(tmp_path / "runs" / "single" / "EURUSD_1h.parquet")
+    assert out["threshold"].tolist() == [0.6] and np.isfinite(out["rar"]).all()
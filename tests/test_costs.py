@@ -7,3 +7,13 @@ def test_position_cost():
                             spread=0.001, commission=0.0, slippage=0.0)
     assert cost == 0.1          # 0.1% * 100 = 0.1
 
+
+
+def test_position_cost_defaults_to_fields():
+    rm = RiskManager(capital=10_000, spread=0.001, commission=0.002, slippage=0.0)
+    assert rm.position_cost(qty=1.0, price=100.0) == 100.0 * 0.003
+    assert rm.position_cost(qty=1.0, price=100.0, commission=0.0) == 100.0 * 0.001
+
+    rm = RiskManager(capital=10_000, trail_k=1.5)
+    rm.update_trailing_sl(price=100.0, atr=2.0)
+    assert rm._trail == 97.0
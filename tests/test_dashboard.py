@@ -1,2 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
 def test_dashboard_import():
     from forest.dashboard import app  # noqa: F401
+
+
+def test_grid_job_background_partials(tmp_path):
+    from forest.backtest.grid import param_grid
+    from forest.backtest.risk import RiskManager
+    from forest.dashboard.jobs import GridJob
+
+    base = np.linspace(100, 102, 40)
+    df = pd.DataFrame(
+        {"open": base, "high": base + 0.2, "low": base - 0.2, "close": base},
+        index=pd.date_range("2025-01-01", periods=40, freq="h"),
+    )
+    out = tmp_path / "grid.parquet"
+    job = GridJob(
+        df,
+        param_grid(fast=[3, 4, 5], slow=[20]),
+        make_risk=lambda: RiskManager(capital=1_000),
+        n_jobs=1,
+        chunk_size=1,  # paczka = 1 kombinacja -> 3 wyniki częściowe
+        export_path=out,
+    )
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        res = job.start(ex).result(timeout=60)
+
+    assert job.progress == 1.0 and not job.running and job.error() is None
+    assert len(res) == 3 and len(job.snapshot()) == 3
+    assert out.exists()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest.distributed import GridCoordinator, run_distributed, run_worker
+from forest.backtest.grid import param_grid, run_grid
+from forest.backtest.risk import RiskManager
+
+
+def _prices(n: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame(
+        {"open": close, "high": close + 0.3, "low": close - 0.3, "close": close},
+        index=pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"),
+    )
+
+
+def _risk() -> RiskManager:
+    return RiskManager(capital=5_000, risk_per_trade=0.02)
+
+
+GRID = list(param_grid(fast=[4, 6, 8], slow=[20, 30], atr_multiple=[1.5, 3.0]))
+
+
+def test_units_match_run_grid(tmp_path):
+    df = _prices()
+    coord = GridCoordinator(tmp_path / "q")
+    job = coord.submit(df, GRID, _risk, unit_size=5)
+    assert coord.status(job) == {"units": 3, "todo": 3, "leased": 0, "results": 0, "failed": 0}
+
+    cache = tmp_path / "cache"
+    assert run_worker(tmp_path / "q", max_units=1, cache_dir=cache, use_cache=False) == 1
+    assert len(coord.results(job)) == 5                      # wyniki częściowe
+    assert run_worker(tmp_path / "q", idle_exit=0, cache_dir=cache, use_cache=False) == 2
+    assert len(list(cache.glob("*.parquet"))) == 1           # dane pobrane raz
+
+    expected = run_grid(df, GRID, make_risk=_risk, n_jobs=1, use_cache=False)
+    pd.testing.assert_frame_equal(coord.wait(job, timeout=5), expected)
+
+
+def test_lost_worker_and_failures(tmp_path):
+    coord = GridCoordinator(tmp_path / "q", lease=0.2, max_attempts=2)
+    job = coord.submit(_prices(), GRID[:4], _risk, unit_size=2)
+    d = tmp_path / "q" / job
+
+    # worker pobrał jednostkę i zniknął – dzierżawa wygasa, jednostka wraca do kolejki
+    lost = d / "leased" / "u00000@gone.json"
+    os.rename(d / "todo" / "u00000.json", lost)
+    os.utime(lost, (time.time() - 10, time.time() - 10))
+    assert coord.requeue_expired(job) == 1
+    assert json.loads((d / "todo" / "u00000.json").read_text())["attempts"] == 1
+    assert run_worker(tmp_path / "q", idle_exit=0, use_cache=False, cache_dir=tmp_path / "c") == 2
+    assert len(coord.wait(job, timeout=5)) == 4
+
+    # jednostka, która zawsze się wywala → failed/ po max_attempts, wait zgłasza błąd
+    bad = coord.submit(_prices(), [{"fast": 5, "slow": 20, "bogus": 1}], _risk)
+    run_worker(tmp_path / "q", idle_exit=0, use_cache=False, cache_dir=tmp_path / "c")
+    assert coord.status(bad)["failed"] == 1
+    with pytest.raises(RuntimeError, match="bogus"):
+        coord.wait(bad, timeout=5)
+
+
+def test_local_worker_processes(tmp_path):
+    df = _prices(200)
+    res = run_distributed(df, GRID, tmp_path / "q", _risk, unit_size=4, local_workers=2, timeout=120)
+    assert len(res) == len(GRID) and res["fast"].tolist() == [p["fast"] for p in GRID]
+
+
+def test_worker_frame_memory_is_bounded(tmp_path):
+    from forest.backtest.distributed import _FRAMES_IN_MEMORY, _Worker
+
+    (tmp_path / "data").mkdir()
+    fps = [f"fp{i}" for i in range(_FRAMES_IN_MEMORY + 2)]
+    for i, fp in enumerate(fps):
+        _prices(10 + i).to_parquet(tmp_path / "data" / f"{fp}.parquet")
+    w = _Worker(tmp_path, "w", 1, tmp_path / "cache", use_cache=False)
+    first = w.frame(fps[0])
+    for fp in fps[1:]:
+        w.frame(fps[0])                                   # ostatnio używana zostaje w pamięci
+        assert len(w.frame(fp)) == 10 + fps.index(fp)
+    assert len(w._frames) == _FRAMES_IN_MEMORY and w.frame(fps[0]) is first
+    assert fps[1] not in w._frames and len(w.frame(fps[1])) == 11   # wyrzucona → z lokalnego cache
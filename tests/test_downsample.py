@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.dashboard.downsample import downsample, lttb_indices, minmax_indices
+
+
+def _equity(n: int) -> pd.Series:
+    rng = np.random.default_rng(0)
+    y = 10_000 + np.cumsum(rng.normal(0, 5, n))
+    y[n // 3] -= 2_000  # pojedynczy głęboki dołek
+    return pd.Series(y, index=pd.date_range("2024-01-01", periods=n, freq="min", tz="UTC"))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_caps_points_and_keeps_ends(method):
+    s = _equity(100_000)
+    out = downsample(s, 1_000, method)
+    assert 2 < len(out) <= 1_000
+    assert out.index.is_monotonic_increasing
+    assert out.index[0] == s.index[0] and out.index[-1] == s.index[-1]
+
+
+def test_minmax_keeps_extremes():
+    s = _equity(50_000)
+    out = downsample(s, 500, "minmax")
+    assert out.min() == s.min() and out.max() == s.max()
+
+
+def test_lttb_picks_spike():
+    y = np.zeros(10_000)
+    y[4_321] = 1.0
+    idx = lttb_indices(np.arange(len(y)), y, 100)
+    assert len(idx) == 100 and 4_321 in idx
+
+
+def test_small_series_untouched_and_nan_dropped():
+    s = pd.Series([np.nan, 1.0, 2.0, 3.0])
+    assert downsample(s, 10).tolist() == [1.0, 2.0, 3.0]
+    assert len(minmax_indices(np.arange(5.0), 10)) == 5
+    with pytest.raises(ValueError):
+        downsample(_equity(100), 10, "bogus")
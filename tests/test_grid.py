@@ -78,3 +78,44 @@ def test_run_grid_rar():
     )
     assert "rar" in res.columns and res.at[0, "rar"] >= 0
 
+
+
+# ---------------------------------------------------------------------------#
+#  Wymiary ryzyka / kosztów w siatce                                         #
+# ---------------------------------------------------------------------------#
+def test_run_grid_risk_dimensions():
+    from forest.backtest.grid import _single_run
+
+    rng = np.random.default_rng(0)
+    df = synthetic_prices(400)
+    df["close"] += np.cumsum(rng.normal(0, 0.3, len(df)))
+    df["high"], df["low"] = df["close"] + 0.3, df["close"] - 0.3
+    grid = list(param_grid(fast=[5, 8], slow=[20], risk_per_trade=[0.01, 0.02], atr_multiple=[1.5, 3.0], commission=[0.0]))
+
+    res = run_grid(df, grid, make_risk=lambda: RiskManager(capital=1_000), n_jobs=1, use_cache=False, profile=True)
+    assert len(res) == 8 and {"risk_per_trade", "atr_multiple", "commission"} <= set(res.attrs["params"])
+    # kolejność jak w siatce; sygnał liczony raz dla obu zestawów (fast, slow)
+    assert res[["fast", "atr_multiple"]].to_dict("records") == [{"fast": p["fast"], "atr_multiple": p["atr_multiple"]} for p in grid]
+    assert res.attrs["profile"]["stages"]["grid.signals"][0] == 1
+    assert res["equity_end"].nunique() > 2
+
+    # wiersz gridu = backtest z RiskManager o nadpisanych polach
+    p = grid[5]
+    direct = _single_run("x", tuple(p.items()), df, lambda: RiskManager(capital=1_000))
+    assert direct.equity_end == res.at[5, "equity_end"]
+
+
+def test_run_grid_cost_and_trail_dimensions_change_result():
+    rng = np.random.default_rng(0)
+    df = synthetic_prices(400)
+    df["close"] += np.cumsum(rng.normal(0, 0.3, len(df)))
+    df["high"], df["low"] = df["close"] + 0.3, df["close"] - 0.3
+    base = {"fast": 5, "slow": 20}
+    grid = [base] + [{**base, k: v} for k, v in
+                     (("commission", 0.01), ("spread", 0.01), ("slippage", 0.01), ("trail_k", 1.0))]
+
+    res = run_grid(df, grid, make_risk=lambda: RiskManager(capital=1_000), n_jobs=1, use_cache=False)
+    ref = res.at[0, "equity_end"]
+    # każdy koszt / trail_k z siatki (pola RiskManager) zmienia wynik względem domyślnych
+    assert all(res.at[i, "equity_end"] != ref for i in range(1, len(grid)))
+    assert (res.loc[1:3, "equity_end"] < ref).all()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("pandas_ta", "numba", "joblib", "tqdm", "structlog")
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["forest.backtest", "forest.backtest.grid", "forest.utils.log", "forest.data", "forest.dashboard.launcher"],
+)
+def test_import_is_lazy(module):
+    # świeży interpreter – w procesie testów część modułów jest już załadowana
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_lazy_exports_resolve():
+    import forest.backtest as bt
+
+    assert bt.TradeBook.__name__ == "TradeBook"
+    with pytest.raises(AttributeError):
+        bt.does_not_exist  # noqa: B018
@@ -17,3 +17,25 @@ def test_invalid_period():
     import pytest
     with pytest.raises(ValueError):
         ema(np.array([1, 2, 3]), period=0)
+
+
+def test_streaming_matches_vectorized():
+    from forest.core.indicators import StreamingATR, StreamingEMA, atr
+
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(size=300))
+    high, low = close + rng.random(300), close - rng.random(300)
+    for p in (5, 10, 12, 14, 49):
+        e, a = StreamingEMA(p), StreamingATR(p)
+        assert np.array_equal([e.update(c) for c in close], ema(close, p), equal_nan=True)
+        assert np.array_equal([a.update(*bar) for bar in zip(high, low, close)], atr(high, low, close, p), equal_nan=True)
+
+
+def test_atr_definition():
+    from forest.core.indicators import atr
+
+    high = np.array([11.0, 12.0, 13.0, 12.0])
+    low = np.array([9.0, 10.0, 10.0, 12.0])
+    close = np.array([10.0, 11.0, 12.0, 12.0])
+    # TR: 2 (high−low), 2, 3, 0; seed = SMA(2, 2) = 2, dalej RMA: (1−½)·2 + ½·3, (1−½)·2.5 + ½·0
+    assert np.array_equal(atr(high, low, close, 2), [np.nan, 2.0, 2.5, 1.25], equal_nan=True)
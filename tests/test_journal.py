@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import numpy as np
+
+from forest.broker import PaperBroker as AdapterBroker
+from forest.broker import Side
+from forest.live import Order, PaperBroker
+from forest.live.journal import (
+    KIND_BRACKET,
+    KIND_FILLS,
+    KIND_ORDER,
+    KIND_PENDING,
+    KIND_PRICE,
+    KIND_RESULT,
+    JournaledBroker,
+    JournaledRouter,
+    TickJournal,
+    journal_frame,
+    read_journal,
+    replay,
+)
+
+
+def _session(router) -> None:
+    router.connect()
+    for i, px in enumerate([100.0, 101.0, 99.5, 102.0]):
+        router.set_price("SYN", px)
+        router.market_order(Order(symbol="SYN", side="BUY" if i % 2 == 0 else "SELL", qty=1, client_id=f"c{i}"))
+    router.market_order(Order(symbol="SYN", side="BUY", qty=2, price=101.0, type="limit", client_id="lim"))
+    router.set_price("SYN", 100.5)
+
+
+def test_records_and_grows(tmp_path):
+    path = tmp_path / "j.fjr"
+    with TickJournal(path, capacity=2) as jr:
+        _session(JournaledRouter(PaperBroker(1_000), jr))
+        n = len(jr)
+    recs, symbols = read_journal(path)
+    assert len(recs) == n == 15 and symbols == ["SYN"]
+    assert recs["kind"][:3].tolist() == [KIND_PRICE, KIND_ORDER, KIND_RESULT]
+    assert recs["ref"][1] == b"c0" and np.all(np.diff(recs["ts"]) >= 0)
+
+    with TickJournal(path, "a") as jr:                      # dopisywanie do istniejącego
+        jr.price("ETH", 2_000.0)
+    df = journal_frame(path)
+    assert len(df) == 16 and df["symbol"].iloc[-1] == "ETH" and df["kind"].iloc[-1] == "price"
+
+
+def test_replay_router_is_deterministic(tmp_path):
+    path = tmp_path / "j.fjr"
+    with TickJournal(path) as jr:
+        brk = JournaledRouter(PaperBroker(1_000), jr)
+        _session(brk)
+        equity = brk.equity()
+
+    target = PaperBroker(1_000)
+    target.connect()
+    report = replay(path, target)
+    assert report.deterministic and report.events == {"price": 5, "order": 5}
+    assert target.equity() == equity
+    assert set(report.percentiles()["order"]) == {"p50", "p90", "p99", "p99.9", "max"}
+
+    recs, _ = read_journal(path)
+    edited = np.memmap(path, dtype=recs.dtype, mode="r+", offset=64, shape=recs.shape)
+    edited["price"][0] = 50.0                                # inna cena → inny fill niż zapisany
+    edited.flush()
+    other = PaperBroker(1_000)
+    other.connect()
+    (i, saved, got), = replay(path, other).mismatches
+    assert i == 2 and "100.0" in saved and "50.0" in got
+
+
+def test_replay_adapter(tmp_path):
+    path = tmp_path / "a.fjr"
+    with TickJournal(path) as jr:
+        br = JournaledBroker(AdapterBroker(initial_balance=10_000), jr)
+        br.update_price("X", 100.0)
+        br.market_order("X", Side.BUY, 2.0, sl=95.0, tp=110.0)
+        br.update_prices(["X"], [94.0])
+        br.market_order("X", Side.SELL, 1.0)
+        br.close_position("X")
+
+    target = AdapterBroker(initial_balance=10_000)
+    report = replay(path, target, speed=1e6)
+    assert report.deterministic and report.events["market"] == 2 and report.events["close"] == 1
+    assert target.balance() == br.balance()
+
+
+def test_replay_adapter_pending_orders_and_executions(tmp_path):
+    path = tmp_path / "p.fjr"
+    with TickJournal(path) as jr:
+        br = JournaledBroker(AdapterBroker(initial_balance=10_000), jr)
+        br.update_price("X", 100.0)
+        br.limit_order("X", Side.BUY, 2.0, 99.0, sl=95.0, tp=104.0)
+        stale = br.stop_order("X", Side.BUY, 1.0, 120.0)
+        assert br.cancel_order(stale) and not br.cancel_order(stale)
+        br.update_price("X", 98.5)                          # limit → fill, nawias SL/TP
+        br.update_price("X", 105.0)                         # TP
+        fills = br.executions()
+        assert [f.price for f in fills] == [99.0, 104.0]
+
+    recs, _ = read_journal(path)
+    kinds = recs["kind"].tolist()
+    assert kinds[kinds.index(KIND_PENDING) + 1] == KIND_BRACKET and KIND_FILLS in kinds
+    target = AdapterBroker(initial_balance=10_000)
+    report = replay(path, target)
+    assert report.deterministic and report.events["pending"] == 2 and report.events["cancel"] == 2
+    assert target.balance() == br.balance()
+
+    edited = np.memmap(path, dtype=recs.dtype, mode="r+", offset=64, shape=recs.shape)
+    edited["aux"][kinds.index(KIND_BRACKET)] = 110.0       # inny TP → brak drugiego fillu
+    edited.flush()
+    assert not replay(path, AdapterBroker(initial_balance=10_000)).deterministic
+
+
+def test_router_cancel_and_fills_are_replayed(tmp_path):
+    path = tmp_path / "r.fjr"
+    with TickJournal(path) as jr:
+        router = JournaledRouter(PaperBroker(1_000), jr)
+        router.connect()
+        router.set_price("SYN", 100.0)
+        res = router.market_order(Order(symbol="SYN", side="BUY", qty=1, price=99.0, type="limit", client_id="a"))
+        gone = router.market_order(Order(symbol="SYN", side="BUY", qty=1, price=90.0, type="limit", client_id="b"))
+        assert res.status == "accepted" and router.cancel(gone.id)
+        router.set_price("SYN", 98.0)
+        assert [f.client_id for f in router.fills()] == ["a"]
+
+    target = PaperBroker(1_000)
+    target.connect()
+    report = replay(path, target)
+    assert report.deterministic and report.events["cancel"] == 1 and report.events["fills"] == 1
+    assert target.position_qty("SYN") == 1.0
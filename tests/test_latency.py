@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import urllib.request
+
+import numpy as np
+
+from forest.backtest.risk import RiskManager
+from forest.live import PaperBroker
+from forest.live.pipeline import STAGES, SignalPipeline
+from forest.utils.latency import LatencyHistogram, LatencyMonitor
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    values = np.random.default_rng(1).lognormal(10, 1.5, 50_000).astype(np.int64)
+    h = LatencyHistogram()
+    h.record_many(values)
+    for q, got in h.percentiles().items():
+        exact = np.quantile(values, q, method="inverted_cdf")
+        assert exact <= got <= exact * 1.008 + 1
+    assert h.count == len(values) and h.max == values.max() and h.percentile(1.0) == values.max()
+
+    small = LatencyHistogram()
+    small.record_many([5, 7, 9])
+    h.merge(small)
+    assert h.min == 5 and h.count == len(values) + 3
+
+
+def test_prometheus_file_and_endpoint(tmp_path):
+    mon = LatencyMonitor()
+    with mon.stage("router"):
+        pass
+    mon.record("router", 2_000)
+    text = mon.write_prometheus(tmp_path / "forest.prom").read_text()
+    assert "# TYPE forest_latency_seconds summary" in text
+    assert 'forest_latency_seconds_count{stage="router"} 2' in text
+    assert 'forest_latency_seconds{stage="router",quantile="0.999"}' in text
+
+    server = mon.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        assert urllib.request.urlopen(url).read().decode() == mon.prometheus()
+    finally:
+        server.shutdown()
+
+
+def test_pipeline_trades_and_measures_every_stage():
+    router = PaperBroker(initial_cash=1_000_000)
+    router.connect()
+    pipe = SignalPipeline(router, RiskManager(capital=100_000), "SYN", fast=3, slow=8)
+    closes = np.r_[np.linspace(100, 90, 20), np.linspace(90, 110, 20), np.linspace(110, 95, 20)]
+    results = [r for c in closes for r in pipe.on_bar(c + 0.5, c - 0.5, c)]
+
+    assert [r.status for r in results] == ["filled", "filled"]        # wejście long, potem wyjście
+    assert router.position_qty("SYN") == 0 and pipe.signal == -1
+    snap = pipe.monitor.snapshot()
+    assert set(snap) == set(STAGES) and snap["bar"]["count"] == len(closes)
+    assert snap["router"]["count"] == 2 and snap["risk"]["count"] == 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+
+from forest.utils.log import get_logger, is_enabled, setup_logger, shutdown_logger
+
+
+def test_async_logger_writes_json_batches(tmp_path):
+    out = tmp_path / "forest.log"
+    lg = setup_logger("INFO", json=True, async_mode=True, file=out, force=True)
+    try:
+        for i in range(100):
+            lg.info("tick", i=i)
+        lg.debug("hidden", i=-1)  # poziom wyłączony -> no-op
+        assert not is_enabled("DEBUG") and is_enabled("WARNING")
+    finally:
+        stats = shutdown_logger()
+
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert stats == {"written": 100, "dropped": 0}
+    assert [json.loads(line)["i"] for line in lines] == list(range(100))
+    assert json.loads(lines[0])["level"] == "info"
+
+
+def test_async_logger_drops_when_queue_full(tmp_path):
+    from forest.utils.log import _AsyncWriter
+
+    class _Sink:
+        def write(self, s):
+            pass
+
+        def flush(self):
+            pass
+
+    writer = _AsyncWriter(_Sink(), str, maxsize=2, overflow="drop")  # wątek nie wystartował
+    for i in range(5):
+        writer.submit({"i": i})
+    assert writer.dropped == 3
+
+
+def test_logging_after_shutdown_is_not_lost(tmp_path, capsys, caplog):
+    import structlog
+
+    from forest.utils import log as log_mod
+
+    lg = setup_logger("INFO", json=True, async_mode=True, file=tmp_path / "f.log", overflow="block",
+                      queue_size=2, force=True)
+    cached = structlog.get_logger("cached")
+    cached.info("before")
+    writer = log_mod._WRITER
+    shutdown_logger()
+    capsys.readouterr()
+
+    cached.info("late", i=1)                            # zbuforowany logger, martwy wątek → zapis od razu
+    get_logger("fresh").warning("fresh", i=2)           # nowy logger: tryb synchroniczny (stdlib)
+    lg.warning("again", i=3)                            # proxy użyty pierwszy raz → nowa konfiguracja
+    out = capsys.readouterr().out
+    assert '"late"' in out and len(writer._buf) == 0
+    msgs = " ".join(r.getMessage() for r in caplog.records)
+    assert "fresh" in msgs and "again" in msgs
+    assert json.loads((tmp_path / "f.log").read_text().splitlines()[0])["event"] == "before"
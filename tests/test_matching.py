@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+
+from forest.broker import PaperBroker, Side
+from forest.broker.matching import ROLE_TP, SELL, MatchingEngine
+from forest.live import Order
+from forest.live import PaperBroker as LivePaperBroker
+
+
+def test_price_time_priority_and_partial_fills():
+    eng = MatchingEngine()
+    a, _ = eng.submit("X", "SELL", 3, "limit", price=10.0)
+    b, _ = eng.submit("X", "SELL", 3, "limit", price=10.0)   # ta sama cena, później
+    c, _ = eng.submit("X", "SELL", 3, "limit", price=9.5)    # lepsza cena
+    _, fills = eng.submit("X", "BUY", 5, "limit", price=10.0)
+
+    makers = [(f.oid, f.price, f.qty) for f in fills if f.side == SELL]
+    assert makers == [(c, 9.5, 3.0), (a, 10.0, 2.0)]
+    assert eng.remaining(a) == 1.0 and eng.remaining(b) == 3.0
+    assert eng.books["X"].best_ask() == 10.0
+
+
+def test_tick_fills_limits_up_to_volume():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    oid, fills = eng.submit("X", "BUY", 5, "limit", price=99.0)
+    assert fills == [] and eng.remaining(oid) == 5
+
+    assert [f.qty for f in eng.on_tick("X", 98.5, volume=2)] == [2.0]
+    fills = eng.on_tick("X", 98.0)
+    assert [(f.price, f.qty) for f in fills] == [(99.0, 3.0)]   # fill po cenie limitu
+    assert eng.remaining(oid) == 0
+
+
+def test_stop_triggers_at_tick_price():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    oid, _ = eng.submit("X", "SELL", 1, "stop", stop=95.0)
+    assert eng.on_tick("X", 96.0) == []
+    fills = eng.on_tick("X", 94.0)                                # luka – fill po cenie ticka
+    assert [(f.oid, f.price) for f in fills] == [(oid, 94.0)]
+
+
+def test_triggered_stop_remainder_is_a_market_order():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    oid, _ = eng.submit("X", "SELL", 10, "stop", stop=99.0)
+    assert [(f.price, f.qty) for f in eng.on_tick("X", 98.5, volume=4)] == [(98.5, 4.0)]
+    # cena wraca nad stop – reszta i tak dostaje fill po kolejnych tickach, do ich wolumenu
+    assert [(f.price, f.qty) for f in eng.on_tick("X", 100.0, volume=5)] == [(100.0, 5.0)]
+    assert [(f.price, f.qty) for f in eng.on_tick("X", 100.5)] == [(100.5, 1.0)]
+    assert eng.remaining(oid) == 0
+
+
+def test_triggered_stop_limit_respects_tick_volume():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    oid, _ = eng.submit("X", "BUY", 10, "stop_limit", price=102.0, stop=101.0)
+    assert [(f.price, f.qty) for f in eng.on_tick("X", 101.5, volume=3)] == [(101.5, 3.0)]
+    assert eng.remaining(oid) == 7.0
+    assert eng.on_tick("X", 103.0) == []                            # ponad limit – czeka
+    assert [(f.price, f.qty) for f in eng.on_tick("X", 101.0, volume=2)] == [(102.0, 2.0)]
+    assert eng.remaining(oid) == 5.0
+
+
+def test_bracket_oco():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    eng.submit("X", "BUY", 2, "market", sl=95.0, tp=105.0)
+    fills = eng.on_tick("X", 106.0)
+    assert [(f.role, f.side, f.price, f.qty) for f in fills] == [(ROLE_TP, SELL, 105.0, 2.0)]
+    assert eng.on_tick("X", 90.0) == []                           # SL anulowany przez OCO
+    assert eng.books["X"].orders == {}
+
+
+def test_adapter_sl_tp_are_honoured():
+    br = PaperBroker(initial_balance=10_000)
+    br.update_price("X", 100.0)
+    br.market_order("X", Side.BUY, qty=2.0, sl=95.0, tp=110.0)
+    br.update_price("X", 104.0)
+    br.update_price("X", 94.0)                                    # SL
+    (res,) = br.executions()
+    assert res.side == Side.SELL and math.isclose(res.realized_pnl, -12.0)
+    assert br.positions() == {} and math.isclose(br.balance(), 9_988.0)
+
+
+def test_adapter_limit_entry_with_bracket():
+    br = PaperBroker()
+    br.update_price("X", 100.0)
+    br.limit_order("X", Side.SELL, 1.0, price=101.0, tp=90.0)
+    br.update_price("X", 102.0)
+    assert br.positions()["X"].side == Side.SELL
+    br.update_price("X", 89.0)
+    assert [e.realized_pnl for e in br.executions()] == [0.0, 11.0]
+    assert br.positions() == {}
+
+
+def test_adapter_limit_never_crosses_own_exit_legs():
+    br = PaperBroker(initial_balance=10_000)
+    br.update_price("X", 100.0)
+    br.market_order("X", Side.BUY, qty=10.0, sl=95.0, tp=105.0)
+    br.limit_order("X", Side.BUY, 5.0, price=106.0)               # marketable → fill po ostatniej cenie
+    (res,) = br.executions()
+    assert (res.side, res.price, res.qty, res.realized_pnl) == (Side.BUY, 100.0, 5.0, 0.0)
+    pos = br.positions()["X"]
+    assert (pos.qty, pos.entry) == (15.0, 100.0) and br.balance() == 10_000.0
+
+    br.update_price("X", 105.0)                                   # TP tylko z ticka rynku
+    (tp,) = br.executions()
+    assert (tp.side, tp.price, tp.qty) == (Side.SELL, 105.0, 10.0) and tp.realized_pnl == 50.0
+
+
+def test_exit_legs_are_not_liquidity():
+    eng = MatchingEngine()
+    eng.on_tick("X", 100.0)
+    eng.submit("X", "BUY", 2, "market", sl=95.0, tp=105.0)
+    oid, fills = eng.submit("X", "BUY", 1, "limit", price=106.0)
+    assert [(f.oid, f.price) for f in fills] == [(oid, 100.0)]
+    assert eng.books["X"].best_ask() is None
+
+
+def test_live_paper_broker_limit_order():
+    brk = LivePaperBroker(initial_cash=1_000)
+    brk.connect()
+    brk.set_price("SYN", 100.0)
+    res = brk.market_order(Order(symbol="SYN", side="BUY", qty=2, price=99.0, type="limit", client_id="l1"))
+    assert res.status == "accepted" and res.filled_qty == 0 and res.client_id == "l1"
+
+    brk.set_price("SYN", 98.0, volume=1)
+    brk.set_price("SYN", 98.0)
+    fills = brk.fills()
+    assert [(f.status, f.filled_qty, f.avg_price) for f in fills] == [("accepted", 1.0, 99.0), ("filled", 1.0, 99.0)]
+    assert brk.position_qty("SYN") == 2 and math.isclose(brk.equity(), 1_000 - 2 * 99 + 2 * 98)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest import RiskManager, run_backtest
+from forest.ml import FeatureSpec, LiveFeatures, MLStrategy, build_features, feature_matrix, time_series_splits
+from forest.utils import profiling
+
+
+def _ohlc(n: int = 1_500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    r = rng.normal(0, 0.01, n)
+    r[1:] += 0.2 * r[:-1]                               # trochę autokorelacji do nauczenia
+    close = 100 * np.exp(np.cumsum(r))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.003, "low": close * 0.997, "close": close},
+        index=pd.date_range("2024-01-01", periods=n, freq="h"),
+    )
+
+
+def test_features_match_streaming_and_are_cached():
+    df = _ohlc(400)
+    spec = FeatureSpec()
+    X = build_features(df, spec)
+    assert X.shape == (400, len(spec.names()))
+    assert not np.isnan(X[spec.warmup :]).any() and np.isnan(X[spec.warmup - 1]).any()
+
+    live = LiveFeatures(spec)
+    rows = np.array([live.update(h, lo, c).copy() for h, lo, c in zip(df["high"], df["low"], df["close"])])
+    assert np.allclose(rows, X, equal_nan=True)
+    ind = slice(len(spec.lags), len(spec.lags) + len(spec.ema_periods) + len(spec.atr_periods))
+    assert np.array_equal(rows[:, ind], X[:, ind], equal_nan=True)    # EMA/ATR: ta sama rekurencja
+
+    with profiling.profiling():
+        a = feature_matrix(df, spec)
+        b = feature_matrix(df.copy(), spec)              # ten sam odcisk → bez przeliczania
+        misses = profiling.snapshot()["counters"].get("ml.features_miss", (0, 0))[0]
+    assert a is b and misses <= 1 and not a.flags.writeable
+
+
+def test_time_series_splits_expand_with_gap():
+    splits = list(time_series_splits(100, 4, gap=2))
+    assert len(splits) == 4 and splits[-1][1].stop == 100
+    for train, test in splits:
+        assert train.start == 0 and test.start == train.stop + 2
+    with pytest.raises(ValueError):
+        list(time_series_splits(5, 4, gap=2))
+
+
+def test_fit_oos_backtest_and_live_inference():
+    df = _ohlc()
+    strat = MLStrategy(num_boost_round=20, horizon=2).fit(df, n_splits=3)
+    assert len(strat.cv_scores) == 3 and all(0 <= s["auc"] <= 1 for s in strat.cv_scores)
+
+    oos = strat.oos_proba
+    assert np.isnan(oos[: strat.spec.warmup + 100]).all() and not np.isnan(oos[-10:]).any()
+    out = run_backtest(df, RiskManager(capital=10_000), signal=strat.to_signal(oos))
+    assert out["signal"].dtype == np.int32 and np.isfinite(out["equity"].iloc[-1])
+
+    batch = strat.signals(df).to_numpy()
+    live = strat.live()
+    streamed = [live.update(h, lo, c) for h, lo, c in zip(df["high"], df["low"], df["close"])]
+    assert np.array_equal(streamed, batch)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from forest.backtest.grid import param_grid, run_grid
+from forest.backtest.optimize import TPESampler, optimize
+from forest.backtest.risk import RiskManager
+from forest.strategies import Param
+
+
+def _prices(n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame(
+        {"open": close, "high": close + 0.3, "low": close - 0.3, "close": close},
+        index=pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"),
+    )
+
+
+def _risk() -> RiskManager:
+    return RiskManager(capital=5_000, risk_per_trade=0.02)
+
+
+def test_sampler_concentrates_on_optimum():
+    space = {"x": Param(0.5, 0.0, 1.0), "k": Param("a", choices=("a", "b", "c"))}
+    sampler = TPESampler(space, n_startup=10, seed=0)
+    for _ in range(12):
+        for p in sampler.ask(4):
+            assert 0.0 <= p["x"] <= 1.0 and p["k"] in ("a", "b", "c")
+            sampler.tell(p, -((p["x"] - 0.7) ** 2) + (p["k"] == "b"))
+    late = sampler._x[-16:]
+    assert np.mean([abs(p["x"] - 0.7) for p in late]) < 0.15
+    assert sum(p["k"] == "b" for p in late) >= 12
+
+
+def test_small_space_exhausts_and_matches_grid():
+    df = _prices()
+    space = {"fast": Param(5, choices=(4, 6, 8)), "slow": Param(20, choices=(20, 30)), "atr_multiple": Param(2.0, choices=(1.5, 3.0))}
+    seen = []
+    res = optimize(
+        df, space=space, make_risk=_risk, n_trials=50, batch_size=4, n_jobs=1, use_cache=False,
+        on_batch=lambda i, best, batch: seen.append(len(batch)),
+    )
+    # 12 kombinacji → przestrzeń wyczerpana, bez powtórek
+    assert res.exhausted and not res.converged and len(res.trials) == 12 and seen == [4, 4, 4]
+    assert "exhausted" in res.summary()
+    assert not res.trials.duplicated(["fast", "slow", "atr_multiple"]).any()
+
+    full = run_grid(df, list(param_grid(fast=[4, 6, 8], slow=[20, 30], atr_multiple=[1.5, 3.0])), make_risk=_risk, n_jobs=1, use_cache=False)
+    assert res.best_value == full["rar"].max()
+    assert res.curve == sorted(res.curve) and res.curve[-1] == res.best_value
+    assert isinstance(res.best["fast"], int) and set(res.best) == {"fast", "slow", "atr_multiple"}
+
+
+def test_plateau_stops_early():
+    res = optimize(_prices(), make_risk=_risk, n_trials=400, batch_size=8, n_jobs=1, use_cache=False, patience=2, tol=1.0)
+    # tol=1.0 → żadna paczka po pierwszej nie jest „poprawą”
+    assert res.converged and len(res.curve) == 3 and len(res.trials) == 24
+    assert "plateau" in res.summary() and not res.exhausted
+
+
+def test_sampler_falls_back_to_unseen_points():
+    from forest.backtest.optimize import _key
+
+    space = {"a": Param(0, choices=tuple(range(6))), "b": Param(0, choices=(0, 1))}
+    sampler = TPESampler(space, n_startup=2, n_candidates=4, seed=0)
+    points = [{"a": a, "b": b} for a in range(6) for b in (0, 1)]
+    for p in points[1:]:                                  # wszystko poza jednym, najsłabszym punktem
+        sampler.tell(p, float(p["a"]))
+    seen = {_key(p) for p in points[1:]}
+    assert sampler.ask(3, exclude=seen) == [points[0]]
+    assert sampler.ask(1, exclude=seen | {_key(points[0])}) == []
+
+
+def test_no_valid_trials_gives_empty_result():
+    df = _prices(200)
+    space = {"fast": Param(30, 30, 40), "slow": Param(10, 5, 20)}     # zawsze fast >= slow
+    for n_trials in (0, 20):
+        res = optimize(df, space=space, make_risk=_risk, n_trials=n_trials, n_jobs=1, use_cache=False)
+        assert res.trials.empty and {"trial", "batch", "rar"} <= set(res.trials.columns)
+        assert res.best == {} and np.isnan(res.best_value) and res.exhausted and res.curve == []
+
+
+def test_async_workers_match_grid():
+    df = _prices()
+    space = {"fast": Param(5, choices=(4, 6, 8)), "slow": Param(20, choices=(20, 30)), "atr_multiple": Param(2.0, choices=(1.5, 3.0))}
+    res = optimize(df, space=space, make_risk=_risk, n_trials=50, batch_size=3, n_jobs=2, use_cache=False)
+    assert res.exhausted and res.trials["trial"].tolist() == list(range(12))
+    assert sorted(res.trials.groupby("batch").size()) == [3, 3, 3, 3]
+
+    full = run_grid(df, list(param_grid(fast=[4, 6, 8], slow=[20, 30], atr_multiple=[1.5, 3.0])), make_risk=_risk, n_jobs=1, use_cache=False)
+    assert res.best_value == full["rar"].max()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+
+from forest.live import LatencyPaperBroker, Order, OrderQueue, PaperBroker, send_batch
+
+
+class _CountingBroker(LatencyPaperBroker):
+    """Round‑trip liczy zlecenia w locie; ``barrier`` wymusza, by ``parties`` było w locie naraz."""
+
+    def __init__(self, *args, parties: int = 0, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.barrier = threading.Barrier(parties, timeout=10) if parties else None
+        self.round_trips = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._count = threading.Lock()
+
+    def _round_trip(self) -> None:
+        with self._count:
+            self.round_trips += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.barrier is not None:
+                self.barrier.wait()          # BrokenBarrierError, gdyby zlecenia szły po kolei
+            super()._round_trip()
+        finally:
+            with self._count:
+                self.in_flight -= 1
+
+
+def test_batch_overlaps_round_trips():
+    brk = _CountingBroker(initial_cash=100_000, latency=0.01, parties=8)
+    brk.connect()
+    orders = [Order(symbol=f"S{i}", side="BUY", qty=1, price=100.0, client_id=f"c{i}") for i in range(16)]
+    for o in orders:
+        brk.set_price(o.symbol, 100.0)
+
+    batch = send_batch(brk, orders, max_in_flight=8)
+
+    assert batch.ok and batch.filled == 16 and len(batch) == 16
+    assert [r.client_id for r in batch.results] == [o.client_id for o in orders]
+    # 2 fale po 8 zleceń w locie naraz (bariera), nigdy ponad limit
+    assert brk.peak == 8 and brk.round_trips == 16
+    assert abs(brk.equity() - 100_000) < 1e-9
+
+
+def test_idempotent_client_id_and_rejections():
+    brk = PaperBroker(initial_cash=1_000)
+    brk.connect()
+    with OrderQueue(brk, max_in_flight=2) as q:
+        f1 = q.submit(Order(symbol="SYN", side="BUY", qty=1, price=10.0, client_id="once"))
+        f2 = q.submit(Order(symbol="SYN", side="BUY", qty=1, price=10.0, client_id="once"))
+        batch = q.submit_batch([Order(symbol="SYN", side="SELL", qty=5, price=10.0, client_id="too-much")]).result(5)
+    assert f1 is f2 and f1.result().status == "filled"
+    assert brk.position_qty("SYN") == 1
+    assert batch.rejected == 1 and batch.errors() == {"too-much": "insufficient_position"}
+
+
+def test_router_batch_single_round_trip():
+    brk = _CountingBroker(initial_cash=1_000, latency=0.0)
+    brk.connect()
+    res = brk.market_orders([Order(symbol="SYN", side="BUY", qty=1, price=10.0) for _ in range(10)])
+    assert brk.round_trips == 1
+    assert all(r.status == "filled" for r in res) and brk.position_qty("SYN") == 10
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from forest.broker import PaperBroker, Side
+from forest.broker.positions import PositionStore
+
+
+def test_incremental_unrealized_matches_recompute():
+    rng = np.random.default_rng(0)
+    store = PositionStore(capacity=2)                      # wymusza kilka powiększeń tablic
+    symbols = [f"S{i}" for i in range(50)]
+    store.update_prices(symbols, rng.uniform(90, 110, 50))
+    for i, sym in enumerate(symbols[::2]):
+        store.set(sym, (-1) ** i * (i + 1), store.price(sym))
+
+    for _ in range(20):
+        store.update_prices(symbols, rng.uniform(90, 110, 50))
+        store.update_price("S0", rng.uniform(90, 110))
+    inc = store.unrealized()
+    assert math.isclose(inc, store.recompute(), rel_tol=1e-9, abs_tol=1e-9)
+    assert len(store) == 25 and set(store.open_symbols()) == set(symbols[::2])
+
+
+def test_close_resets_slot():
+    store = PositionStore()
+    store.update_price("X", 100.0)
+    store.set("X", 2.0, 100.0)
+    store.update_price("X", 103.0)
+    assert store.unrealized() == 6.0 and store.unrealized_of("X") == 6.0
+    store.set("X", 0.0, 0.0)
+    assert store.unrealized() == 0.0 and store.get("X") == (0.0, 0.0) and len(store) == 0
+
+
+def test_paper_broker_bulk_mark_to_market():
+    br = PaperBroker(initial_balance=1_000)
+    symbols = [f"S{i}" for i in range(200)]
+    br.update_prices(symbols, [100.0] * 200)
+    for i, sym in enumerate(symbols):
+        br.market_order(sym, Side.BUY if i % 2 == 0 else Side.SELL, qty=1.0)
+
+    br.update_prices(symbols, [101.0] * 200)               # long +1, short −1 -> suma 0
+    assert math.isclose(br.equity(), 1_000.0)
+    br.update_prices(symbols[::2], [105.0] * 100)          # tylko longi w górę
+    assert math.isclose(br.equity(), 1_000.0 + 100 * 5 - 100 * 1)
+    assert len(br.positions()) == 200 and br.positions()["S1"].side == Side.SELL
+
+
+def test_nan_price_does_not_poison_total():
+    br = PaperBroker(initial_balance=1_000)
+    br.update_price("X", 100.0)
+    br.market_order("X", Side.BUY, qty=2.0)
+    br.update_prices(["X"], [float("nan")])
+    assert br.equity() == 1_000.0                          # pozycja bez ceny liczy się jako 0
+    br.update_prices(["X"], [101.0])
+    assert math.isclose(br.equity(), 1_002.0)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from forest.backtest.grid import param_grid, profile_combo, run_grid
+from forest.backtest.risk import RiskManager
+from forest.utils import profiling
+
+
+def _prices(n: int = 60) -> pd.DataFrame:
+    base = np.linspace(100, 103, n) + np.sin(np.arange(n) / 3)
+    return pd.DataFrame(
+        {"open": base, "high": base + 0.2, "low": base - 0.2, "close": base},
+        index=pd.date_range("2025-01-01", periods=n, freq="h"),
+    )
+
+
+def _make_risk() -> RiskManager:
+    return RiskManager(capital=1_000)
+
+
+def test_disabled_timer_is_noop():
+    profiling.reset()
+    with profiling.timer("x"):
+        pass
+    profiling.incr("y")
+    assert profiling.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_run_grid_profile_stages_and_cache_counters():
+    df = _prices()
+    grid = list(param_grid(fast=[3, 5], slow=[20]))
+
+    res = run_grid(df, grid, make_risk=_make_risk, n_jobs=1, use_cache=False, profile=True)
+    stats = res.attrs["profile"]
+    for stage in ("grid.hash_df", "grid.dispatch", "grid.worker", "backtest.loop", "indicators.ema"):
+        assert stage in stats["stages"]
+    assert stats["counters"]["grid.cache_miss"][0] == 2
+    assert stats["counters"]["grid.cache_hit"][0] == 0
+
+    run_grid(df, grid, make_risk=_make_risk, n_jobs=1, use_cache=True)  # rozgrzej cache
+    res = run_grid(df, grid, make_risk=_make_risk, n_jobs=1, use_cache=True, profile=True)
+    assert res.attrs["profile"]["counters"]["grid.cache_hit"][0] == 2
+    assert not profiling.is_enabled()  # profile=True nie zostawia włączonej instrumentacji
+
+
+def test_profile_merges_worker_processes():
+    df = _prices()
+    grid = list(param_grid(fast=[3, 5], slow=[20]))
+    res = run_grid(df, grid, make_risk=_make_risk, n_jobs=2, use_cache=False, profile=True)
+    # etapy z silnika liczone w procesach workerów trafiają do wyniku rodzica
+    assert res.attrs["profile"]["stages"]["backtest.loop"][0] == 2
+
+
+def test_profile_combo_cprofile():
+    text = profile_combo(_prices(), {"fast": 3, "slow": 20}, make_risk=_make_risk)
+    assert "run_backtest" in text
@@ -0,0 +1,48 @@
+import io
+
+import pandas as pd
+import pytest
+
+from forest.backtest.grid import GridResult
+from forest.backtest.results import METRICS, flatten_results, param_columns, read_results, results_frame
+
+
+def _results() -> list[GridResult]:
+    return [
+        GridResult({"fast": f, "slow": s, "mode": "long"}, 1_000.0 + f, 0.1, 0.2, 2.0, 1.5)
+        for f in (5, 10)
+        for s in (20, 30)
+    ]
+
+
+def test_results_frame_flat_typed():
+    df = results_frame(_results())
+    assert df.attrs["params"] == ["fast", "slow", "mode"]
+    assert df["fast"].dtype == "int32" and df["slow"].dtype == "int32"
+    assert isinstance(df["mode"].dtype, pd.CategoricalDtype)
+    assert all(df[m].dtype == "float64" for m in METRICS)
+    assert "params" not in df.columns
+
+
+def test_param_name_clash():
+    with pytest.raises(ValueError):
+        results_frame([GridResult({"sharpe": 1}, 1.0, 0.0, 0.0, 0.0, 0.0)])
+
+
+def test_read_results_projection_roundtrip(tmp_path):
+    path = tmp_path / "grid.parquet"
+    results_frame(_results()).to_parquet(path, index=False)
+    df = read_results(path, ["max_dd"])
+    assert list(df.columns) == ["fast", "slow", "mode", "max_dd"]
+    assert df["fast"].dtype == "int32"
+
+
+def test_flatten_legacy_params_column():
+    legacy = pd.DataFrame({"params": [{"fast": 5, "slow": 20}, {"fast": 10, "slow": 30}], "equity_end": [1.0, 2.0]})
+    df = flatten_results(legacy)
+    assert param_columns(df) == ["fast", "slow"] and df["slow"].dtype == "int32"
+
+    buf = io.BytesIO()
+    legacy.to_csv(buf, index=False)  # CSV: słowniki jako tekst
+    df = read_results(buf.getvalue(), fmt="csv")
+    assert df["fast"].tolist() == [5, 10] and df["fast"].dtype == "int32"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from forest.backtest import RiskManager, run_backtest
+from forest.backtest.grid import run_grid
+from forest.ml import FeatureSpec, FeatureStore, build_features
+from forest.utils import profiling
+
+
+def _ohlc(n: int = 3_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.003, "low": close * 0.997, "close": close},
+        index=pd.date_range("2024-01-01", periods=n, freq="h"),
+    )
+
+
+def _counters() -> dict:
+    return {k: n for k, (n, _) in profiling.snapshot()["counters"].items()}
+
+
+def test_reuse_missing_columns_and_appended_bars(tmp_path):
+    df = _ohlc()
+    store = FeatureStore(tmp_path)
+    spec = FeatureSpec(lags=(1, 2), ema_periods=(10,), atr_periods=(14,), windows=(20,))
+
+    with profiling.profiling():
+        X = store.features(df.iloc[:2_500], spec, dataset="SYN-1h")
+        store.features(df.iloc[:2_500], spec, dataset="SYN-1h")          # z dysku
+        assert _counters() == {"store.computed_columns": len(spec.names())}
+
+        store.get(df.iloc[:2_500], ["ema_10", "ind.ema_30"], dataset="SYN-1h")
+        assert _counters()["store.computed_columns"] == len(spec.names()) + 1
+
+        X = store.features(df, spec, dataset="SYN-1h")                     # +500 świec
+        assert _counters()["store.append_rows"] == 500
+    assert np.allclose(X, build_features(df, spec), equal_nan=True, rtol=1e-9, atol=1e-12)
+    assert store.datasets() == ["SYN-1h"]
+
+    changed = df.copy()
+    changed.iloc[10, changed.columns.get_loc("close")] *= 1.01                  # zmiana wstecz → od nowa
+    assert np.allclose(store.features(changed, spec, dataset="SYN-1h"), build_features(changed, spec), equal_nan=True)
+
+
+def test_indicators_feed_backtest_and_grid(tmp_path):
+    df = _ohlc(800)
+    ind = FeatureStore(tmp_path).indicators(df, emas=(5, 10, 20))
+    assert isinstance(ind["ema_5"], np.memmap) and not ind["atr_14"].flags.writeable
+
+    base = run_backtest(df, RiskManager(capital=10_000), 5, 20)
+    pre = run_backtest(df, RiskManager(capital=10_000), 5, 20, indicators=ind)
+    pd.testing.assert_frame_equal(base, pre)
+
+    grid = [{"fast": 5, "slow": 10}, {"fast": 5, "slow": 20}]
+    a = run_grid(df, grid, n_jobs=1, use_cache=False)
+    b = run_grid(df, grid, n_jobs=1, use_cache=False, indicators=ind)
+    pd.testing.assert_frame_equal(a, b)
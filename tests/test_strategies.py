@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.backtest import RiskManager, run_backtest
+from forest.backtest.engine import ema_cross_strategy
+from forest.backtest.grid import run_grid
+from forest.strategies import Param, Strategy, available, get_strategy, register, strategy_inputs
+from forest.utils import profiling
+
+
+def _ohlc(n: int = 600, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0.02, 0.5, n))
+    return pd.DataFrame(
+        {"open": close, "high": close + 0.3, "low": close - 0.3, "close": close},
+        index=pd.date_range("2024-01-01", periods=n, freq="h"),
+    )
+
+
+@register
+class _Momentum(Strategy):
+    name = "test_momentum"
+    space = {"n": Param(10, 5, 20, 5), "side": Param("both", choices=("both", "long"))}
+
+    def needs(self, params):
+        return [f"sma_{params['n']}"]
+
+    def signal(self, data, params):
+        sig = np.nan_to_num(np.sign(data["close"] - data[f"sma_{params['n']}"])).astype(np.int8)
+        return np.maximum(sig, 0) if params["side"] == "long" else sig
+
+
+def test_registry_and_param_space():
+    assert {"ema_cross", "donchian", "test_momentum"} <= set(available())
+    ema = get_strategy("ema_cross")
+    assert ema.resolve({"fast": 5}) == {"fast": 5, "slow": 26}
+    with pytest.raises(ValueError):
+        ema.resolve({"fats": 5})
+    assert all(p["fast"] < p["slow"] for p in ema.grid(fast=[5, 30], slow=[20, 40]))
+    assert get_strategy("test_momentum").grid() == [
+        {"n": n, "side": s} for n in (5, 10, 15, 20) for s in ("both", "long")
+    ]
+    with pytest.raises(KeyError):
+        get_strategy("nope")
+
+
+def test_broken_plugin_is_skipped(monkeypatch):
+    import importlib.metadata
+
+    from forest.strategies import base
+
+    class _EP:
+        def __init__(self, name, load):
+            self.name, self.load = name, load
+
+    def _boom():
+        raise ImportError("missing dependency")
+
+    class _Unnamed(_Momentum):
+        name = ""
+
+    class _NoSignal(Strategy):                              # brak ``signal`` → błąd już przy rejestracji
+        name = "no_signal"
+
+    with pytest.raises(TypeError):
+        register(_NoSignal)
+
+    loads = []
+    eps = [_EP("broken", lambda: loads.append(1) or _boom()), _EP("no_signal", lambda: _NoSignal),
+           _EP("plugin_momentum", lambda: _Unnamed)]
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: eps)
+    monkeypatch.setattr(base, "_REGISTRY", dict(base._REGISTRY))
+    base._load.cache_clear()
+    try:
+        assert get_strategy("plugin_momentum").name == "plugin_momentum"
+        assert "ema_cross" in available() and not {"broken", "no_signal"} & set(available())
+        assert loads == [1]                                   # bez ponawiania przy kolejnych wywołaniach
+    finally:
+        base._load.cache_clear()
+
+
+def test_signal_matrix_matches_single_and_legacy():
+    df = _ohlc()
+    ema = get_strategy("ema_cross")
+    params = ema.grid(fast=[3, 5, 8], slow=[13, 21])
+    data = strategy_inputs(df, {k for p in params for k in ema.needs(p)})
+    mat = ema.signal_matrix(data, params)
+    assert mat.dtype == np.int8 and mat.shape == (len(params), len(df))
+    for row, p in zip(mat, params):
+        assert np.array_equal(row, ema_cross_strategy(df, p["fast"], p["slow"]).to_numpy())
+
+    donchian = get_strategy("donchian")
+    sig = donchian.signal(strategy_inputs(df, donchian.needs({"n": 10})), {"n": 10})
+    hh = df["high"].rolling(10).max().shift(1).to_numpy()
+    assert np.array_equal(sig == 1, df["close"].to_numpy() > np.nan_to_num(hh, nan=np.inf))
+
+
+def test_grid_runs_any_strategy_with_shared_indicators():
+    df = _ohlc()
+    grid = get_strategy("test_momentum").grid()
+    with profiling.profiling():
+        res = run_grid(df, grid, n_jobs=1, use_cache=False, strategy="test_momentum")
+        calls = profiling.snapshot()["stages"]["indicators.atr"][0]
+    assert calls == 1                                           # ATR raz na cały grid
+    assert res.attrs["params"] == ["n", "side"] and len(res) == 8
+
+    one = run_backtest(df, RiskManager(capital=10_000), strategy="test_momentum", params={"n": 15, "side": "long"})
+    row = res[(res["n"] == 15) & (res["side"] == "long")].iloc[0]
+    assert row["equity_end"] == pytest.approx(float(one["equity"].iloc[-1]))
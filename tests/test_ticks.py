@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.data.csv_source import CSVConfig, load_history_csv
+from forest.data.ticks import TICK_DTYPE, BarAggregator, TickConfig, aggregate_ticks
+
+
+def _ticks(n: int = 20_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp("2025-01-06", tz="UTC").value // 10**6
+    ms = t0 + np.cumsum(rng.integers(50, 2_000, n))                         # ~17 h ticków
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    spread = rng.uniform(1e-5, 3e-5, n)
+    return pd.DataFrame({"time": ms, "bid": mid - spread / 2, "ask": mid + spread / 2, "volume": rng.integers(1, 10, n)})
+
+
+def test_time_bars_match_resample_and_chunking(tmp_path):
+    raw = _ticks()
+    path = tmp_path / "ticks.csv"
+    raw.to_csv(path, index=False)
+    cfg = TickConfig(path=path, time_unit="ms", volume_col="volume", chunksize=777)
+    bars = aggregate_ticks(cfg, "15m")
+
+    # jedna paczka = ten sam wynik co wiele paczek
+    whole = aggregate_ticks(cfg.model_copy(update={"chunksize": 10**7}), "15m")
+    pd.testing.assert_frame_equal(bars, whole)
+
+    s = raw.set_index(pd.to_datetime(raw["time"], unit="ms", utc=True))
+    mid = (s["bid"] + s["ask"]) / 2
+    ref = mid.resample("15min").ohlc().dropna()
+    np.testing.assert_allclose(bars[["open", "high", "low", "close"]].to_numpy(), ref.to_numpy())
+    assert (bars.index == ref.index).all()
+    assert bars["volume"].sum() == raw["volume"].sum() and bars["ticks"].sum() == len(raw)
+    spr = (s["ask"] - s["bid"]).resample("15min").agg(["mean", "max"]).dropna()
+    np.testing.assert_allclose(bars[["spread_mean", "spread_max"]].to_numpy(), spr.to_numpy())
+
+
+def test_tick_and_volume_bars():
+    raw = _ticks(5_000)
+    t = raw["time"].to_numpy() * 10**6
+    agg = BarAggregator("1000t")
+    parts = [agg.update(t[i : i + 300], raw["bid"][i : i + 300], raw["ask"][i : i + 300]) for i in range(0, len(t), 300)]
+    bars = pd.concat(parts + [agg.flush()])
+    assert len(bars) == 5 and (bars["ticks"] == 1000).all()
+    assert bars.index[1].value == t[1000]
+
+    vol = BarAggregator("2000v")
+    v = raw["volume"].to_numpy().astype(float)
+    vb = pd.concat([vol.update(t, raw["bid"], raw["ask"], v), vol.flush()])
+    assert vb["volume"].sum() == v.sum()
+    assert ((vb["volume"].iloc[:-1] - 2000).abs() < v.max()).all()
+
+    # spóźnione ticki do zamkniętej świecy są pomijane i liczone
+    late = BarAggregator("1m")
+    late.update(t[:1000], raw["bid"][:1000], raw["ask"][:1000])
+    late.update(t[:10], raw["bid"][:10], raw["ask"][:10])
+    assert late.late == 10
+
+
+def test_write_to_csv_store_and_append(tmp_path):
+    raw = _ticks()
+    rec = np.empty(len(raw), dtype=TICK_DTYPE)
+    rec["time"] = raw["time"].to_numpy() * 10**6
+    rec["bid"], rec["ask"], rec["volume"] = raw["bid"], raw["ask"], raw["volume"]
+    half = len(rec) // 2
+    rec[:half].tofile(tmp_path / "a.bin")
+    rec[half:].tofile(tmp_path / "b.bin")
+
+    out = str(tmp_path / "store" / "{symbol}_{timeframe}.csv")
+    a = TickConfig(path=tmp_path / "a.bin", symbol="EURUSD", format="binary", chunksize=1000)
+    b = a.model_copy(update={"path": tmp_path / "b.bin"})
+    paths = aggregate_ticks([a, b], ["1m", "1h"], out=out)
+    assert paths["1h"] == tmp_path / "store" / "EURUSD_1h.csv"
+
+    full = load_history_csv(CSVConfig(path=paths["1h"], timeframe="1h"))
+    ref = aggregate_ticks([a, b], "1h")
+    np.testing.assert_allclose(full[["open", "high", "low", "close", "volume"]].to_numpy(), ref[["open", "high", "low", "close", "volume"]].to_numpy())
+    assert {"ticks", "spread_mean", "spread_max"} <= set(full.columns)
+    # 1m przeliczone przez load_history_csv do 1h = świece 1h z ticków
+    up = load_history_csv(CSVConfig(path=paths["1m"], timeframe="1h"))
+    np.testing.assert_allclose(up[["high", "ticks", "spread_max"]], full[["high", "ticks", "spread_max"]])
+    np.testing.assert_allclose(up["spread_mean"], full["spread_mean"], rtol=1e-9)   # ważony liczbą ticków
+
+    # dopisanie kolejnego pliku: tylko nowsze świece
+    aggregate_ticks(a, "1h", out=out)
+    aggregate_ticks(b, "1h", out=out, append=True)
+    again = load_history_csv(CSVConfig(path=paths["1h"], timeframe="1h"))
+    assert again.index.equals(full.index) and not again.index.has_duplicates
+
+    # świece tickowe / wolumenowe nie mają interwału dla load_history_csv
+    with pytest.raises(ValueError, match="time bars only"):
+        aggregate_ticks(a, ["1h", "500t"], out=str(tmp_path / "bad" / "{symbol}_{timeframe}.csv"))
+    assert not (tmp_path / "bad").exists()
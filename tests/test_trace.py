@@ -11,3 +11,50 @@ def test_trace_dataclass():
 def test_setup_logger_no_exception():
     setup_logger("DEBUG")  # nie rzuca wyjątków
 
+
+
+def _prices(n: int = 300):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    base = np.cumsum(rng.normal(0, 0.5, n)) + 100
+    return pd.DataFrame(
+        {"open": base, "high": base + 0.3, "low": base - 0.3, "close": base},
+        index=pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"),
+    )
+
+
+def test_trace_recorder_modes_and_why(tmp_path):
+    from forest.backtest.engine import run_backtest
+    from forest.backtest.risk import RiskManager
+    from forest.backtest.trace import TraceRecorder, load_trace, why
+
+    df = _prices()
+    path = tmp_path / "trace.parquet"
+    with TraceRecorder("full", path=path, capacity=4) as rec:  # mały bufor -> kilka flushy
+        run_backtest(df, RiskManager(capital=10_000), 5, 20, trace=rec)
+    full = load_trace(path)
+    assert len(full) > 4
+    assert set(full["event"].astype(str)) <= {"open", "close", "trailing_sl", "skip"}
+    assert full["symbol"].iloc[0] == "SYN"
+
+    last = why(path, full["time"].iloc[-1])
+    assert len(last) == 1 and last["time"].iloc[0] == full["time"].iloc[-1]
+
+    sampled = TraceRecorder("sampled", sample_every=3)
+    run_backtest(df, RiskManager(capital=10_000), 5, 20, trace=sampled)
+    assert len(sampled) == (len(full) + 2) // 3
+
+    off = TraceRecorder("off")
+    run_backtest(df, RiskManager(capital=10_000), 5, 20, trace=off)
+    assert len(off) == 0
+
+
+def test_trace_ring_buffer_keeps_latest():
+    from forest.backtest.trace import EVENT_OPEN, TraceRecorder
+
+    rec = TraceRecorder("full", capacity=3)
+    for t in range(5):
+        rec.record(t, EVENT_OPEN, 1)
+    assert list(rec.records()["time"]) == [2, 3, 4]
@@ -16,3 +16,31 @@ def test_tradebook_pnl_and_dd():
     dd = tb.max_drawdown()
     assert dd == 95.0            # największe obsunięcie między 100 a 5
 
+
+
+def test_tradebook_growth_and_incremental_dd():
+    tb = TradeBook(capacity=2)
+    times = pd.date_range("2025-08-05 10:00", periods=100, freq="min", tz="UTC")
+    for i, ts in enumerate(times):
+        # naprzemiennie LONG / SHORT -> equity skacze w górę i w dół
+        tb.append(ts, 10.0 + i, 1.0, "LONG" if i % 2 == 0 else "SHORT")
+
+    assert len(tb) == 100
+    eq = tb.equity_curve()
+    assert eq.index.tz is not None
+    # przyrostowy DD == DD liczony od zera na pełnej serii
+    assert tb.max_drawdown() == float((eq.cummax() - eq).max())
+
+
+def test_tradebook_export():
+    tb = TradeBook()
+    tb.add(Trade(pd.Timestamp("2025-08-05 10:00"), 100.0, 1, "LONG"))
+    tb.add(Trade(pd.Timestamp("2025-08-05 12:00"), 95.0, 1, "SHORT"))
+
+    frame = tb.to_frame()
+    assert list(frame["side"]) == [1, -1]
+    assert list(frame["equity"]) == [100.0, 5.0]
+    assert [t.side for t in tb] == ["LONG", "SHORT"]
+
+    table = tb.to_arrow()
+    assert table.num_rows == 2 and table.column_names[0] == "time"
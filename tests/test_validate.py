@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest.utils import profiling
+from forest.utils.validate import clear_cache, ensure_backtest_ready, repair_ohlc, validate_ohlc
+
+
+def _bars(n: int = 24 * 14, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-06", periods=n, freq="h", tz="UTC")    # poniedziałek
+    idx = idx[idx.dayofweek < 5]                                         # bez weekendów (luki weekendowe)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, len(idx)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame(
+        {"open": open_, "high": np.maximum(open_, close) + 0.1, "low": np.minimum(open_, close) - 0.1, "close": close, "volume": 1.0},
+        index=idx,
+    )
+
+
+def test_clean_frame_is_ok_and_not_copied():
+    df = _bars()
+    rep = validate_ohlc(df, timeframe="1h", cache=False)
+    assert rep.ok and rep.missing_bars == 0
+    assert list(rep.gaps["kind"]) == ["weekend"] and rep.gaps["missing"].iloc[0] == 48
+    assert repair_ohlc(df, rep) is df
+    assert ensure_backtest_ready(df, check=True) is df
+
+
+def test_detects_and_repairs_issues():
+    df = _bars()
+    df.iloc[10, df.columns.get_loc("high")] = df["close"].iloc[10] - 1.0      # high < close
+    df.iloc[20, df.columns.get_loc("close")] = np.nan
+    df.iloc[30, df.columns.get_loc("close")] *= 1.2                           # izolowana szpilka
+    df.iloc[31, df.columns.get_loc("open")] = df["close"].iloc[30]
+    df.iloc[31, df.columns.get_loc("high")] = df["close"].iloc[30]
+    df = df.drop(df.index[40:45])                                             # luka 5 świec
+    df = pd.concat([df, df.iloc[[50]]])                                       # duplikat na końcu (cofnięcie)
+
+    rep = validate_ohlc(df, timeframe="1h", cache=False)
+    c = rep.counts
+    assert c["ohlc"] >= 1 and c["nan"] == 1 and c["unsorted"] == 1 and c["spike"] >= 1
+    assert 30 in rep.rows["spike"] and 10 in rep.rows["ohlc"]
+    gap = rep.gaps[rep.gaps["kind"] == "session"]
+    assert len(gap) == 1 and gap["missing"].iloc[0] == 5
+    assert "nan=1" in rep.summary()
+    with pytest.raises(ValueError, match="Data quality"):
+        ensure_backtest_ready(df, check=True)
+
+    fixed = repair_ohlc(df, rep, fill_gaps=True)
+    assert fixed.index.is_monotonic_increasing and not fixed.index.has_duplicates
+    assert validate_ohlc(fixed, timeframe="1h", cache=False).ok
+    assert len(fixed) == len(df) - 1 - 2 + 5                                  # −duplikat −NaN −szpilka +luka
+    filled = fixed.loc[fixed.index[40]]
+    assert np.diff(fixed.index.asi8[39:41])[0] == 3600 * 10**9
+    assert filled["volume"] == 0 and filled["open"] == filled["close"] == df["close"].iloc[39]
+
+
+def test_report_cached_by_fingerprint(tmp_path):
+    clear_cache()
+    df = _bars()
+    with profiling.profiling():
+        a = validate_ohlc(df, cache_dir=tmp_path)
+        b = validate_ohlc(df.copy(), cache_dir=tmp_path)
+        clear_cache()
+        c = validate_ohlc(df, cache_dir=tmp_path)                            # z dysku
+        snap = profiling.snapshot()
+    assert a is b and c.fingerprint == a.fingerprint and snap["counters"]["validate.cache_hit"][0] == 2
+    assert snap["stages"]["validate.scan"][0] == 1
+    assert len(list(tmp_path.glob("*.pkl"))) == 1